@@ -0,0 +1,14 @@
+"""
+Benchmarks headless do SmartCityOS.
+
+generate.py popula o banco com uma cidade sintética (COPY), run.py cronometra
+as consultas quentes das páginas e grava um relatório JSON, e compare.py
+compara dois relatórios.
+"""
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (ROOT_DIR, os.path.join(ROOT_DIR, "functions")):
+    if path not in sys.path:
+        sys.path.append(path)
@@ -0,0 +1,93 @@
+import json
+
+# Piora relativa da mediana a partir da qual um caso conta como regressão
+DEFAULT_THRESHOLD = 0.10
+
+
+def load_report(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare_reports(baseline, current, threshold=DEFAULT_THRESHOLD):
+    """
+    Compare the median of each case present in both reports.
+
+    Returns a list of dicts (case, baseline_ms, current_ms, change, status)
+    sorted by change, status being "regression", "improvement", "same",
+    "new", "removed" or "error".
+    """
+    rows = []
+    base_cases = baseline.get("cases", {})
+    cur_cases = current.get("cases", {})
+
+    for name in sorted(set(base_cases) | set(cur_cases)):
+        base = base_cases.get(name)
+        cur = cur_cases.get(name)
+        row = {"case": name, "baseline_ms": None, "current_ms": None, "change": None}
+        if base is None:
+            row["status"] = "new"
+        elif cur is None:
+            row["status"] = "removed"
+        elif "error" in base or "error" in cur:
+            row["status"] = "error"
+        else:
+            row["baseline_ms"] = base["median_ms"]
+            row["current_ms"] = cur["median_ms"]
+            row["change"] = (cur["median_ms"] - base["median_ms"]) / base["median_ms"] if base["median_ms"] else 0.0
+            if row["change"] > threshold:
+                row["status"] = "regression"
+            elif row["change"] < -threshold:
+                row["status"] = "improvement"
+            else:
+                row["status"] = "same"
+        rows.append(row)
+
+    rows.sort(key=lambda r: (r["change"] is None, -(r["change"] or 0)))
+    return rows
+
+
+def scale_differences(baseline, current):
+    """Tables whose row count differs between the two reports: {table: (baseline, current)}."""
+    base_scale = baseline.get("scale", {})
+    cur_scale = current.get("scale", {})
+    return {
+        table: (base_scale.get(table), cur_scale.get(table))
+        for table in sorted(set(base_scale) | set(cur_scale))
+        if base_scale.get(table) != cur_scale.get(table)
+    }
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Compare two benchmark reports written by bench.run")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument(
+        "--threshold", type=float, default=DEFAULT_THRESHOLD,
+        help="Relative slowdown of the median flagged as regression (default: 0.10)",
+    )
+    args = parser.parse_args()
+
+    baseline = load_report(args.baseline)
+    current = load_report(args.current)
+
+    print(f"Baseline: {baseline.get('created_at')} ({baseline.get('git_commit')})")
+    print(f"Current:  {current.get('created_at')} ({current.get('git_commit')})")
+    for table, (before, after) in scale_differences(baseline, current).items():
+        print(f"Warning: {table} has {before} rows in the baseline and {after} now")
+
+    rows = compare_reports(baseline, current, args.threshold)
+    for row in rows:
+        if row["change"] is None:
+            print(f"{row['status']:>11}  {row['case']}")
+        else:
+            print(
+                f"{row['status']:>11}  {row['case']}: {row['baseline_ms']:.2f} ms -> "
+                f"{row['current_ms']:.2f} ms ({row['change']:+.1%})"
+            )
+
+    regressions = [row for row in rows if row["status"] == "regression"]
+    print(f"{len(regressions)} regression(s) above {args.threshold:.0%}")
+    sys.exit(1 if regressions else 0)
@@ -0,0 +1,528 @@
+import random
+from array import array
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+# Linhas geradas por cidadão; os demais volumes derivam de --citizens
+RATIOS = {
+    "vehicles": 0.6,
+    "sensors": 0.01,
+    "readings": 10,
+    "incidents": 0.5,
+}
+# Fração dos incidentes (com veículo de dono conhecido) que viram multa, e das multas pagas
+FINE_RATE = 0.7
+PAYMENT_RATE = 0.4
+MIN_SENSORS = 10
+CHUNK_SIZE = 100000
+# Janela das leituras e incidentes sintéticos
+HISTORY_DAYS = 90
+PASSWORD = "bench"
+
+FIRST_NAMES = (
+    "Ana", "Bruno", "Carla", "Daniel", "Eduarda", "Felipe", "Gabriela", "Henrique",
+    "Isabela", "João", "Larissa", "Lucas", "Mariana", "Mateus", "Natália", "Pedro",
+    "Rafaela", "Rodrigo", "Sofia", "Thiago", "Valentina", "Vinícius", "Beatriz", "Gustavo",
+)
+LAST_NAMES = (
+    "Silva", "Santos", "Oliveira", "Souza", "Rodrigues", "Ferreira", "Alves", "Pereira",
+    "Lima", "Gomes", "Costa", "Ribeiro", "Martins", "Carvalho", "Almeida", "Lopes",
+    "Soares", "Fernandes", "Vieira", "Barbosa", "Rocha", "Dias", "Nascimento", "Moreira",
+)
+STREETS = (
+    "Av. Paulista", "Rua Augusta", "Av. Brasil", "Rua das Flores", "Av. Atlântica",
+    "Rua XV de Novembro", "Av. Sete de Setembro", "Rua da Consolação", "Av. Rio Branco",
+    "Rua Oscar Freire", "Av. Ipiranga", "Rua Direita", "Av. Beira Mar", "Rua do Comércio",
+)
+NEIGHBORHOODS = (
+    "Centro", "Jardins", "Vila Mariana", "Moema", "Pinheiros", "Copacabana", "Botafogo",
+    "Savassi", "Boa Viagem", "Batel", "Meireles", "Asa Sul",
+)
+VEHICLE_MODELS = (
+    "Fiat Uno", "VW Gol", "Chevrolet Onix", "Hyundai HB20", "Toyota Corolla", "Honda Civic",
+    "Renault Kwid", "Fiat Strada", "VW Polo", "Jeep Renegade", "Ford Ka", "Nissan Kicks",
+)
+INCIDENT_DESCRIPTIONS = (
+    "Excesso de velocidade", "Avanço de sinal vermelho", "Estacionamento irregular",
+    "Uso de celular ao volante", "Parada sobre a faixa de pedestres", "Conversão proibida",
+    "Trafegar no corredor de ônibus", "Sem cinto de segurança",
+)
+PAYMENT_METHODS = (
+    "Carteira Digital", "Cartão de Crédito", "Cartão de Débito", "Dinheiro", "PIX", "Boleto",
+)
+
+
+def _speed(rng):
+    return {"speed": round(rng.gauss(55, 15), 1)}
+
+
+def _traffic(rng):
+    return {
+        "vehicle_count": rng.randint(0, 120),
+        "avg_speed": round(rng.uniform(5, 80), 1),
+        "occupancy": round(rng.random(), 3),
+    }
+
+
+def _air(rng):
+    pm25 = round(rng.uniform(2, 80), 1)
+    return {"aqi": int(pm25 * 2), "pm25": pm25, "pm10": round(pm25 * 1.6, 1), "co2": rng.randint(380, 900)}
+
+
+def _noise(rng):
+    return {"noise_db": round(rng.uniform(35, 95), 1)}
+
+
+def _camera(rng):
+    # Sem reading_schema: vai para reading como JSONB
+    return {"plates_read": rng.randint(0, 40), "status": rng.choice(("ok", "ok", "ok", "blurred"))}
+
+
+# Tipo de sensor -> (modelos, gerador de payload)
+SENSOR_TYPES = {
+    "Radar": (("Radar RX-200", "SpeedCam 3"), _speed),
+    "Sensor de Velocidade": (("VelociSense V2",), _speed),
+    "Sensor de Tráfego": (("TrafficPro T1", "FlowCount 500"), _traffic),
+    "Qualidade do Ar": (("AirQ 10", "EcoSense PM"), _air),
+    "Ruído": (("NoiseMeter N3",), _noise),
+    "Câmera": (("IP Camera X100", "Vision 4K"), _camera),
+}
+
+
+def plan_volumes(citizens, **overrides):
+    """Row counts per entity for a city of `citizens`; explicit overrides win."""
+    volumes = {
+        "citizens": citizens,
+        "vehicles": int(citizens * RATIOS["vehicles"]),
+        "sensors": max(int(citizens * RATIOS["sensors"]), MIN_SENSORS),
+        "readings": int(citizens * RATIOS["readings"]),
+        "incidents": int(citizens * RATIOS["incidents"]),
+    }
+    volumes.update({key: value for key, value in overrides.items() if value is not None})
+    return volumes
+
+
+def _chunks(total, size):
+    for start in range(0, total, size):
+        yield start, min(size, total - start)
+
+
+def _plate(n):
+    """n-th plate in the Mercosul format (ABC1D23)."""
+    n, tail = divmod(n, 100)
+    n, letter = divmod(n, 26)
+    n, digit = divmod(n, 10)
+    prefix = ""
+    for _ in range(3):
+        n, code = divmod(n, 26)
+        prefix = chr(65 + code) + prefix
+    return f"{prefix}{digit}{chr(65 + letter)}{tail:02d}"
+
+
+def _address(rng):
+    return f"{rng.choice(STREETS)}, {rng.randint(1, 4000)} - {rng.choice(NEIGHBORHOODS)}"
+
+
+def _random_time(rng, now):
+    return now - timedelta(seconds=rng.randrange(HISTORY_DAYS * 86400))
+
+
+def _copy(cur, table, columns, types, rows):
+    with cur.copy(f"COPY {table} ({', '.join(columns)}) FROM STDIN") as copy:
+        copy.set_types(types)
+        for row in rows:
+            copy.write_row(row)
+
+
+def _new_ids(cur, table, after):
+    """Ids created after `after`, in insertion order (COPY assigns them sequentially)."""
+    cur.execute(f"SELECT id FROM {table} WHERE id > %s ORDER BY id", (after,))
+    return [row[0] for row in cur.fetchall()]
+
+
+def _max_id(cur, table):
+    cur.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}")
+    return cur.fetchone()[0]
+
+
+def generate_city(conn_info, schema, citizens, seed=42, chunk_size=CHUNK_SIZE,
+                  overrides=None, rollups=True, progress=None):
+    """
+    Populate the database with a synthetic city, for the benchmarks.
+
+    Citizens, vehicles and sensors are staged with COPY and inserted set-wise
+    together with their app_user rows; readings, incidents, fines and payments
+    go straight in with COPY. Triggers stay enabled, so debts, fine_read_model,
+    sensor_reading_stats and the audit log are filled as in production. Each
+    chunk is committed on its own. Usernames, CPFs and plates continue after
+    the existing rows, so a city can be added to a database that has data.
+    progress(entity, done, total) is called after each chunk.
+    Returns {"volumes": {...}, "timings": {entity: seconds}}, or None on error.
+    """
+    try:
+        import time
+        import psycopg as psy
+        from psycopg.types.json import Jsonb
+        from reading_storage import load_reading_schemas, map_payload
+
+        rng = random.Random(seed)
+        volumes = plan_volumes(citizens, **(overrides or {}))
+        created = dict.fromkeys(volumes, 0)
+        created.update(fines=0, payments=0)
+        timings = {}
+        now = datetime.now().replace(microsecond=0)
+
+        with psy.connect(conn_info) as conn:
+            with conn.cursor() as cur:
+                tag = _max_id(cur, f"{schema}.app_user")
+                cur.execute(f"""
+                    SELECT COALESCE(MAX(cpf::BIGINT), 0)
+                    FROM {schema}.citizen
+                    WHERE cpf ~ '^[0-9]{{11}}$'
+                """)
+                cpf_base = cur.fetchone()[0]
+                plate_base = _max_id(cur, f"{schema}.vehicle")
+                schemas = load_reading_schemas(cur, schema)
+
+                cur.execute("""
+                    CREATE TEMP TABLE citizen_stage (
+                        line_no BIGINT GENERATED ALWAYS AS IDENTITY,
+                        username TEXT, first_name TEXT, last_name TEXT, cpf TEXT,
+                        birth_date DATE, email TEXT, phone TEXT, address TEXT,
+                        wallet_balance NUMERIC(10,2)
+                    )
+                """)
+                cur.execute("""
+                    CREATE TEMP TABLE vehicle_stage (
+                        line_no BIGINT GENERATED ALWAYS AS IDENTITY,
+                        username TEXT, license_plate TEXT, model TEXT, year INTEGER,
+                        citizen_id INTEGER
+                    )
+                """)
+                cur.execute("""
+                    CREATE TEMP TABLE sensor_stage (
+                        line_no BIGINT GENERATED ALWAYS AS IDENTITY,
+                        username TEXT, model TEXT, type TEXT, location TEXT
+                    )
+                """)
+            conn.commit()
+
+            # Cidadãos
+            started = time.perf_counter()
+            citizen_ids = array("i")
+            for start, count in _chunks(volumes["citizens"], chunk_size):
+                with conn.cursor() as cur:
+                    cur.execute("TRUNCATE citizen_stage")
+                    rows = []
+                    for i in range(start, start + count):
+                        first_name = rng.choice(FIRST_NAMES)
+                        last_name = f"{rng.choice(LAST_NAMES)} {rng.choice(LAST_NAMES)}"
+                        rows.append((
+                            f"bench_{tag}_citizen_{i}",
+                            first_name,
+                            last_name,
+                            f"{cpf_base + i + 1:011d}",
+                            date(1940, 1, 1) + timedelta(days=rng.randrange(60 * 365)),
+                            f"{first_name.lower()}.{i}.{tag}@bench.smartcity",
+                            f"(11) 9{rng.randrange(10000):04d}-{rng.randrange(10000):04d}",
+                            _address(rng),
+                            Decimal(rng.randrange(200000)) / 100,
+                        ))
+                    _copy(
+                        cur, "citizen_stage",
+                        ("username", "first_name", "last_name", "cpf", "birth_date",
+                         "email", "phone", "address", "wallet_balance"),
+                        ("text", "text", "text", "text", "date", "text", "text", "text", "numeric"),
+                        rows,
+                    )
+                    cur.execute(f"""
+                        WITH new_users AS (
+                            INSERT INTO {schema}.app_user (username, password_hash)
+                            SELECT username, %(password)s
+                            FROM citizen_stage
+                            ORDER BY line_no
+                            RETURNING id, username
+                        )
+                        INSERT INTO {schema}.citizen (
+                            app_user_id, first_name, last_name, cpf, birth_date,
+                            email, phone, address, wallet_balance
+                        )
+                        SELECT nu.id, s.first_name, s.last_name, s.cpf, s.birth_date,
+                               s.email, s.phone, s.address, s.wallet_balance
+                        FROM citizen_stage s
+                        JOIN new_users nu ON nu.username = s.username
+                        ORDER BY s.line_no
+                        RETURNING id
+                    """, {"password": PASSWORD})
+                    citizen_ids.extend(row[0] for row in cur.fetchall())
+                conn.commit()
+                created["citizens"] += count
+                if progress:
+                    progress("citizens", created["citizens"], volumes["citizens"])
+            timings["citizens"] = time.perf_counter() - started
+
+            # Veículos (90% com dono)
+            started = time.perf_counter()
+            vehicle_ids = array("i")
+            vehicle_owners = array("i")
+            for start, count in _chunks(volumes["vehicles"], chunk_size):
+                with conn.cursor() as cur:
+                    cur.execute("TRUNCATE vehicle_stage")
+                    rows = [
+                        (
+                            f"bench_{tag}_vehicle_{i}",
+                            _plate(plate_base + i + 1),
+                            rng.choice(VEHICLE_MODELS),
+                            rng.randint(1995, now.year + 1),
+                            rng.choice(citizen_ids) if citizen_ids and rng.random() < 0.9 else None,
+                        )
+                        for i in range(start, start + count)
+                    ]
+                    _copy(
+                        cur, "vehicle_stage",
+                        ("username", "license_plate", "model", "year", "citizen_id"),
+                        ("text", "text", "text", "int4", "int4"),
+                        rows,
+                    )
+                    cur.execute(f"""
+                        WITH new_users AS (
+                            INSERT INTO {schema}.app_user (username, password_hash)
+                            SELECT username, %(password)s
+                            FROM vehicle_stage
+                            ORDER BY line_no
+                            RETURNING id, username
+                        ),
+                        new_vehicles AS (
+                            INSERT INTO {schema}.vehicle (
+                                app_user_id, license_plate, model, year, citizen_id
+                            )
+                            SELECT nu.id, s.license_plate, s.model, s.year, s.citizen_id
+                            FROM vehicle_stage s
+                            JOIN new_users nu ON nu.username = s.username
+                            ORDER BY s.line_no
+                            RETURNING id, citizen_id
+                        ),
+                        new_links AS (
+                            INSERT INTO {schema}.vehicle_citizen (vehicle_id, citizen_id)
+                            SELECT id, citizen_id
+                            FROM new_vehicles
+                            WHERE citizen_id IS NOT NULL
+                        )
+                        SELECT id, COALESCE(citizen_id, 0)
+                        FROM new_vehicles
+                        ORDER BY id
+                    """, {"password": PASSWORD})
+                    for vehicle_id, owner_id in cur.fetchall():
+                        vehicle_ids.append(vehicle_id)
+                        vehicle_owners.append(owner_id)
+                conn.commit()
+                created["vehicles"] += count
+                if progress:
+                    progress("vehicles", created["vehicles"], volumes["vehicles"])
+            timings["vehicles"] = time.perf_counter() - started
+
+            # Sensores
+            started = time.perf_counter()
+            sensor_ids = array("i")
+            sensor_types = []
+            type_names = list(SENSOR_TYPES)
+            for start, count in _chunks(volumes["sensors"], chunk_size):
+                with conn.cursor() as cur:
+                    cur.execute("TRUNCATE sensor_stage")
+                    rows = []
+                    for i in range(start, start + count):
+                        sensor_type = type_names[i % len(type_names)]
+                        rows.append((
+                            f"bench_{tag}_sensor_{i}",
+                            rng.choice(SENSOR_TYPES[sensor_type][0]),
+                            sensor_type,
+                            _address(rng),
+                        ))
+                    _copy(
+                        cur, "sensor_stage",
+                        ("username", "model", "type", "location"),
+                        ("text", "text", "text", "text"),
+                        rows,
+                    )
+                    cur.execute(f"""
+                        WITH new_users AS (
+                            INSERT INTO {schema}.app_user (username, password_hash)
+                            SELECT username, %(password)s
+                            FROM sensor_stage
+                            ORDER BY line_no
+                            RETURNING id, username
+                        )
+                        INSERT INTO {schema}.sensor (app_user_id, model, type, location)
+                        SELECT nu.id, s.model, s.type, s.location
+                        FROM sensor_stage s
+                        JOIN new_users nu ON nu.username = s.username
+                        ORDER BY s.line_no
+                        RETURNING id, type
+                    """, {"password": PASSWORD})
+                    for sensor_id, sensor_type in cur.fetchall():
+                        sensor_ids.append(sensor_id)
+                        sensor_types.append(sensor_type)
+                conn.commit()
+                created["sensors"] += count
+                if progress:
+                    progress("sensors", created["sensors"], volumes["sensors"])
+            timings["sensors"] = time.perf_counter() - started
+
+            # Leituras: tipadas em reading_compact, as demais em reading (JSONB)
+            started = time.perf_counter()
+            for start, count in _chunks(volumes["readings"] if sensor_ids else 0, chunk_size):
+                compact_rows = []
+                jsonb_rows = []
+                for _ in range(count):
+                    index = rng.randrange(len(sensor_ids))
+                    sensor_type = sensor_types[index]
+                    payload = SENSOR_TYPES[sensor_type][1](rng)
+                    timestamp = _random_time(rng, now)
+                    schema_id, metrics = schemas.get(sensor_type, (None, None))
+                    values = map_payload(payload, metrics) if metrics else None
+                    if values is not None:
+                        compact_rows.append((sensor_ids[index], schema_id, timestamp, values))
+                    else:
+                        jsonb_rows.append((sensor_ids[index], Jsonb(payload), timestamp))
+                with conn.cursor() as cur:
+                    if compact_rows:
+                        _copy(
+                            cur, f"{schema}.reading_compact",
+                            ("sensor_id", "schema_id", "timestamp", "metrics"),
+                            ("integer", "smallint", "timestamp", "real[]"),
+                            compact_rows,
+                        )
+                    if jsonb_rows:
+                        _copy(
+                            cur, f"{schema}.reading",
+                            ("sensor_id", "value", "timestamp"),
+                            ("integer", "jsonb", "timestamp"),
+                            jsonb_rows,
+                        )
+                conn.commit()
+                created["readings"] += count
+                if progress:
+                    progress("readings", created["readings"], volumes["readings"])
+            timings["readings"] = time.perf_counter() - started
+
+            # Incidentes, com as multas e pagamentos do mesmo lote
+            started = time.perf_counter()
+            for start, count in _chunks(volumes["incidents"] if sensor_ids else 0, chunk_size):
+                with conn.cursor() as cur:
+                    last_incident = _max_id(cur, f"{schema}.traffic_incident")
+                    incidents = []
+                    for _ in range(count):
+                        index = rng.randrange(len(vehicle_ids)) if vehicle_ids else None
+                        incidents.append((
+                            vehicle_ids[index] if index is not None else None,
+                            rng.choice(sensor_ids),
+                            _random_time(rng, now),
+                            f"{rng.choice(STREETS)} - {rng.choice(NEIGHBORHOODS)}",
+                            rng.choice(INCIDENT_DESCRIPTIONS),
+                            vehicle_owners[index] if index is not None else 0,
+                        ))
+                    _copy(
+                        cur, f"{schema}.traffic_incident",
+                        ("vehicle_id", "sensor_id", "occurred_at", "location", "description"),
+                        ("integer", "integer", "timestamp", "text", "text"),
+                        (row[:5] for row in incidents),
+                    )
+                    incident_ids = _new_ids(cur, f"{schema}.traffic_incident", last_incident)
+
+                    fines = [
+                        (
+                            incident_id,
+                            incident[5],
+                            Decimal(rng.choice((8838, 13016, 19553, 29347, 88038))) / 100,
+                            (incident[2] + timedelta(days=30)).date(),
+                            incident[2],
+                        )
+                        for incident_id, incident in zip(incident_ids, incidents)
+                        if incident[5] and rng.random() < FINE_RATE
+                    ]
+                    if fines:
+                        last_fine = _max_id(cur, f"{schema}.fine")
+                        _copy(
+                            cur, f"{schema}.fine",
+                            ("traffic_incident_id", "citizen_id", "amount", "due_date", "created_at"),
+                            ("integer", "integer", "numeric", "date", "timestamp"),
+                            fines,
+                        )
+                        fine_ids = _new_ids(cur, f"{schema}.fine", last_fine)
+                        payments = [
+                            (
+                                fine_id,
+                                fine[2],
+                                min(fine[4] + timedelta(days=rng.randrange(30)), now),
+                                rng.choice(PAYMENT_METHODS),
+                            )
+                            for fine_id, fine in zip(fine_ids, fines)
+                            if rng.random() < PAYMENT_RATE
+                        ]
+                        if payments:
+                            _copy(
+                                cur, f"{schema}.fine_payment",
+                                ("fine_id", "amount_paid", "paid_at", "payment_method"),
+                                ("integer", "numeric", "timestamp", "text"),
+                                payments,
+                            )
+                        created["fines"] += len(fines)
+                        created["payments"] += len(payments)
+                conn.commit()
+                created["incidents"] += count
+                if progress:
+                    progress("incidents", created["incidents"], volumes["incidents"])
+            timings["incidents"] = time.perf_counter() - started
+
+            # Estatísticas do planejador atualizadas antes de cronometrar consultas
+            started = time.perf_counter()
+            conn.autocommit = True
+            with conn.cursor() as cur:
+                for table in ("app_user", "citizen", "vehicle", "vehicle_citizen", "sensor",
+                              "reading", "reading_compact", "traffic_incident", "fine",
+                              "fine_payment", "fine_read_model", "audit_log"):
+                    cur.execute(f"ANALYZE {schema}.{table}")
+            timings["analyze"] = time.perf_counter() - started
+
+        if rollups:
+            from smartcity.reading_rollups import refresh_rollups
+
+            started = time.perf_counter()
+            refresh_rollups(conn_info, schema, lag_seconds=0)
+            timings["rollups"] = time.perf_counter() - started
+
+        return {"volumes": created, "timings": timings}
+    except Exception as e:
+        print(f"Error: {e}")
+        import traceback
+        traceback.print_exc()
+        return None
+
+if __name__ == "__main__":
+    import argparse
+    from conect_db import connect_to_db
+
+    parser = argparse.ArgumentParser(description="Populate the database with a synthetic city")
+    parser.add_argument("--citizens", type=int, default=10000, help="City size (10k to 10M)")
+    for entity in ("vehicles", "sensors", "readings", "incidents"):
+        parser.add_argument(f"--{entity}", type=int, help=f"Override the number of {entity}")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--no-rollups", action="store_true", help="Skip the reading rollup refresh")
+    parser.add_argument("--schema", default="public")
+    args = parser.parse_args()
+
+    conn_info = connect_to_db()
+    result = generate_city(
+        conn_info, args.schema, args.citizens,
+        seed=args.seed,
+        chunk_size=args.chunk_size,
+        overrides={entity: getattr(args, entity) for entity in ("vehicles", "sensors", "readings", "incidents")},
+        rollups=not args.no_rollups,
+        progress=lambda entity, done, total: print(f"{entity}: {done}/{total}"),
+    )
+    if result:
+        for entity, count in result["volumes"].items():
+            print(f"{entity}: {count}")
+        for step, elapsed in result["timings"].items():
+            print(f"{step}: {elapsed:.2f}s")
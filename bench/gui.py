@@ -0,0 +1,344 @@
+import fnmatch
+import os
+import platform
+import random
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from bench.generate import (
+    FIRST_NAMES,
+    INCIDENT_DESCRIPTIONS,
+    LAST_NAMES,
+    SENSOR_TYPES,
+    STREETS,
+    VEHICLE_MODELS,
+    _address,
+    _plate,
+)
+from bench.run import git_commit, time_case, write_report
+
+REPORT_VERSION = 1
+DEFAULT_SIZES = (1000, 10000, 100000, 1000000)
+FINE_STATUSES = ("pending", "pending", "overdue", "paid", "paid", "cancelled")
+
+
+def size_label(size):
+    if size >= 1000000 and size % 1000000 == 0:
+        return f"{size // 1000000}M"
+    if size >= 1000 and size % 1000 == 0:
+        return f"{size // 1000}k"
+    return str(size)
+
+
+def _money(rng, low, high):
+    return Decimal(rng.randint(low * 100, high * 100)) / 100
+
+
+def _recent(rng, now, days=90):
+    return now - timedelta(seconds=rng.randrange(days * 86400))
+
+
+def citizen_rows(rng, size, now):
+    rows = []
+    for i in range(size):
+        first_name = rng.choice(FIRST_NAMES)
+        last_name = rng.choice(LAST_NAMES)
+        username = f"{first_name.lower()}.{last_name.lower()}{i}"
+        rows.append({
+            "id": i + 1,
+            "first_name": first_name,
+            "last_name": last_name,
+            "email": f"{username}@smartcity.com",
+            "cpf": f"{rng.randrange(10 ** 11):011d}",
+            "phone": f"119{rng.randrange(10 ** 8):08d}" if rng.random() < 0.8 else None,
+            "address": _address(rng),
+            "birth_date": date(1950, 1, 1) + timedelta(days=rng.randrange(20000)),
+            "wallet_balance": _money(rng, 0, 2000),
+            "debt": _money(rng, 0, 800) if rng.random() < 0.3 else Decimal("0.00"),
+            "allowed": rng.random() < 0.9,
+            "username": username,
+            "created_at": _recent(rng, now),
+        })
+    return rows
+
+
+def vehicle_rows(rng, size, now):
+    rows = []
+    for i in range(size):
+        owned = rng.random() < 0.8
+        rows.append({
+            "id": i + 1,
+            "license_plate": _plate(i),
+            "model": rng.choice(VEHICLE_MODELS),
+            "year": rng.randint(1995, 2025),
+            "allowed": rng.random() < 0.9,
+            "username": f"vehicle{i}",
+            "first_name": rng.choice(FIRST_NAMES) if owned else None,
+            "last_name": rng.choice(LAST_NAMES) if owned else None,
+        })
+    return rows
+
+
+def sensor_rows(rng, size, now):
+    types = tuple(SENSOR_TYPES)
+    rows = []
+    for i in range(size):
+        reading_count = rng.randrange(5000) if rng.random() < 0.9 else 0
+        rows.append({
+            "id": i + 1,
+            "type": rng.choice(types),
+            "location": _address(rng),
+            "active": rng.random() < 0.9,
+            "reading_count": reading_count,
+            "last_reading": _recent(rng, now) if reading_count else None,
+        })
+    return rows
+
+
+def incident_rows(rng, size, now):
+    rows = []
+    for i in range(size):
+        fine_count = 1 if rng.random() < 0.7 else 0
+        rows.append({
+            "id": i + 1,
+            "location": rng.choice(STREETS),
+            "occurred_at": _recent(rng, now),
+            "description": rng.choice(INCIDENT_DESCRIPTIONS),
+            "fine_count": fine_count,
+            "total_fines": _money(rng, 88, 880) if fine_count else Decimal("0.00"),
+        })
+    return rows
+
+
+def fine_rows(rng, size, now):
+    rows = []
+    for i in range(size):
+        created_at = _recent(rng, now)
+        rows.append({
+            "id": i + 1,
+            "amount": _money(rng, 88, 880),
+            "status": rng.choice(FINE_STATUSES),
+            "created_at": created_at,
+            "due_date": created_at.date() + timedelta(days=30),
+            "incident_location": rng.choice(STREETS),
+            "incident_description": rng.choice(INCIDENT_DESCRIPTIONS),
+            "license_plate": _plate(rng.randrange(size)),
+            "first_name": rng.choice(FIRST_NAMES),
+            "last_name": rng.choice(LAST_NAMES),
+        })
+    return rows
+
+
+# Página -> (atributo da janela, lista de linhas da página, gerador, filtros do caso "filtered")
+PAGES = {
+    "citizens": (
+        "citizens_page", "all_citizens", citizen_rows,
+        {"name_filter": "silva", "status_filter": "Ativos"},
+    ),
+    "vehicles": (
+        "vehicles_page", "all_vehicles", vehicle_rows,
+        {"model_filter": "gol", "status_filter": "Ativos"},
+    ),
+    "sensors": (
+        "sensors_page", "all_sensors", sensor_rows,
+        {"type_filter": "radar", "readings_filter": "Com Leituras"},
+    ),
+    "incidents": (
+        "incidents_page", "all_incidents", incident_rows,
+        {"location_filter": "av.", "period_filter": "Este Mês"},
+    ),
+    "fines": (
+        "fines_page", "all_fines", fine_rows,
+        {"status_filter": "Pendentes", "period_filter": "Este Mês"},
+    ),
+}
+
+
+def _set_filters(page, values):
+    """Set filter widgets without firing their signals (no debounce timer, no early apply_filters)."""
+    for name, value in values.items():
+        widget = getattr(page, name)
+        widget.blockSignals(True)
+        if hasattr(widget, "setCurrentText"):
+            widget.setCurrentText(value)
+        else:
+            widget.setText(value)
+        widget.blockSignals(False)
+
+
+def _reset_filters(page, values):
+    for name in values:
+        widget = getattr(page, name)
+        widget.blockSignals(True)
+        if hasattr(widget, "setCurrentIndex"):
+            widget.setCurrentIndex(0)
+        else:
+            widget.clear()
+        widget.blockSignals(False)
+
+
+def peak_memory(func):
+    """Peak Python heap (KiB) allocated by one call of func, measured by tracemalloc."""
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024
+
+
+def build_cases(window, sizes, seed=42, selected=lambda name: True):
+    """
+    Yield (name, func, cleanup) for every page and size. Rows are generated
+    lazily per (page, size), so only one synthetic list is alive at a time.
+    """
+    now = datetime.now()
+
+    for page_name, (attribute, rows_attribute, generator, filters) in PAGES.items():
+        page = getattr(window, attribute)
+        for size in sizes:
+            label = size_label(size)
+            names = [
+                f"gui.{page_name}.{op}.{label}"
+                for op in ("update_stats", "apply_filters", "apply_filters_filtered", "update_table")
+            ]
+            if not any(selected(name) for name in names):
+                continue
+
+            rows = generator(random.Random(seed), size, now)
+            setattr(page, rows_attribute, rows)
+            if hasattr(page, "filter_index"):
+                page.filter_index = None
+
+            def filtered(page=page, filters=filters):
+                _set_filters(page, filters)
+                try:
+                    page.apply_filters()
+                finally:
+                    _reset_filters(page, filters)
+
+            def cleanup(page=page, rows_attribute=rows_attribute):
+                page.table.setRowCount(0)
+                setattr(page, rows_attribute, [])
+                if hasattr(page, "filter_index"):
+                    page.filter_index = None
+
+            yield names[0], lambda page=page, rows=rows: page.update_stats(rows), None
+            yield names[1], page.apply_filters, None
+            yield names[2], filtered, None
+            yield names[3], lambda page=page, rows=rows: page.update_table(rows), cleanup
+            del rows
+
+    # Console SQL: resultado de um SELECT * FROM citizen_active
+    for size in sizes:
+        name = f"gui.sql.update_results_table.{size_label(size)}"
+        if not selected(name):
+            continue
+        rows = citizen_rows(random.Random(seed), size, now)
+        columns = list(rows[0]) if rows else []
+
+        def cleanup(page=window.sql_page):
+            page.results_table.setRowCount(0)
+
+        yield name, lambda rows=rows, columns=columns: window.sql_page._update_results_table(columns, rows), cleanup
+        del rows
+
+
+def run_gui_benchmarks(sizes=DEFAULT_SIZES, repeat=3, warmup=1, only=None, skip=None, seed=42, memory=True):
+    """
+    Time the table/filter hot paths of the Qt pages on synthetic rows, with no
+    database: update_stats, apply_filters (no filter and with the filters of
+    PAGES), update_table and SQLPage._update_results_table.
+
+    Runs on the offscreen Qt platform unless QT_QPA_PLATFORM is already set.
+    Peak memory comes from a separate untimed call under tracemalloc, so it
+    covers Python allocations only (not the C++ side of the table items).
+    Returns the report dict (same "cases" layout as bench.run), or None on error.
+    """
+    try:
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        import PySide6
+        from PySide6.QtWidgets import QApplication
+
+        from gui.qt_app import SmartCityOSQtApp
+
+        app = QApplication.instance() or QApplication([])
+        window = SmartCityOSQtApp()
+
+        report = {
+            "version": REPORT_VERSION,
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "qt": PySide6.__version__,
+            "qt_platform": os.environ["QT_QPA_PLATFORM"],
+            "repeat": repeat,
+            "warmup": warmup,
+            "sizes": list(sizes),
+            "cases": {},
+        }
+
+        def selected(name):
+            if only and not any(fnmatch.fnmatch(name, p) for p in only):
+                return False
+            return not (skip and any(fnmatch.fnmatch(name, p) for p in skip))
+
+        for name, func, cleanup in build_cases(window, sizes, seed, selected):
+            if selected(name):
+                try:
+                    result = time_case(func, repeat, warmup)
+                    if memory:
+                        result["peak_kb"] = peak_memory(func)
+                    report["cases"][name] = result
+                    summary = f"median {result['median_ms']:.1f} ms | p95 {result['p95_ms']:.1f} ms"
+                    if memory:
+                        summary += f" | peak {result['peak_kb'] / 1024:.1f} MiB"
+                except Exception as exc:
+                    report["cases"][name] = {"error": str(exc)}
+                    summary = f"ERROR {exc}"
+                print(f"{name}: {summary}")
+            if cleanup:
+                cleanup()
+            app.processEvents()
+
+        window.close()
+        return report
+    except Exception as e:
+        print(f"Error: {e}")
+        import traceback
+        traceback.print_exc()
+        return None
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Time the Qt page hot paths on synthetic rows (offscreen)")
+    parser.add_argument("--output", default=f"bench_gui_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES),
+        help="Row counts fed to each page (default: 1000 10000 100000 1000000)",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--only", action="append", help="Run only cases matching this pattern (e.g. 'gui.fines.*')")
+    parser.add_argument("--skip", action="append", help="Skip cases matching this pattern (e.g. '*.1M')")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc run of each case")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    report = run_gui_benchmarks(
+        sizes=args.sizes,
+        repeat=args.repeat,
+        warmup=args.warmup,
+        only=args.only,
+        skip=args.skip,
+        seed=args.seed,
+        memory=not args.no_memory,
+    )
+    if report:
+        write_report(report, args.output)
+        print(f"Report written to {args.output} ({time.perf_counter() - started:.0f} s)")
@@ -0,0 +1,315 @@
+import fnmatch
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from bench import ROOT_DIR
+
+REPORT_VERSION = 1
+# Tabelas cujo tamanho entra no relatório (compare.py avisa se mudou entre execuções)
+SCALE_TABLES = (
+    "app_user", "citizen", "vehicle", "sensor", "reading", "reading_compact",
+    "traffic_incident", "fine", "fine_payment", "audit_log",
+)
+SEARCH_TERM = "sil"
+DELTA_IDS = 100
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def time_case(func, repeat, warmup):
+    """Run func warmup + repeat times; returns its timings (ms) and the size of its last result."""
+    for _ in range(warmup):
+        func()
+    samples = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        samples.append((time.perf_counter() - started) * 1000)
+    rows = len(result) if isinstance(result, list) else None
+    return {
+        "runs": repeat,
+        "min_ms": min(samples),
+        "median_ms": statistics.median(samples),
+        "p95_ms": percentile(samples, 0.95),
+        "max_ms": max(samples),
+        "mean_ms": statistics.fmean(samples),
+        "rows": rows,
+    }
+
+
+def _rolled_back(db, work):
+    """Run work(cur) on the shared connection and always roll it back (trigger cases)."""
+    def run():
+        conn = db.connect()
+        with conn.transaction(force_rollback=True):
+            with conn.cursor() as cur:
+                return work(cur)
+    return run
+
+
+def build_cases(db, selected=lambda name: True):
+    """
+    Timed cases: (name, callable). Page loads go through the same repositories
+    as the GUI, so the numbers match what the pages see. Setup queries of the
+    cases rejected by selected(name) are skipped.
+    """
+    from psycopg.rows import tuple_row
+    from search import SEARCH_TARGETS, search
+    from smartcity.backup import restore_commands, split_sql_commands, write_backup
+    from smartcity.data import CitizenRepo, FineRepo, IncidentRepo, SensorRepo, StatsRepo, VehicleRepo
+
+    cases = []
+    repos = {
+        "citizens": CitizenRepo(db),
+        "vehicles": VehicleRepo(db),
+        "sensors": SensorRepo(db),
+        "incidents": IncidentRepo(db),
+        "fines": FineRepo(db),
+    }
+    for page, repo in repos.items():
+        cases.append((f"page.{page}.load_full", lambda repo=repo: repo.load([], None)[0]))
+        if selected(f"page.{page}.load_delta"):
+            # Recarga incremental sem alterações: só o delta e a contagem
+            rows, loaded_at, _ = repo.load([], None)
+            cases.append((
+                f"page.{page}.load_delta",
+                lambda repo=repo, rows=rows, loaded_at=loaded_at: repo.load(rows, loaded_at)[0],
+            ))
+
+    # Atualização por notificação: os DELTA_IDS ids mais recentes
+    for page, table in (("sensors", "sensor_active"), ("incidents", "traffic_incident")):
+        if not selected(f"page.{page}.by_ids"):
+            continue
+        with db.transaction() as cur:
+            cur.execute(f"SELECT id FROM {table} ORDER BY id DESC LIMIT %s", (DELTA_IDS,))
+            ids = [row["id"] for row in cur.fetchall()]
+        if ids:
+            cases.append((f"page.{page}.by_ids", lambda repo=repos[page], ids=ids: repo.by_ids(ids)))
+
+    stats_repo = StatsRepo(db)
+    cases.append(("stats.statistics", stats_repo.statistics))
+    cases.append(("stats.dashboard", stats_repo.dashboard))
+
+    for target in SEARCH_TARGETS:
+        for label, term in (("default", ""), ("term", SEARCH_TERM)):
+            def run_search(target=target, term=term):
+                with db.transaction() as cur:
+                    return search(cur, target, term)
+            cases.append((f"search.{target}.{label}", run_search))
+
+    with db.transaction() as cur:
+        cur.execute("""
+            SELECT sensor_id
+            FROM sensor_reading_stats
+            ORDER BY reading_count DESC
+            LIMIT 1
+        """)
+        busiest = cur.fetchone()
+    if busiest:
+        sensor_repo = repos["sensors"]
+        sensor_id = busiest["sensor_id"]
+        end = datetime.now()
+        cases.append(("sensor.metrics", lambda: sensor_repo.metrics(sensor_id)))
+        for label, span in (("7d", timedelta(days=7)), ("1y", timedelta(days=365))):
+            cases.append((
+                f"sensor.series.{label}",
+                lambda span=span: sensor_repo.series(sensor_id, end - span, end, "*", 1000)["t"].tolist(),
+            ))
+
+    # Triggers: cada operação da GUI dentro de uma transação desfeita no fim
+    with db.transaction() as cur:
+        cur.execute("""
+            SELECT v.id AS vehicle_id, v.citizen_id, s.id AS sensor_id
+            FROM vehicle_active v
+            CROSS JOIN (SELECT id FROM sensor_active ORDER BY id LIMIT 1) s
+            WHERE v.citizen_id IS NOT NULL
+            ORDER BY v.id
+            LIMIT 1
+        """)
+        sample = cur.fetchone()
+    if sample:
+        def incident_with_fine(cur):
+            cur.execute("""
+                INSERT INTO traffic_incident (vehicle_id, sensor_id, location, description)
+                VALUES (%(vehicle_id)s, %(sensor_id)s, 'Benchmark', 'Benchmark')
+                RETURNING id
+            """, sample)
+            incident_id = cur.fetchone()["id"]
+            cur.execute("""
+                INSERT INTO fine (traffic_incident_id, citizen_id, amount, due_date)
+                VALUES (%s, %s, 195.23, CURRENT_DATE + 30)
+                RETURNING id
+            """, (incident_id, sample["citizen_id"]))
+            return cur.fetchone()["id"]
+
+        def fine_payment(cur):
+            fine_id = incident_with_fine(cur)
+            cur.execute("""
+                INSERT INTO fine_payment (fine_id, amount_paid, payment_method)
+                VALUES (%s, 195.23, 'PIX')
+            """, (fine_id,))
+
+        def vehicle_update(cur):
+            cur.execute(
+                "UPDATE vehicle SET license_plate = license_plate || 'X' WHERE id = %(vehicle_id)s",
+                sample,
+            )
+
+        def vehicle_soft_delete(cur):
+            cur.execute("DELETE FROM vehicle WHERE id = %(vehicle_id)s", sample)
+
+        cases.append(("trigger.incident_fine_insert", _rolled_back(db, incident_with_fine)))
+        cases.append(("trigger.fine_payment_insert", _rolled_back(db, fine_payment)))
+        cases.append(("trigger.vehicle_update", _rolled_back(db, vehicle_update)))
+        cases.append(("trigger.vehicle_soft_delete", _rolled_back(db, vehicle_soft_delete)))
+
+    # Backup completo e restauração do mesmo arquivo em tabelas esvaziadas (desfeita no fim)
+    backup_path = os.path.join(tempfile.gettempdir(), "smartcity_bench_backup.sql")
+
+    def backup():
+        with db.transaction(row_factory=tuple_row) as cur:
+            with open(backup_path, "w", encoding="utf-8") as f:
+                return write_backup(cur, f, "bench")
+
+    def restore_into_empty(cur, commands):
+        # Como um restore só de dados: sem triggers nem FKs (a ordem do arquivo é alfabética)
+        cur.execute("SET LOCAL session_replication_role = replica")
+        cur.execute("""
+            SELECT string_agg(quote_ident(table_name), ', ') AS tables
+            FROM information_schema.tables
+            WHERE table_schema = current_schema()
+              AND table_type = 'BASE TABLE'
+        """)
+        cur.execute(f"TRUNCATE {cur.fetchone()['tables']}")
+        success_count, errors = restore_commands(cur, commands, savepoints=True)
+        if errors:
+            raise RuntimeError(f"{len(errors)} of {len(commands)} commands failed, first: {errors[0]}")
+        return success_count
+
+    def restore():
+        if not os.path.exists(backup_path):
+            backup()
+        with open(backup_path, "r", encoding="utf-8") as f:
+            commands = split_sql_commands(f.read())
+        return _rolled_back(db, lambda cur: restore_into_empty(cur, commands))()
+
+    cases.append(("backup.write", backup))
+    cases.append(("backup.restore", restore))
+    return cases
+
+
+def table_sizes(db):
+    with db.transaction() as cur:
+        sizes = {}
+        for table in SCALE_TABLES:
+            cur.execute(f"SELECT COUNT(*) AS total FROM {table}")
+            sizes[table] = cur.fetchone()["total"]
+        return sizes
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def run_benchmarks(conn_info, repeat=5, warmup=1, only=None, skip=None, prepare=True):
+    """
+    Time every case matching `only` and not matching `skip` (fnmatch patterns).
+    Returns the report dict (see write_report), or None on error.
+    """
+    try:
+        from smartcity.data import Database
+
+        db = Database(conn_info, prepare=prepare)
+        try:
+            with db.transaction() as cur:
+                cur.execute("SHOW server_version")
+                server_version = cur.fetchone()["server_version"]
+            report = {
+                "version": REPORT_VERSION,
+                "created_at": datetime.now().isoformat(timespec="seconds"),
+                "git_commit": git_commit(),
+                "python": platform.python_version(),
+                "server_version": server_version,
+                "prepare": prepare,
+                "repeat": repeat,
+                "warmup": warmup,
+                "scale": table_sizes(db),
+                "cases": {},
+            }
+
+            def selected(name):
+                if only and not any(fnmatch.fnmatch(name, p) for p in only):
+                    return False
+                return not (skip and any(fnmatch.fnmatch(name, p) for p in skip))
+
+            for name, func in build_cases(db, selected):
+                if not selected(name):
+                    continue
+                try:
+                    report["cases"][name] = time_case(func, repeat, warmup)
+                except Exception as exc:
+                    report["cases"][name] = {"error": str(exc)}
+                print(f"{name}: {_summary(report['cases'][name])}")
+
+            report["statements"] = db.stats()
+            return report
+        finally:
+            db.close()
+    except Exception as e:
+        print(f"Error: {e}")
+        import traceback
+        traceback.print_exc()
+        return None
+
+
+def _summary(result):
+    if "error" in result:
+        return f"ERROR {result['error']}"
+    return f"median {result['median_ms']:.2f} ms | p95 {result['p95_ms']:.2f} ms"
+
+
+def write_report(report, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False, default=str)
+
+if __name__ == "__main__":
+    import argparse
+    from conect_db import connect_to_db
+
+    parser = argparse.ArgumentParser(description="Time the hot queries of the GUI and write a JSON report")
+    parser.add_argument("--output", default=f"bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--only", action="append", help="Run only cases matching this pattern (e.g. 'page.*')")
+    parser.add_argument("--skip", action="append", help="Skip cases matching this pattern (e.g. 'backup.*')")
+    parser.add_argument("--no-prepare", action="store_true", help="Disable server-side prepared statements")
+    args = parser.parse_args()
+
+    conn_info = connect_to_db()
+    report = run_benchmarks(
+        conn_info,
+        repeat=args.repeat,
+        warmup=args.warmup,
+        only=args.only,
+        skip=args.skip,
+        prepare=not args.no_prepare,
+    )
+    if report:
+        write_report(report, args.output)
+        print(f"Report written to {args.output}")
@@ -0,0 +1,416 @@
+import statistics
+import time
+
+# Bits de pg_trigger.tgtype por evento
+TRIGGER_EVENTS = {"insert": 4, "delete": 8, "update": 16}
+DEFAULT_ROWS = 1000
+
+# (tabela, operação) -> SQL que afeta até %(rows)s linhas; nomes sem schema (search_path)
+WORKLOADS = {
+    ("app_user", "insert"): """
+        INSERT INTO app_user (username, password_hash)
+        SELECT 'trigger_bench_' || g, 'bench'
+        FROM generate_series(1, %(rows)s) g
+    """,
+    ("app_user", "update"): """
+        UPDATE app_user SET allowed = allowed
+        WHERE id IN (SELECT id FROM app_user_active ORDER BY id DESC LIMIT %(rows)s)
+    """,
+    ("citizen", "insert"): """
+        WITH new_users AS (
+            INSERT INTO app_user (username, password_hash)
+            SELECT 'trigger_bench_citizen_' || g, 'bench'
+            FROM generate_series(1, %(rows)s) g
+            RETURNING id, username
+        )
+        INSERT INTO citizen (app_user_id, first_name, last_name, cpf, birth_date, email, address)
+        SELECT id, 'Bench', 'Trigger', lpad((99000000000 + row_number() OVER (ORDER BY id))::TEXT, 11, '0'),
+               DATE '1990-01-01', username || '@bench.smartcity', 'Rua do Benchmark, 1'
+        FROM new_users
+    """,
+    ("citizen", "update"): """
+        UPDATE citizen SET wallet_balance = wallet_balance + 1
+        WHERE id IN (SELECT id FROM citizen_active ORDER BY id DESC LIMIT %(rows)s)
+    """,
+    ("citizen", "delete"): """
+        DELETE FROM citizen
+        WHERE id IN (
+            SELECT c.id
+            FROM citizen_active c
+            WHERE NOT EXISTS (SELECT 1 FROM vehicle_citizen vc WHERE vc.citizen_id = c.id)
+            ORDER BY c.id DESC
+            LIMIT %(rows)s
+        )
+    """,
+    ("vehicle", "insert"): """
+        WITH new_users AS (
+            INSERT INTO app_user (username, password_hash)
+            SELECT 'trigger_bench_vehicle_' || g, 'bench'
+            FROM generate_series(1, %(rows)s) g
+            RETURNING id
+        )
+        INSERT INTO vehicle (app_user_id, license_plate, model, year)
+        SELECT id, 'Z' || lpad((row_number() OVER (ORDER BY id))::TEXT, 6, '0'), 'Bench', 2024
+        FROM new_users
+    """,
+    ("vehicle", "update"): """
+        UPDATE vehicle SET allowed = NOT allowed
+        WHERE id IN (SELECT id FROM vehicle_active ORDER BY id DESC LIMIT %(rows)s)
+    """,
+    ("vehicle", "delete"): """
+        DELETE FROM vehicle
+        WHERE id IN (SELECT id FROM vehicle_active ORDER BY id DESC LIMIT %(rows)s)
+    """,
+    ("sensor", "insert"): """
+        WITH new_users AS (
+            INSERT INTO app_user (username, password_hash)
+            SELECT 'trigger_bench_sensor_' || g, 'bench'
+            FROM generate_series(1, %(rows)s) g
+            RETURNING id
+        )
+        INSERT INTO sensor (app_user_id, model, type, location)
+        SELECT id, 'Bench', 'Radar', 'Rua do Benchmark, 1'
+        FROM new_users
+    """,
+    ("sensor", "update"): """
+        UPDATE sensor SET active = active
+        WHERE id IN (SELECT id FROM sensor_active ORDER BY id DESC LIMIT %(rows)s)
+    """,
+    ("reading", "insert"): """
+        INSERT INTO reading (sensor_id, value, timestamp)
+        SELECT s.id, jsonb_build_object('speed', 40 + g %% 40), LOCALTIMESTAMP - g * INTERVAL '1 second'
+        FROM generate_series(1, %(rows)s) g
+        CROSS JOIN (SELECT id FROM sensor_active ORDER BY id LIMIT 1) s
+    """,
+    ("reading", "update"): """
+        UPDATE reading SET timestamp = timestamp
+        WHERE id IN (SELECT id FROM reading ORDER BY id DESC LIMIT %(rows)s)
+    """,
+    ("reading", "delete"): """
+        DELETE FROM reading
+        WHERE id IN (SELECT id FROM reading ORDER BY id DESC LIMIT %(rows)s)
+    """,
+    ("reading_compact", "insert"): """
+        INSERT INTO reading_compact (sensor_id, schema_id, timestamp, metrics)
+        SELECT s.id, s.schema_id, LOCALTIMESTAMP - g * INTERVAL '1 second',
+               array_fill((g %% 100)::REAL, ARRAY[s.width])
+        FROM generate_series(1, %(rows)s) g
+        CROSS JOIN (
+            SELECT s.id, rs.id AS schema_id, cardinality(rs.metrics) AS width
+            FROM sensor_active s
+            JOIN reading_schema rs ON rs.sensor_type = s.type
+            ORDER BY s.id
+            LIMIT 1
+        ) s
+    """,
+    ("reading_compact", "update"): """
+        UPDATE reading_compact SET timestamp = timestamp
+        WHERE id IN (SELECT id FROM reading_compact ORDER BY id DESC LIMIT %(rows)s)
+    """,
+    ("reading_compact", "delete"): """
+        DELETE FROM reading_compact
+        WHERE id IN (SELECT id FROM reading_compact ORDER BY id DESC LIMIT %(rows)s)
+    """,
+    ("traffic_incident", "insert"): """
+        INSERT INTO traffic_incident (vehicle_id, sensor_id, location, description)
+        SELECT v.id, s.id, 'Rua do Benchmark', 'Benchmark'
+        FROM (SELECT id FROM vehicle_active ORDER BY id DESC LIMIT %(rows)s) v
+        CROSS JOIN (SELECT id FROM sensor_active ORDER BY id LIMIT 1) s
+    """,
+    ("traffic_incident", "update"): """
+        UPDATE traffic_incident SET description = description
+        WHERE id IN (SELECT id FROM traffic_incident ORDER BY id DESC LIMIT %(rows)s)
+    """,
+    ("traffic_incident", "delete"): """
+        DELETE FROM traffic_incident
+        WHERE id IN (SELECT id FROM traffic_incident ORDER BY id DESC LIMIT %(rows)s)
+    """,
+    ("fine", "insert"): """
+        INSERT INTO fine (traffic_incident_id, citizen_id, amount, due_date)
+        SELECT ti.id, v.citizen_id, 195.23, CURRENT_DATE + 30
+        FROM traffic_incident ti
+        JOIN vehicle_active v ON v.id = ti.vehicle_id
+        WHERE v.citizen_id IS NOT NULL
+        ORDER BY ti.id DESC
+        LIMIT %(rows)s
+    """,
+    ("fine", "update"): """
+        UPDATE fine SET due_date = due_date + 1
+        WHERE id IN (
+            SELECT id FROM fine WHERE status = 'pending' ORDER BY id DESC LIMIT %(rows)s
+        )
+    """,
+    ("fine", "delete"): """
+        DELETE FROM fine
+        WHERE id IN (SELECT id FROM fine ORDER BY id DESC LIMIT %(rows)s)
+    """,
+    ("fine_payment", "insert"): """
+        INSERT INTO fine_payment (fine_id, amount_paid, payment_method)
+        SELECT id, amount - amount_paid_total, 'PIX'
+        FROM fine
+        WHERE status IN ('pending', 'overdue')
+        ORDER BY id DESC
+        LIMIT %(rows)s
+    """,
+    ("fine_payment", "update"): """
+        UPDATE fine_payment SET payment_method = payment_method
+        WHERE id IN (SELECT id FROM fine_payment ORDER BY id DESC LIMIT %(rows)s)
+    """,
+    ("fine_payment", "delete"): """
+        DELETE FROM fine_payment
+        WHERE id IN (SELECT id FROM fine_payment ORDER BY id DESC LIMIT %(rows)s)
+    """,
+}
+
+
+def table_triggers(cur, schema, table, operation):
+    """User triggers of `table` that fire on `operation`, as (name, function, enabled)."""
+    cur.execute("""
+        SELECT t.tgname, p.proname, t.tgenabled <> 'D'
+        FROM pg_trigger t
+        JOIN pg_class c ON c.oid = t.tgrelid
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        JOIN pg_proc p ON p.oid = t.tgfoid
+        WHERE n.nspname = %s
+          AND c.relname = %s
+          AND NOT t.tgisinternal
+          AND t.tgtype & %s <> 0
+        ORDER BY t.tgname
+    """, (schema, table, TRIGGER_EVENTS[operation]))
+    return cur.fetchall()
+
+
+def _function_stats(conn, schema):
+    """
+    Flushed pg_stat_user_functions counters of `schema`, as
+    {function: (calls, total_ms, self_ms)}.
+
+    The backend only publishes its pending counters when it goes idle, so the
+    flush is forced and committed first, and the cached stats snapshot is
+    cleared before reading (PostgreSQL 15+).
+    """
+    conn.execute("SELECT pg_stat_force_next_flush()")
+    conn.commit()
+    with conn.cursor() as cur:
+        cur.execute("SELECT pg_stat_clear_snapshot()")
+        cur.execute("""
+            SELECT funcname, calls, total_time, self_time
+            FROM pg_stat_user_functions
+            WHERE schemaname = %s
+        """, (schema,))
+        stats = {name: (calls, total, self_time) for name, calls, total, self_time in cur.fetchall()}
+    conn.commit()
+    return stats
+
+
+def _run_once(conn, schema, table, operation, rows, disable=None):
+    """
+    Run one workload in a transaction that is always rolled back.
+
+    disable: None (every trigger), "USER" (all user triggers of the table) or a
+    trigger name. ALTER TABLE ... DISABLE TRIGGER is transactional, so it is
+    undone by the same rollback.
+    Returns (seconds, affected rows, function stats of the run): the stats are
+    the difference of pg_stat_user_functions snapshots taken around the run.
+    """
+    before = _function_stats(conn, schema)
+    with conn.transaction(force_rollback=True):
+        with conn.cursor() as cur:
+            cur.execute(f"SET LOCAL search_path TO {schema}")
+            if disable == "USER":
+                cur.execute(f"ALTER TABLE {schema}.{table} DISABLE TRIGGER USER")
+            elif disable:
+                cur.execute(f'ALTER TABLE {schema}.{table} DISABLE TRIGGER "{disable}"')
+
+            started = time.perf_counter()
+            cur.execute(WORKLOADS[(table, operation)], {"rows": rows})
+            elapsed = time.perf_counter() - started
+            affected = cur.rowcount
+    after = _function_stats(conn, schema)
+
+    # Contadores de funções não são desfeitos pelo rollback: a diferença é o custo desta execução
+    functions = []
+    for name, (calls, total, self_time) in after.items():
+        calls_before, total_before, self_before = before.get(name, (0, 0.0, 0.0))
+        if calls > calls_before:
+            functions.append({
+                "function": name,
+                "calls": calls - calls_before,
+                "total_ms": total - total_before,
+                "self_ms": self_time - self_before,
+            })
+    functions.sort(key=lambda f: -f["total_ms"])
+    return elapsed, affected, functions
+
+
+def _measure(conn, schema, table, operation, rows, repeat, disable=None):
+    """Timings of `repeat` runs, plus the affected rows and function stats of the last one."""
+    samples = []
+    affected = 0
+    functions = []
+    for _ in range(repeat):
+        elapsed, affected, functions = _run_once(conn, schema, table, operation, rows, disable)
+        samples.append(elapsed)
+    timing = {
+        "median_ms": statistics.median(samples) * 1000,
+        "min_ms": min(samples) * 1000,
+    }
+    return timing, affected, functions
+
+
+def _throughput(timing, targeted):
+    timing["rows"] = targeted
+    timing["rows_per_second"] = targeted * 1000 / timing["median_ms"] if timing["median_ms"] > 0 else 0.0
+    return timing
+
+
+def trigger_overhead(conn_info, schema, rows=DEFAULT_ROWS, repeat=5, tables=None, operations=None,
+                     per_trigger=True, progress=None):
+    """
+    Throughput of each (table, operation) workload with triggers enabled and
+    with the table's user triggers disabled, plus the cost of each trigger
+    (median with every trigger minus median with only that trigger disabled).
+
+    Every run happens in a rolled-back transaction, so the data is untouched;
+    the ALTER TABLE locks the table while it runs, so use a local database.
+    Function timings are the difference of pg_stat_user_functions snapshots
+    around each run, so other sessions calling the same functions skew them;
+    they need track_functions = 'pl' (set per session when the user may, else
+    empty).
+    Throughput counts the rows the workload targets (the rowcount with the user
+    triggers disabled): soft-delete triggers make a DELETE report 0 rows.
+    Cascades are included: a fine insert also counts the citizen triggers
+    fired by apply_fines_to_wallet().
+    Returns {"track_functions": bool, "results": [...]}, or None on error.
+    """
+    try:
+        import psycopg as psy
+
+        results = []
+        with psy.connect(conn_info) as conn:
+            try:
+                conn.execute("SET track_functions = 'pl'")
+                conn.commit()
+                track_functions = True
+            except psy.Error:
+                conn.rollback()
+                track_functions = False
+
+            for table, operation in WORKLOADS:
+                if tables and table not in tables:
+                    continue
+                if operations and operation not in operations:
+                    continue
+
+                with conn.cursor() as cur:
+                    triggers = [t for t in table_triggers(cur, schema, table, operation) if t[2]]
+                conn.commit()
+
+                try:
+                    # Uma execução descartada antes de medir (cache e planos)
+                    _run_once(conn, schema, table, operation, rows)
+                    disabled, targeted, _ = _measure(conn, schema, table, operation, rows, repeat, disable="USER")
+                    enabled, _, functions = _measure(conn, schema, table, operation, rows, repeat)
+                except psy.Error as exc:
+                    results.append({"table": table, "operation": operation, "error": str(exc).strip()})
+                    if progress:
+                        progress(table, operation, None)
+                    continue
+
+                # Linhas visadas pela carga: com os triggers ativos o DELETE de citizen/vehicle
+                # afeta 0 linhas, porque o soft delete (BEFORE DELETE com RETURN NULL) cancela a remoção
+                _throughput(enabled, targeted)
+                _throughput(disabled, targeted)
+                result = {
+                    "table": table,
+                    "operation": operation,
+                    "enabled": enabled,
+                    "disabled": disabled,
+                    "overhead_ms": enabled["median_ms"] - disabled["median_ms"],
+                    "slowdown": enabled["median_ms"] / disabled["median_ms"] if disabled["median_ms"] else None,
+                    "functions": functions,
+                    "triggers": [],
+                }
+
+                if per_trigger:
+                    for name, function, _ in triggers:
+                        try:
+                            without, _, _ = _measure(conn, schema, table, operation, rows, repeat, disable=name)
+                        except psy.Error as exc:
+                            result["triggers"].append({"trigger": name, "function": function, "error": str(exc).strip()})
+                            continue
+                        result["triggers"].append({
+                            "trigger": name,
+                            "function": function,
+                            "median_ms_without": without["median_ms"],
+                            "overhead_ms": enabled["median_ms"] - without["median_ms"],
+                            "per_row_us": (
+                                (enabled["median_ms"] - without["median_ms"]) * 1000 / enabled["rows"]
+                                if enabled["rows"] else None
+                            ),
+                        })
+                    result["triggers"].sort(key=lambda t: -(t.get("overhead_ms") or 0))
+
+                results.append(result)
+                if progress:
+                    progress(table, operation, result)
+
+        return {"track_functions": track_functions, "rows": rows, "repeat": repeat, "results": results}
+    except Exception as e:
+        print(f"Error: {e}")
+        import traceback
+        traceback.print_exc()
+        return None
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    from conect_db import connect_to_db
+
+    parser = argparse.ArgumentParser(description="Measure the overhead of the triggers per table and operation")
+    parser.add_argument("--rows", type=int, default=DEFAULT_ROWS, help="Rows affected by each workload")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--table", action="append", help="Only this table (repeatable)")
+    parser.add_argument("--operation", action="append", choices=sorted(TRIGGER_EVENTS))
+    parser.add_argument("--no-per-trigger", action="store_true", help="Skip the one-trigger-off runs")
+    parser.add_argument("--output", help="Write the results as JSON")
+    parser.add_argument("--schema", default="public")
+    args = parser.parse_args()
+
+    def report(table, operation, result):
+        if result is None:
+            print(f"{table}.{operation}: ERROR")
+            return
+        print(
+            f"{table}.{operation}: {result['enabled']['rows_per_second']:.0f} rows/s with triggers, "
+            f"{result['disabled']['rows_per_second']:.0f} rows/s without "
+            f"(+{result['overhead_ms']:.1f} ms for {result['enabled']['rows']} rows)"
+        )
+        for trigger in result["triggers"]:
+            if "error" in trigger:
+                print(f"    {trigger['trigger']}: ERROR {trigger['error']}")
+            else:
+                print(f"    {trigger['trigger']} ({trigger['function']}): {trigger['overhead_ms']:+.1f} ms")
+        for function in result["functions"][:5]:
+            print(
+                f"    fn {function['function']}: {function['calls']} calls, "
+                f"{function['total_ms']:.1f} ms total, {function['self_ms']:.1f} ms self"
+            )
+
+    conn_info = connect_to_db()
+    overhead = trigger_overhead(
+        conn_info, args.schema,
+        rows=args.rows,
+        repeat=args.repeat,
+        tables=args.table,
+        operations=args.operation,
+        per_trigger=not args.no_per_trigger,
+        progress=report,
+    )
+    if overhead:
+        if not overhead["track_functions"]:
+            print("track_functions could not be set: function timings are empty (needs superuser or postgresql.conf)")
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(overhead, f, indent=2, ensure_ascii=False)
+            print(f"Results written to {args.output}")
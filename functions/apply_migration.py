@@ -0,0 +1,27 @@
+def apply_migration(conn_info, file_path, schema):
+    """
+    Apply a single migration file from sql/migrations to an existing database
+    and record it in schema_migrations (migrate.py applies every pending one)
+    """
+    try:
+        from query_metrics import connect
+        from migrate import apply_file, ensure_migrations_table, load_migration
+        migration = load_migration(file_path)
+        with connect(conn_info, autocommit=True) as conn:
+            with conn.cursor() as cur:
+                ensure_migrations_table(cur, schema)
+            apply_file(conn, schema, migration)
+            return True
+    except Exception as e:
+        print(f"Error applying migration {file_path}: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+if __name__ == "__main__":
+    import sys
+    from conect_db import connect_to_db
+    file = sys.argv[1] if len(sys.argv) > 1 else r"sql\migrations\001_apply_fines_to_wallet_statement.sql"
+    conn_info = connect_to_db()
+    if apply_migration(conn_info, file, 'public'):
+        print(f"Applied migration: {file}")
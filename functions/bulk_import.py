@@ -0,0 +1,114 @@
+import csv
+
+COPY_CHUNK_SIZE = 1 << 20
+# Tentativas de um lote após UniqueViolation sem nenhuma linha em conflito encontrada
+CONFLICT_RETRIES = 3
+# pg_input_is_valid(), usado na validação das importações, existe a partir do PostgreSQL 16
+MIN_SERVER_VERSION = 160000
+
+
+def check_server_version(cur):
+    """Fail early, with a clear message, on servers without pg_input_is_valid() (PostgreSQL < 16)."""
+    cur.execute("SHOW server_version_num")
+    version = int(cur.fetchone()[0])
+    if version < MIN_SERVER_VERSION:
+        raise RuntimeError(
+            f"Bulk imports need PostgreSQL 16 or newer (pg_input_is_valid); "
+            f"the server is {version // 10000}.{version % 10000}"
+        )
+
+
+def read_csv_header(f, allowed, required):
+    """
+    Read the header line of an open CSV file and validate its columns.
+    Returns the column names in file order so COPY can target them directly.
+    """
+    line = f.readline()
+    header = [col.strip().lower() for col in next(csv.reader([line]), [])]
+    unknown = [col for col in header if col not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown CSV column(s): {', '.join(unknown)}")
+    missing = [col for col in required if col not in header]
+    if missing:
+        raise ValueError(f"Missing CSV column(s): {', '.join(missing)}")
+    if len(set(header)) != len(header):
+        raise ValueError("Duplicated CSV column in header")
+    return header
+
+
+def copy_csv(cur, table, columns, f, chunk_size=COPY_CHUNK_SIZE):
+    """
+    Stream the rest of an open CSV file into a table with COPY, chunk by chunk.
+    Returns the number of rows copied.
+    """
+    from psycopg import sql
+    query = sql.SQL("COPY {} ({}) FROM STDIN WITH (FORMAT csv)").format(
+        sql.Identifier(table),
+        sql.SQL(", ").join(sql.Identifier(col) for col in columns),
+    )
+    with cur.copy(query) as copy:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            copy.write(chunk)
+    return cur.rowcount
+
+
+def insert_chunk(conn, insert, recheck_sql, conflict_sql, params):
+    """
+    Run insert(cur) for one chunk of checked rows and commit.
+
+    A UniqueViolation means another session took a key after the set-based
+    check: the chunk is rolled back, recheck_sql rejects only the rows now in
+    conflict and the chunk is retried. After CONFLICT_RETRIES violations in
+    which recheck_sql found nothing, conflict_sql rejects what is left.
+    Returns insert's result, or None when the chunk was rejected.
+    """
+    import psycopg as psy
+    attempts = 0
+    while True:
+        try:
+            with conn.cursor() as cur:
+                result = insert(cur)
+            conn.commit()
+            return result
+        except psy.errors.UniqueViolation:
+            conn.rollback()
+            with conn.cursor() as cur:
+                cur.execute(recheck_sql, params)
+                if cur.rowcount == 0:
+                    attempts += 1
+                    if attempts >= CONFLICT_RETRIES:
+                        cur.execute(conflict_sql, params)
+                        conn.commit()
+                        return None
+            conn.commit()
+
+
+def write_rejects(path, columns, rows):
+    """Write rejected staging rows (with their reason) to a CSV file."""
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        writer.writerows(rows)
+    return path
+
+
+def default_reject_path(file_path):
+    """Build '<name>.rejects.csv' next to the imported file."""
+    base = file_path[:-4] if file_path.lower().endswith(".csv") else file_path
+    return f"{base}.rejects.csv"
+
+
+def money_sql(expr):
+    """
+    SQL text that normalizes a Brazilian money string the same way
+    gui.qt_app.parse_money_input does ('R$ 1.234,56' -> '1234.56').
+    """
+    cleaned = f"btrim(replace(COALESCE({expr}, ''), 'R$', ''))"
+    return (
+        f"CASE WHEN strpos({cleaned}, ',') > 0 AND strpos({cleaned}, '.') > 0 "
+        f"THEN replace(replace({cleaned}, '.', ''), ',', '.') "
+        f"ELSE replace({cleaned}, ',', '.') END"
+    )
@@ -0,0 +1,55 @@
+def check_fine_payments(conn_info, schema, fix=False):
+    """
+    Compare fine.amount_paid_total with SUM(fine_payment.amount_paid).
+    Returns the list of (fine_id, amount_paid_total, expected) that diverge.
+    With fix=True the stored totals are rewritten from fine_payment.
+    """
+    try:
+        from query_metrics import connect
+        with connect(conn_info) as conn:
+            with conn.cursor() as cur:
+                cur.execute(f"""
+                    SELECT f.id, f.amount_paid_total, COALESCE(p.total, 0) AS expected
+                    FROM {schema}.fine f
+                    LEFT JOIN (
+                        SELECT fine_id, SUM(amount_paid) AS total
+                        FROM {schema}.fine_payment
+                        GROUP BY fine_id
+                    ) p ON p.fine_id = f.id
+                    WHERE f.amount_paid_total <> COALESCE(p.total, 0)
+                    ORDER BY f.id
+                """)
+                mismatches = cur.fetchall()
+
+                if fix and mismatches:
+                    cur.execute(f"""
+                        UPDATE {schema}.fine f
+                        SET amount_paid_total = COALESCE(p.total, 0),
+                            updated_at = CURRENT_TIMESTAMP
+                        FROM {schema}.fine f2
+                        LEFT JOIN (
+                            SELECT fine_id, SUM(amount_paid) AS total
+                            FROM {schema}.fine_payment
+                            GROUP BY fine_id
+                        ) p ON p.fine_id = f2.id
+                        WHERE f.id = f2.id
+                          AND f.amount_paid_total <> COALESCE(p.total, 0)
+                    """)
+            conn.commit()
+            return mismatches
+    except Exception as e:
+        print(f"Error: {e}")
+        import traceback
+        traceback.print_exc()
+        return None
+
+if __name__ == "__main__":
+    import sys
+    from conect_db import connect_to_db
+    conn_info = connect_to_db()
+    fix = "--fix" in sys.argv
+    mismatches = check_fine_payments(conn_info, 'public', fix=fix)
+    if mismatches is not None:
+        for fine_id, stored, expected in mismatches:
+            print(f"fine {fine_id}: amount_paid_total={stored} expected={expected}")
+        print(f"{len(mismatches)} divergent fine(s){' fixed' if fix and mismatches else ''}")
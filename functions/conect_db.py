@@ -1,9 +1,8 @@
 import os
 from dotenv import load_dotenv
-import psycopg as psy
+from query_metrics import connect
 
 def connect_to_db():
-   import psycopg as psy
    load_dotenv()
 
    DB_NAME = os.getenv('DB_NAME')
@@ -13,7 +12,7 @@ def connect_to_db():
 
    conn_info = f"dbname={DB_NAME} user={DB_USER} password={DB_PASSWORD} host={DB_HOST}"
    try:
-      with psy.connect(conn_info) as conn:
+      with connect(conn_info) as conn:
          print("Connected to database")
          cur = conn.cursor()
          cur.execute("SELECT version();")
@@ -16,9 +16,9 @@ def table_names_from_sql(file_path):
         return None
 
 def create_tables(conn_info, sql_file, schema):
-    import psycopg as psy
+    from query_metrics import connect
     try:
-        with psy.connect(conn_info) as conn:
+        with connect(conn_info) as conn:
             with conn.cursor() as cur:
                 with open(sql_file, "r", encoding="utf-8") as f:
                     cur.execute(f.read().replace('SCHEMA_NAME', schema))
@@ -19,9 +19,9 @@ def create_all_triggers(conn_info,file_path_func,file_path_trig, schema):
     Create database triggers for Smart City OS
     """
     try:
-        import psycopg as psy
+        from query_metrics import connect
         from psycopg.rows import dict_row
-        with psy.connect(conn_info, row_factory=dict_row) as conn:
+        with connect(conn_info, row_factory=dict_row) as conn:
             with conn.cursor() as cur:
                 with open(file_path_func, 'r') as f:
                     functions = f.read().replace('SCHEMA_NAME', schema)
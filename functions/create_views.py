@@ -22,9 +22,9 @@ def create_all_views(conn_info, file_path, schema):
     """
     
     try:
-        import psycopg as psy
+        from query_metrics import connect
         from psycopg.rows import dict_row
-        with psy.connect(conn_info, row_factory=dict_row) as conn:
+        with connect(conn_info, row_factory=dict_row) as conn:
             with conn.cursor() as cur:
                 # Read and execute trigger_functions.sql
                 with open(file_path, 'r') as f:
@@ -1,7 +1,8 @@
-import psycopg as psy
 import sys
 sys.path.append('functions')
 from conect_db import connect_to_db
+from query_metrics import connect
+from migrate import discover_migrations, ensure_migrations_table, record_migration
 
 def drop_and_recreate_all(schema):
     """
@@ -9,7 +10,7 @@ def drop_and_recreate_all(schema):
     """
     try:
         conn_info = connect_to_db()
-        with psy.connect(conn_info) as conn:
+        with connect(conn_info) as conn:
             with conn.cursor() as cur:
                 print("🔄 DROPANDO E RECRIANDO TUDO DO ZERO...")
                 print("=" * 60)
@@ -66,8 +67,17 @@ def drop_and_recreate_all(schema):
                 conn.commit()
                 print("   ✅ Índices recriados")
                 
-                # 8. Verificar estrutura
-                print("8️⃣ Verificando estrutura...")
+                # 8. Registrar migrações (os scripts acima já contêm todas)
+                print("8️⃣ Registrando migrações...")
+                ensure_migrations_table(cur, schema)
+                migrations = discover_migrations('sql/migrations')
+                for migration in migrations:
+                    record_migration(cur, schema, migration)
+                conn.commit()
+                print(f"   ✅ {len(migrations)} migrações registradas em schema_migrations")
+                
+                # 9. Verificar estrutura
+                print("9️⃣ Verificando estrutura...")
                 
                 # Verificar tabelas
                 cur.execute("""
@@ -1,9 +1,9 @@
 def drop_all_triggers(conn_info, schema):
-    import psycopg
+    from query_metrics import connect
     from psycopg import sql
 
     try:
-        with psycopg.connect(conn_info) as conn:
+        with connect(conn_info) as conn:
             with conn.cursor() as cur:
                 cur.execute(
                     """
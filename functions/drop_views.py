@@ -1,10 +1,10 @@
 
 def drop_all_views(conn_info, schema):
-    import psycopg
+    from query_metrics import connect
     from psycopg import sql
 
     try:
-        with psycopg.connect(conn_info) as conn:
+        with connect(conn_info) as conn:
             with conn.cursor() as cur:
                 cur.execute(
                     """
@@ -0,0 +1,36 @@
+def flag_overdue_fines(conn_info, schema):
+    """
+    Mark pending fines past their due date as 'overdue' in one UPDATE
+    (SQL function flag_overdue_fines(), served by idx_fine_pending_due_date).
+    Returns the number of fines flagged, or None on error.
+    """
+    try:
+        from query_metrics import connect
+        with connect(conn_info) as conn:
+            with conn.cursor() as cur:
+                cur.execute(f"SELECT {schema}.flag_overdue_fines()")
+                flagged = cur.fetchone()[0]
+            conn.commit()
+        return flagged
+    except Exception as e:
+        print(f"Error: {e}")
+        import traceback
+        traceback.print_exc()
+        return None
+
+if __name__ == "__main__":
+    import argparse
+    import time
+    from conect_db import connect_to_db
+
+    parser = argparse.ArgumentParser(description="Flag pending fines past their due date as overdue")
+    parser.add_argument("--loop", type=int, metavar="SECONDS", help="Keep flagging every SECONDS")
+    parser.add_argument("--schema", default="public")
+    args = parser.parse_args()
+
+    conn_info = connect_to_db()
+    while True:
+        print(f"Flagged {flag_overdue_fines(conn_info, args.schema)} overdue fine(s)")
+        if not args.loop:
+            break
+        time.sleep(args.loop)
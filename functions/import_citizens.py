@@ -0,0 +1,239 @@
+CITIZEN_COLUMNS = (
+    "username", "password", "first_name", "last_name", "cpf", "birth_date",
+    "email", "phone", "address", "wallet_balance",
+)
+REQUIRED_COLUMNS = (
+    "username", "password", "first_name", "last_name", "cpf", "birth_date",
+    "email", "address",
+)
+REJECT_COLUMNS = ("line_no", "username", "cpf", "email", "reason")
+
+
+def import_citizens(conn_info, file_path, schema, reject_path=None, chunk_size=5000, progress=None):
+    """
+    Bulk onboarding of citizens from a CSV file.
+
+    The file is streamed with COPY into a temporary staging table. Field
+    validation and CPF/email/username uniqueness (inside the file and against
+    the active rows covered by the partial unique indexes) are checked in one
+    set-based pass. Valid rows are inserted as app_user + citizen pairs with
+    INSERT ... SELECT ... RETURNING, committing every chunk_size rows.
+    progress(done, total) is called after each committed chunk.
+    Returns a dict with the counters, or None on error.
+    """
+    try:
+        from query_metrics import connect
+        from bulk_import import (
+            check_server_version, copy_csv, default_reject_path, insert_chunk, money_sql,
+            read_csv_header, write_rejects,
+        )
+
+        reject_path = reject_path or default_reject_path(file_path)
+
+        with connect(conn_info) as conn:
+            with conn.cursor() as cur:
+                check_server_version(cur)
+                # Session temp tables: they must survive the per-chunk commits
+                cur.execute(f"""
+                    CREATE TEMP TABLE citizen_stage (
+                        line_no BIGINT GENERATED ALWAYS AS IDENTITY,
+                        {", ".join(f"{col} TEXT" for col in CITIZEN_COLUMNS)}
+                    )
+                """)
+
+                with open(file_path, "r", encoding="utf-8", newline="") as f:
+                    columns = read_csv_header(f, CITIZEN_COLUMNS, REQUIRED_COLUMNS)
+                    staged = copy_csv(cur, "citizen_stage", columns, f)
+
+                cur.execute(f"""
+                    CREATE TEMP TABLE citizen_checked AS
+                    WITH parsed AS (
+                        SELECT
+                            s.line_no,
+                            NULLIF(btrim(s.username), '') AS username,
+                            NULLIF(btrim(s.password), '') AS password,
+                            NULLIF(btrim(s.first_name), '') AS first_name,
+                            NULLIF(btrim(s.last_name), '') AS last_name,
+                            regexp_replace(COALESCE(s.cpf, ''), '[.\\-\\s]', '', 'g') AS cpf,
+                            regexp_replace(
+                                btrim(COALESCE(s.birth_date, '')),
+                                '^(\\d{{2}})/(\\d{{2}})/(\\d{{4}})$', '\\3-\\2-\\1'
+                            ) AS birth_date_text,
+                            NULLIF(btrim(s.email), '') AS email,
+                            NULLIF(btrim(s.phone), '') AS phone,
+                            NULLIF(btrim(s.address), '') AS address,
+                            NULLIF({money_sql('s.wallet_balance')}, '') AS wallet_text
+                        FROM citizen_stage s
+                    ),
+                    typed AS (
+                        SELECT
+                            p.*,
+                            CASE WHEN pg_input_is_valid(p.birth_date_text, 'date')
+                                THEN p.birth_date_text::DATE END AS birth_date,
+                            CASE
+                                WHEN p.wallet_text IS NULL THEN 0.00
+                                WHEN pg_input_is_valid(p.wallet_text, 'numeric(10,2)')
+                                    THEN p.wallet_text::NUMERIC(10,2)
+                            END AS wallet_balance,
+                            ROW_NUMBER() OVER (PARTITION BY p.username ORDER BY p.line_no) AS username_rank,
+                            ROW_NUMBER() OVER (PARTITION BY p.cpf ORDER BY p.line_no) AS cpf_rank,
+                            ROW_NUMBER() OVER (PARTITION BY p.email ORDER BY p.line_no) AS email_rank
+                        FROM parsed p
+                    ),
+                    checked AS (
+                        SELECT
+                            t.line_no, t.username, t.password, t.first_name, t.last_name,
+                            t.cpf, t.birth_date, t.email, t.phone, t.address, t.wallet_balance,
+                            CASE
+                                WHEN t.username IS NULL OR t.password IS NULL
+                                  OR t.first_name IS NULL OR t.last_name IS NULL
+                                  OR t.address IS NULL THEN 'missing_required_field'
+                                WHEN t.cpf !~ '^\\d{{11}}$' THEN 'invalid_cpf'
+                                WHEN t.birth_date IS NULL OR t.birth_date > CURRENT_DATE THEN 'invalid_birth_date'
+                                WHEN t.email IS NULL OR t.email NOT LIKE '%_@_%._%' THEN 'invalid_email'
+                                WHEN t.wallet_balance IS NULL OR t.wallet_balance < 0 THEN 'invalid_wallet_balance'
+                                WHEN t.username_rank > 1 THEN 'duplicate_username_in_file'
+                                WHEN t.cpf_rank > 1 THEN 'duplicate_cpf_in_file'
+                                WHEN t.email_rank > 1 THEN 'duplicate_email_in_file'
+                                WHEN u.id IS NOT NULL THEN 'username_in_use'
+                                WHEN c_cpf.id IS NOT NULL THEN 'cpf_in_use'
+                                WHEN c_email.id IS NOT NULL THEN 'email_in_use'
+                            END AS reason
+                        FROM typed t
+                        LEFT JOIN {schema}.app_user u
+                            ON u.username = t.username AND u.deleted_at IS NULL
+                        LEFT JOIN {schema}.citizen c_cpf
+                            ON c_cpf.cpf = t.cpf AND c_cpf.deleted_at IS NULL
+                        LEFT JOIN {schema}.citizen c_email
+                            ON c_email.email = t.email AND c_email.deleted_at IS NULL
+                    )
+                    SELECT
+                        c.*,
+                        CASE WHEN c.reason IS NULL THEN
+                            (ROW_NUMBER() OVER (PARTITION BY c.reason IS NULL ORDER BY c.line_no) - 1)
+                            / {int(chunk_size)}
+                        END AS chunk_no
+                    FROM checked c
+                """)
+
+                cur.execute("SELECT COUNT(*), MAX(chunk_no) FROM citizen_checked WHERE reason IS NULL")
+                total_valid, last_chunk = cur.fetchone()
+            conn.commit()
+
+            # Another session took a username/CPF/email after the check: reject only those lines
+            recheck_sql = f"""
+                UPDATE citizen_checked t
+                SET reason = r.reason
+                FROM (
+                    SELECT
+                        b.line_no,
+                        CASE
+                            WHEN u.id IS NOT NULL THEN 'username_in_use'
+                            WHEN c_cpf.id IS NOT NULL THEN 'cpf_in_use'
+                            WHEN c_email.id IS NOT NULL THEN 'email_in_use'
+                        END AS reason
+                    FROM citizen_checked b
+                    LEFT JOIN {schema}.app_user u
+                        ON u.username = b.username AND u.deleted_at IS NULL
+                    LEFT JOIN {schema}.citizen c_cpf
+                        ON c_cpf.cpf = b.cpf AND c_cpf.deleted_at IS NULL
+                    LEFT JOIN {schema}.citizen c_email
+                        ON c_email.email = b.email AND c_email.deleted_at IS NULL
+                    WHERE b.chunk_no = %(chunk_no)s
+                      AND b.reason IS NULL
+                ) r
+                WHERE t.line_no = r.line_no
+                  AND r.reason IS NOT NULL
+            """
+            conflict_sql = """
+                UPDATE citizen_checked
+                SET reason = 'conflict_during_import'
+                WHERE chunk_no = %(chunk_no)s
+                  AND reason IS NULL
+            """
+
+            def insert_citizens(cur, chunk_no):
+                cur.execute(f"""
+                    WITH batch AS (
+                        SELECT *
+                        FROM citizen_checked
+                        WHERE chunk_no = %(chunk_no)s
+                          AND reason IS NULL
+                    ),
+                    new_users AS (
+                        INSERT INTO {schema}.app_user (username, password_hash)
+                        SELECT username, password
+                        FROM batch
+                        ORDER BY line_no
+                        RETURNING id, username
+                    )
+                    INSERT INTO {schema}.citizen (
+                        app_user_id, first_name, last_name, cpf, birth_date,
+                        email, phone, address, wallet_balance
+                    )
+                    SELECT
+                        nu.id, b.first_name, b.last_name, b.cpf, b.birth_date,
+                        b.email, b.phone, b.address, b.wallet_balance
+                    FROM batch b
+                    JOIN new_users nu ON nu.username = b.username
+                    ORDER BY b.line_no
+                """, {"chunk_no": chunk_no})
+                return cur.rowcount
+
+            inserted = 0
+            for chunk_no in range(0 if last_chunk is None else last_chunk + 1):
+                inserted += insert_chunk(
+                    conn,
+                    lambda cur: insert_citizens(cur, chunk_no),
+                    recheck_sql, conflict_sql, {"chunk_no": chunk_no},
+                ) or 0
+
+                if progress:
+                    progress(inserted, total_valid)
+
+            with conn.cursor() as cur:
+                cur.execute("""
+                    SELECT line_no, username, cpf, email, reason
+                    FROM citizen_checked
+                    WHERE reason IS NOT NULL
+                    ORDER BY line_no
+                """)
+                rejects = cur.fetchall()
+
+        if rejects:
+            write_rejects(reject_path, REJECT_COLUMNS, rejects)
+
+        return {
+            "staged": staged,
+            "inserted": inserted,
+            "rejected": len(rejects),
+            "reject_path": reject_path if rejects else None,
+        }
+    except Exception as e:
+        print(f"Error: {e}")
+        import traceback
+        traceback.print_exc()
+        return None
+
+if __name__ == "__main__":
+    import argparse
+    from conect_db import connect_to_db
+
+    parser = argparse.ArgumentParser(description="Bulk import citizens from a CSV file")
+    parser.add_argument("file", help=f"CSV with columns: {', '.join(CITIZEN_COLUMNS)}")
+    parser.add_argument("--rejects", help="Path of the reject file (default: <file>.rejects.csv)")
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--schema", default="public")
+    args = parser.parse_args()
+
+    conn_info = connect_to_db()
+    result = import_citizens(
+        conn_info, args.file, args.schema,
+        reject_path=args.rejects,
+        chunk_size=args.chunk_size,
+        progress=lambda done, total: print(f"{done}/{total} citizens inserted"),
+    )
+    if result:
+        print(f"Staged: {result['staged']} | Inserted: {result['inserted']} | Rejected: {result['rejected']}")
+        if result["reject_path"]:
+            print(f"Rejects written to {result['reject_path']}")
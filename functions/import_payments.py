@@ -0,0 +1,147 @@
+PAYMENT_COLUMNS = ("fine_id", "amount_paid", "payment_method", "paid_at")
+REJECT_COLUMNS = ("line_no", "fine_id", "amount_paid", "payment_method", "paid_at", "reason")
+
+
+def import_payments(conn_info, file_path, schema, reject_path=None, tolerance=0):
+    """
+    Import a bank reconciliation CSV into fine_payment.
+
+    The file is streamed with COPY into a temporary staging table and validated
+    against fine with a single set-based join: the fine must exist, be pending,
+    appear only once in the file and the amount must match what is still owed
+    (fine.amount - fine.amount_paid_total). tolerance only admits overpayments:
+    a line short of the balance would leave the fine pending, so it is always
+    rejected. Valid rows are inserted in the same transaction; the others are
+    written to a reject file.
+    Returns a dict with the counters, or None on error.
+    """
+    try:
+        from query_metrics import connect
+        from bulk_import import (
+            check_server_version, copy_csv, default_reject_path, money_sql, read_csv_header, write_rejects,
+        )
+
+        reject_path = reject_path or default_reject_path(file_path)
+
+        with connect(conn_info) as conn:
+            with conn.cursor() as cur:
+                check_server_version(cur)
+                cur.execute("""
+                    CREATE TEMP TABLE payment_stage (
+                        line_no BIGINT GENERATED ALWAYS AS IDENTITY,
+                        fine_id TEXT,
+                        amount_paid TEXT,
+                        payment_method TEXT,
+                        paid_at TEXT
+                    ) ON COMMIT DROP
+                """)
+
+                with open(file_path, "r", encoding="utf-8", newline="") as f:
+                    columns = read_csv_header(
+                        f, PAYMENT_COLUMNS, ("fine_id", "amount_paid", "payment_method")
+                    )
+                    staged = copy_csv(cur, "payment_stage", columns, f)
+
+                # Lock the referenced fines so concurrent payments cannot race the check
+                cur.execute(f"""
+                    SELECT f.id
+                    FROM {schema}.fine f
+                    WHERE f.id IN (
+                        SELECT btrim(s.fine_id)::INTEGER
+                        FROM payment_stage s
+                        WHERE pg_input_is_valid(btrim(s.fine_id), 'integer')
+                    )
+                    ORDER BY f.id
+                    FOR UPDATE
+                """)
+
+                cur.execute(f"""
+                    CREATE TEMP TABLE payment_checked ON COMMIT DROP AS
+                    SELECT
+                        s.line_no,
+                        s.fine_id AS raw_fine_id,
+                        s.amount_paid AS raw_amount_paid,
+                        s.payment_method AS raw_payment_method,
+                        s.paid_at AS raw_paid_at,
+                        v.fine_id,
+                        v.amount_paid,
+                        v.payment_method,
+                        v.paid_at,
+                        CASE
+                            WHEN v.fine_id IS NULL THEN 'invalid_fine_id'
+                            WHEN v.amount_paid IS NULL THEN 'invalid_amount'
+                            WHEN v.payment_method IS NULL THEN 'missing_payment_method'
+                            WHEN v.paid_at_invalid THEN 'invalid_paid_at'
+                            WHEN f.id IS NULL THEN 'fine_not_found'
+                            WHEN f.status NOT IN ('pending', 'overdue') THEN 'fine_' || f.status
+                            WHEN COUNT(*) OVER (PARTITION BY v.fine_id) > 1 THEN 'duplicate_in_file'
+                            WHEN v.amount_paid < f.amount - f.amount_paid_total
+                              OR v.amount_paid - (f.amount - f.amount_paid_total) > %(tolerance)s
+                                THEN 'amount_mismatch'
+                        END AS reason
+                    FROM payment_stage s
+                    CROSS JOIN LATERAL (
+                        SELECT
+                            CASE WHEN pg_input_is_valid(btrim(s.fine_id), 'integer')
+                                THEN btrim(s.fine_id)::INTEGER END AS fine_id,
+                            CASE WHEN pg_input_is_valid({money_sql('s.amount_paid')}, 'numeric(10,2)')
+                                THEN ({money_sql('s.amount_paid')})::NUMERIC(10,2) END AS amount_paid,
+                            NULLIF(left(btrim(s.payment_method), 50), '') AS payment_method,
+                            CASE WHEN NULLIF(btrim(s.paid_at), '') IS NOT NULL
+                                  AND pg_input_is_valid(btrim(s.paid_at), 'timestamp')
+                                THEN btrim(s.paid_at)::TIMESTAMP END AS paid_at,
+                            NULLIF(btrim(s.paid_at), '') IS NOT NULL
+                                AND NOT pg_input_is_valid(btrim(s.paid_at), 'timestamp') AS paid_at_invalid
+                    ) v
+                    LEFT JOIN {schema}.fine f ON f.id = v.fine_id
+                """, {"tolerance": tolerance})
+
+                cur.execute(f"""
+                    INSERT INTO {schema}.fine_payment (fine_id, amount_paid, payment_method, paid_at)
+                    SELECT fine_id, amount_paid, payment_method, COALESCE(paid_at, CURRENT_TIMESTAMP)
+                    FROM payment_checked
+                    WHERE reason IS NULL
+                    ORDER BY line_no
+                """)
+                applied = cur.rowcount
+
+                cur.execute("""
+                    SELECT line_no, raw_fine_id, raw_amount_paid, raw_payment_method, raw_paid_at, reason
+                    FROM payment_checked
+                    WHERE reason IS NOT NULL
+                    ORDER BY line_no
+                """)
+                rejects = cur.fetchall()
+            conn.commit()
+
+        if rejects:
+            write_rejects(reject_path, REJECT_COLUMNS, rejects)
+
+        return {
+            "staged": staged,
+            "applied": applied,
+            "rejected": len(rejects),
+            "reject_path": reject_path if rejects else None,
+        }
+    except Exception as e:
+        print(f"Error: {e}")
+        import traceback
+        traceback.print_exc()
+        return None
+
+if __name__ == "__main__":
+    import argparse
+    from conect_db import connect_to_db
+
+    parser = argparse.ArgumentParser(description="Import fine payments from a bank CSV file")
+    parser.add_argument("file", help="CSV with fine_id, amount_paid, payment_method[, paid_at]")
+    parser.add_argument("--rejects", help="Path of the reject file (default: <file>.rejects.csv)")
+    parser.add_argument("--schema", default="public")
+    args = parser.parse_args()
+
+    conn_info = connect_to_db()
+    result = import_payments(conn_info, args.file, args.schema, reject_path=args.rejects)
+    if result:
+        print(f"Staged: {result['staged']} | Applied: {result['applied']} | Rejected: {result['rejected']}")
+        if result["reject_path"]:
+            print(f"Rejects written to {result['reject_path']}")
@@ -0,0 +1,272 @@
+import re
+
+VEHICLE_COLUMNS = ("license_plate", "model", "year", "owner_cpf", "username", "password")
+REQUIRED_COLUMNS = ("license_plate", "model", "year")
+REJECT_COLUMNS = ("line_no", "license_plate", "owner_cpf", "username", "reason")
+
+# Old Brazilian plates (ABC1234) and Mercosul plates (ABC1D23)
+PLATE_PATTERN = r"^[A-Z]{3}[0-9][A-Z0-9][0-9]{2}$"
+
+
+def normalize_plate(plate):
+    """Normalize a license plate: uppercase, without spaces, dots or hyphens ('abc-1234' -> 'ABC1234')."""
+    if plate is None:
+        return ""
+    return re.sub(r"[^A-Z0-9]", "", str(plate).upper())
+
+
+def plate_sql(expr):
+    """
+    SQL equivalent of normalize_plate, used for the set-based checks.
+    Applied to vehicle.license_plate it matches idx_vehicle_license_plate_normalized.
+    """
+    return f"regexp_replace(upper(COALESCE({expr}, '')), '[^A-Z0-9]', '', 'g')"
+
+
+def import_vehicles(conn_info, file_path, schema, default_password=None, reject_path=None,
+                    chunk_size=2000, progress=None):
+    """
+    Bulk registration of vehicles from a fleet spreadsheet exported as CSV.
+
+    Plates are normalized, owners are resolved by CPF against citizen_active
+    and plate/username conflicts are detected in one join over the staging
+    table. app_user, vehicle and vehicle_citizen rows are then inserted
+    set-wise, one commit per chunk. When the file has no username column the
+    account is named after the plate ('vehicle_abc1234').
+    progress(done, total, rows_per_second) is called after each committed chunk.
+    Returns a dict with the counters and throughput, or None on error.
+    """
+    try:
+        import time
+        from query_metrics import connect
+        from bulk_import import (
+            check_server_version, copy_csv, default_reject_path, insert_chunk, read_csv_header, write_rejects,
+        )
+
+        reject_path = reject_path or default_reject_path(file_path)
+        started = time.perf_counter()
+
+        with connect(conn_info) as conn:
+            with conn.cursor() as cur:
+                check_server_version(cur)
+                cur.execute(f"""
+                    CREATE TEMP TABLE vehicle_stage (
+                        line_no BIGINT GENERATED ALWAYS AS IDENTITY,
+                        {", ".join(f"{col} TEXT" for col in VEHICLE_COLUMNS)}
+                    )
+                """)
+
+                with open(file_path, "r", encoding="utf-8", newline="") as f:
+                    columns = read_csv_header(f, VEHICLE_COLUMNS, REQUIRED_COLUMNS)
+                    staged = copy_csv(cur, "vehicle_stage", columns, f)
+
+                cur.execute(f"""
+                    CREATE TEMP TABLE vehicle_checked AS
+                    WITH parsed AS (
+                        SELECT
+                            s.line_no,
+                            {plate_sql('s.license_plate')} AS license_plate,
+                            NULLIF(left(btrim(s.model), 100), '') AS model,
+                            CASE WHEN pg_input_is_valid(btrim(s.year), 'integer')
+                                THEN btrim(s.year)::INTEGER END AS year,
+                            NULLIF(regexp_replace(COALESCE(s.owner_cpf, ''), '[.\\-\\s]', '', 'g'), '') AS owner_cpf,
+                            COALESCE(
+                                NULLIF(btrim(s.username), ''),
+                                'vehicle_' || lower({plate_sql('s.license_plate')})
+                            ) AS username,
+                            COALESCE(NULLIF(btrim(s.password), ''), %(default_password)s) AS password
+                        FROM vehicle_stage s
+                    ),
+                    ranked AS (
+                        SELECT
+                            p.*,
+                            ROW_NUMBER() OVER (PARTITION BY p.license_plate ORDER BY p.line_no) AS plate_rank,
+                            ROW_NUMBER() OVER (PARTITION BY p.username ORDER BY p.line_no) AS username_rank
+                        FROM parsed p
+                    ),
+                    existing_plates AS (
+                        -- Só as placas do arquivo, por idx_vehicle_license_plate_normalized
+                        SELECT DISTINCT {plate_sql('v.license_plate')} AS license_plate
+                        FROM {schema}.vehicle v
+                        WHERE v.deleted_at IS NULL
+                          AND {plate_sql('v.license_plate')} IN (SELECT license_plate FROM parsed)
+                    ),
+                    checked AS (
+                        SELECT
+                            r.line_no, r.license_plate, r.model, r.year, r.owner_cpf,
+                            r.username, r.password, c.id AS citizen_id,
+                            CASE
+                                WHEN r.license_plate !~ '{PLATE_PATTERN}' THEN 'invalid_plate'
+                                WHEN r.model IS NULL THEN 'missing_model'
+                                WHEN r.year IS NULL
+                                  OR r.year < 1900
+                                  OR r.year > EXTRACT(YEAR FROM CURRENT_DATE)::INTEGER + 1 THEN 'invalid_year'
+                                WHEN r.password IS NULL THEN 'missing_password'
+                                WHEN r.owner_cpf IS NOT NULL AND r.owner_cpf !~ '^\\d{{11}}$' THEN 'invalid_owner_cpf'
+                                WHEN r.owner_cpf IS NOT NULL AND c.id IS NULL THEN 'owner_not_found'
+                                WHEN r.plate_rank > 1 THEN 'duplicate_plate_in_file'
+                                WHEN r.username_rank > 1 THEN 'duplicate_username_in_file'
+                                WHEN ep.license_plate IS NOT NULL THEN 'plate_in_use'
+                                WHEN u.id IS NOT NULL THEN 'username_in_use'
+                            END AS reason
+                        FROM ranked r
+                        LEFT JOIN {schema}.citizen_active c ON c.cpf = r.owner_cpf
+                        LEFT JOIN existing_plates ep ON ep.license_plate = r.license_plate
+                        LEFT JOIN {schema}.app_user u
+                            ON u.username = r.username AND u.deleted_at IS NULL
+                    )
+                    SELECT
+                        c.*,
+                        CASE WHEN c.reason IS NULL THEN
+                            (ROW_NUMBER() OVER (PARTITION BY c.reason IS NULL ORDER BY c.line_no) - 1)
+                            / {int(chunk_size)}
+                        END AS chunk_no
+                    FROM checked c
+                """, {"default_password": default_password})
+
+                cur.execute("SELECT COUNT(*), MAX(chunk_no) FROM vehicle_checked WHERE reason IS NULL")
+                total_valid, last_chunk = cur.fetchone()
+            conn.commit()
+
+            # Another session took a plate/username after the check: reject only those lines
+            recheck_sql = f"""
+                UPDATE vehicle_checked t
+                SET reason = r.reason
+                FROM (
+                    SELECT
+                        b.line_no,
+                        CASE
+                            WHEN EXISTS (
+                                SELECT 1
+                                FROM {schema}.vehicle v
+                                WHERE {plate_sql('v.license_plate')} = b.license_plate
+                                  AND v.deleted_at IS NULL
+                            ) THEN 'plate_in_use'
+                            WHEN u.id IS NOT NULL THEN 'username_in_use'
+                        END AS reason
+                    FROM vehicle_checked b
+                    LEFT JOIN {schema}.app_user u
+                        ON u.username = b.username AND u.deleted_at IS NULL
+                    WHERE b.chunk_no = %(chunk_no)s
+                      AND b.reason IS NULL
+                ) r
+                WHERE t.line_no = r.line_no
+                  AND r.reason IS NOT NULL
+            """
+            conflict_sql = """
+                UPDATE vehicle_checked
+                SET reason = 'conflict_during_import'
+                WHERE chunk_no = %(chunk_no)s
+                  AND reason IS NULL
+            """
+
+            def insert_vehicles(cur, chunk_no):
+                cur.execute(f"""
+                    WITH batch AS (
+                        SELECT *
+                        FROM vehicle_checked
+                        WHERE chunk_no = %(chunk_no)s
+                          AND reason IS NULL
+                    ),
+                    new_users AS (
+                        INSERT INTO {schema}.app_user (username, password_hash)
+                        SELECT username, password
+                        FROM batch
+                        ORDER BY line_no
+                        RETURNING id, username
+                    ),
+                    new_vehicles AS (
+                        INSERT INTO {schema}.vehicle (
+                            app_user_id, license_plate, model, year, citizen_id
+                        )
+                        SELECT nu.id, b.license_plate, b.model, b.year, b.citizen_id
+                        FROM batch b
+                        JOIN new_users nu ON nu.username = b.username
+                        ORDER BY b.line_no
+                        RETURNING id, citizen_id
+                    ),
+                    new_links AS (
+                        INSERT INTO {schema}.vehicle_citizen (vehicle_id, citizen_id)
+                        SELECT id, citizen_id
+                        FROM new_vehicles
+                        WHERE citizen_id IS NOT NULL
+                        RETURNING vehicle_id
+                    )
+                    SELECT
+                        (SELECT COUNT(*) FROM new_vehicles),
+                        (SELECT COUNT(*) FROM new_links)
+                """, {"chunk_no": chunk_no})
+                return cur.fetchone()
+
+            inserted = 0
+            linked = 0
+            insert_started = time.perf_counter()
+            for chunk_no in range(0 if last_chunk is None else last_chunk + 1):
+                chunk_vehicles, chunk_links = insert_chunk(
+                    conn,
+                    lambda cur: insert_vehicles(cur, chunk_no),
+                    recheck_sql, conflict_sql, {"chunk_no": chunk_no},
+                ) or (0, 0)
+                inserted += chunk_vehicles
+                linked += chunk_links
+
+                if progress:
+                    elapsed = time.perf_counter() - insert_started
+                    progress(inserted, total_valid, inserted / elapsed if elapsed > 0 else 0.0)
+
+            with conn.cursor() as cur:
+                cur.execute("""
+                    SELECT line_no, license_plate, owner_cpf, username, reason
+                    FROM vehicle_checked
+                    WHERE reason IS NOT NULL
+                    ORDER BY line_no
+                """)
+                rejects = cur.fetchall()
+
+        if rejects:
+            write_rejects(reject_path, REJECT_COLUMNS, rejects)
+
+        elapsed = time.perf_counter() - started
+        return {
+            "staged": staged,
+            "inserted": inserted,
+            "linked": linked,
+            "rejected": len(rejects),
+            "reject_path": reject_path if rejects else None,
+            "elapsed": elapsed,
+            "rows_per_second": inserted / elapsed if elapsed > 0 else 0.0,
+        }
+    except Exception as e:
+        print(f"Error: {e}")
+        import traceback
+        traceback.print_exc()
+        return None
+
+if __name__ == "__main__":
+    import argparse
+    from conect_db import connect_to_db
+
+    parser = argparse.ArgumentParser(description="Bulk register vehicles from a CSV file")
+    parser.add_argument("file", help=f"CSV with columns: {', '.join(VEHICLE_COLUMNS)}")
+    parser.add_argument("--default-password", help="Password for rows without a password column")
+    parser.add_argument("--rejects", help="Path of the reject file (default: <file>.rejects.csv)")
+    parser.add_argument("--chunk-size", type=int, default=2000)
+    parser.add_argument("--schema", default="public")
+    args = parser.parse_args()
+
+    conn_info = connect_to_db()
+    result = import_vehicles(
+        conn_info, args.file, args.schema,
+        default_password=args.default_password,
+        reject_path=args.rejects,
+        chunk_size=args.chunk_size,
+        progress=lambda done, total, rate: print(f"{done}/{total} vehicles inserted ({rate:.0f} rows/s)"),
+    )
+    if result:
+        print(
+            f"Staged: {result['staged']} | Inserted: {result['inserted']} "
+            f"(owners linked: {result['linked']}) | Rejected: {result['rejected']}"
+        )
+        print(f"Elapsed: {result['elapsed']:.2f}s | Throughput: {result['rows_per_second']:.0f} rows/s")
+        if result["reject_path"]:
+            print(f"Rejects written to {result['reject_path']}")
@@ -0,0 +1,468 @@
+import os
+import re
+import sys
+from datetime import datetime
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MIGRATIONS_DIR = os.path.join(ROOT_DIR, "sql", "migrations")
+# Ganho mínimo (custo estimado das consultas afetadas) para um índice ser sugerido
+MIN_GAIN = 0.10
+# Colunas por índice candidato
+MAX_COLUMNS = 3
+# Caminhos da GUI conhecidos por não terem índice: sempre avaliados
+DEFAULT_CANDIDATES = (
+    ("reading", ("sensor_id", "timestamp")),
+    ("fine", ("created_at",)),
+    ("traffic_incident", ("location",)),
+    ("vehicle", ("citizen_id",)),
+)
+# Repositórios cujo SQL lê só catálogos do sistema
+IGNORED_REPOSITORIES = ("DiagnosticsRepo",)
+
+_CLIENT_PARAMS = re.compile(r"%%|%\((\w+)\)s|%s")
+_SERVER_PARAMS = re.compile(r"\$(\d+)")
+_LITERALS = re.compile(r"'(?:[^']|'')*'")
+_COLUMN_REF = re.compile(r"(?:\b(\w+)\.)?\b([a-z_][a-z0-9_]*)\b")
+_EQUALITY = re.compile(r"(?:\b\w+\.)?\b([a-z_][a-z0-9_]*)\)?(?:::\w+)? = ")
+_SORT_KEY = re.compile(r"^\(?(?:(\w+)\.)?([a-z_][a-z0-9_]*)\)?(?:\s+(?:ASC|DESC))?(?:\s+NULLS\s+\w+)?$")
+_READ_ONLY = re.compile(r"^\s*(SELECT|WITH|UPDATE|DELETE)\b", re.IGNORECASE)
+
+
+def server_placeholders(query):
+    """psycopg placeholders (%s, %(name)s) turned into $n; returns (query, number of parameters)."""
+    positions = {}
+    count = 0
+
+    def replace(match):
+        nonlocal count
+        if match.group(0) == "%%":
+            return "%"
+        name = match.group(1)
+        if name is not None and name in positions:
+            return f"${positions[name]}"
+        count += 1
+        if name is not None:
+            positions[name] = count
+        return f"${count}"
+
+    return _CLIENT_PARAMS.sub(replace, query), count
+
+
+def app_workload():
+    """
+    Named statements of the repositories in smartcity.data, as the GUI runs
+    them: [{"name": "Repo.statement", "query", "params", "weight": 1, "source": "app"}].
+    INSERTs are skipped (an index never makes them cheaper).
+    """
+    if ROOT_DIR not in sys.path:
+        sys.path.append(ROOT_DIR)
+    import smartcity.data
+    from smartcity.data.repository import Repository
+
+    def subclasses(cls):
+        for sub in cls.__subclasses__():
+            yield sub
+            yield from subclasses(sub)
+
+    workload = []
+    seen = set()
+    for repo in sorted(set(subclasses(Repository)), key=lambda cls: cls.__name__):
+        if repo.__name__ in IGNORED_REPOSITORIES:
+            continue
+        statements = dict(getattr(repo, "ACCOUNT_STATEMENTS", {}))
+        statements.update(repo.STATEMENTS)
+        for name, query in sorted(statements.items()):
+            # ACCOUNT_STATEMENTS se repetem em cada repositório de conta
+            if not _READ_ONLY.match(query) or query in seen:
+                continue
+            seen.add(query)
+            text, params = server_placeholders(query)
+            workload.append({
+                "name": f"{repo.__name__}.{name}",
+                "query": text,
+                "params": params,
+                "weight": 1,
+                "source": "app",
+            })
+    return workload
+
+
+def stat_workload(cur, limit):
+    """
+    Top statements of pg_stat_statements (by total time) for the current
+    database, weighted by their calls. Returns [] when the view is unavailable.
+    """
+    try:
+        with cur.connection.transaction():
+            cur.execute(r"""
+                SELECT s.queryid, s.query, s.calls
+                FROM pg_stat_statements s
+                JOIN pg_database d ON d.oid = s.dbid
+                WHERE d.datname = current_database()
+                  AND s.query ~* '^\s*(select|with|update|delete)\M'
+                  AND s.query !~* '(pg_catalog|pg_stat|information_schema|hypopg|pg_extension)'
+                ORDER BY s.total_exec_time DESC
+                LIMIT %s
+            """, (limit,))
+            rows = cur.fetchall()
+    except Exception as exc:
+        print(f"pg_stat_statements unavailable: {str(exc).strip()}")
+        return []
+
+    return [
+        {
+            "name": f"pg_stat_statements.{queryid}",
+            "query": query,
+            "params": max((int(n) for n in _SERVER_PARAMS.findall(query)), default=0),
+            "weight": calls,
+            "source": "pg_stat_statements",
+        }
+        for queryid, query, calls in rows
+    ]
+
+
+def explain(cur, query, params):
+    """
+    Generic plan (JSON) of query: PREPARE + EXPLAIN EXECUTE with NULL
+    arguments under plan_cache_mode = force_generic_plan, so the plan does
+    not depend on sample values.
+    """
+    args = f"({', '.join(['NULL'] * params)})" if params else ""
+    try:
+        with cur.connection.transaction():
+            cur.execute(f"PREPARE index_advisor_stmt AS {query}")
+            cur.execute(f"EXPLAIN (FORMAT JSON) EXECUTE index_advisor_stmt{args}")
+            return cur.fetchone()[0][0]["Plan"]
+    finally:
+        # Statements preparados não seguem o rollback do savepoint
+        cur.execute("DEALLOCATE ALL")
+
+
+def _nodes(plan):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _nodes(child)
+
+
+def _seq_scans(plan):
+    """{alias: table} of the sequential scans under plan."""
+    return {
+        node.get("Alias", node["Relation Name"]): node["Relation Name"]
+        for node in _nodes(plan)
+        if node["Node Type"] == "Seq Scan"
+    }
+
+
+def _columns_in(expression, aliases, columns):
+    """[(table, column)] referenced by expression, for the seq-scanned tables in aliases."""
+    expression = _LITERALS.sub("", expression)
+    tables = set(aliases.values())
+    found = []
+    for qualifier, name in _COLUMN_REF.findall(expression):
+        if qualifier:
+            table = aliases.get(qualifier)
+            if table is None:
+                continue
+        else:
+            owners = [t for t in tables if name in columns.get(t, ())]
+            if len(owners) != 1:
+                continue
+            table = owners[0]
+        if name in columns.get(table, ()) and (table, name) not in found:
+            found.append((table, name))
+    return found
+
+
+def plan_candidates(plan, columns):
+    """
+    Index candidates {(table, (columns...))} suggested by a plan: filters of
+    sequential scans (equality columns first), sort and group keys computed
+    over a sequential scan, and join conditions whose inner side is scanned.
+    """
+    candidates = set()
+    for node in _nodes(plan):
+        aliases = _seq_scans(node)
+        if not aliases:
+            continue
+
+        if node["Node Type"] == "Seq Scan" and node.get("Filter"):
+            alias = node.get("Alias", node["Relation Name"])
+            scanned = {alias: node["Relation Name"]}
+            used = [col for _, col in _columns_in(node["Filter"], scanned, columns)]
+            equal = [col for col in _EQUALITY.findall(_LITERALS.sub("", node["Filter"])) if col in used]
+            ordered = list(dict.fromkeys(equal + used))
+            if ordered:
+                candidates.add((node["Relation Name"], tuple(ordered[:MAX_COLUMNS])))
+                candidates.add((node["Relation Name"], (ordered[0],)))
+
+        for keys in (node.get("Sort Key"), node.get("Group Key")):
+            if not keys:
+                continue
+            parsed = [_SORT_KEY.match(key.strip()) for key in keys]
+            if not all(parsed):
+                continue
+            refs = _columns_in(", ".join(
+                f"{m.group(1)}.{m.group(2)}" if m.group(1) else m.group(2) for m in parsed
+            ), aliases, columns)
+            tables = {table for table, _ in refs}
+            if len(refs) == len(keys) and len(tables) == 1:
+                candidates.add((tables.pop(), tuple(col for _, col in refs[:MAX_COLUMNS])))
+
+        for condition in ("Hash Cond", "Merge Cond", "Join Filter"):
+            if node.get(condition):
+                for table, col in _columns_in(node[condition], aliases, columns):
+                    candidates.add((table, (col,)))
+    return candidates
+
+
+def _plan_relations(plan):
+    return {node["Relation Name"] for node in _nodes(plan) if node.get("Relation Name")}
+
+
+def _plan_uses(plan, index_name):
+    return any(index_name in (node.get("Index Name") or "") for node in _nodes(plan))
+
+
+def _schema_columns(cur, schema):
+    cur.execute("""
+        SELECT table_name, column_name
+        FROM information_schema.columns
+        WHERE table_schema = %s
+    """, (schema,))
+    columns = {}
+    for table, column in cur.fetchall():
+        columns.setdefault(table, set()).add(column)
+    return columns
+
+
+def _existing_indexes(cur, schema):
+    """{table: [(columns...)]} of the non-partial indexes on plain columns."""
+    cur.execute("""
+        SELECT t.relname, array_agg(a.attname ORDER BY k.ord)
+        FROM pg_index ix
+        JOIN pg_class t ON t.oid = ix.indrelid
+        JOIN pg_namespace n ON n.oid = t.relnamespace
+        CROSS JOIN LATERAL unnest(ix.indkey::SMALLINT[]) WITH ORDINALITY AS k(attnum, ord)
+        JOIN pg_attribute a ON a.attrelid = t.oid AND a.attnum = k.attnum
+        WHERE n.nspname = %s
+          AND ix.indpred IS NULL
+        GROUP BY ix.indexrelid, t.relname
+    """, (schema,))
+    existing = {}
+    for table, cols in cur.fetchall():
+        existing.setdefault(table, []).append(tuple(cols))
+    return existing
+
+
+def _covered(existing, table, cols):
+    return any(index[:len(cols)] == cols for index in existing.get(table, ()))
+
+
+def index_name(table, cols):
+    return f"idx_{table}_{'_'.join(cols)}"[:63]
+
+
+def advise_indexes(conn_info, schema, sources=("app", "stat"), mode="auto", limit=50,
+                   min_gain=MIN_GAIN, progress=None):
+    """
+    Replay the query workload with EXPLAIN and propose missing indexes.
+
+    The workload is the repositories' SQL ("app") and/or the top statements
+    of pg_stat_statements ("stat"). Candidates come from the plans plus
+    DEFAULT_CANDIDATES, minus those already covered by an index with the same
+    leading columns. Each candidate is tested alone: with hypopg
+    (mode "hypopg", or "auto" when installed) as a hypothetical index, or with
+    mode "build" as a real index inside a rolled-back transaction (locks the
+    table: use a copy of the database). A candidate is advised when the
+    planner uses it and the weighted cost of the statements touching its
+    table drops by at least min_gain.
+    Returns {"mode", "statements", "errors", "candidates", "advised"}, or None on error.
+    """
+    try:
+        from query_metrics import connect
+
+        with connect(conn_info) as conn:
+            # Sem prepares automáticos do psycopg: o DEALLOCATE ALL do explain() os apagaria
+            conn.prepare_threshold = None
+            with conn.cursor() as cur:
+                cur.execute(f"SET search_path TO {schema}")
+                cur.execute("SET plan_cache_mode = force_generic_plan")
+
+                cur.execute("SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'hypopg')")
+                has_hypopg = cur.fetchone()[0]
+                if mode == "auto":
+                    mode = "hypopg" if has_hypopg else "build"
+                if mode == "hypopg" and not has_hypopg:
+                    raise Exception("hypopg is not installed (CREATE EXTENSION hypopg) - use --mode build")
+
+                workload = app_workload() if "app" in sources else []
+                if "stat" in sources:
+                    workload.extend(stat_workload(cur, limit))
+
+                columns = _schema_columns(cur, schema)
+                existing = _existing_indexes(cur, schema)
+
+                # Custos atuais e candidatos vindos dos planos
+                baseline = {}
+                errors = []
+                candidates = set(DEFAULT_CANDIDATES)
+                for statement in workload:
+                    try:
+                        plan = explain(cur, statement["query"], statement["params"])
+                    except Exception as exc:
+                        errors.append({"name": statement["name"], "error": str(exc).strip()})
+                        continue
+                    baseline[statement["name"]] = (statement, plan["Total Cost"], _plan_relations(plan))
+                    candidates |= plan_candidates(plan, columns)
+
+                candidates = sorted(
+                    (table, cols) for table, cols in candidates
+                    if table in columns
+                    and all(col in columns[table] for col in cols)
+                    and not _covered(existing, table, cols)
+                )
+
+                results = []
+                for table, cols in candidates:
+                    affected = [entry for entry in baseline.values() if table in entry[2]]
+                    if not affected:
+                        continue
+                    ddl = f"CREATE INDEX {{name}}ON {schema}.{table} ({', '.join(cols)})"
+                    with conn.transaction(force_rollback=(mode == "build")):
+                        if mode == "hypopg":
+                            cur.execute("SELECT indexrelid, indexname FROM hypopg_create_index(%s)", (ddl.format(name=""),))
+                            hypo_oid, name = cur.fetchone()
+                        else:
+                            name = index_name(table, cols)
+                            cur.execute(ddl.format(name=f"{name} "))
+
+                        statements = []
+                        for statement, before, _ in affected:
+                            try:
+                                plan = explain(cur, statement["query"], statement["params"])
+                            except Exception:
+                                continue
+                            statements.append({
+                                "name": statement["name"],
+                                "weight": statement["weight"],
+                                "before": before,
+                                "after": plan["Total Cost"],
+                                "uses_index": _plan_uses(plan, name),
+                            })
+
+                        if mode == "hypopg":
+                            cur.execute("SELECT hypopg_drop_index(%s)", (hypo_oid,))
+
+                    before = sum(s["before"] * s["weight"] for s in statements)
+                    after = sum(s["after"] * s["weight"] for s in statements)
+                    result = {
+                        "table": table,
+                        "columns": list(cols),
+                        "name": index_name(table, cols),
+                        "before": before,
+                        "after": after,
+                        "gain": 1 - after / before if before else 0.0,
+                        "used_by": [s["name"] for s in statements if s["uses_index"]],
+                        "statements": statements,
+                    }
+                    results.append(result)
+                    if progress:
+                        progress(result)
+            conn.rollback()
+
+        # Melhores primeiro; um candidato que é prefixo de outro já sugerido na mesma tabela é redundante
+        advised = []
+        for result in sorted(results, key=lambda r: -r["gain"]):
+            if not result["used_by"] or result["gain"] < min_gain:
+                continue
+            if any(
+                a["table"] == result["table"] and a["columns"][:len(result["columns"])] == result["columns"]
+                for a in advised
+            ):
+                continue
+            advised.append(result)
+
+        return {
+            "mode": mode,
+            "statements": len(baseline),
+            "errors": errors,
+            "candidates": results,
+            "advised": advised,
+        }
+    except Exception as e:
+        print(f"Error: {e}")
+        import traceback
+        traceback.print_exc()
+        return None
+
+
+def write_migration(advice, migrations_dir=MIGRATIONS_DIR):
+    """
+    Write the advised indexes as the next numbered migration
+    (NNN_advised_indexes.sql, SCHEMA_NAME placeholder) with the estimated
+    costs before/after in comments. The indexes are built CONCURRENTLY, so
+    the migration is marked no-transaction for migrate.py.
+    Returns the path, or None if nothing was advised.
+    """
+    from migrate import NO_TRANSACTION, discover_migrations
+
+    if not advice["advised"]:
+        return None
+
+    version = max((m["version"] for m in discover_migrations(migrations_dir)), default=0) + 1
+    path = os.path.join(migrations_dir, f"{version:03d}_advised_indexes.sql")
+
+    lines = [
+        f"-- Índices sugeridos por functions/index_advisor.py em {datetime.now():%Y-%m-%d} ({advice['mode']})",
+        "-- Custos estimados pelo planejador (plano genérico), somados sobre as consultas que leem a tabela",
+        NO_TRANSACTION,
+    ]
+    for result in advice["advised"]:
+        lines.append("")
+        lines.append(
+            f"-- {result['table']}({', '.join(result['columns'])}): custo {result['before']:.0f} -> "
+            f"{result['after']:.0f} ({-result['gain']:+.1%}); usado por {', '.join(result['used_by'])}"
+        )
+        lines.append(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {result['name']}")
+        lines.append(f"ON SCHEMA_NAME.{result['table']}({', '.join(result['columns'])});")
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    return path
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    from conect_db import connect_to_db
+
+    parser = argparse.ArgumentParser(description="Propose indexes from the EXPLAIN plans of the app workload")
+    parser.add_argument("--source", choices=("app", "stat", "all"), default="all",
+                        help="Repository SQL, pg_stat_statements or both (default)")
+    parser.add_argument("--mode", choices=("auto", "hypopg", "build"), default="auto",
+                        help="Hypothetical indexes (hypopg) or real ones in a rolled-back transaction")
+    parser.add_argument("--limit", type=int, default=50, help="Statements read from pg_stat_statements")
+    parser.add_argument("--min-gain", type=float, default=MIN_GAIN)
+    parser.add_argument("--write", action="store_true", help="Write the advised indexes as the next migration")
+    parser.add_argument("--output", help="Write every evaluated candidate as JSON")
+    parser.add_argument("--schema", default="public")
+    args = parser.parse_args()
+
+    def report(result):
+        print(
+            f"{result['table']}({', '.join(result['columns'])}): {result['before']:.0f} -> {result['after']:.0f} "
+            f"({-result['gain']:+.1%}), used by {len(result['used_by'])} statement(s)"
+        )
+
+    conn_info = connect_to_db()
+    sources = ("app", "stat") if args.source == "all" else (args.source,)
+    advice = advise_indexes(conn_info, args.schema, sources, args.mode, args.limit, args.min_gain, progress=report)
+    if advice:
+        for error in advice["errors"]:
+            print(f"Could not explain {error['name']}: {error['error']}")
+        print(f"{len(advice['advised'])} index(es) advised from {advice['statements']} statement(s) ({advice['mode']})")
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(advice, f, indent=2, ensure_ascii=False)
+        if args.write:
+            path = write_migration(advice)
+            print(f"Migration written to {path}" if path else "Nothing to write")
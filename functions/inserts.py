@@ -4,8 +4,8 @@ def insert_generic(conn_info,table,schema,values,return_columns=None):
     """
     try:
         
-        import psycopg as psy
-        with psy.connect(conn_info) as conn:
+        from query_metrics import connect
+        with connect(conn_info) as conn:
             with conn.cursor() as cur:
                 # TODO: Implement test data insertion
                 # Example: insert a test app_user
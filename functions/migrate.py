@@ -0,0 +1,352 @@
+import hashlib
+import os
+import re
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MIGRATIONS_DIR = os.path.join(ROOT_DIR, "sql", "migrations")
+MIGRATIONS_TABLE = "schema_migrations"
+# Linha que tira a migração da transação (CREATE INDEX CONCURRENTLY, ALTER TYPE ... ADD VALUE)
+NO_TRANSACTION = "-- migrate:no-transaction"
+
+_MIGRATION_FILE = re.compile(r"^(\d+)_(\w+)\.sql$")
+_DOLLAR_TAG = re.compile(r"\$(?:[A-Za-z_]\w*)?\$")
+_LINE_COMMENT = re.compile(r"--[^\n]*")
+
+
+def load_migration(path):
+    """
+    {"version", "name", "path", "checksum", "sql", "transactional"} of a
+    NNN_name.sql file. The checksum ignores line endings, so Windows and
+    Linux checkouts of the same file agree.
+    """
+    match = _MIGRATION_FILE.match(os.path.basename(path))
+    if not match:
+        raise ValueError(f"Not a migration file (NNN_name.sql): {path}")
+    with open(path, "r", encoding="utf-8") as f:
+        sql = f.read().replace("\r\n", "\n")
+    return {
+        "version": int(match.group(1)),
+        "name": match.group(2),
+        "path": path,
+        "checksum": hashlib.sha256(sql.encode("utf-8")).hexdigest(),
+        "sql": sql,
+        "transactional": not any(line.strip().lower() == NO_TRANSACTION for line in sql.splitlines()),
+    }
+
+
+def discover_migrations(directory=MIGRATIONS_DIR):
+    """Migrations of directory ordered by version; two files with the same version are an error."""
+    migrations = {}
+    for file_name in sorted(os.listdir(directory)):
+        if not _MIGRATION_FILE.match(file_name):
+            continue
+        migration = load_migration(os.path.join(directory, file_name))
+        if migration["version"] in migrations:
+            raise ValueError(
+                f"Duplicate migration version {migration['version']}: "
+                f"{migrations[migration['version']]['path']} and {migration['path']}"
+            )
+        migrations[migration["version"]] = migration
+    return [migrations[version] for version in sorted(migrations)]
+
+
+def split_statements(sql):
+    """
+    Statements of a SQL script, split on the semicolons outside quotes,
+    comments and dollar-quoted bodies. Needed by no-transaction migrations:
+    a multi-statement query runs in an implicit transaction, where
+    CREATE INDEX CONCURRENTLY is refused.
+    """
+    statements = []
+    start = i = 0
+    n = len(sql)
+    while i < n:
+        char = sql[i]
+        if sql.startswith("--", i):
+            end = sql.find("\n", i)
+            i = n if end < 0 else end + 1
+        elif sql.startswith("/*", i):
+            end = sql.find("*/", i + 2)
+            i = n if end < 0 else end + 2
+        elif char in "'\"":
+            end = i + 1
+            while True:
+                end = sql.find(char, end)
+                if end < 0:
+                    end = n
+                    break
+                # Aspas duplicadas são escape dentro do literal
+                if sql.startswith(char * 2, end):
+                    end += 2
+                    continue
+                break
+            i = end + 1
+        elif char == "$" and _DOLLAR_TAG.match(sql, i):
+            tag = _DOLLAR_TAG.match(sql, i).group(0)
+            end = sql.find(tag, i + len(tag))
+            i = n if end < 0 else end + len(tag)
+        elif char == ";":
+            statements.append(sql[start:i])
+            i += 1
+            start = i
+        else:
+            i += 1
+    statements.append(sql[start:])
+    return [statement.strip() for statement in statements if _LINE_COMMENT.sub("", statement).strip()]
+
+
+def ensure_migrations_table(cur, schema):
+    cur.execute(f"""
+        CREATE TABLE IF NOT EXISTS {schema}.{MIGRATIONS_TABLE} (
+            version INTEGER PRIMARY KEY,
+            name VARCHAR(200) NOT NULL,
+            checksum CHAR(64) NOT NULL,
+            transactional BOOLEAN NOT NULL DEFAULT TRUE,
+            duration_ms DOUBLE PRECISION,
+            applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def record_migration(cur, schema, migration, duration_ms=None):
+    """Mark migration as applied (duration_ms is None for a baseline that did not run it)."""
+    cur.execute(f"""
+        INSERT INTO {schema}.{MIGRATIONS_TABLE} (version, name, checksum, transactional, duration_ms)
+        VALUES (%s, %s, %s, %s, %s)
+        ON CONFLICT (version) DO UPDATE
+        SET name = EXCLUDED.name,
+            checksum = EXCLUDED.checksum,
+            transactional = EXCLUDED.transactional,
+            duration_ms = EXCLUDED.duration_ms,
+            applied_at = CURRENT_TIMESTAMP
+    """, (migration["version"], migration["name"], migration["checksum"], migration["transactional"], duration_ms))
+
+
+def applied_migrations(cur, schema):
+    """{version: {"version", "name", "checksum", "duration_ms", "applied_at"}} from schema_migrations."""
+    cur.execute(f"""
+        SELECT version, name, checksum, duration_ms, applied_at
+        FROM {schema}.{MIGRATIONS_TABLE}
+        ORDER BY version
+    """)
+    return {
+        row[0]: {"version": row[0], "name": row[1], "checksum": row[2], "duration_ms": row[3], "applied_at": row[4]}
+        for row in cur.fetchall()
+    }
+
+
+def apply_file(conn, schema, migration):
+    """
+    Run one migration on an autocommit connection and record it.
+
+    Transactional migrations run with their schema_migrations row in a single
+    transaction: either both are committed or nothing changes. No-transaction
+    migrations run statement by statement and are recorded after the last
+    one; if one fails, the statements before it stay applied, so the file
+    must be safe to run again (IF NOT EXISTS). A failed CREATE INDEX
+    CONCURRENTLY leaves an INVALID index that IF NOT EXISTS would skip:
+    they are listed in the error to be dropped before retrying.
+    Returns the duration in milliseconds.
+    """
+    sql = migration["sql"].replace("SCHEMA_NAME", schema)
+    start = time.perf_counter()
+    with conn.cursor() as cur:
+        if migration["transactional"]:
+            with conn.transaction():
+                cur.execute(sql)
+                duration_ms = (time.perf_counter() - start) * 1000
+                record_migration(cur, schema, migration, duration_ms)
+            return duration_ms
+
+        try:
+            for statement in split_statements(sql):
+                cur.execute(statement)
+        except Exception as exc:
+            invalid = _invalid_indexes(cur, schema)
+            if invalid:
+                raise Exception(
+                    f"{exc} - invalid indexes left behind (DROP INDEX CONCURRENTLY before retrying): "
+                    f"{', '.join(invalid)}"
+                ) from exc
+            raise
+        duration_ms = (time.perf_counter() - start) * 1000
+        record_migration(cur, schema, migration, duration_ms)
+        return duration_ms
+
+
+def _invalid_indexes(cur, schema):
+    cur.execute("""
+        SELECT c.relname
+        FROM pg_index i
+        JOIN pg_class c ON c.oid = i.indexrelid
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = %s
+          AND NOT i.indisvalid
+        ORDER BY c.relname
+    """, (schema,))
+    return [row[0] for row in cur.fetchall()]
+
+
+def migration_status(conn_info, schema, directory=MIGRATIONS_DIR):
+    """
+    Every migration known to the files or to schema_migrations with its state:
+    "applied", "pending", "changed" (file edited after it was applied) or
+    "missing" (applied but its file is gone). Returns None on error.
+    """
+    try:
+        from query_metrics import connect
+        migrations = {m["version"]: m for m in discover_migrations(directory)}
+        with connect(conn_info, autocommit=True) as conn:
+            with conn.cursor() as cur:
+                ensure_migrations_table(cur, schema)
+                applied = applied_migrations(cur, schema)
+
+        status = []
+        for version in sorted(set(migrations) | set(applied)):
+            migration = migrations.get(version)
+            row = applied.get(version)
+            if row is None:
+                state = "pending"
+            elif migration is None:
+                state = "missing"
+            elif row["checksum"] != migration["checksum"]:
+                state = "changed"
+            else:
+                state = "applied"
+            status.append({
+                "version": version,
+                "name": (migration or row)["name"],
+                "state": state,
+                "applied_at": row["applied_at"] if row else None,
+                "duration_ms": row["duration_ms"] if row else None,
+            })
+        return status
+    except Exception as e:
+        print(f"Error: {e}")
+        import traceback
+        traceback.print_exc()
+        return None
+
+
+def migrate(conn_info, schema, directory=MIGRATIONS_DIR, target=None, dry_run=False, repair=False,
+            lock_timeout=None, progress=None):
+    """
+    Apply the pending migrations of directory (up to version target) in order.
+
+    A session advisory lock serializes runners on the same schema. Applied
+    migrations whose file changed since are refused (add a new migration
+    instead); repair=True accepts the files as they are and only updates the
+    checksums. lock_timeout (e.g. "5s") makes a statement waiting on a busy
+    table fail instead of queueing the application behind it.
+    Returns [{"version", "name", "transactional", "duration_ms"}] of the
+    migrations applied (pending ones with dry_run), or None on error.
+    """
+    try:
+        from query_metrics import connect
+        migrations = discover_migrations(directory)
+        with connect(conn_info, autocommit=True) as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT pg_advisory_lock(hashtext(%s))", (f"{MIGRATIONS_TABLE}:{schema}",))
+                if lock_timeout:
+                    cur.execute("SELECT set_config('lock_timeout', %s, false)", (lock_timeout,))
+                ensure_migrations_table(cur, schema)
+                applied = applied_migrations(cur, schema)
+
+                changed = [
+                    m for m in migrations
+                    if m["version"] in applied and applied[m["version"]]["checksum"] != m["checksum"]
+                ]
+                if changed and not repair:
+                    names = ", ".join(os.path.basename(m["path"]) for m in changed)
+                    raise Exception(f"Applied migrations were edited: {names} (add a new migration, or --repair)")
+                if changed and not dry_run:
+                    for migration in changed:
+                        cur.execute(f"""
+                            UPDATE {schema}.{MIGRATIONS_TABLE}
+                            SET checksum = %s
+                            WHERE version = %s
+                        """, (migration["checksum"], migration["version"]))
+
+            pending = [
+                m for m in migrations
+                if m["version"] not in applied and (target is None or m["version"] <= target)
+            ]
+            done = []
+            for migration in pending:
+                result = {
+                    "version": migration["version"],
+                    "name": migration["name"],
+                    "transactional": migration["transactional"],
+                    "duration_ms": None,
+                }
+                if not dry_run:
+                    result["duration_ms"] = apply_file(conn, schema, migration)
+                done.append(result)
+                if progress:
+                    progress(result)
+        return done
+    except Exception as e:
+        print(f"Error: {e}")
+        import traceback
+        traceback.print_exc()
+        return None
+
+
+def baseline(conn_info, schema, directory=MIGRATIONS_DIR, target=None):
+    """
+    Record the migrations (up to version target) as applied without running
+    them: for databases created from the full scripts in sql/, which already
+    contain every migration. Returns the number recorded, or None on error.
+    """
+    try:
+        from query_metrics import connect
+        with connect(conn_info) as conn:
+            with conn.cursor() as cur:
+                ensure_migrations_table(cur, schema)
+                recorded = 0
+                for migration in discover_migrations(directory):
+                    if target is None or migration["version"] <= target:
+                        record_migration(cur, schema, migration)
+                        recorded += 1
+            conn.commit()
+        return recorded
+    except Exception as e:
+        print(f"Error: {e}")
+        import traceback
+        traceback.print_exc()
+        return None
+
+if __name__ == "__main__":
+    import argparse
+    from conect_db import connect_to_db
+
+    parser = argparse.ArgumentParser(description="Apply the pending migrations of sql/migrations")
+    parser.add_argument("--status", action="store_true", help="List the migrations and their state")
+    parser.add_argument("--baseline", action="store_true",
+                        help="Record the migrations as applied without running them (database built from sql/)")
+    parser.add_argument("--target", type=int, metavar="VERSION", help="Stop after this version")
+    parser.add_argument("--dry-run", action="store_true", help="Only list what would be applied")
+    parser.add_argument("--repair", action="store_true", help="Accept applied migrations whose file was edited")
+    parser.add_argument("--lock-timeout", help="lock_timeout for the migration statements (e.g. 5s)")
+    parser.add_argument("--dir", default=MIGRATIONS_DIR)
+    parser.add_argument("--schema", default="public")
+    args = parser.parse_args()
+
+    conn_info = connect_to_db()
+    if args.status:
+        for migration in migration_status(conn_info, args.schema, args.dir) or []:
+            applied_at = f" {migration['applied_at']:%Y-%m-%d %H:%M}" if migration["applied_at"] else ""
+            print(f"{migration['version']:03d} {migration['name']:<40} {migration['state']}{applied_at}")
+    elif args.baseline:
+        print(f"Recorded {baseline(conn_info, args.schema, args.dir, args.target)} migration(s) as applied")
+    else:
+        def report(result):
+            mode = "" if result["transactional"] else " (no transaction)"
+            took = "" if result["duration_ms"] is None else f" in {result['duration_ms']:.0f} ms"
+            print(f"{'Pending' if args.dry_run else 'Applied'} {result['version']:03d}_{result['name']}{mode}{took}")
+
+        done = migrate(conn_info, args.schema, args.dir, args.target, args.dry_run, args.repair,
+                       args.lock_timeout, progress=report)
+        if done == []:
+            print("Database is up to date")
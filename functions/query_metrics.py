@@ -0,0 +1,21 @@
+"""
+Script entry point for smartcity/query_metrics.py, where the instrumented
+cursor now lives; the scripts in functions/ keep importing connect from here.
+"""
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+from smartcity.query_metrics import RECORDER, connect, fingerprint
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Fingerprint a query as the instrumented cursor does")
+    parser.add_argument("query")
+    args = parser.parse_args()
+
+    print(fingerprint(args.query))
@@ -0,0 +1,32 @@
+"""Script entry point for smartcity/reading_rollups.py (refresh or rebuild the rollups)."""
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+from smartcity.reading_rollups import query_series, rebuild_rollups, refresh_rollups
+
+if __name__ == "__main__":
+    import argparse
+    import time
+    from conect_db import connect_to_db
+
+    parser = argparse.ArgumentParser(description="Refresh reading rollups (1m/1h/1d)")
+    parser.add_argument("--rebuild", action="store_true", help="Clear the rollups and aggregate everything again")
+    parser.add_argument("--loop", type=int, metavar="SECONDS", help="Keep refreshing every SECONDS")
+    parser.add_argument("--batch-size", type=int, default=100000)
+    parser.add_argument("--lag", type=int, default=60, help="Seconds to wait before rolling up a reading")
+    parser.add_argument("--schema", default="public")
+    args = parser.parse_args()
+
+    conn_info = connect_to_db()
+    if args.rebuild:
+        print(f"Rebuilt rollups: {rebuild_rollups(conn_info, args.schema, args.batch_size)} readings")
+    while True:
+        rolled = refresh_rollups(conn_info, args.schema, args.batch_size, args.lag)
+        print(f"Rolled up {rolled} readings")
+        if not args.loop:
+            break
+        time.sleep(args.loop)
@@ -0,0 +1,94 @@
+def load_reading_schemas(cur, schema):
+    """Return {sensor_type: (schema_id, [metrics])} from reading_schema."""
+    cur.execute(f"SELECT id, sensor_type, metrics FROM {schema}.reading_schema")
+    return {sensor_type: (schema_id, list(metrics)) for schema_id, sensor_type, metrics in cur.fetchall()}
+
+
+def map_payload(payload, metrics):
+    """
+    Map a JSON payload to a list of floats in the order of `metrics`.
+
+    Same rules as the SQL reading_compact_values(): the payload must be an
+    object whose keys all belong to the schema and whose values are numbers
+    (or null). Missing metrics become None. Returns None when the payload does
+    not fit, so the caller keeps it as JSONB.
+    """
+    if not isinstance(payload, dict):
+        return None
+    for key, value in payload.items():
+        if key not in metrics:
+            return None
+        if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float))):
+            return None
+    return [None if payload.get(metric) is None else float(payload[metric]) for metric in metrics]
+
+
+def ingest_readings(conn_info, schema, readings):
+    """
+    Store sensor readings, choosing the typed storage when possible.
+
+    `readings` is an iterable of (sensor_id, timestamp, payload). Payloads of
+    sensors whose type has a reading_schema row go to reading_compact as REAL[];
+    anything else stays in reading as JSONB. Both tables are filled with COPY.
+    reading_compact.timestamp is NOT NULL: a missing timestamp gets the
+    column default (the transaction's LOCALTIMESTAMP) instead of failing the batch.
+    Returns {"compact": n, "jsonb": n}, or None on error.
+    """
+    try:
+        from query_metrics import connect
+        from psycopg.types.json import Jsonb
+
+        readings = list(readings)
+        with connect(conn_info) as conn:
+            with conn.cursor() as cur:
+                schemas = load_reading_schemas(cur, schema)
+                sensor_ids = sorted({sensor_id for sensor_id, _, _ in readings})
+                cur.execute(
+                    f"SELECT id, type FROM {schema}.sensor_active WHERE id = ANY(%s)",
+                    (sensor_ids,),
+                )
+                sensor_types = dict(cur.fetchall())
+                cur.execute("SELECT LOCALTIMESTAMP")
+                now = cur.fetchone()[0]
+
+                compact_rows = []
+                jsonb_rows = []
+                for sensor_id, timestamp, payload in readings:
+                    schema_id, metrics = schemas.get(sensor_types.get(sensor_id), (None, None))
+                    values = map_payload(payload, metrics) if metrics else None
+                    if values is not None:
+                        compact_rows.append((sensor_id, schema_id, timestamp or now, values))
+                    else:
+                        jsonb_rows.append((sensor_id, Jsonb(payload), timestamp))
+
+                if compact_rows:
+                    with cur.copy(
+                        f"COPY {schema}.reading_compact (sensor_id, schema_id, timestamp, metrics) FROM STDIN"
+                    ) as copy:
+                        copy.set_types(["integer", "smallint", "timestamp", "real[]"])
+                        for row in compact_rows:
+                            copy.write_row(row)
+
+                if jsonb_rows:
+                    with cur.copy(
+                        f"COPY {schema}.reading (sensor_id, value, timestamp) FROM STDIN"
+                    ) as copy:
+                        copy.set_types(["integer", "jsonb", "timestamp"])
+                        for row in jsonb_rows:
+                            copy.write_row(row)
+            conn.commit()
+        return {"compact": len(compact_rows), "jsonb": len(jsonb_rows)}
+    except Exception as e:
+        print(f"Error: {e}")
+        import traceback
+        traceback.print_exc()
+        return None
+
+if __name__ == "__main__":
+    import sys
+    from datetime import datetime
+    from conect_db import connect_to_db
+
+    conn_info = connect_to_db()
+    sensor_id = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    print(ingest_readings(conn_info, 'public', [(sensor_id, datetime.now(), {"speed": 42.5})]))
@@ -0,0 +1,137 @@
+SEARCH_TARGETS = {
+    # source: view/table searched; expression: text covered by the pg_trgm GIN index;
+    # where: fixed filter (matches the partial index); order: listing for an empty term
+    "citizen": {
+        "source": "citizen_active",
+        "expression": "(first_name || ' ' || last_name)",
+        "columns": "id, first_name, last_name, cpf",
+        "order": "first_name, last_name",
+    },
+    "vehicle": {
+        "source": "vehicle_active",
+        "expression": "license_plate",
+        "columns": "id, license_plate, model, year",
+        "order": "license_plate",
+    },
+    "incident": {
+        "source": "traffic_incident",
+        "expression": "location",
+        "columns": "id, location, occurred_at, description",
+        "order": "occurred_at DESC",
+    },
+    "sensor": {
+        "source": "sensor_active",
+        "expression": "location",
+        "columns": "id, type, location, active",
+        "order": "location",
+    },
+    # Selectors of the GUI dialogs
+    "allowed_vehicle": {
+        "source": "vehicle_active",
+        "expression": "license_plate",
+        "columns": "id, license_plate, model",
+        "where": "allowed = true",
+        "order": "license_plate",
+    },
+    "active_sensor": {
+        "source": "sensor_active",
+        "expression": "location",
+        "columns": "id, type, location",
+        "where": "active = true",
+        "order": "location",
+    },
+    "open_fine": {
+        "source": "fine_read_model",
+        "expression": "(COALESCE(license_plate, '') || ' ' || COALESCE(first_name, '') || ' ' || COALESCE(last_name, ''))",
+        "columns": (
+            "fine_id AS id, amount, due_date, incident_location AS location, "
+            "license_plate, first_name, last_name"
+        ),
+        "where": "status IN ('pending', 'overdue')",
+        "order": "due_date",
+    },
+    "unfined_incident": {
+        "source": "fine_read_model",
+        "expression": "(COALESCE(license_plate, '') || ' ' || COALESCE(incident_location, ''))",
+        "columns": (
+            "incident_id AS id, incident_location AS location, occurred_at, "
+            "incident_description AS description, license_plate, citizen_id, first_name, last_name"
+        ),
+        "where": "fine_id IS NULL",
+        "order": "occurred_at DESC",
+    },
+}
+# pg_trgm needs at least one full trigram to use the index
+MIN_TRIGRAM_TERM = 3
+
+
+def escape_like(term):
+    """Escape LIKE wildcards so the term is matched literally."""
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def search(cur, target, term, limit=20, schema=None):
+    """
+    Ranked fuzzy search over one of SEARCH_TARGETS.
+
+    Matches substrings (ILIKE) and similar spellings (pg_trgm % operator), both
+    answered by the trigram GIN indexes instead of a table scan. Prefix matches
+    come first, then by similarity. Plates are normalized like the importer
+    ('abc-12' -> 'ABC12'). An empty term lists the first `limit` rows in the
+    target's order. Returns up to `limit` rows with the target columns plus
+    `score`, using the cursor's row factory.
+    """
+    spec = SEARCH_TARGETS[target]
+    prefix = f"{schema}." if schema else ""
+    term = (term or "").strip()
+    expression = spec["expression"]
+    if expression == "license_plate":
+        from import_vehicles import normalize_plate
+        term = normalize_plate(term)
+    where = f"AND {spec['where']}" if spec.get("where") else ""
+
+    if not term:
+        cur.execute(f"""
+            SELECT {spec["columns"]}, 0.0::REAL AS score
+            FROM {prefix}{spec["source"]}
+            WHERE true {where}
+            ORDER BY {spec["order"]}
+            LIMIT %(limit)s
+        """, {"limit": limit})
+        return cur.fetchall()
+
+    # Short terms have no trigram to compare: substring match only
+    fuzzy = f"OR {expression} %% %(term)s" if len(term) >= MIN_TRIGRAM_TERM else ""
+    cur.execute(f"""
+        SELECT {spec["columns"]}, similarity({expression}, %(term)s) AS score
+        FROM {prefix}{spec["source"]}
+        WHERE ({expression} ILIKE %(pattern)s
+           {fuzzy})
+          {where}
+        ORDER BY {expression} ILIKE %(starts_with)s DESC, score DESC, {expression}
+        LIMIT %(limit)s
+    """, {
+        "term": term,
+        "pattern": f"%{escape_like(term)}%",
+        "starts_with": f"{escape_like(term)}%",
+        "limit": limit,
+    })
+    return cur.fetchall()
+
+if __name__ == "__main__":
+    import argparse
+    from query_metrics import connect
+    from conect_db import connect_to_db
+
+    parser = argparse.ArgumentParser(description="Fuzzy search for names, plates and locations")
+    parser.add_argument("target", choices=sorted(SEARCH_TARGETS))
+    parser.add_argument("term")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--schema", default="public")
+    args = parser.parse_args()
+
+    conn_info = connect_to_db()
+    with connect(conn_info) as conn:
+        with conn.cursor() as cur:
+            for row in search(cur, args.target, args.term, args.limit, args.schema):
+                print(*row[:-1], f"(score {row[-1]:.2f})", sep=" | ")
@@ -0,0 +1,26 @@
+"""Script entry point for smartcity/sensor_series.py (print a sensor's downsampled series)."""
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+from smartcity.reading_rollups import READING_COUNT_METRIC
+from smartcity.sensor_series import sensor_metrics, sensor_series
+
+if __name__ == "__main__":
+    from query_metrics import connect
+    from datetime import datetime, timedelta
+    from conect_db import connect_to_db
+
+    conn_info = connect_to_db()
+    sensor_id = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    metric = sys.argv[2] if len(sys.argv) > 2 else READING_COUNT_METRIC
+    end = datetime.now()
+    with connect(conn_info) as conn:
+        with conn.cursor() as cur:
+            series = sensor_series(cur, sensor_id, end - timedelta(days=365), end, metric=metric)
+    print(f"{len(series['t'])} points")
+    for t, count, avg in list(zip(series["t"], series["count"], series["avg"]))[:10]:
+        print(t, count, avg)
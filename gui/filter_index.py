@@ -0,0 +1,195 @@
+"""
+Índice em memória para os filtros das páginas carregadas no cliente.
+
+As chaves normalizadas (nomes em minúsculas, CPF só com dígitos, valores em
+float, datas como ordinais) são calculadas uma única vez por carga e guardadas
+em colunas NumPy. Busca por substring usa um índice de trigramas; os demais
+filtros viram comparações vetorizadas que devolvem máscaras booleanas.
+"""
+import re
+from datetime import datetime
+
+import numpy as np
+
+NGRAM = 3
+
+
+def normalize_text(value):
+    if value is None:
+        return ""
+    text = str(value).lower().strip()
+    return text.replace("\0", "") if "\0" in text else text
+
+
+def normalize_digits(value):
+    if value is None:
+        return ""
+    text = str(value)
+    return text if text.isdigit() else re.sub(r"\D", "", text)
+
+
+def date_key(value):
+    """Chave numérica de date/datetime: ordinal do dia em segundos mais a hora; NaN para None."""
+    if value is None:
+        return np.nan
+    key = value.toordinal() * 86400
+    if isinstance(value, datetime):
+        key += value.hour * 3600 + value.minute * 60 + value.second
+    return float(key)
+
+
+class TextColumn:
+    """
+    Coluna de texto com índice de trigramas.
+
+    Os caracteres são remapeados para um alfabeto compacto (0 separa as linhas),
+    o que permite codificar (trigrama, linha) em um único int64 e montar as
+    postings com uma ordenação simples.
+    """
+
+    def __init__(self, values, normalize):
+        self.normalize = normalize
+        self.values = [normalize(v) for v in values]
+        self._build()
+
+    def _build(self):
+        n = len(self.values)
+        lengths = np.fromiter(map(len, self.values), dtype=np.int64, count=n)
+        self.offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(lengths + 1, out=self.offsets[1:])
+
+        # Linhas separadas por \0, que nunca aparece nos valores normalizados
+        raw = np.frombuffer(("\0".join(self.values) + "\0").encode("utf-32-le"), dtype=np.uint32)
+        chars = np.flatnonzero(np.bincount(raw))
+        self.alphabet = {chr(code): i for i, code in enumerate(chars.tolist())}
+        lut = np.zeros(int(chars[-1]) + 1, dtype=np.int64)
+        lut[chars] = np.arange(len(chars))
+        self.codes = lut[raw].astype(np.uint16 if len(chars) <= 65536 else np.uint32)
+        self.k = len(chars)
+
+        a = lut[raw[:-2]]
+        b = lut[raw[1:-1]]
+        c = lut[raw[2:]]
+        valid = (a != 0) & (b != 0) & (c != 0)
+        rows = np.searchsorted(self.offsets, np.flatnonzero(valid), side="right") - 1
+        keys = ((a[valid] * self.k + b[valid]) * self.k + c[valid]) * n + rows
+        keys.sort()
+        if not len(keys):
+            self.grams = keys
+            self.starts = np.zeros(1, dtype=np.int64)
+            self.rows = np.empty(0, dtype=np.int32)
+            return
+        keys = keys[np.append(True, keys[1:] != keys[:-1])]
+
+        # CSR: grams[i] tem as linhas rows[starts[i]:starts[i + 1]], em ordem crescente
+        grams = keys // n
+        self.rows = (keys % n).astype(np.int32)
+        self.starts = np.append(np.flatnonzero(np.append(True, grams[1:] != grams[:-1])), len(grams))
+        self.grams = grams[self.starts[:-1]]
+
+    def _code(self, text):
+        codes = [self.alphabet.get(ch) for ch in text]
+        return None if None in codes else codes
+
+    def postings(self, codes):
+        gram = (codes[0] * self.k + codes[1]) * self.k + codes[2]
+        i = np.searchsorted(self.grams, gram)
+        if i == len(self.grams) or self.grams[i] != gram:
+            return None
+        return self.rows[self.starts[i]:self.starts[i + 1]]
+
+    def contains(self, needle):
+        """Índices (crescentes) das linhas que contêm needle, já normalizado."""
+        codes = self._code(needle)
+        if codes is None:
+            return np.empty(0, dtype=np.int64)
+
+        if len(codes) < NGRAM:
+            # Uni/bigramas: comparação vetorizada direto sobre o texto concatenado
+            hits = self.codes[: len(self.codes) - len(codes) + 1] == codes[0]
+            for j in range(1, len(codes)):
+                hits &= self.codes[j: len(self.codes) - len(codes) + 1 + j] == codes[j]
+            rows = np.searchsorted(self.offsets, np.flatnonzero(hits), side="right") - 1
+            return rows[np.append(True, rows[1:] != rows[:-1])] if len(rows) else rows
+
+        lists = []
+        for i in range(len(codes) - NGRAM + 1):
+            rows = self.postings(codes[i:i + NGRAM])
+            if rows is None:
+                return np.empty(0, dtype=np.int64)
+            lists.append(rows)
+
+        lists.sort(key=len)
+        candidates = lists[0]
+        for rows in lists[1:]:
+            candidates = np.intersect1d(candidates, rows, assume_unique=True)
+            if not len(candidates):
+                return candidates
+
+        if len(codes) == NGRAM:
+            return candidates
+        # Todos os trigramas presentes não garantem a substring: confirma nos candidatos
+        values = self.values
+        return np.fromiter(
+            (i for i in candidates.tolist() if needle in values[i]), dtype=np.int64
+        )
+
+
+class FilterIndex:
+    """
+    Colunas pré-computadas de uma lista de linhas (dicts) para filtragem vetorizada.
+
+    text/digits: {nome: extrator} indexados por trigramas (contains)
+    numbers: float64 com NaN para None; flags: bool; dates: date_key() (NaN para None);
+    keys: texto para comparação por igualdade. Colunas não textuais são acessadas
+    por index[nome] e combinadas como máscaras NumPy.
+    """
+
+    def __init__(self, rows, text=None, digits=None, numbers=None, flags=None, dates=None, keys=None):
+        self.source = rows
+        self.size = len(rows)
+        self._rows = np.empty(self.size, dtype=object)
+        self._rows[:] = rows
+
+        self.text = {}
+        for name, extract in (text or {}).items():
+            self.text[name] = TextColumn([extract(r) for r in rows], normalize_text)
+        for name, extract in (digits or {}).items():
+            self.text[name] = TextColumn([extract(r) for r in rows], normalize_digits)
+
+        self.columns = {}
+        for name, extract in (numbers or {}).items():
+            self.columns[name] = np.fromiter(
+                (np.nan if v is None else float(v) for v in map(extract, rows)),
+                dtype=np.float64,
+                count=self.size,
+            )
+        for name, extract in (flags or {}).items():
+            self.columns[name] = np.fromiter(
+                (bool(v) for v in map(extract, rows)), dtype=bool, count=self.size
+            )
+        for name, extract in (dates or {}).items():
+            self.columns[name] = np.fromiter(
+                (date_key(v) for v in map(extract, rows)), dtype=np.float64, count=self.size
+            )
+        for name, extract in (keys or {}).items():
+            self.columns[name] = np.array(
+                ["" if v is None else str(v) for v in map(extract, rows)], dtype=str
+            ).reshape(self.size)
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def all(self):
+        return np.ones(self.size, dtype=bool)
+
+    def contains(self, name, needle):
+        column = self.text[name]
+        key = column.normalize(needle)
+        mask = np.zeros(self.size, dtype=bool)
+        if key:
+            mask[column.contains(key)] = True
+        return mask
+
+    def select(self, mask):
+        return self._rows[mask].tolist()
@@ -4,6 +4,7 @@ SmartCityOS GUI - PySide6 (Qt)
 Migração faseada da interface Tkinter para Qt.
 """
 
+import glob
 import json
 import os
 import re
@@ -11,13 +12,14 @@ import sys
 from datetime import datetime, timedelta
 from random import choice
 
-from PySide6.QtCore import Qt, QTimer
-from PySide6.QtGui import QFont, QIcon, QTextCursor
+from PySide6.QtCore import QModelIndex, QPointF, Qt, QThread, QTimer, Signal
+from PySide6.QtGui import QColor, QFont, QIcon, QStandardItem, QStandardItemModel, QTextCursor
 from PySide6.QtWidgets import (
     QApplication,
     QAbstractItemView,
     QCheckBox,
     QComboBox,
+    QCompleter,
     QDialog,
     QFormLayout,
     QFrame,
@@ -33,6 +35,7 @@ from PySide6.QtWidgets import (
     QScrollArea,
     QSizePolicy,
     QStackedWidget,
+    QTabWidget,
     QTableWidget,
     QTableWidgetItem,
     QHeaderView,
@@ -41,6 +44,12 @@ from PySide6.QtWidgets import (
     QWidget,
 )
 
+try:
+    from PySide6.QtCharts import QChart, QChartView, QDateTimeAxis, QLineSeries, QValueAxis
+    HAS_QTCHARTS = True
+except ImportError:
+    HAS_QTCHARTS = False
+
 import psycopg as psy
 from psycopg import sql
 from psycopg.rows import dict_row
@@ -48,6 +57,28 @@ from dotenv import load_dotenv
 
 ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(ROOT_DIR)
+sys.path.append(os.path.join(ROOT_DIR, "functions"))
+
+from gui.filter_index import FilterIndex, date_key
+from smartcity import query_metrics
+from smartcity.backup import restore_commands, split_sql_commands, write_backup
+from smartcity.data import (
+    CitizenRepo,
+    Database,
+    DiagnosticsRepo,
+    FineRepo,
+    IncidentRepo,
+    SensorRepo,
+    StatsRepo,
+    VehicleRepo,
+    declared_indexes,
+)
+
+# Espera após a última tecla antes de refiltrar as tabelas
+FILTER_DEBOUNCE_MS = 150
+# Seletores com busca no servidor: espera entre teclas e número de sugestões
+SEARCH_DEBOUNCE_MS = 200
+SEARCH_LIMIT = 20
 
 
 
@@ -82,6 +113,124 @@ def parse_money_input(value):
     return float(text)
 
 
+class DatabaseListener(QThread):
+    """Thread que escuta LISTEN/NOTIFY do banco e repassa as notificações para a GUI."""
+
+    CHANNELS = ("reading_feed", "incident_feed")
+
+    notified = Signal(str, str)
+    failed = Signal(str)
+
+    def __init__(self, conn_string, parent=None):
+        super().__init__(parent)
+        self.conn_string = conn_string
+        self._running = True
+
+    def stop(self):
+        self._running = False
+        self.wait(3000)
+
+    def run(self):
+        while self._running:
+            try:
+                with query_metrics.connect(self.conn_string, autocommit=True) as conn:
+                    for channel in self.CHANNELS:
+                        conn.execute(sql.SQL("LISTEN {}").format(sql.Identifier(channel)))
+                    while self._running:
+                        # Timeout curto para a thread conseguir encerrar
+                        for notify in conn.notifies(timeout=1.0):
+                            self.notified.emit(notify.channel, notify.payload)
+            except Exception as exc:
+                if not self._running:
+                    break
+                self.failed.emit(str(exc))
+                self.msleep(5000)
+
+
+class SearchSelector(QLineEdit):
+    """
+    Campo com autocompletar que escolhe um registro por busca no servidor.
+
+    Cada digitação (com debounce) consulta search() de functions/search.py e
+    mostra só os SEARCH_LIMIT primeiros resultados, então o diálogo abre na hora
+    qualquer que seja o tamanho da tabela. A seleção é guardada pelo id da linha.
+    """
+
+    selection_changed = Signal(object)
+
+    def __init__(self, app, target, display, placeholder, parent=None):
+        super().__init__(parent)
+        self.app = app
+        self.target = target
+        self.display = display
+        self.rows = {}
+        self.selected = None
+        self.failed = False
+        self.setPlaceholderText(placeholder)
+        self.setClearButtonEnabled(True)
+
+        self.model = QStandardItemModel(self)
+        self.completer = QCompleter(self.model, self)
+        # O servidor já filtrou: o completer mostra os resultados como vieram
+        self.completer.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+        self.completer.setMaxVisibleItems(12)
+        self.completer.activated[QModelIndex].connect(self._on_activated)
+        self.setCompleter(self.completer)
+
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self.search_timer.timeout.connect(self.refresh)
+        self.textEdited.connect(self._on_text_edited)
+
+    def selected_row(self):
+        return self.selected
+
+    def refresh(self):
+        from search import search
+
+        try:
+            with self.app.db.transaction() as cur:
+                rows = search(cur, self.target, self.text(), limit=SEARCH_LIMIT)
+        except Exception as exc:
+            print(f"Search error ({self.target}): {exc!r}", file=sys.stderr)
+            self.model.clear()
+            self.rows = {}
+            # Uma mensagem por sequência de falhas, não uma por tecla digitada
+            if not self.failed:
+                self.failed = True
+                QMessageBox.critical(self, "Erro", f"Erro ao buscar registros: {exc}")
+            return
+
+        self.failed = False
+        self.model.clear()
+        self.rows = {}
+        for row in rows:
+            item = QStandardItem(self.display(row))
+            item.setData(row["id"], Qt.UserRole)
+            self.model.appendRow(item)
+            self.rows[row["id"]] = row
+
+        if rows and self.hasFocus():
+            self.completer.complete()
+
+    def focusInEvent(self, event):
+        super().focusInEvent(event)
+        # Campo vazio: mostra os primeiros registros na ordem natural do alvo
+        if self.selected is None and not self.text():
+            self.search_timer.start()
+
+    def _on_text_edited(self, _text):
+        if self.selected is not None:
+            self.selected = None
+            self.selection_changed.emit(None)
+        self.search_timer.start()
+
+    def _on_activated(self, index):
+        self.selected = self.rows.get(index.data(Qt.UserRole))
+        self.selection_changed.emit(self.selected)
+
+
 class StatCard(QFrame):
     """Card de estatística usado no Dashboard."""
 
@@ -450,40 +599,19 @@ class AddCitizenDialog(QDialog):
 
             wallet_balance = parse_money_input(self.fields["wallet_balance"].text())
 
-            conn_string = self.app.get_connection_string()
-            with psy.connect(conn_string) as conn:
-                with conn.cursor() as cur:
-                    password_hash = password
-
-                    cur.execute(
-                        """
-                        INSERT INTO app_user (username, password_hash)
-                        VALUES (%s, %s) RETURNING id
-                        """,
-                        (username, password_hash),
-                    )
-                    app_user_id = cur.fetchone()[0]
-
-                    cur.execute(
-                        """
-                        INSERT INTO citizen (
-                            app_user_id, first_name, last_name, cpf, birth_date,
-                            email, phone, address, wallet_balance
-                        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-                        """,
-                        (
-                            app_user_id,
-                            first_name,
-                            last_name,
-                            cpf_clean,
-                            birth_date_obj,
-                            email,
-                            phone,
-                            address,
-                            wallet_balance,
-                        ),
-                    )
-                conn.commit()
+            password_hash = password
+            self.app.citizen_repo.create(
+                username,
+                password_hash,
+                first_name,
+                last_name,
+                cpf_clean,
+                birth_date_obj,
+                email,
+                phone,
+                address,
+                wallet_balance,
+            )
 
             QMessageBox.information(self, "Sucesso", "Cidadão adicionado com sucesso!")
             self.accept()
@@ -569,7 +697,9 @@ class AddVehicleDialog(QDialog):
         try:
             username = self.fields["username"].text().strip()
             password = self.fields["password"].text().strip()
-            license_plate = self.fields["license_plate"].text().strip().upper()
+            from import_vehicles import normalize_plate
+
+            license_plate = normalize_plate(self.fields["license_plate"].text())
             model = self.fields["model"].text().strip()
             year_text = self.fields["year"].text().strip()
             citizen_cpf = self.fields["citizen_cpf"].text().strip()
@@ -607,23 +737,14 @@ class AddVehicleDialog(QDialog):
                     QMessageBox.warning(self, "Erro", "CPF inválido! Deve ter 11 dígitos.")
                     return
 
-                conn_string = self.app.get_connection_string()
-                with psy.connect(conn_string) as conn:
-                    with conn.cursor() as cur:
-                        cur.execute(
-                            "SELECT id FROM citizen_active WHERE cpf = %s",
-                            (cpf_clean,),
-                        )
-                        citizen_result = cur.fetchone()
-                        if citizen_result:
-                            citizen_id = citizen_result[0]
-                        else:
-                            QMessageBox.warning(
-                                self,
-                                "Erro",
-                                "CPF não encontrado no sistema! Cadastre o cidadão primeiro.",
-                            )
-                            return
+                citizen_id = self.app.citizen_repo.id_by_cpf(cpf_clean)
+                if not citizen_id:
+                    QMessageBox.warning(
+                        self,
+                        "Erro",
+                        "CPF não encontrado no sistema! Cadastre o cidadão primeiro.",
+                    )
+                    return
 
             if not self.app.is_username_available(username):
                 QMessageBox.warning(
@@ -633,39 +754,10 @@ class AddVehicleDialog(QDialog):
                 )
                 return
 
-            conn_string = self.app.get_connection_string()
-            with psy.connect(conn_string) as conn:
-                with conn.cursor() as cur:
-                    password_hash = password
-
-                    cur.execute(
-                        """
-                        INSERT INTO app_user (username, password_hash)
-                        VALUES (%s, %s) RETURNING id
-                        """,
-                        (username, password_hash),
-                    )
-                    app_user_id = cur.fetchone()[0]
-
-                    cur.execute(
-                        """
-                        INSERT INTO vehicle (
-                            app_user_id, license_plate, model, year, citizen_id
-                        ) VALUES (%s, %s, %s, %s, %s) RETURNING id
-                        """,
-                        (app_user_id, license_plate, model, year, citizen_id),
-                    )
-                    vehicle_id = cur.fetchone()[0]
-
-                    if citizen_id:
-                        cur.execute(
-                            """
-                            INSERT INTO vehicle_citizen (vehicle_id, citizen_id)
-                            VALUES (%s, %s)
-                            """,
-                            (vehicle_id, citizen_id),
-                        )
-                conn.commit()
+            password_hash = password
+            self.app.vehicle_repo.create(
+                username, password_hash, license_plate, model, year, citizen_id
+            )
 
             QMessageBox.information(self, "Sucesso", "Veículo adicionado com sucesso!")
             self.accept()
@@ -772,29 +864,8 @@ class AddSensorDialog(QDialog):
                 )
                 return
 
-            conn_string = self.app.get_connection_string()
-            with psy.connect(conn_string) as conn:
-                with conn.cursor() as cur:
-                    password_hash = password
-
-                    cur.execute(
-                        """
-                        INSERT INTO app_user (username, password_hash)
-                        VALUES (%s, %s) RETURNING id
-                        """,
-                        (username, password_hash),
-                    )
-                    app_user_id = cur.fetchone()[0]
-
-                    cur.execute(
-                        """
-                        INSERT INTO sensor (
-                            app_user_id, model, type, location
-                        ) VALUES (%s, %s, %s, %s)
-                        """,
-                        (app_user_id, model, sensor_type, location),
-                    )
-                conn.commit()
+            password_hash = password
+            self.app.sensor_repo.create(username, password_hash, model, sensor_type, location)
 
             QMessageBox.information(self, "Sucesso", "Sensor adicionado com sucesso!")
             self.accept()
@@ -832,8 +903,20 @@ class AddIncidentDialog(QDialog):
         form_layout.setLabelAlignment(Qt.AlignLeft)
         form_layout.setFormAlignment(Qt.AlignTop)
 
-        self.vehicle_combo = QComboBox(form_widget)
-        self.sensor_combo = QComboBox(form_widget)
+        self.vehicle_selector = SearchSelector(
+            self.app,
+            "allowed_vehicle",
+            lambda v: f"{v['license_plate']} - {v['model']}",
+            "Digite a placa do veículo",
+            form_widget,
+        )
+        self.sensor_selector = SearchSelector(
+            self.app,
+            "active_sensor",
+            lambda s: f"{s['id']} - {s['type']} - {s['location']}",
+            "Digite a localização do sensor",
+            form_widget,
+        )
         self.location_input = QLineEdit(form_widget)
         self.location_input.setPlaceholderText("Ex: Av. Principal, esquina com Rua Secundária")
 
@@ -841,13 +924,8 @@ class AddIncidentDialog(QDialog):
         self.description_input.setPlaceholderText("Descreva o incidente em detalhes")
         self.description_input.setFixedHeight(110)
 
-        self.vehicle_combo.addItem("Selecione o veículo")
-        self.sensor_combo.addItem("Selecione o sensor")
-
-        self._load_dropdowns()
-
-        form_layout.addRow("🚗 Veículo", self.vehicle_combo)
-        form_layout.addRow("📹 Sensor", self.sensor_combo)
+        form_layout.addRow("🚗 Veículo", self.vehicle_selector)
+        form_layout.addRow("📹 Sensor", self.sensor_selector)
         form_layout.addRow("📍 Localização", self.location_input)
         form_layout.addRow("📝 Descrição", self.description_input)
 
@@ -868,43 +946,14 @@ class AddIncidentDialog(QDialog):
         buttons_layout.addWidget(save_btn)
         layout.addLayout(buttons_layout)
 
-    def _load_dropdowns(self):
-        try:
-            conn_string = self.app.get_connection_string()
-            with psy.connect(conn_string) as conn:
-                with conn.cursor() as cur:
-                    cur.execute(
-                        """
-                        SELECT license_plate, model
-                        FROM vehicle_active
-                        WHERE allowed = true
-                        ORDER BY license_plate
-                        """
-                    )
-                    for plate, model in cur.fetchall():
-                        self.vehicle_combo.addItem(f"{plate} - {model}")
-
-                    cur.execute(
-                        """
-                        SELECT id, location, type
-                        FROM sensor_active
-                        WHERE active = true
-                        ORDER BY location
-                        """
-                    )
-                    for sensor_id, location, sensor_type in cur.fetchall():
-                        self.sensor_combo.addItem(f"{sensor_id} - {sensor_type} - {location}")
-        except Exception:
-            pass
-
     def save_incident(self):
         try:
-            vehicle_text = self.vehicle_combo.currentText()
-            sensor_text = self.sensor_combo.currentText()
+            vehicle = self.vehicle_selector.selected_row()
+            sensor = self.sensor_selector.selected_row()
             location = self.location_input.text().strip()
             description = self.description_input.toPlainText().strip()
 
-            if vehicle_text.startswith("Selecione") or sensor_text.startswith("Selecione"):
+            if not vehicle or not sensor:
                 QMessageBox.warning(self, "Erro", "Selecione o veículo e o sensor!")
                 return
 
@@ -916,31 +965,7 @@ class AddIncidentDialog(QDialog):
                 QMessageBox.warning(self, "Erro", "Preencha a descrição do incidente!")
                 return
 
-            vehicle_plate = vehicle_text.split(" - ")[0]
-            sensor_id = int(sensor_text.split(" - ")[0])
-
-            conn_string = self.app.get_connection_string()
-            with psy.connect(conn_string) as conn:
-                with conn.cursor() as cur:
-                    cur.execute(
-                        "SELECT id FROM vehicle_active WHERE license_plate = %s",
-                        (vehicle_plate,),
-                    )
-                    vehicle_result = cur.fetchone()
-                    if not vehicle_result:
-                        QMessageBox.warning(self, "Erro", "Veículo não encontrado!")
-                        return
-                    vehicle_id = vehicle_result[0]
-
-                    cur.execute(
-                        """
-                        INSERT INTO traffic_incident (
-                            vehicle_id, sensor_id, location, description
-                        ) VALUES (%s, %s, %s, %s)
-                        """,
-                        (vehicle_id, sensor_id, location, description),
-                    )
-                conn.commit()
+            self.app.incident_repo.create(vehicle["id"], sensor["id"], location, description)
 
             QMessageBox.information(self, "Sucesso", "Incidente registrado com sucesso!")
             self.accept()
@@ -955,7 +980,6 @@ class PayFineDialog(QDialog):
         super().__init__(parent)
         self.app = app
         self.colors = app.colors
-        self.fines_data = {}
 
         self.setWindowTitle("💳 Pagar Multa")
         self.resize(560, 420)
@@ -979,7 +1003,17 @@ class PayFineDialog(QDialog):
         form_layout.setLabelAlignment(Qt.AlignLeft)
         form_layout.setFormAlignment(Qt.AlignTop)
 
-        self.fine_combo = QComboBox(form_widget)
+        self.fine_selector = SearchSelector(
+            self.app,
+            "open_fine",
+            lambda f: (
+                f"#{f['id']} - {format_currency_brl(f['amount'])} - "
+                f"Venc: {f['due_date'].strftime('%d/%m/%Y') if f['due_date'] else 'N/A'} - "
+                f"{f.get('license_plate') or 'Veículo não identificado'}"
+            ),
+            "Digite a placa ou o nome do cidadão",
+            form_widget,
+        )
         self.amount_input = QLineEdit(form_widget)
         self.amount_input.setReadOnly(True)
 
@@ -996,11 +1030,9 @@ class PayFineDialog(QDialog):
             ]
         )
 
-        self._load_fines()
-
-        self.fine_combo.currentIndexChanged.connect(self._update_amount)
+        self.fine_selector.selection_changed.connect(self._update_amount)
 
-        form_layout.addRow("💰 Multa Pendente", self.fine_combo)
+        form_layout.addRow("💰 Multa Pendente", self.fine_selector)
         form_layout.addRow("💳 Valor a Pagar (R$)", self.amount_input)
         form_layout.addRow("🏦 Método de Pagamento", self.payment_method)
 
@@ -1021,45 +1053,7 @@ class PayFineDialog(QDialog):
         buttons_layout.addWidget(pay_btn)
         layout.addLayout(buttons_layout)
 
-    def _load_fines(self):
-        self.fine_combo.clear()
-        self.fines_data = {}
-        self.fine_combo.addItem("Selecione uma multa")
-
-        try:
-            conn_string = self.app.get_connection_string()
-            with psy.connect(conn_string) as conn:
-                with conn.cursor(row_factory=dict_row) as cur:
-                    cur.execute(
-                        """
-                        SELECT f.id, f.amount, f.due_date, f.created_at,
-                               ti.location, ti.occurred_at,
-                               v.license_plate, c.first_name, c.last_name
-                        FROM fine f
-                        JOIN traffic_incident ti ON f.traffic_incident_id = ti.id
-                        LEFT JOIN vehicle v ON ti.vehicle_id = v.id
-                        LEFT JOIN citizen c ON v.citizen_id = c.id
-                        WHERE f.status = 'pending'
-                        ORDER BY f.due_date ASC
-                        """
-                    )
-                    fines = cur.fetchall()
-
-            for fine in fines:
-                display = (
-                    f"#{fine['id']} - {format_currency_brl(fine['amount'])} - "
-                    f"Venc: {fine['due_date'].strftime('%d/%m/%Y')} - "
-                    f"{fine.get('license_plate') or 'Veículo não identificado'}"
-                )
-                self.fines_data[display] = fine
-                self.fine_combo.addItem(display)
-
-        except Exception:
-            pass
-
-    def _update_amount(self):
-        text = self.fine_combo.currentText()
-        fine = self.fines_data.get(text)
+    def _update_amount(self, fine):
         if fine:
             self.amount_input.setText(format_currency_brl(fine["amount"]).replace("R$ ", ""))
         else:
@@ -1067,8 +1061,7 @@ class PayFineDialog(QDialog):
 
     def pay_fine(self):
         try:
-            fine_text = self.fine_combo.currentText()
-            fine = self.fines_data.get(fine_text)
+            fine = self.fine_selector.selected_row()
             if not fine:
                 QMessageBox.warning(self, "Erro", "Selecione uma multa!")
                 return
@@ -1081,34 +1074,22 @@ class PayFineDialog(QDialog):
             fine_id = fine["id"]
             amount_paid = parse_money_input(self.amount_input.text())
 
-            conn_string = self.app.get_connection_string()
-            with psy.connect(conn_string) as conn:
-                with conn.cursor() as cur:
-                    cur.execute("SELECT status, amount FROM fine WHERE id = %s", (fine_id,))
-                    fine_result = cur.fetchone()
-                    if not fine_result:
-                        QMessageBox.warning(self, "Erro", "Multa não encontrada!")
-                        return
-
-                    status, db_amount = fine_result
-                    if status != "pending":
-                        QMessageBox.warning(self, "Erro", f"Esta multa já está {status}!")
-                        return
-
-                    amount_db = parse_money_input(db_amount)
-                    if abs(amount_paid - amount_db) > 0.01:
-                        QMessageBox.warning(self, "Erro", "Valor da multa não confere!")
-                        return
-
-                    cur.execute(
-                        """
-                        INSERT INTO fine_payment (
-                            fine_id, amount_paid, payment_method
-                        ) VALUES (%s, %s, %s)
-                        """,
-                        (fine_id, amount_paid, payment_method),
-                    )
-                conn.commit()
+            fine_result = self.app.fine_repo.status(fine_id)
+            if not fine_result:
+                QMessageBox.warning(self, "Erro", "Multa não encontrada!")
+                return
+
+            status = fine_result["status"]
+            if status not in ("pending", "overdue"):
+                QMessageBox.warning(self, "Erro", f"Esta multa já está {status}!")
+                return
+
+            amount_db = parse_money_input(fine_result["amount"])
+            if abs(amount_paid - amount_db) > 0.01:
+                QMessageBox.warning(self, "Erro", "Valor da multa não confere!")
+                return
+
+            self.app.fine_repo.pay(fine_id, amount_paid, payment_method)
 
             QMessageBox.information(self, "Sucesso", "Multa paga com sucesso!")
             self.accept()
@@ -1123,7 +1104,6 @@ class GenerateFineDialog(QDialog):
         super().__init__(parent)
         self.app = app
         self.colors = app.colors
-        self.incidents_data = {}
 
         self.setWindowTitle("💰 Gerar Multa")
         self.resize(560, 440)
@@ -1147,15 +1127,23 @@ class GenerateFineDialog(QDialog):
         form_layout.setLabelAlignment(Qt.AlignLeft)
         form_layout.setFormAlignment(Qt.AlignTop)
 
-        self.incident_combo = QComboBox(form_widget)
+        self.incident_selector = SearchSelector(
+            self.app,
+            "unfined_incident",
+            lambda inc: (
+                f"#{inc['id']} - {inc.get('license_plate') or 'Veículo não identificado'} - "
+                f"{inc.get('location') or 'Local não informado'} - "
+                f"{inc['occurred_at'].strftime('%d/%m %H:%M')}"
+            ),
+            "Digite a placa ou a localização do incidente",
+            form_widget,
+        )
         self.amount_input = QLineEdit(form_widget)
         self.amount_input.setPlaceholderText("150.00")
         self.due_date_input = QLineEdit(form_widget)
         self.due_date_input.setPlaceholderText("DD/MM/AAAA")
 
-        self._load_incidents()
-
-        form_layout.addRow("⚠️ Incidente", self.incident_combo)
+        form_layout.addRow("⚠️ Incidente", self.incident_selector)
         form_layout.addRow("💰 Valor (R$)", self.amount_input)
         form_layout.addRow("📅 Data Vencimento", self.due_date_input)
 
@@ -1176,44 +1164,9 @@ class GenerateFineDialog(QDialog):
         buttons_layout.addWidget(save_btn)
         layout.addLayout(buttons_layout)
 
-    def _load_incidents(self):
-        self.incident_combo.clear()
-        self.incidents_data = {}
-        self.incident_combo.addItem("Selecione um incidente")
-
-        try:
-            conn_string = self.app.get_connection_string()
-            with psy.connect(conn_string) as conn:
-                with conn.cursor(row_factory=dict_row) as cur:
-                    cur.execute(
-                        """
-                        SELECT ti.id, ti.location, ti.occurred_at, ti.description,
-                               v.license_plate, c.first_name, c.last_name
-                        FROM traffic_incident ti
-                        LEFT JOIN vehicle v ON ti.vehicle_id = v.id
-                        LEFT JOIN citizen c ON v.citizen_id = c.id
-                        LEFT JOIN fine f ON ti.id = f.traffic_incident_id
-                        WHERE f.id IS NULL
-                        ORDER BY ti.occurred_at DESC
-                        """
-                    )
-                    incidents = cur.fetchall()
-
-            for inc in incidents:
-                display_text = (
-                    f"#{inc['id']} - {inc.get('license_plate') or 'Veículo não identificado'} - "
-                    f"{inc.get('location') or 'Local não informado'} - "
-                    f"{inc['occurred_at'].strftime('%d/%m %H:%M')}"
-                )
-                self.incidents_data[display_text] = inc
-                self.incident_combo.addItem(display_text)
-        except Exception:
-            pass
-
     def save_fine(self):
         try:
-            incident_text = self.incident_combo.currentText()
-            incident = self.incidents_data.get(incident_text)
+            incident = self.incident_selector.selected_row()
             if not incident:
                 QMessageBox.warning(self, "Erro", "Selecione um incidente!")
                 return
@@ -1259,48 +1212,21 @@ class GenerateFineDialog(QDialog):
                 )
                 return
 
-            conn_string = self.app.get_connection_string()
-            with psy.connect(conn_string) as conn:
-                with conn.cursor() as cur:
-                    cur.execute(
-                        "SELECT id FROM fine WHERE traffic_incident_id = %s",
-                        (incident_id,),
-                    )
-                    if cur.fetchone():
-                        QMessageBox.warning(
-                            self, "Erro", "Este incidente já possui uma multa!"
-                        )
-                        return
-
-                    cur.execute(
-                        """
-                        SELECT c.id as citizen_id
-                        FROM traffic_incident ti
-                        JOIN vehicle v ON v.id = ti.vehicle_id
-                        JOIN citizen c ON c.id = v.citizen_id
-                        WHERE ti.id = %s
-                        """,
-                        (incident_id,),
-                    )
-                    citizen_result = cur.fetchone()
-                    if not citizen_result:
-                        QMessageBox.warning(
-                            self,
-                            "Erro",
-                            "Não foi possível encontrar o cidadão associado ao incidente!",
-                        )
-                        return
-                    citizen_id = citizen_result[0]
-
-                    cur.execute(
-                        """
-                        INSERT INTO fine (
-                            traffic_incident_id, citizen_id, amount, due_date
-                        ) VALUES (%s, %s, %s, %s)
-                        """,
-                        (incident_id, citizen_id, amount, due_date),
-                    )
-                conn.commit()
+            if self.app.fine_repo.id_by_incident(incident_id):
+                QMessageBox.warning(self, "Erro", "Este incidente já possui uma multa!")
+                return
+
+            # Dono do veículo, já resolvido no modelo de leitura
+            citizen_id = incident.get("citizen_id")
+            if not citizen_id:
+                QMessageBox.warning(
+                    self,
+                    "Erro",
+                    "Não foi possível encontrar o cidadão associado ao incidente!",
+                )
+                return
+
+            self.app.fine_repo.create(incident_id, citizen_id, amount, due_date)
 
             QMessageBox.information(self, "Sucesso", "Multa gerada com sucesso!")
             self.accept()
@@ -1317,7 +1243,13 @@ class CitizensPage(QWidget):
         self.colors = app.colors
         self.fonts = app.fonts
         self.all_citizens = []
+        self.loaded_at = None
         self.filtered_citizens = []
+        self.filter_index = None
+        self.filter_timer = QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(FILTER_DEBOUNCE_MS)
+        self.filter_timer.timeout.connect(self.apply_filters)
 
         layout = QVBoxLayout(self)
         layout.setContentsMargins(16, 16, 16, 16)
@@ -1338,11 +1270,11 @@ class CitizensPage(QWidget):
 
         self.name_filter = QLineEdit(filters_widget)
         self.name_filter.setPlaceholderText("Nome")
-        self.name_filter.textChanged.connect(self.apply_filters)
+        self.name_filter.textChanged.connect(lambda _: self.filter_timer.start())
 
         self.cpf_filter = QLineEdit(filters_widget)
         self.cpf_filter.setPlaceholderText("CPF")
-        self.cpf_filter.textChanged.connect(self.apply_filters)
+        self.cpf_filter.textChanged.connect(lambda _: self.filter_timer.start())
 
         self.status_filter = QComboBox(filters_widget)
         self.status_filter.addItems(["Todos", "Ativos", "Inativos"])
@@ -1356,6 +1288,10 @@ class CitizensPage(QWidget):
         self.add_button.setObjectName("SuccessButton")
         self.add_button.clicked.connect(self.open_add_dialog)
 
+        self.import_button = QPushButton("📥 Importar", filters_widget)
+        self.import_button.setObjectName("PrimaryButton")
+        self.import_button.clicked.connect(self.import_citizens_csv)
+
         self.refresh_button = QPushButton("🔄 Atualizar", filters_widget)
         self.refresh_button.setObjectName("PrimaryButton")
         self.refresh_button.clicked.connect(self.load_citizens)
@@ -1373,6 +1309,7 @@ class CitizensPage(QWidget):
         filters_layout.addWidget(QLabel("💳 Dívida:", filters_widget))
         filters_layout.addWidget(self.debt_filter)
         filters_layout.addWidget(self.add_button)
+        filters_layout.addWidget(self.import_button)
         filters_layout.addWidget(self.refresh_button)
         filters_layout.addWidget(self.delete_button)
 
@@ -1451,32 +1388,25 @@ class CitizensPage(QWidget):
     def set_connected(self, connected):
         self.message_label.setVisible(not connected)
         self.content_container.setVisible(connected)
+        if not connected:
+            self.loaded_at = None
 
-    def load_citizens(self):
+    def load_citizens(self, full=False):
         if not self.app.connected:
             self.set_connected(False)
             return
 
         try:
-            conn_string = self.app.get_connection_string()
-            with psy.connect(conn_string) as conn:
-                with conn.cursor(row_factory=dict_row) as cur:
-                    cur.execute(
-                        """
-                        SELECT c.id, c.first_name, c.last_name, c.email, c.cpf, c.phone,
-                               c.address, c.birth_date, c.wallet_balance, c.debt, c.allowed,
-                               u.username, c.created_at
-                        FROM citizen_active c
-                        JOIN app_user u ON c.app_user_id = u.id
-                        ORDER BY c.first_name, c.last_name
-                        """
-                    )
-                    self.all_citizens = cur.fetchall()
+            self.all_citizens, self.loaded_at, full_reload = self.app.citizen_repo.load(
+                self.all_citizens, None if full else self.loaded_at
+            )
 
             self.set_connected(True)
             self.update_stats(self.all_citizens)
             self.apply_filters()
-            self.app.status_label.setText("Cidadãos carregados")
+            self.app.status_label.setText(
+                "Cidadãos carregados" if full_reload else "Cidadãos atualizados"
+            )
         except Exception as exc:
             QMessageBox.critical(self, "Erro", f"Erro ao carregar cidadãos: {exc}")
 
@@ -1493,39 +1423,47 @@ class CitizensPage(QWidget):
         self.active_card.update(active_citizens, active_percent)
         self.inactive_card.update(inactive_citizens, format_currency_brl(total_debt))
 
+    def get_filter_index(self):
+        if self.filter_index is None or self.filter_index.source is not self.all_citizens:
+            self.filter_index = FilterIndex(
+                self.all_citizens,
+                text={"name": lambda c: f"{c['first_name'] or ''} {c['last_name'] or ''}"},
+                digits={"cpf": lambda c: c["cpf"]},
+                numbers={"debt": lambda c: c.get("debt")},
+                flags={"allowed": lambda c: c["allowed"]},
+            )
+        return self.filter_index
+
     def apply_filters(self):
         if not self.all_citizens:
             self.update_table([])
             self.update_info_label([])
             return
 
-        filtered = self.all_citizens
+        index = self.get_filter_index()
+        mask = index.all()
 
-        name_filter = self.name_filter.text().lower().strip()
+        name_filter = self.name_filter.text().strip()
         if name_filter:
-            filtered = [
-                c
-                for c in filtered
-                if (c["first_name"] and name_filter in c["first_name"].lower())
-                or (c["last_name"] and name_filter in c["last_name"].lower())
-            ]
+            mask &= index.contains("name", name_filter)
 
         cpf_filter = self.cpf_filter.text().strip()
         if cpf_filter:
-            filtered = [c for c in filtered if c["cpf"] and cpf_filter in c["cpf"]]
+            mask &= index.contains("cpf", cpf_filter)
 
         status_filter = self.status_filter.currentText()
         if status_filter == "Ativos":
-            filtered = [c for c in filtered if c["allowed"]]
+            mask &= index["allowed"]
         elif status_filter == "Inativos":
-            filtered = [c for c in filtered if not c["allowed"]]
+            mask &= ~index["allowed"]
 
         debt_filter = self.debt_filter.currentText()
         if debt_filter == "Com Dívida":
-            filtered = [c for c in filtered if c.get("debt", 0) > 0]
+            mask &= index["debt"] > 0
         elif debt_filter == "Sem Dívida":
-            filtered = [c for c in filtered if c.get("debt", 0) == 0]
+            mask &= index["debt"] == 0
 
+        filtered = index.select(mask)
         self.filtered_citizens = filtered
         self.update_table(filtered)
         self.update_info_label(filtered)
@@ -1584,6 +1522,52 @@ class CitizensPage(QWidget):
         if dialog.exec() == QDialog.Accepted:
             self.load_citizens()
 
+    def import_citizens_csv(self):
+        if not self.app.connected:
+            QMessageBox.warning(self, "Aviso", "Conecte-se ao banco de dados primeiro!")
+            return
+
+        file_path, _ = QFileDialog.getOpenFileName(
+            self,
+            "Importar Cidadãos",
+            os.getcwd(),
+            "Arquivo CSV (*.csv);;Todos os Arquivos (*.*)",
+        )
+        if not file_path:
+            return
+
+        from import_citizens import import_citizens
+
+        def report_progress(done, total):
+            self.app.status_label.setText(f"Importando cidadãos: {done}/{total}")
+            QApplication.processEvents()
+
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            result = import_citizens(
+                self.app.get_connection_string(),
+                file_path,
+                "public",
+                progress=report_progress,
+            )
+        finally:
+            QApplication.restoreOverrideCursor()
+
+        if result is None:
+            QMessageBox.critical(self, "Erro", "Erro ao importar cidadãos! Verifique o arquivo CSV.")
+            return
+
+        message = (
+            f"Linhas lidas: {result['staged']}\n"
+            f"Cidadãos importados: {result['inserted']}\n"
+            f"Linhas rejeitadas: {result['rejected']}"
+        )
+        if result["reject_path"]:
+            message += f"\n\nRejeitadas salvas em:\n{result['reject_path']}"
+        QMessageBox.information(self, "Importação Concluída", message)
+        self.app.status_label.setText("Importação de cidadãos concluída")
+        self.load_citizens()
+
     def delete_selected(self):
         if not self.app.connected:
             QMessageBox.warning(self, "Aviso", "Conecte-se ao banco de dados primeiro!")
@@ -1608,24 +1592,16 @@ class CitizensPage(QWidget):
             return
 
         try:
-            conn_string = self.app.get_connection_string()
-            with psy.connect(conn_string) as conn:
-                with conn.cursor() as cur:
-                    cur.execute(
-                        "SELECT COUNT(*) FROM fine WHERE citizen_id = %s AND status = 'pending'",
-                        (citizen_id,),
-                    )
-                    pending_fines = cur.fetchone()[0]
-                    if pending_fines > 0:
-                        QMessageBox.critical(
-                            self,
-                            "Erro",
-                            f"Não é possível excluir cidadão com {pending_fines} multa(s) pendente(s)!",
-                        )
-                        return
+            pending_fines = self.app.citizen_repo.open_fine_count(citizen_id)
+            if pending_fines > 0:
+                QMessageBox.critical(
+                    self,
+                    "Erro",
+                    f"Não é possível excluir cidadão com {pending_fines} multa(s) pendente(s)!",
+                )
+                return
 
-                    cur.execute("DELETE FROM citizen WHERE id = %s", (citizen_id,))
-                conn.commit()
+            self.app.citizen_repo.delete(citizen_id)
 
             QMessageBox.information(
                 self, "Sucesso", f"Cidadão {citizen_name} excluído com sucesso!"
@@ -1644,7 +1620,13 @@ class VehiclesPage(QWidget):
         self.colors = app.colors
         self.fonts = app.fonts
         self.all_vehicles = []
+        self.loaded_at = None
         self.filtered_vehicles = []
+        self.filter_index = None
+        self.filter_timer = QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(FILTER_DEBOUNCE_MS)
+        self.filter_timer.timeout.connect(self.apply_filters)
 
         layout = QVBoxLayout(self)
         layout.setContentsMargins(16, 16, 16, 16)
@@ -1665,15 +1647,15 @@ class VehiclesPage(QWidget):
 
         self.plate_filter = QLineEdit(filters_widget)
         self.plate_filter.setPlaceholderText("Placa")
-        self.plate_filter.textChanged.connect(self.apply_filters)
+        self.plate_filter.textChanged.connect(lambda _: self.filter_timer.start())
 
         self.model_filter = QLineEdit(filters_widget)
         self.model_filter.setPlaceholderText("Modelo")
-        self.model_filter.textChanged.connect(self.apply_filters)
+        self.model_filter.textChanged.connect(lambda _: self.filter_timer.start())
 
         self.year_filter = QLineEdit(filters_widget)
         self.year_filter.setPlaceholderText("Ano")
-        self.year_filter.textChanged.connect(self.apply_filters)
+        self.year_filter.textChanged.connect(lambda _: self.filter_timer.start())
 
         self.status_filter = QComboBox(filters_widget)
         self.status_filter.addItems(["Todos", "Ativos", "Inativos"])
@@ -1767,32 +1749,25 @@ class VehiclesPage(QWidget):
     def set_connected(self, connected):
         self.message_label.setVisible(not connected)
         self.content_container.setVisible(connected)
+        if not connected:
+            self.loaded_at = None
 
-    def load_vehicles(self):
+    def load_vehicles(self, full=False):
         if not self.app.connected:
             self.set_connected(False)
             return
 
         try:
-            conn_string = self.app.get_connection_string()
-            with psy.connect(conn_string) as conn:
-                with conn.cursor(row_factory=dict_row) as cur:
-                    cur.execute(
-                        """
-                        SELECT v.id, v.license_plate, v.model, v.year, v.allowed,
-                               u.username, c.first_name, c.last_name
-                        FROM vehicle_active v
-                        JOIN app_user u ON v.app_user_id = u.id
-                        LEFT JOIN citizen_active c ON v.citizen_id = c.id
-                        ORDER BY v.license_plate
-                        """
-                    )
-                    self.all_vehicles = cur.fetchall()
+            self.all_vehicles, self.loaded_at, full_reload = self.app.vehicle_repo.load(
+                self.all_vehicles, None if full else self.loaded_at
+            )
 
             self.set_connected(True)
             self.update_stats(self.all_vehicles)
             self.apply_filters()
-            self.app.status_label.setText("Veículos carregados")
+            self.app.status_label.setText(
+                "Veículos carregados" if full_reload else "Veículos atualizados"
+            )
         except Exception as exc:
             QMessageBox.critical(self, "Erro", f"Erro ao carregar veículos: {exc}")
 
@@ -1808,45 +1783,47 @@ class VehiclesPage(QWidget):
         self.active_card.update(active, active_percent)
         self.inactive_card.update(inactive, inactive_percent)
 
+    def get_filter_index(self):
+        if self.filter_index is None or self.filter_index.source is not self.all_vehicles:
+            self.filter_index = FilterIndex(
+                self.all_vehicles,
+                text={
+                    "plate": lambda v: v["license_plate"],
+                    "model": lambda v: v["model"],
+                    "year": lambda v: v["year"],
+                },
+                flags={"allowed": lambda v: v["allowed"]},
+            )
+        return self.filter_index
+
     def apply_filters(self):
         if not self.all_vehicles:
             self.update_table([])
             self.update_info_label([])
             return
 
-        filtered = self.all_vehicles
+        index = self.get_filter_index()
+        mask = index.all()
 
-        plate_filter = self.plate_filter.text().upper().strip()
+        plate_filter = self.plate_filter.text().strip()
         if plate_filter:
-            filtered = [
-                v
-                for v in filtered
-                if v["license_plate"]
-                and plate_filter in v["license_plate"].upper()
-            ]
+            mask &= index.contains("plate", plate_filter)
 
-        model_filter = self.model_filter.text().lower().strip()
+        model_filter = self.model_filter.text().strip()
         if model_filter:
-            filtered = [
-                v
-                for v in filtered
-                if v["model"] and model_filter in v["model"].lower()
-            ]
+            mask &= index.contains("model", model_filter)
 
         year_filter = self.year_filter.text().strip()
         if year_filter:
-            filtered = [
-                v
-                for v in filtered
-                if v["year"] and year_filter in str(v["year"])
-            ]
+            mask &= index.contains("year", year_filter)
 
         status_filter = self.status_filter.currentText()
         if status_filter == "Ativos":
-            filtered = [v for v in filtered if v["allowed"]]
+            mask &= index["allowed"]
         elif status_filter == "Inativos":
-            filtered = [v for v in filtered if not v["allowed"]]
+            mask &= ~index["allowed"]
 
+        filtered = index.select(mask)
         self.filtered_vehicles = filtered
         self.update_table(filtered)
         self.update_info_label(filtered)
@@ -1930,11 +1907,7 @@ class VehiclesPage(QWidget):
             return
 
         try:
-            conn_string = self.app.get_connection_string()
-            with psy.connect(conn_string) as conn:
-                with conn.cursor() as cur:
-                    cur.execute("DELETE FROM vehicle WHERE id = %s", (vehicle_id,))
-                conn.commit()
+            self.app.vehicle_repo.delete(vehicle_id)
 
             QMessageBox.information(
                 self,
@@ -1949,13 +1922,22 @@ class VehiclesPage(QWidget):
 class SensorsPage(QWidget):
     """Página de Gestão de Sensores."""
 
+    CHART_PERIODS = {
+        "Últimas 24h": timedelta(days=1),
+        "Últimos 7 dias": timedelta(days=7),
+        "Últimos 30 dias": timedelta(days=30),
+        "Último ano": timedelta(days=365),
+    }
+
     def __init__(self, app, parent=None):
         super().__init__(parent)
         self.app = app
         self.colors = app.colors
         self.fonts = app.fonts
         self.all_sensors = []
+        self.loaded_at = None
         self.filtered_sensors = []
+        self.chart_sensor_id = None
 
         layout = QVBoxLayout(self)
         layout.setContentsMargins(16, 16, 16, 16)
@@ -2065,9 +2047,41 @@ class SensorsPage(QWidget):
         info_layout.addWidget(self.info_label)
         info_layout.addStretch(1)
 
+        self.chart_group = QGroupBox("📈 Série Temporal", self.content_container)
+        chart_layout = QVBoxLayout(self.chart_group)
+
+        chart_controls = QHBoxLayout()
+        self.chart_metric = QComboBox(self.chart_group)
+        self.chart_metric.currentIndexChanged.connect(self.load_chart)
+        self.chart_period = QComboBox(self.chart_group)
+        self.chart_period.addItems(list(self.CHART_PERIODS))
+        self.chart_period.setCurrentText("Últimos 7 dias")
+        self.chart_period.currentIndexChanged.connect(self.load_chart)
+        chart_controls.addWidget(QLabel("Métrica:", self.chart_group))
+        chart_controls.addWidget(self.chart_metric)
+        chart_controls.addWidget(QLabel("Período:", self.chart_group))
+        chart_controls.addWidget(self.chart_period)
+        chart_controls.addStretch(1)
+        chart_layout.addLayout(chart_controls)
+
+        if HAS_QTCHARTS:
+            self.chart = QChart()
+            self.chart.legend().hide()
+            self.chart.setTitle("Selecione um sensor na tabela")
+            self.chart_view = QChartView(self.chart, self.chart_group)
+            self.chart_view.setMinimumHeight(220)
+            chart_layout.addWidget(self.chart_view)
+        else:
+            unavailable = QLabel("QtCharts não está disponível nesta instalação do PySide6.", self.chart_group)
+            unavailable.setStyleSheet("color: #696969; font-size: 11px;")
+            chart_layout.addWidget(unavailable)
+
+        self.table.itemSelectionChanged.connect(self.on_sensor_selected)
+
         content_layout.addWidget(stats_frame)
         content_layout.addWidget(self.table, 1)
         content_layout.addWidget(info_frame)
+        content_layout.addWidget(self.chart_group)
 
         layout.addWidget(header)
         layout.addWidget(self.message_label)
@@ -2078,36 +2092,46 @@ class SensorsPage(QWidget):
     def set_connected(self, connected):
         self.message_label.setVisible(not connected)
         self.content_container.setVisible(connected)
+        if not connected:
+            self.loaded_at = None
 
-    def load_sensors(self):
+    def load_sensors(self, full=False):
         if not self.app.connected:
             self.set_connected(False)
             return
 
         try:
-            conn_string = self.app.get_connection_string()
-            with psy.connect(conn_string) as conn:
-                with conn.cursor(row_factory=dict_row) as cur:
-                    cur.execute(
-                        """
-                        SELECT s.id, s.type, s.location, s.active,
-                               COUNT(r.id) as reading_count,
-                               MAX(r.timestamp) as last_reading
-                        FROM sensor_active s
-                        LEFT JOIN reading r ON s.id = r.sensor_id
-                        GROUP BY s.id, s.type, s.location, s.active
-                        ORDER BY s.type, s.location
-                        """
-                    )
-                    self.all_sensors = cur.fetchall()
+            self.all_sensors, self.loaded_at, full_reload = self.app.sensor_repo.load(
+                self.all_sensors, None if full else self.loaded_at
+            )
 
             self.set_connected(True)
             self.update_stats(self.all_sensors)
             self.apply_filters()
-            self.app.status_label.setText("Sensores carregados")
+            self.app.status_label.setText(
+                "Sensores carregados" if full_reload else "Sensores atualizados"
+            )
         except Exception as exc:
             QMessageBox.critical(self, "Erro", f"Erro ao carregar sensores: {exc}")
 
+    def apply_sensor_deltas(self, sensor_ids):
+        """Atualiza apenas os sensores notificados, sem recarregar a página inteira."""
+        # loaded_at é None enquanto a página não foi carregada (uma página vazia já tem watermark)
+        if not self.app.connected or self.loaded_at is None or not sensor_ids:
+            return
+
+        try:
+            updated = {row["id"]: row for row in self.app.sensor_repo.by_ids(sensor_ids)}
+        except Exception as exc:
+            self.app.status_label.setText(f"Erro ao atualizar sensores: {exc}")
+            return
+
+        if not updated:
+            return
+        self.all_sensors = [updated.pop(s["id"], s) for s in self.all_sensors] + list(updated.values())
+        self.update_stats(self.all_sensors)
+        self.apply_filters()
+
     def update_stats(self, sensors):
         total = len(sensors)
         active = len([s for s in sensors if s["active"]]) if sensors else 0
@@ -2216,6 +2240,85 @@ class SensorsPage(QWidget):
         if dialog.exec() == QDialog.Accepted:
             self.load_sensors()
 
+    def on_sensor_selected(self):
+        selection = self.table.selectionModel().selectedRows()
+        if not selection or not self.app.connected:
+            return
+
+        sensor_id = int(self.table.item(selection[0].row(), 0).text())
+        if sensor_id == self.chart_sensor_id:
+            return
+        self.chart_sensor_id = sensor_id
+
+        try:
+            metrics = self.app.sensor_repo.metrics(sensor_id)
+        except Exception as exc:
+            QMessageBox.critical(self, "Erro", f"Erro ao carregar métricas do sensor: {exc}")
+            return
+
+        self.chart_metric.blockSignals(True)
+        self.chart_metric.clear()
+        self.chart_metric.addItem("Leituras (contagem)", "*")
+        for metric in metrics:
+            self.chart_metric.addItem(metric, metric)
+        self.chart_metric.setCurrentIndex(1 if metrics else 0)
+        self.chart_metric.blockSignals(False)
+        self.load_chart()
+
+    def load_chart(self):
+        if not HAS_QTCHARTS or self.chart_sensor_id is None or not self.app.connected:
+            return
+
+        import numpy as np
+
+        metric = self.chart_metric.currentData() or "*"
+        end = datetime.now()
+        start = end - self.CHART_PERIODS[self.chart_period.currentText()]
+
+        try:
+            series = self.app.sensor_repo.series(
+                self.chart_sensor_id,
+                start,
+                end,
+                metric=metric,
+                points=max(self.chart_view.width(), 200),
+            )
+        except Exception as exc:
+            QMessageBox.critical(self, "Erro", f"Erro ao carregar série do sensor: {exc}")
+            return
+
+        values = series["count"].astype(np.float64) if metric == "*" else series["avg"]
+        # Timestamps do banco são horário local; o eixo espera ms desde a época (UTC)
+        offset_ms = int(datetime.now().astimezone().utcoffset().total_seconds() * 1000)
+        x = series["t"].astype(np.int64) - offset_ms
+        valid = ~np.isnan(values)
+
+        line = QLineSeries()
+        line.append([QPointF(float(xi), float(yi)) for xi, yi in zip(x[valid], values[valid])])
+
+        self.chart.removeAllSeries()
+        for axis in self.chart.axes():
+            self.chart.removeAxis(axis)
+        self.chart.addSeries(line)
+
+        axis_x = QDateTimeAxis()
+        axis_x.setFormat("dd/MM HH:mm")
+        axis_x.setRange(start, end)
+        self.chart.addAxis(axis_x, Qt.AlignBottom)
+        line.attachAxis(axis_x)
+
+        axis_y = QValueAxis()
+        if valid.any():
+            low, high = float(values[valid].min()), float(values[valid].max())
+            margin = (high - low) * 0.05 or 1.0
+            axis_y.setRange(low - margin, high + margin)
+        self.chart.addAxis(axis_y, Qt.AlignLeft)
+        line.attachAxis(axis_y)
+
+        self.chart.setTitle(
+            f"Sensor {self.chart_sensor_id} - {self.chart_metric.currentText()} ({int(valid.sum())} pontos)"
+        )
+
     def delete_selected(self):
         if not self.app.connected:
             QMessageBox.warning(self, "Aviso", "Conecte-se ao banco de dados primeiro!")
@@ -2241,11 +2344,7 @@ class SensorsPage(QWidget):
             return
 
         try:
-            conn_string = self.app.get_connection_string()
-            with psy.connect(conn_string) as conn:
-                with conn.cursor() as cur:
-                    cur.execute("DELETE FROM sensor WHERE id = %s", (sensor_id,))
-                conn.commit()
+            self.app.sensor_repo.delete(sensor_id)
 
             QMessageBox.information(
                 self,
@@ -2266,6 +2365,7 @@ class IncidentsPage(QWidget):
         self.colors = app.colors
         self.fonts = app.fonts
         self.all_incidents = []
+        self.loaded_at = None
         self.filtered_incidents = []
 
         layout = QVBoxLayout(self)
@@ -2384,36 +2484,52 @@ class IncidentsPage(QWidget):
     def set_connected(self, connected):
         self.message_label.setVisible(not connected)
         self.content_container.setVisible(connected)
+        if not connected:
+            self.loaded_at = None
 
-    def load_incidents(self):
+    def load_incidents(self, full=False):
         if not self.app.connected:
             self.set_connected(False)
             return
 
         try:
-            conn_string = self.app.get_connection_string()
-            with psy.connect(conn_string) as conn:
-                with conn.cursor(row_factory=dict_row) as cur:
-                    cur.execute(
-                        """
-                        SELECT ti.id, ti.location, ti.occurred_at, ti.description,
-                               COUNT(f.id) as fine_count,
-                               COALESCE(SUM(f.amount), 0) as total_fines
-                        FROM traffic_incident ti
-                        LEFT JOIN fine f ON ti.id = f.traffic_incident_id
-                        GROUP BY ti.id, ti.location, ti.occurred_at, ti.description
-                        ORDER BY ti.occurred_at DESC
-                        """
-                    )
-                    self.all_incidents = cur.fetchall()
+            self.all_incidents, self.loaded_at, full_reload = self.app.incident_repo.load(
+                self.all_incidents, None if full else self.loaded_at
+            )
 
             self.set_connected(True)
             self.update_stats(self.all_incidents)
             self.apply_filters()
-            self.app.status_label.setText("Incidentes carregados")
+            self.app.status_label.setText(
+                "Incidentes carregados" if full_reload else "Incidentes atualizados"
+            )
         except Exception as exc:
             QMessageBox.critical(self, "Erro", f"Erro ao carregar incidentes: {exc}")
 
+    def apply_incident_deltas(self, incident_ids):
+        """Aplica inserções, alterações e remoções de incidentes notificadas pelo banco."""
+        # loaded_at é None enquanto a página não foi carregada (uma página vazia já tem watermark)
+        if not self.app.connected or self.loaded_at is None or not incident_ids:
+            return
+
+        try:
+            updated = {row["id"]: row for row in self.app.incident_repo.by_ids(incident_ids)}
+        except Exception as exc:
+            self.app.status_label.setText(f"Erro ao atualizar incidentes: {exc}")
+            return
+
+        # IDs notificados que não voltaram na consulta foram removidos
+        merged = [
+            updated.pop(i["id"], i)
+            for i in self.all_incidents
+            if i["id"] not in incident_ids or i["id"] in updated
+        ]
+        merged.extend(updated.values())
+        merged.sort(key=lambda i: i["occurred_at"] or datetime.min, reverse=True)
+        self.all_incidents = merged
+        self.update_stats(self.all_incidents)
+        self.apply_filters()
+
     def update_stats(self, incidents):
         total = len(incidents)
         week_ago = datetime.now() - timedelta(days=7)
@@ -2561,7 +2677,13 @@ class FinesPage(QWidget):
         self.app = app
         self.colors = app.colors
         self.all_fines = []
+        self.loaded_at = None
         self.filtered_fines = []
+        self.filter_index = None
+        self.filter_timer = QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(FILTER_DEBOUNCE_MS)
+        self.filter_timer.timeout.connect(self.apply_filters)
 
         layout = QVBoxLayout(self)
         layout.setContentsMargins(16, 16, 16, 16)
@@ -2586,11 +2708,11 @@ class FinesPage(QWidget):
 
         self.amount_filter = QLineEdit(controls_widget)
         self.amount_filter.setPlaceholderText("Valor mínimo")
-        self.amount_filter.textChanged.connect(self.apply_filters)
+        self.amount_filter.textChanged.connect(lambda _: self.filter_timer.start())
 
         self.plate_filter = QLineEdit(controls_widget)
         self.plate_filter.setPlaceholderText("Placa")
-        self.plate_filter.textChanged.connect(self.apply_filters)
+        self.plate_filter.textChanged.connect(lambda _: self.filter_timer.start())
 
         self.period_filter = QComboBox(controls_widget)
         self.period_filter.addItems(["Todos", "Hoje", "Esta Semana", "Este Mês", "Vencidas"])
@@ -2691,35 +2813,25 @@ class FinesPage(QWidget):
     def set_connected(self, connected):
         self.message_label.setVisible(not connected)
         self.content_container.setVisible(connected)
+        if not connected:
+            self.loaded_at = None
 
-    def load_fines(self):
+    def load_fines(self, full=False):
         if not self.app.connected:
             self.set_connected(False)
             return
 
         try:
-            conn_string = self.app.get_connection_string()
-            with psy.connect(conn_string) as conn:
-                with conn.cursor(row_factory=dict_row) as cur:
-                    cur.execute(
-                        """
-                        SELECT f.id, f.amount, f.status, f.created_at, f.due_date,
-                               ti.location as incident_location, ti.description as incident_description,
-                               v.license_plate,
-                               c.first_name, c.last_name
-                        FROM fine f
-                        LEFT JOIN traffic_incident ti ON f.traffic_incident_id = ti.id
-                        LEFT JOIN vehicle v ON ti.vehicle_id = v.id
-                        LEFT JOIN citizen c ON f.citizen_id = c.id
-                        ORDER BY f.created_at DESC
-                        """
-                    )
-                    self.all_fines = cur.fetchall()
+            self.all_fines, self.loaded_at, full_reload = self.app.fine_repo.load(
+                self.all_fines, None if full else self.loaded_at
+            )
 
             self.set_connected(True)
             self.update_stats(self.all_fines)
             self.apply_filters()
-            self.app.status_label.setText("Multas carregadas")
+            self.app.status_label.setText(
+                "Multas carregadas" if full_reload else "Multas atualizadas"
+            )
         except Exception as exc:
             QMessageBox.critical(self, "Erro", f"Erro ao carregar multas: {exc}")
 
@@ -2744,80 +2856,62 @@ class FinesPage(QWidget):
         self.overdue_card.update(overdue_fines, format_currency_brl(overdue_amount))
         self.paid_card.update(paid_fines, paid_percent)
 
+    def get_filter_index(self):
+        if self.filter_index is None or self.filter_index.source is not self.all_fines:
+            self.filter_index = FilterIndex(
+                self.all_fines,
+                text={"plate": lambda f: f.get("license_plate")},
+                numbers={"amount": lambda f: f["amount"]},
+                dates={
+                    "created_at": lambda f: f["created_at"],
+                    "due_date": lambda f: f["due_date"],
+                },
+                keys={"status": lambda f: f["status"]},
+            )
+        return self.filter_index
+
     def apply_filters(self):
         if not self.all_fines:
             self.update_table([])
             self.update_info_label([])
             return
 
-        filtered = self.all_fines
+        index = self.get_filter_index()
+        mask = index.all()
+        now = datetime.now()
+        overdue = index["status"] == "overdue"
 
         status_filter = self.status_filter.currentText()
         if status_filter == "Pendentes":
-            filtered = [f for f in filtered if f["status"] == "pending"]
+            mask &= index["status"] == "pending"
         elif status_filter == "Pagas":
-            filtered = [f for f in filtered if f["status"] == "paid"]
+            mask &= index["status"] == "paid"
         elif status_filter == "Vencidas":
-            now_date = datetime.now().date()
-            filtered = [
-                f
-                for f in filtered
-                if f["due_date"] and f["due_date"] < now_date and f["status"] != "paid"
-            ]
+            mask &= overdue
 
         amount_filter = self.amount_filter.text().strip()
         if amount_filter:
             try:
                 min_amount = parse_money_input(amount_filter)
-                filtered = [
-                    f
-                    for f in filtered
-                    if f["amount"] and float(f["amount"]) >= min_amount
-                ]
+                mask &= (index["amount"] != 0) & (index["amount"] >= min_amount)
             except ValueError:
                 pass
 
-        plate_filter = self.plate_filter.text().upper().strip()
+        plate_filter = self.plate_filter.text().strip()
         if plate_filter:
-            filtered = [
-                f
-                for f in filtered
-                if f.get("license_plate")
-                and plate_filter in f["license_plate"].upper()
-            ]
+            mask &= index.contains("plate", plate_filter)
 
         period_filter = self.period_filter.currentText()
-        if period_filter != "Todos":
-            now = datetime.now()
-            if period_filter == "Hoje":
-                start_date = now.replace(hour=0, minute=0, second=0, microsecond=0)
-                filtered = [
-                    f
-                    for f in filtered
-                    if f["created_at"] and f["created_at"].date() >= start_date.date()
-                ]
-            elif period_filter == "Esta Semana":
-                start_date = now - timedelta(days=7)
-                filtered = [
-                    f
-                    for f in filtered
-                    if f["created_at"] and f["created_at"] >= start_date
-                ]
-            elif period_filter == "Este Mês":
-                start_date = now - timedelta(days=30)
-                filtered = [
-                    f
-                    for f in filtered
-                    if f["created_at"] and f["created_at"] >= start_date
-                ]
-            elif period_filter == "Vencidas":
-                now_date = now.date()
-                filtered = [
-                    f
-                    for f in filtered
-                    if f["due_date"] and f["due_date"] < now_date and f["status"] != "paid"
-                ]
-
+        if period_filter == "Hoje":
+            mask &= index["created_at"] >= date_key(now.date())
+        elif period_filter == "Esta Semana":
+            mask &= index["created_at"] >= date_key(now - timedelta(days=7))
+        elif period_filter == "Este Mês":
+            mask &= index["created_at"] >= date_key(now - timedelta(days=30))
+        elif period_filter == "Vencidas":
+            mask &= overdue
+
+        filtered = index.select(mask)
         self.filtered_fines = filtered
         self.update_table(filtered)
         self.update_info_label(filtered)
@@ -2934,24 +3028,16 @@ class FinesPage(QWidget):
             return
 
         try:
-            conn_string = self.app.get_connection_string()
-            with psy.connect(conn_string) as conn:
-                with conn.cursor() as cur:
-                    cur.execute(
-                        "SELECT COUNT(*) FROM fine_payment WHERE fine_id = %s",
-                        (fine_id,),
-                    )
-                    payments = cur.fetchone()[0]
-                    if payments > 0:
-                        QMessageBox.warning(
-                            self,
-                            "Erro",
-                            f"Não é possível excluir multa com {payments} pagamento(s) registrado(s)!",
-                        )
-                        return
+            payments = self.app.fine_repo.payment_count(fine_id)
+            if payments > 0:
+                QMessageBox.warning(
+                    self,
+                    "Erro",
+                    f"Não é possível excluir multa com {payments} pagamento(s) registrado(s)!",
+                )
+                return
 
-                    cur.execute("DELETE FROM fine WHERE id = %s", (fine_id,))
-                conn.commit()
+            self.app.fine_repo.delete(fine_id)
 
             QMessageBox.information(
                 self, "Sucesso", f"Multa ID: {fine_id} excluída com sucesso!"
@@ -3161,10 +3247,7 @@ class StatisticsPage(QWidget):
             return
 
         try:
-            conn_string = self.app.get_connection_string()
-            with psy.connect(conn_string) as conn:
-                with conn.cursor(row_factory=dict_row) as cur:
-                    stats = self._load_stats(cur)
+            stats = self.app.stats_repo.statistics()
 
             self.current_stats = stats
             self.set_connected(True)
@@ -3177,194 +3260,6 @@ class StatisticsPage(QWidget):
                 f"Erro ao carregar estatísticas: {exc}",
             )
 
-    def _load_stats(self, cur):
-        stats = {}
-
-        try:
-            cur.execute(
-                """
-                SELECT COUNT(*) as total,
-                       COUNT(CASE WHEN created_at >= CURRENT_DATE - INTERVAL '30 days' THEN 1 END) as this_month,
-                       COUNT(CASE WHEN created_at >= CURRENT_DATE - INTERVAL '7 days' THEN 1 END) as this_week
-                FROM app_user_active
-                """
-            )
-            stats["users"] = cur.fetchone()
-        except Exception:
-            stats["users"] = {"total": 0, "this_month": 0, "this_week": 0}
-
-        try:
-            cur.execute(
-                """
-                SELECT COUNT(*) as total,
-                       COUNT(CASE WHEN debt > 0 THEN 1 END) as with_debt,
-                       COUNT(CASE WHEN allowed = TRUE THEN 1 END) as with_access,
-                       COALESCE(SUM(debt), 0) as total_debt,
-                       COALESCE(AVG(debt), 0) as avg_debt
-                FROM citizen_active
-                """
-            )
-            stats["citizens"] = cur.fetchone()
-        except Exception:
-            stats["citizens"] = {
-                "total": 0,
-                "with_debt": 0,
-                "with_access": 0,
-                "total_debt": 0,
-                "avg_debt": 0,
-            }
-
-        try:
-            cur.execute(
-                """
-                SELECT COUNT(*) as total,
-                       COUNT(CASE WHEN allowed = TRUE THEN 1 END) as active,
-                       COUNT(CASE WHEN allowed = FALSE THEN 1 END) as blocked,
-                       COUNT(DISTINCT citizen_id) as unique_owners
-                FROM vehicle_active
-                """
-            )
-            stats["vehicles"] = cur.fetchone()
-        except Exception:
-            stats["vehicles"] = {
-                "total": 0,
-                "active": 0,
-                "blocked": 0,
-                "unique_owners": 0,
-            }
-
-        try:
-            cur.execute(
-                """
-                SELECT type, COUNT(*) as count,
-                       COUNT(CASE WHEN active = TRUE THEN 1 END) as active
-                FROM sensor_active
-                GROUP BY type
-                ORDER BY count DESC
-                """
-            )
-            stats["sensors_by_type"] = cur.fetchall()
-
-            cur.execute(
-                """
-                SELECT COUNT(*) as total_sensors,
-                       COUNT(CASE WHEN active = TRUE THEN 1 END) as active_sensors,
-                       COUNT(DISTINCT type) as sensor_types
-                FROM sensor_active
-                """
-            )
-            stats["sensors"] = cur.fetchone()
-        except Exception:
-            stats["sensors_by_type"] = []
-            stats["sensors"] = {
-                "total_sensors": 0,
-                "active_sensors": 0,
-                "sensor_types": 0,
-            }
-
-        try:
-            cur.execute(
-                """
-                SELECT COUNT(*) as count,
-                       COUNT(CASE WHEN ti.occurred_at >= CURRENT_DATE - INTERVAL '30 days' THEN 1 END) as last_30_days,
-                       COUNT(CASE WHEN ti.occurred_at >= CURRENT_DATE - INTERVAL '7 days' THEN 1 END) as last_7_days,
-                       COALESCE(SUM(f.amount), 0) as total_fines
-                FROM traffic_incident ti
-                LEFT JOIN fine f ON ti.id = f.traffic_incident_id
-                """
-            )
-            incident_summary = cur.fetchone()
-
-            cur.execute(
-                """
-                SELECT ti.location, COUNT(*) as count,
-                       COUNT(f.id) as fine_count,
-                       COALESCE(AVG(f.amount), 0) as avg_fine
-                FROM traffic_incident ti
-                LEFT JOIN fine f ON ti.id = f.traffic_incident_id
-                GROUP BY ti.location
-                ORDER BY count DESC
-                """
-            )
-            stats["incidents_by_location"] = cur.fetchall()
-
-            stats["incidents"] = {
-                "total_incidents": incident_summary.get("count", 0) if incident_summary else 0,
-                "resolved": 0,
-                "pending": incident_summary.get("count", 0) if incident_summary else 0,
-                "last_30_days": incident_summary.get("last_30_days", 0) if incident_summary else 0,
-                "last_7_days": incident_summary.get("last_7_days", 0) if incident_summary else 0,
-                "total_fines": incident_summary.get("total_fines", 0) if incident_summary else 0,
-            }
-        except Exception:
-            stats["incidents_by_location"] = []
-            stats["incidents"] = {
-                "total_incidents": 0,
-                "resolved": 0,
-                "pending": 0,
-                "last_30_days": 0,
-                "last_7_days": 0,
-                "total_fines": 0,
-            }
-
-        try:
-            cur.execute(
-                """
-                SELECT COUNT(*) as total_fines,
-                       COUNT(CASE WHEN status = 'pending' THEN 1 END) as pending_fines,
-                       COUNT(CASE WHEN status = 'overdue' THEN 1 END) as overdue_fines,
-                       COUNT(CASE WHEN status = 'paid' THEN 1 END) as paid_fines,
-                       COUNT(CASE WHEN status = 'cancelled' THEN 1 END) as cancelled_fines,
-                       COALESCE(SUM(amount), 0) as total_amount,
-                       COALESCE(SUM(CASE WHEN status = 'pending' THEN amount END), 0) as pending_amount,
-                       COALESCE(SUM(CASE WHEN status = 'overdue' THEN amount END), 0) as overdue_amount,
-                       COALESCE(SUM(CASE WHEN status = 'paid' THEN amount END), 0) as paid_amount,
-                       COALESCE(AVG(amount), 0) as avg_amount
-                FROM fine;
-                """
-            )
-            stats["fines"] = cur.fetchone()
-
-            cur.execute(
-                """
-                SELECT status, COUNT(*) as count, COALESCE(SUM(amount), 0) as total_amount
-                FROM fine
-                GROUP BY status
-                ORDER BY count DESC;
-                """
-            )
-            stats["fines_by_status"] = cur.fetchall()
-        except Exception:
-            stats["fines_by_status"] = []
-            stats["fines"] = {
-                "total_fines": 0,
-                "pending_fines": 0,
-                "overdue_fines": 0,
-                "paid_fines": 0,
-                "cancelled_fines": 0,
-                "total_amount": 0,
-                "pending_amount": 0,
-                "overdue_amount": 0,
-                "paid_amount": 0,
-                "avg_amount": 0,
-            }
-
-        try:
-            cur.execute(
-                """
-                SELECT DATE(timestamp) as date, COUNT(*) as readings_count
-                FROM reading
-                WHERE timestamp >= CURRENT_DATE - INTERVAL '7 days'
-                GROUP BY DATE(timestamp)
-                ORDER BY date;
-                """
-            )
-            stats["readings_last_7_days"] = cur.fetchall()
-        except Exception:
-            stats["readings_last_7_days"] = []
-
-        return stats
-
     def update_statistics(self, stats):
         self._update_main_cards(stats)
         self._update_secondary_cards(stats)
@@ -3573,10 +3468,7 @@ class StatisticsPage(QWidget):
         is_excel = file_path.lower().endswith(".xlsx")
 
         try:
-            conn_string = self.app.get_connection_string()
-            with psy.connect(conn_string) as conn:
-                with conn.cursor(row_factory=dict_row) as cur:
-                    stats = self._load_stats(cur)
+            stats = self.app.stats_repo.statistics()
 
             import pandas as pd
 
@@ -3730,7 +3622,7 @@ class SQLPage(QWidget):
             "SELECT type, COUNT(*) FROM sensor_active GROUP BY type ORDER BY COUNT DESC;",
             "SELECT username, created_at FROM app_user_active ORDER BY created_at DESC LIMIT 5;",
             "SELECT * FROM citizen_active WHERE debt > 0 ORDER BY debt DESC;",
-            "SELECT s.type, s.location, COUNT(r.id) as readings FROM sensor_active s LEFT JOIN reading r ON s.id = r.sensor_id GROUP BY s.id, s.type, s.location ORDER BY readings DESC;",
+            "SELECT s.type, s.location, COALESCE(st.reading_count, 0) as readings FROM sensor_active s LEFT JOIN sensor_reading_stats st ON st.sensor_id = s.id ORDER BY readings DESC;",
         ]
         self.default_sql = "-- Digite sua consulta SQL aqui\nSELECT * FROM app_user_active LIMIT 10;"
 
@@ -3886,7 +3778,7 @@ class SQLPage(QWidget):
 
         try:
             conn_string = self.app.get_connection_string()
-            with psy.connect(conn_string) as conn:
+            with query_metrics.connect(conn_string) as conn:
                 with conn.cursor(row_factory=dict_row) as cur:
                     cur.execute(sql)
                     results = cur.fetchall()
@@ -3945,7 +3837,7 @@ class SQLPage(QWidget):
 
         try:
             conn_string = self.app.get_connection_string()
-            with psy.connect(conn_string) as conn:
+            with query_metrics.connect(conn_string) as conn:
                 with conn.cursor(row_factory=dict_row) as cur:
                     cur.execute(sql)
                     results = cur.fetchall()
@@ -4098,6 +3990,272 @@ class SQLPage(QWidget):
         return True, "", "", ""
 
 
+class DiagnosticsPage(QWidget):
+    """Página de Diagnóstico: latência medida no cliente e estatísticas do servidor."""
+
+    CLIENT_COLUMNS = (
+        ("Consulta", "fingerprint"),
+        ("Chamadas", "calls"),
+        ("Total (ms)", "total_ms"),
+        ("Média (ms)", "mean_ms"),
+        ("p50 (ms)", "p50_ms"),
+        ("p95 (ms)", "p95_ms"),
+        ("p99 (ms)", "p99_ms"),
+        ("Máx (ms)", "max_ms"),
+        ("Linhas", "rows"),
+        ("Dados (KB)", "bytes"),
+        ("Erros", "errors"),
+    )
+    STATEMENT_COLUMNS = (
+        ("Consulta", "query"),
+        ("Chamadas", "calls"),
+        ("Total (ms)", "total_ms"),
+        ("Média (ms)", "mean_ms"),
+        ("Máx (ms)", "max_ms"),
+        ("Linhas", "rows"),
+        ("Cache (%)", "hit_ratio"),
+    )
+    TABLE_COLUMNS = (
+        ("Tabela", "table_name"),
+        ("Seq Scans", "seq_scan"),
+        ("Linhas Lidas (seq)", "seq_tup_read"),
+        ("Index Scans", "idx_scan"),
+        ("Linhas Vivas", "n_live_tup"),
+        ("Linhas Mortas", "n_dead_tup"),
+        ("Mortas (%)", "dead_ratio"),
+        ("Último VACUUM", "last_vacuum"),
+        ("Último ANALYZE", "last_analyze"),
+        ("Tamanho (KB)", "total_bytes"),
+    )
+    INDEX_COLUMNS = (
+        ("Índice", "index_name"),
+        ("Tabela", "table_name"),
+        ("Scans", "idx_scan"),
+        ("Linhas Lidas", "idx_tup_read"),
+        ("Tamanho (KB)", "index_bytes"),
+        ("Definido em", "source"),
+        ("Tipo", "kind"),
+    )
+    # Arquivos de onde vêm os índices do projeto (coluna "Definido em")
+    INDEX_FILES = ("sql/indexes.sql", "sql/migrations/*.sql")
+
+    def __init__(self, app, parent=None):
+        super().__init__(parent)
+        self.app = app
+        self.colors = app.colors
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(16, 16, 16, 16)
+        layout.setSpacing(12)
+
+        header = QFrame(self)
+        header_layout = QHBoxLayout(header)
+        header_layout.setContentsMargins(16, 12, 16, 12)
+        header_layout.setSpacing(12)
+
+        title_label = QLabel("🩺 Diagnóstico de Consultas", header)
+        title_label.setStyleSheet("font-size: 16px; font-weight: 700;")
+
+        controls_widget = QWidget(header)
+        controls_layout = QHBoxLayout(controls_widget)
+        controls_layout.setContentsMargins(0, 0, 0, 0)
+        controls_layout.setSpacing(8)
+
+        self.refresh_button = QPushButton("🔄 Atualizar", controls_widget)
+        self.refresh_button.setObjectName("PrimaryButton")
+        self.refresh_button.clicked.connect(self.load_diagnostics)
+
+        self.reset_button = QPushButton("🧹 Zerar", controls_widget)
+        self.reset_button.setObjectName("DangerButton")
+        self.reset_button.clicked.connect(self.reset_metrics)
+
+        self.export_button = QPushButton("📥 Exportar", controls_widget)
+        self.export_button.setObjectName("SuccessButton")
+        self.export_button.clicked.connect(self.export_metrics)
+
+        controls_layout.addWidget(self.refresh_button)
+        controls_layout.addWidget(self.reset_button)
+        controls_layout.addWidget(self.export_button)
+
+        header_layout.addWidget(title_label)
+        header_layout.addStretch(1)
+        header_layout.addWidget(controls_widget)
+
+        stats_frame = QWidget(self)
+        stats_layout = QHBoxLayout(stats_frame)
+        stats_layout.setContentsMargins(0, 0, 0, 0)
+        stats_layout.setSpacing(12)
+
+        self.queries_card = SummaryCard("🧾 Consultas Distintas", 0, "0 execuções", self.colors["primary"], stats_frame)
+        self.time_card = SummaryCard("⏱️ Tempo Total", "0 ms", "desde 00:00:00", self.colors["secondary"], stats_frame)
+        self.slowest_card = SummaryCard("🐢 Maior p95", "0 ms", "N/A", self.colors["warning"], stats_frame)
+        self.errors_card = SummaryCard("❌ Erros", 0, "0%", self.colors["danger"], stats_frame)
+
+        stats_layout.addWidget(self.queries_card)
+        stats_layout.addWidget(self.time_card)
+        stats_layout.addWidget(self.slowest_card)
+        stats_layout.addWidget(self.errors_card)
+
+        self.tabs = QTabWidget(self)
+        self.table = self._build_table(self.CLIENT_COLUMNS)
+        self.statements_table = self._build_table(self.STATEMENT_COLUMNS)
+        self.tables_table = self._build_table(self.TABLE_COLUMNS)
+        self.indexes_table = self._build_table(self.INDEX_COLUMNS)
+        self.tabs.addTab(self.table, "Cliente")
+        self.tabs.addTab(self.statements_table, "pg_stat_statements")
+        self.tabs.addTab(self.tables_table, "Tabelas")
+        self.tabs.addTab(self.indexes_table, "Índices")
+
+        self.info_label = QLabel(
+            "Tempos do cliente incluem rede + servidor; percentis com erro relativo de até ~3%.",
+            self,
+        )
+        self.info_label.setStyleSheet("color: #696969; font-size: 11px;")
+        self.info_label.setWordWrap(True)
+
+        layout.addWidget(header)
+        layout.addWidget(stats_frame)
+        layout.addWidget(self.tabs, 1)
+        layout.addWidget(self.info_label)
+
+    def _build_table(self, columns):
+        table = QTableWidget(self)
+        table.setColumnCount(len(columns))
+        table.setHorizontalHeaderLabels([label for label, _ in columns])
+        table.setSortingEnabled(True)
+        table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        table.setSelectionMode(QAbstractItemView.SingleSelection)
+        table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        return table
+
+    def _fill_table(self, table, columns, rows, highlight=None):
+        """Preenche a tabela; highlight(row) devolve a cor de fundo da linha ou None."""
+        table.setSortingEnabled(False)
+        table.setRowCount(len(rows))
+        for row_index, row in enumerate(rows):
+            color = highlight(row) if highlight else None
+            for col, (_, key) in enumerate(columns):
+                value = row.get(key)
+                item = QTableWidgetItem()
+                if isinstance(value, str):
+                    text = " ".join(value.split())
+                    item.setText(text if len(text) <= 120 else text[:117] + "...")
+                    item.setToolTip(value)
+                elif key.endswith("_ratio"):
+                    item.setData(Qt.DisplayRole, round(value * 100, 1) if value is not None else 0)
+                elif key.endswith("bytes"):
+                    item.setData(Qt.DisplayRole, round((value or 0) / 1024))
+                elif isinstance(value, float):
+                    # Valor numérico no DisplayRole para a ordenação não ser alfabética
+                    item.setData(Qt.DisplayRole, round(value, 2))
+                elif hasattr(value, "strftime"):
+                    item.setText(value.strftime("%d/%m/%Y %H:%M"))
+                else:
+                    item.setData(Qt.DisplayRole, value if value is not None else "N/A")
+                if color:
+                    item.setBackground(QColor(color))
+                item.setFlags(item.flags() ^ Qt.ItemIsEditable)
+                table.setItem(row_index, col, item)
+        table.setSortingEnabled(True)
+
+    def load_diagnostics(self):
+        self.load_metrics()
+        if self.app.connected:
+            self.load_server_stats()
+
+    def load_metrics(self):
+        queries = query_metrics.RECORDER.snapshot()
+        calls = sum(q["calls"] for q in queries)
+        errors = sum(q["errors"] for q in queries)
+        total_ms = sum(q["total_ms"] for q in queries)
+        slowest = max(queries, key=lambda q: q["p95_ms"] or 0, default=None)
+
+        started_at = query_metrics.RECORDER.started_at.strftime("%H:%M:%S")
+        self.queries_card.update(len(queries), f"{calls} execuções")
+        self.time_card.update(f"{total_ms:,.0f} ms".replace(",", "."), f"desde {started_at}")
+        if slowest:
+            self.slowest_card.update(f"{slowest['p95_ms']:.1f} ms", slowest["fingerprint"][:40])
+        else:
+            self.slowest_card.update("0 ms", "N/A")
+        self.errors_card.update(errors, f"{(errors / calls * 100):.1f}%" if calls else "0%")
+
+        self._fill_table(self.table, self.CLIENT_COLUMNS, queries)
+
+    def load_server_stats(self):
+        try:
+            paths = []
+            for pattern in self.INDEX_FILES:
+                paths.extend(sorted(glob.glob(os.path.join(ROOT_DIR, pattern))))
+            stats = self.app.diagnostics_repo.server_stats(declared=declared_indexes(paths))
+        except Exception as exc:
+            QMessageBox.critical(self, "Erro", f"Erro ao carregar estatísticas do servidor: {exc}")
+            return
+
+        for index in stats["indexes"]:
+            if index["is_primary"]:
+                index["kind"] = "PK"
+            elif index["is_unique"]:
+                index["kind"] = "UNIQUE"
+            else:
+                index["kind"] = "Não utilizado" if index["unused"] else "Secundário"
+
+        offender = "#FDE2E2"
+        attention = "#FFF4D6"
+        self._fill_table(
+            self.statements_table, self.STATEMENT_COLUMNS, stats["statements"],
+            lambda s: offender if s["offender"] else None,
+        )
+        self._fill_table(
+            self.tables_table, self.TABLE_COLUMNS, stats["tables"],
+            lambda t: offender if t["seq_heavy"] else attention if t["bloated"] else None,
+        )
+        self._fill_table(
+            self.indexes_table, self.INDEX_COLUMNS, stats["indexes"],
+            lambda i: attention if i["unused"] else None,
+        )
+
+        unused = [i for i in stats["indexes"] if i["unused"]]
+        seq_heavy = [t["table_name"] for t in stats["tables"] if t["seq_heavy"]]
+        reset = stats["stats_reset"].strftime("%d/%m/%Y %H:%M") if stats["stats_reset"] else "início do servidor"
+        parts = [
+            f"Estatísticas do servidor desde {reset}",
+            f"{len(unused)} índice(s) nunca usado(s)",
+            f"seq scan dominante em: {', '.join(seq_heavy)}" if seq_heavy else "nenhuma tabela grande lida só por seq scan",
+        ]
+        if stats["statements_error"]:
+            parts.append(f"pg_stat_statements indisponível: {stats['statements_error']}")
+        self.info_label.setText(" | ".join(parts))
+
+    def reset_metrics(self):
+        confirm = QMessageBox.question(
+            self,
+            "Zerar Métricas",
+            "Descartar todas as métricas de consultas coletadas até agora?",
+        )
+        if confirm != QMessageBox.Yes:
+            return
+        query_metrics.RECORDER.reset()
+        self.load_metrics()
+
+    def export_metrics(self):
+        file_path, _ = QFileDialog.getSaveFileName(
+            self,
+            "Exportar Métricas",
+            os.path.join(os.getcwd(), f"query_metrics_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"),
+            "JSON (*.json);;Prometheus (*.prom)",
+        )
+        if not file_path:
+            return
+
+        try:
+            query_metrics.RECORDER.dump(file_path)
+            QMessageBox.information(self, "Sucesso", f"Métricas exportadas para:\n{file_path}")
+        except Exception as exc:
+            QMessageBox.critical(self, "Erro", f"Erro ao exportar métricas: {exc}")
+
+
 class SettingsPage(QWidget):
     """Página de Configurações do Sistema."""
 
@@ -4248,7 +4406,7 @@ class SettingsPage(QWidget):
         if self.app.connected:
             try:
                 conn_string = self.app.get_connection_string()
-                with psy.connect(conn_string) as conn:
+                with query_metrics.connect(conn_string) as conn:
                     with conn.cursor() as cur:
                         cur.execute("SELECT version()")
                         version = cur.fetchone()
@@ -4366,48 +4524,12 @@ class SettingsPage(QWidget):
 
         try:
             conn_string = self.app.get_connection_string()
-            with psy.connect(conn_string) as conn:
+            with query_metrics.connect(conn_string) as conn:
                 with conn.cursor() as cur:
-                    cur.execute(
-                        """
-                        SELECT table_name
-                        FROM information_schema.tables
-                        WHERE table_schema = 'public'
-                        AND table_type = 'BASE TABLE'
-                        ORDER BY table_name
-                        """
-                    )
-                    tables = [row[0] for row in cur.fetchall()]
-
                     with open(backup_file, "w", encoding="utf-8") as f:
-                        f.write("-- SmartCityOS Database Backup\n")
-                        f.write(f"-- Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                        f.write(f"-- Database: {self.db_name_input.text().strip() or 'smart_city_os'}\n")
-                        f.write(f"-- Total tables: {len(tables)}\n\n")
-
-                        for table in tables:
-                            f.write(f"--\n-- Data for table: {table}\n--\n\n")
-
-                            cur.execute(sql.SQL("SELECT * FROM {}").format(sql.Identifier(table)))
-                            rows = cur.fetchall()
-                            columns = [desc.name for desc in cur.description] if cur.description else []
-
-                            if not columns:
-                                f.write(f"-- Table {table} has no columns\n\n")
-                                continue
-
-                            if rows:
-                                col_list = ", ".join([self._quote_ident(col) for col in columns])
-                                for row in rows:
-                                    values = [self._format_sql_value(value) for value in row]
-                                    insert_sql = (
-                                        f"INSERT INTO {self._quote_ident(table)} "
-                                        f"({col_list}) VALUES ({', '.join(values)});"
-                                    )
-                                    f.write(insert_sql + "\n")
-                                f.write(f"\n-- {len(rows)} rows backed up for table {table}\n\n")
-                            else:
-                                f.write(f"-- Table {table} is empty\n\n")
+                        tables = write_backup(
+                            cur, f, self.db_name_input.text().strip() or "smart_city_os"
+                        )
 
             QMessageBox.information(
                 self,
@@ -4444,27 +4566,14 @@ class SettingsPage(QWidget):
             with open(backup_file, "r", encoding="utf-8") as f:
                 sql_content = f.read()
 
-            sql_commands = self._split_sql_commands(sql_content)
+            sql_commands = split_sql_commands(sql_content)
 
             conn_string = self.app.get_connection_string()
-            with psy.connect(conn_string) as conn:
+            with query_metrics.connect(conn_string) as conn:
                 conn.autocommit = True
                 with conn.cursor() as cur:
-                    success_count = 0
-                    error_count = 0
-                    errors = []
-
-                    for i, command in enumerate(sql_commands):
-                        if not command.strip():
-                            continue
-
-                        try:
-                            cur.execute(command)
-                            success_count += 1
-                        except Exception as cmd_error:
-                            error_count += 1
-                            errors.append(f"Comando {i + 1}: {cmd_error}")
-                            continue
+                    success_count, errors = restore_commands(cur, sql_commands)
+                    error_count = len(errors)
 
             result_msg = (
                 "✅ Restauração concluída!\n\n"
@@ -4494,43 +4603,6 @@ class SettingsPage(QWidget):
         except Exception as exc:
             QMessageBox.critical(self, "Erro", f"❌ Erro ao restaurar: {exc}")
 
-    def _split_sql_commands(self, sql_content):
-        commands = []
-        current_command = ""
-
-        for line in sql_content.split("\n"):
-            line = line.strip()
-
-            if line.startswith("--") or not line:
-                continue
-
-            current_command += line + " "
-
-            if line.endswith(";"):
-                commands.append(current_command.strip())
-                current_command = ""
-
-        if current_command.strip():
-            commands.append(current_command.strip())
-
-        return commands
-
-    def _quote_ident(self, value):
-        return '"' + str(value).replace('"', '""') + '"'
-
-    def _format_sql_value(self, value):
-        if value is None:
-            return "NULL"
-        if isinstance(value, bool):
-            return "TRUE" if value else "FALSE"
-        if isinstance(value, (int, float)):
-            return str(value)
-        if isinstance(value, datetime):
-            return f"'{value.isoformat(sep=' ')}'"
-        if isinstance(value, dict):
-            return "'" + json.dumps(value).replace("'", "''") + "'"
-        return "'" + str(value).replace("'", "''") + "'"
-
     def _sync_env(self, db_settings):
         updates = {}
         host = (db_settings.get("host") or "").strip()
@@ -4629,6 +4701,16 @@ class SmartCityOSQtApp(QMainWindow):
         }
 
         self.connected = False
+        self.listener = None
+        self.db = None
+        self.open_repositories(None)
+        self.pending_sensor_ids = set()
+        self.pending_incident_ids = set()
+        # Notificações do banco são aplicadas em lote a cada 250 ms
+        self.notify_timer = QTimer(self)
+        self.notify_timer.setSingleShot(True)
+        self.notify_timer.setInterval(250)
+        self.notify_timer.timeout.connect(self.flush_notifications)
 
         self.setWindowTitle("SmartCityOS - Sistema Operacional Inteligente para Cidades")
         self.setMinimumSize(1200, 800)
@@ -4755,6 +4837,7 @@ class SmartCityOSQtApp(QMainWindow):
             ("Multas", "💰 Multas"),
             ("Estatísticas", "📈 Estatísticas"),
             ("SQL", "🔍 Consultas SQL"),
+            ("Diagnóstico", "🩺 Diagnóstico"),
             ("Configurações", "⚙️ Configurações"),
         ]
 
@@ -4797,6 +4880,9 @@ class SmartCityOSQtApp(QMainWindow):
         self.sql_page = SQLPage(self, self)
         self._add_page("SQL", self.sql_page)
 
+        self.diagnostics_page = DiagnosticsPage(self, self)
+        self._add_page("Diagnóstico", self.diagnostics_page)
+
         self.settings_page = SettingsPage(self, self)
         self._add_page("Configurações", self.settings_page)
 
@@ -5081,6 +5167,8 @@ class SmartCityOSQtApp(QMainWindow):
                 )
                 return
             self.sql_page.load_console()
+        elif name == "Diagnóstico":
+            self.diagnostics_page.load_diagnostics()
         elif name == "Configurações":
             self.settings_page.load_settings()
             self.settings_page.update_connection_state(self.connected)
@@ -5121,20 +5209,31 @@ class SmartCityOSQtApp(QMainWindow):
 
     def is_username_available(self, username):
         try:
-            conn_string = self.get_connection_string()
-            with psy.connect(conn_string) as conn:
-                with conn.cursor() as cur:
-                    cur.execute(
-                        "SELECT id FROM app_user_active WHERE username = %s",
-                        (username,),
-                    )
-                    return cur.fetchone() is None
+            return self.citizen_repo.username_available(username)
         except Exception:
             return False
 
+    def open_repositories(self, db):
+        """Repositórios das páginas sobre a conexão compartilhada (None ao desconectar)."""
+        self.db = db
+        self.citizen_repo = CitizenRepo(db) if db else None
+        self.vehicle_repo = VehicleRepo(db) if db else None
+        self.sensor_repo = SensorRepo(db) if db else None
+        self.incident_repo = IncidentRepo(db) if db else None
+        self.fine_repo = FineRepo(db) if db else None
+        self.stats_repo = StatsRepo(db) if db else None
+        self.diagnostics_repo = DiagnosticsRepo(db) if db else None
+
+    def close_database(self):
+        if self.db is not None:
+            self.db.close()
+        self.open_repositories(None)
+
     def toggle_connection(self):
         if self.connected:
             self.connected = False
+            self.stop_listener()
+            self.close_database()
             self.connection_status.setText("🔴 Desconectado")
             self.connect_button.setText("🔌 Conectar")
             self.status_label.setText("Desconectado do banco")
@@ -5150,9 +5249,11 @@ class SmartCityOSQtApp(QMainWindow):
             return
 
         try:
-            conn_string = self.get_connection_string()
-            with psy.connect(conn_string) as conn:
-                pass
+            # Conexão de longa duração dos repositórios (statements preparados)
+            self.close_database()
+            db = Database(self.get_connection_string())
+            db.connect()
+            self.open_repositories(db)
             self.connected = True
             self.connection_status.setText("🟢 Conectado")
             self.connect_button.setText("🔌 Desconectar")
@@ -5166,17 +5267,18 @@ class SmartCityOSQtApp(QMainWindow):
             self.statistics_page.set_connected(True)
             self.sql_page.set_connected(True)
             self.settings_page.update_connection_state(True)
+            self.start_listener()
             self.refresh_dashboard()
             if self.stack.currentWidget() is self.citizens_page:
-                self.citizens_page.load_citizens()
+                self.citizens_page.load_citizens(full=True)
             if self.stack.currentWidget() is self.vehicles_page:
-                self.vehicles_page.load_vehicles()
+                self.vehicles_page.load_vehicles(full=True)
             if self.stack.currentWidget() is self.sensors_page:
-                self.sensors_page.load_sensors()
+                self.sensors_page.load_sensors(full=True)
             if self.stack.currentWidget() is self.incidents_page:
-                self.incidents_page.load_incidents()
+                self.incidents_page.load_incidents(full=True)
             if self.stack.currentWidget() is self.fines_page:
-                self.fines_page.load_fines()
+                self.fines_page.load_fines(full=True)
             if self.stack.currentWidget() is self.statistics_page:
                 self.statistics_page.load_statistics()
             if self.stack.currentWidget() is self.sql_page:
@@ -5184,79 +5286,61 @@ class SmartCityOSQtApp(QMainWindow):
             if self.stack.currentWidget() is self.settings_page:
                 self.settings_page.load_settings()
         except Exception as exc:
+            self.close_database()
             QMessageBox.critical(
                 self,
                 "Erro de conexão",
                 f"Não foi possível conectar ao banco de dados.\n{exc}",
             )
 
+    def start_listener(self):
+        self.stop_listener()
+        self.pending_sensor_ids.clear()
+        self.pending_incident_ids.clear()
+        self.listener = DatabaseListener(self.get_connection_string(), self)
+        self.listener.notified.connect(self.on_notification)
+        self.listener.failed.connect(
+            lambda message: self.status_label.setText(f"Feed em tempo real indisponível: {message}")
+        )
+        self.listener.start()
+
+    def stop_listener(self):
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+        self.notify_timer.stop()
+
+    def on_notification(self, channel, payload):
+        if channel == "reading_feed":
+            self.pending_sensor_ids.update(int(i) for i in payload.split(",") if i)
+        elif channel == "incident_feed":
+            _, _, incident_id = payload.partition(":")
+            if incident_id:
+                self.pending_incident_ids.add(int(incident_id))
+        # Agrupa rajadas de notificações em uma única atualização
+        if not self.notify_timer.isActive():
+            self.notify_timer.start()
+
+    def flush_notifications(self):
+        sensor_ids, self.pending_sensor_ids = self.pending_sensor_ids, set()
+        incident_ids, self.pending_incident_ids = self.pending_incident_ids, set()
+        if sensor_ids:
+            self.sensors_page.apply_sensor_deltas(sensor_ids)
+        if incident_ids:
+            self.incidents_page.apply_incident_deltas(incident_ids)
+
+    def closeEvent(self, event):
+        self.stop_listener()
+        self.close_database()
+        super().closeEvent(event)
+
     def refresh_dashboard(self):
         if not self.connected:
             self.dashboard_page.set_connected(False)
             return
 
         try:
-            conn_string = self.get_connection_string()
-            with psy.connect(conn_string) as conn:
-                with conn.cursor(row_factory=dict_row) as cur:
-                    stats = {}
-
-                    cur.execute(
-                          """
-                          SELECT COUNT(*) as total,
-                                 COUNT(CASE WHEN created_at >= CURRENT_DATE - INTERVAL '30 days' THEN 1 END) as this_month
-                          FROM app_user_active
-                          """
-                    )
-                    stats["users"] = cur.fetchone()
-
-                    cur.execute(
-                        """
-                        SELECT COUNT(*) as total,
-                               COUNT(CASE WHEN debt > 0 THEN 1 END) as with_debt,
-                               COALESCE(SUM(debt), 0) as total_debt
-                        FROM citizen_active
-                        """
-                    )
-                    stats["citizens"] = cur.fetchone()
-
-                    cur.execute(
-                        """
-                        SELECT COUNT(*) as total,
-                               COUNT(CASE WHEN allowed = TRUE THEN 1 END) as active
-                        FROM vehicle_active
-                        """
-                    )
-                    stats["vehicles"] = cur.fetchone()
-
-                    cur.execute(
-                        """
-                        SELECT COUNT(*) as total,
-                               COUNT(CASE WHEN occurred_at >= CURRENT_DATE - INTERVAL '7 days' THEN 1 END) as this_week
-                        FROM traffic_incident
-                        """
-                    )
-                    stats["incidents"] = cur.fetchone()
-
-                    cur.execute(
-                        """
-                        SELECT COUNT(*) as total,
-                               COUNT(CASE WHEN status = 'pending' THEN 1 END) as pending,
-                               COUNT(CASE WHEN status = 'overdue' THEN 1 END) as overdue,
-                               COALESCE(SUM(amount), 0) as total_amount
-                        FROM fine
-                        """
-                    )
-                    stats["fines"] = cur.fetchone()
-
-                    cur.execute(
-                        """
-                        SELECT COUNT(*) as total,
-                               COUNT(CASE WHEN active = TRUE THEN 1 END) as active
-                        FROM sensor_active
-                        """
-                    )
-                    stats["sensors"] = cur.fetchone()
+            stats = self.stats_repo.dashboard()
 
             cards_data = [
                 (
@@ -0,0 +1 @@
+"""SmartCityOS: código compartilhado entre a GUI, os scripts e os benchmarks."""
@@ -0,0 +1,146 @@
+"""Backup em SQL (INSERTs) e restauração, sem dependência do Qt."""
+import json
+from datetime import datetime
+
+from psycopg import sql
+
+
+def quote_ident(value):
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+def format_sql_value(value):
+    if value is None:
+        return "NULL"
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, (int, float)):
+        return str(value)
+    if isinstance(value, datetime):
+        return f"'{value.isoformat(sep=' ')}'"
+    if isinstance(value, dict):
+        return "'" + json.dumps(value).replace("'", "''") + "'"
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def write_backup(cur, f, database, schema="public"):
+    """
+    Write every base table of `schema` to the open file `f` as INSERT statements.
+
+    Tables with GENERATED ALWAYS identity columns are written with
+    OVERRIDING SYSTEM VALUE (the ids are kept) followed by a setval() so new
+    rows continue after the restored ids.
+    Returns the names of the tables written.
+    """
+    cur.execute(
+        """
+        SELECT table_name
+        FROM information_schema.tables
+        WHERE table_schema = %s
+        AND table_type = 'BASE TABLE'
+        ORDER BY table_name
+        """,
+        (schema,),
+    )
+    tables = [row[0] for row in cur.fetchall()]
+
+    cur.execute(
+        """
+        SELECT table_name, column_name
+        FROM information_schema.columns
+        WHERE table_schema = %s
+        AND is_identity = 'YES'
+        """,
+        (schema,),
+    )
+    identities = {}
+    for table, column in cur.fetchall():
+        identities.setdefault(table, []).append(column)
+
+    f.write("-- SmartCityOS Database Backup\n")
+    f.write(f"-- Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+    f.write(f"-- Database: {database}\n")
+    f.write(f"-- Total tables: {len(tables)}\n\n")
+
+    for table in tables:
+        f.write(f"--\n-- Data for table: {table}\n--\n\n")
+
+        cur.execute(sql.SQL("SELECT * FROM {}").format(sql.Identifier(table)))
+        rows = cur.fetchall()
+        columns = [desc.name for desc in cur.description] if cur.description else []
+
+        if not columns:
+            f.write(f"-- Table {table} has no columns\n\n")
+            continue
+
+        if rows:
+            col_list = ", ".join([quote_ident(col) for col in columns])
+            overriding = " OVERRIDING SYSTEM VALUE" if table in identities else ""
+            for row in rows:
+                values = [format_sql_value(value) for value in row]
+                f.write(
+                    f"INSERT INTO {quote_ident(table)} "
+                    f"({col_list}){overriding} VALUES ({', '.join(values)});\n"
+                )
+            for column in identities.get(table, []):
+                literal = format_sql_value(quote_ident(table))
+                f.write(
+                    f"SELECT setval(pg_get_serial_sequence({literal}, {format_sql_value(column)}), "
+                    f"MAX({quote_ident(column)})) FROM {quote_ident(table)};\n"
+                )
+            f.write(f"\n-- {len(rows)} rows backed up for table {table}\n\n")
+        else:
+            f.write(f"-- Table {table} is empty\n\n")
+
+    return tables
+
+
+def split_sql_commands(sql_content):
+    """Split a backup file into commands (one per `;` at end of line), skipping comments."""
+    commands = []
+    current_command = ""
+
+    for line in sql_content.split("\n"):
+        line = line.strip()
+
+        if line.startswith("--") or not line:
+            continue
+
+        current_command += line + " "
+
+        if line.endswith(";"):
+            commands.append(current_command.strip())
+            current_command = ""
+
+    if current_command.strip():
+        commands.append(current_command.strip())
+
+    return commands
+
+
+def restore_commands(cur, commands, savepoints=False):
+    """
+    Execute the commands of a backup one by one, going on after failures.
+
+    With autocommit every command stands alone (as in the GUI); inside a
+    transaction pass savepoints=True so a failed command does not abort the rest.
+    Returns (success_count, errors), errors as "Comando N: message".
+    """
+    success_count = 0
+    errors = []
+
+    for i, command in enumerate(commands):
+        if not command.strip():
+            continue
+
+        try:
+            if savepoints:
+                with cur.connection.transaction():
+                    cur.execute(command)
+            else:
+                cur.execute(command)
+            success_count += 1
+        except Exception as cmd_error:
+            errors.append(f"Comando {i + 1}: {cmd_error}")
+
+    return success_count, errors
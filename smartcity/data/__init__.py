@@ -0,0 +1,10 @@
+"""Acesso a dados: conexão compartilhada e repositórios com statements preparados."""
+from smartcity.data.citizens import CitizenRepo
+from smartcity.data.database import Database
+from smartcity.data.diagnostics import DiagnosticsRepo, declared_indexes
+from smartcity.data.fines import FineRepo
+from smartcity.data.incidents import IncidentRepo
+from smartcity.data.repository import Repository
+from smartcity.data.sensors import SensorRepo
+from smartcity.data.stats import StatsRepo
+from smartcity.data.vehicles import VehicleRepo
@@ -0,0 +1,81 @@
+from smartcity.data.repository import AccountRepository
+
+
+class CitizenRepo(AccountRepository):
+    """Citizens page and citizen registration."""
+
+    STATEMENTS = {
+        **AccountRepository.ACCOUNT_STATEMENTS,
+        "list": """
+            SELECT c.id, c.first_name, c.last_name, c.email, c.cpf, c.phone,
+                   c.address, c.birth_date, c.wallet_balance, c.debt, c.allowed,
+                   u.username, c.created_at
+            FROM citizen_active c
+            JOIN app_user u ON c.app_user_id = u.id
+            ORDER BY c.first_name, c.last_name
+        """,
+        "changed_since": """
+            WITH changed AS (
+                SELECT id FROM citizen WHERE updated_at > %(since)s
+                UNION
+                SELECT c.id
+                FROM citizen c
+                JOIN app_user u ON c.app_user_id = u.id
+                WHERE u.updated_at > %(since)s
+            )
+            SELECT c.id, c.first_name, c.last_name, c.email, c.cpf, c.phone,
+                   c.address, c.birth_date, c.wallet_balance, c.debt, c.allowed,
+                   u.username, c.created_at, c.deleted_at
+            FROM citizen c
+            JOIN app_user u ON c.app_user_id = u.id
+            WHERE c.id IN (SELECT id FROM changed)
+        """,
+        "count": """
+            SELECT COUNT(*) AS total
+            FROM citizen_active c
+            JOIN app_user u ON c.app_user_id = u.id
+        """,
+        "id_by_cpf": """
+            SELECT id FROM citizen_active WHERE cpf = %s
+        """,
+        "insert": """
+            INSERT INTO citizen (
+                app_user_id, first_name, last_name, cpf, birth_date,
+                email, phone, address, wallet_balance
+            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s) RETURNING id
+        """,
+        "open_fine_count": """
+            SELECT COUNT(*) AS total
+            FROM fine
+            WHERE citizen_id = %s AND status IN ('pending', 'overdue')
+        """,
+        "delete": """
+            DELETE FROM citizen WHERE id = %s
+        """,
+    }
+
+    def load(self, rows, loaded_at):
+        return self._load_delta(
+            rows, loaded_at, sort_key=lambda c: (c["first_name"] or "", c["last_name"] or "")
+        )
+
+    def id_by_cpf(self, cpf):
+        row = self._one("id_by_cpf", (cpf,))
+        return row["id"] if row else None
+
+    def create(self, username, password_hash, first_name, last_name, cpf, birth_date,
+               email, phone, address, wallet_balance):
+        with self.db.transaction() as cur:
+            app_user_id = self._insert_app_user(cur, username, password_hash)
+            return self._run(cur, "insert", (
+                app_user_id, first_name, last_name, cpf, birth_date,
+                email, phone, address, wallet_balance,
+            )).fetchone()["id"]
+
+    def open_fine_count(self, citizen_id):
+        return self._one("open_fine_count", (citizen_id,))["total"]
+
+    def delete(self, citizen_id):
+        """Soft delete (trigger soft_delete_citizen_with_user)."""
+        with self.db.transaction() as cur:
+            self._run(cur, "delete", (citizen_id,))
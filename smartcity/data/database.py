@@ -0,0 +1,82 @@
+from collections import Counter
+from contextlib import contextmanager
+
+from psycopg.rows import dict_row
+
+# Prepare a statement on its first execution (psycopg's default waits for 5)
+PREPARE_THRESHOLD = 0
+
+
+class Database:
+    """
+    One long-lived connection shared by the repositories.
+
+    Statements are executed through `execute()`, which asks psycopg to prepare
+    them server-side (`prepare=True`) so a save repeated in the same session
+    skips parsing and planning. Per-statement counters record how many
+    executions ran prepared, how many did not, and how many PREPAREs were sent.
+    Pass prepare=False for poolers that cannot keep prepared statements
+    (e.g. PgBouncer in transaction mode without prepared statement support).
+    The connection uses the instrumented cursor of query_metrics, so every
+    statement also lands in the per-fingerprint latency histograms.
+    """
+
+    def __init__(self, conn_string, prepare=True):
+        self.conn_string = conn_string
+        self.prepare = prepare
+        self.conn = None
+        self.counters = Counter()
+        self._prepared = set()
+
+    def connect(self):
+        if self.conn is None or self.conn.closed or self.conn.broken:
+            from smartcity.query_metrics import connect
+
+            self.conn = connect(self.conn_string, row_factory=dict_row)
+            self.conn.prepare_threshold = PREPARE_THRESHOLD if self.prepare else None
+            # Prepared statements live in the server session: a new connection starts empty
+            self._prepared = set()
+        return self.conn
+
+    def close(self):
+        if self.conn is not None and not self.conn.closed:
+            self.conn.close()
+        self.conn = None
+
+    @contextmanager
+    def transaction(self, row_factory=None):
+        """
+        Cursor of the shared connection; commits on success and rolls back on error.
+        Rows are dicts unless another row_factory is given (e.g. tuple_row).
+        """
+        conn = self.connect()
+        try:
+            with conn.cursor(row_factory=row_factory or dict_row) as cur:
+                yield cur
+            conn.commit()
+        except Exception:
+            if not conn.closed:
+                conn.rollback()
+            raise
+
+    def execute(self, cur, name, query, params=None):
+        """Run `query` (registered as `name` in the counters) and return the cursor."""
+        cur.execute(query, params, prepare=self.prepare)
+        if self.prepare:
+            self.counters[(name, "prepared")] += 1
+            if name not in self._prepared:
+                self._prepared.add(name)
+                self.counters[(name, "prepares")] += 1
+        else:
+            self.counters[(name, "unprepared")] += 1
+        return cur
+
+    def stats(self):
+        """{statement name: {"prepared": n, "unprepared": n, "prepares": n}}, sorted by name."""
+        stats = {}
+        for (name, kind), count in sorted(self.counters.items()):
+            stats.setdefault(name, {"prepared": 0, "unprepared": 0, "prepares": 0})[kind] = count
+        return stats
+
+    def reset_stats(self):
+        self.counters.clear()
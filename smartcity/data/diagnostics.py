@@ -0,0 +1,131 @@
+import os
+import re
+
+from smartcity.data.repository import Repository
+
+# Tabela com mais linhas que isso e mais seq scans que index scans é candidata a índice
+SEQ_SCAN_MIN_ROWS = 10000
+# Fração de tuplas mortas a partir da qual a tabela precisa de VACUUM
+DEAD_TUPLE_RATIO = 0.2
+# Consultas do pg_stat_statements destacadas como maiores ofensoras (por tempo total)
+TOP_OFFENDERS = 5
+
+_CREATE_INDEX = re.compile(
+    r"CREATE\s+(?:UNIQUE\s+)?INDEX\s+(?:CONCURRENTLY\s+)?(?:IF\s+NOT\s+EXISTS\s+)?(\w+)",
+    re.IGNORECASE,
+)
+
+
+def declared_indexes(paths):
+    """{index name: file name} of the CREATE INDEX statements found in the given SQL files."""
+    declared = {}
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            for name in _CREATE_INDEX.findall(f.read()):
+                declared.setdefault(name, os.path.basename(path))
+    return declared
+
+
+class DiagnosticsRepo(Repository):
+    """
+    Server-side statistics of the Diagnostics page: pg_stat_statements,
+    pg_stat_user_tables and pg_stat_user_indexes for the current schema.
+
+    pg_stat_statements is optional (extension + shared_preload_libraries);
+    without it, or without permission to read it, its section comes back
+    empty with the reason instead of failing the whole page.
+    """
+
+    STATEMENTS = {
+        "stats_reset": """
+            SELECT stats_reset
+            FROM pg_stat_database
+            WHERE datname = current_database()
+        """,
+        "has_pg_stat_statements": """
+            SELECT EXISTS (
+                SELECT 1 FROM pg_extension WHERE extname = 'pg_stat_statements'
+            ) AS installed
+        """,
+        "statements": """
+            SELECT s.queryid, s.query, s.calls,
+                   s.total_exec_time AS total_ms,
+                   s.mean_exec_time AS mean_ms,
+                   s.max_exec_time AS max_ms,
+                   s.rows,
+                   s.shared_blks_hit + s.shared_blks_read AS blocks,
+                   CASE WHEN s.shared_blks_hit + s.shared_blks_read > 0
+                        THEN s.shared_blks_hit::FLOAT / (s.shared_blks_hit + s.shared_blks_read)
+                   END AS hit_ratio
+            FROM pg_stat_statements s
+            JOIN pg_database d ON d.oid = s.dbid
+            WHERE d.datname = current_database()
+            ORDER BY s.total_exec_time DESC
+            LIMIT %(limit)s
+        """,
+        "tables": """
+            SELECT relname AS table_name,
+                   seq_scan, seq_tup_read,
+                   COALESCE(idx_scan, 0) AS idx_scan,
+                   n_live_tup, n_dead_tup,
+                   CASE WHEN n_live_tup + n_dead_tup > 0
+                        THEN n_dead_tup::FLOAT / (n_live_tup + n_dead_tup)
+                        ELSE 0
+                   END AS dead_ratio,
+                   GREATEST(last_vacuum, last_autovacuum) AS last_vacuum,
+                   GREATEST(last_analyze, last_autoanalyze) AS last_analyze,
+                   pg_total_relation_size(relid) AS total_bytes
+            FROM pg_stat_user_tables
+            WHERE schemaname = current_schema()
+            ORDER BY seq_tup_read DESC
+        """,
+        "indexes": """
+            SELECT s.indexrelname AS index_name,
+                   s.relname AS table_name,
+                   s.idx_scan, s.idx_tup_read, s.idx_tup_fetch,
+                   i.indisunique AS is_unique,
+                   i.indisprimary AS is_primary,
+                   pg_relation_size(s.indexrelid) AS index_bytes
+            FROM pg_stat_user_indexes s
+            JOIN pg_index i ON i.indexrelid = s.indexrelid
+            WHERE s.schemaname = current_schema()
+            ORDER BY s.idx_scan, pg_relation_size(s.indexrelid) DESC
+        """,
+    }
+
+    def server_stats(self, limit=20, declared=None):
+        """
+        {"stats_reset", "statements", "statements_error", "tables", "indexes"}.
+
+        Top offenders are flagged in place: statements["offender"] for the
+        TOP_OFFENDERS by total time, tables["seq_heavy"]/["bloated"] and
+        indexes["unused"] (never scanned and not backing a PK/UNIQUE
+        constraint). declared ({index name: file}) fills indexes["source"].
+        """
+        declared = declared or {}
+        stats = {"stats_reset": None, "statements": [], "statements_error": None, "tables": [], "indexes": []}
+        with self.db.transaction() as cur:
+            row = self._run(cur, "stats_reset").fetchone()
+            stats["stats_reset"] = row["stats_reset"] if row else None
+
+            if not self._run(cur, "has_pg_stat_statements").fetchone()["installed"]:
+                stats["statements_error"] = "Extensão pg_stat_statements não instalada"
+            else:
+                try:
+                    with cur.connection.transaction():
+                        stats["statements"] = self._run(cur, "statements", {"limit": limit}).fetchall()
+                except Exception as exc:
+                    stats["statements_error"] = str(exc).strip()
+            for position, statement in enumerate(stats["statements"]):
+                statement["offender"] = position < TOP_OFFENDERS
+
+            for table in self._run(cur, "tables").fetchall():
+                table["seq_heavy"] = table["n_live_tup"] >= SEQ_SCAN_MIN_ROWS and table["seq_scan"] > table["idx_scan"]
+                table["bloated"] = table["dead_ratio"] >= DEAD_TUPLE_RATIO
+                stats["tables"].append(table)
+
+            for index in self._run(cur, "indexes").fetchall():
+                index["unused"] = index["idx_scan"] == 0 and not (index["is_unique"] or index["is_primary"])
+                index["source"] = declared.get(index["index_name"])
+                stats["indexes"].append(index)
+        return stats
@@ -0,0 +1,97 @@
+from datetime import datetime
+
+from smartcity.data.repository import Repository
+
+# Colunas da página de Multas lidas de fine_read_model; o status segue a regra da view fine_current
+FINE_READ_MODEL_COLUMNS = """
+    m.fine_id AS id, m.amount,
+    CASE
+        WHEN m.status = 'pending' AND m.due_date < CURRENT_DATE THEN 'overdue'
+        ELSE m.status
+    END AS status,
+    m.fine_created_at AS created_at, m.due_date,
+    m.incident_location, m.incident_description,
+    m.license_plate, m.first_name, m.last_name
+"""
+
+
+class FineRepo(Repository):
+    """Fines page (from fine_read_model), fine generation, payment and deletion."""
+
+    STATEMENTS = {
+        "list": f"""
+            SELECT {FINE_READ_MODEL_COLUMNS}
+            FROM fine_read_model m
+            WHERE m.fine_id IS NOT NULL
+            ORDER BY m.fine_created_at DESC
+        """,
+        "changed_since": f"""
+            SELECT {FINE_READ_MODEL_COLUMNS}
+            FROM fine_read_model m
+            WHERE m.fine_id IS NOT NULL
+              AND (
+                  m.updated_at > %(since)s
+                  -- Vencer não altera a linha: multas pendentes vencidas voltam sempre, com status 'overdue'
+                  OR (m.status = 'pending' AND m.due_date < CURRENT_DATE)
+              )
+        """,
+        "count": """
+            SELECT COUNT(*) AS total
+            FROM fine_read_model
+            WHERE fine_id IS NOT NULL
+        """,
+        "id_by_incident": """
+            SELECT id FROM fine WHERE traffic_incident_id = %s
+        """,
+        "insert": """
+            INSERT INTO fine (
+                traffic_incident_id, citizen_id, amount, due_date
+            ) VALUES (%s, %s, %s, %s) RETURNING id
+        """,
+        "status": """
+            SELECT status, amount FROM fine WHERE id = %s
+        """,
+        "insert_payment": """
+            INSERT INTO fine_payment (
+                fine_id, amount_paid, payment_method
+            ) VALUES (%s, %s, %s) RETURNING id
+        """,
+        "payment_count": """
+            SELECT COUNT(*) AS total FROM fine_payment WHERE fine_id = %s
+        """,
+        "delete": """
+            DELETE FROM fine WHERE id = %s
+        """,
+    }
+
+    def load(self, rows, loaded_at):
+        return self._load_delta(
+            rows, loaded_at, sort_key=lambda f: f["created_at"] or datetime.min, reverse=True
+        )
+
+    def id_by_incident(self, incident_id):
+        row = self._one("id_by_incident", (incident_id,))
+        return row["id"] if row else None
+
+    def create(self, incident_id, citizen_id, amount, due_date):
+        with self.db.transaction() as cur:
+            return self._run(cur, "insert", (
+                incident_id, citizen_id, amount, due_date,
+            )).fetchone()["id"]
+
+    def status(self, fine_id):
+        """{"status", "amount"} of a fine, or None when it does not exist."""
+        return self._one("status", (fine_id,))
+
+    def pay(self, fine_id, amount_paid, payment_method):
+        with self.db.transaction() as cur:
+            return self._run(cur, "insert_payment", (
+                fine_id, amount_paid, payment_method,
+            )).fetchone()["id"]
+
+    def payment_count(self, fine_id):
+        return self._one("payment_count", (fine_id,))["total"]
+
+    def delete(self, fine_id):
+        with self.db.transaction() as cur:
+            self._run(cur, "delete", (fine_id,))
@@ -0,0 +1,77 @@
+from datetime import timedelta
+
+# Margem do watermark: cobre transações que commitaram depois da última carga
+DELTA_OVERLAP = timedelta(minutes=5)
+
+
+class Repository:
+    """
+    Base of the repositories: named SQL statements run on a shared Database.
+
+    Subclasses list their SQL in STATEMENTS ({name: query}); the text of each
+    statement never changes between calls, so the connection prepares it once
+    and reuses the plan for the rest of the session. Counters are kept under
+    "<Repo>.<name>".
+    """
+
+    STATEMENTS = {}
+
+    def __init__(self, db):
+        self.db = db
+
+    def _run(self, cur, name, params=None):
+        return self.db.execute(cur, f"{type(self).__name__}.{name}", self.STATEMENTS[name], params)
+
+    def _one(self, name, params=None):
+        with self.db.transaction() as cur:
+            return self._run(cur, name, params).fetchone()
+
+    def _all(self, name, params=None):
+        with self.db.transaction() as cur:
+            return self._run(cur, name, params).fetchall()
+
+    def _load_delta(self, rows, loaded_at, sort_key, reverse=False):
+        """
+        Incremental load of a page, from the "list", "changed_since" and "count" statements.
+
+        Without a watermark runs "list". With one, runs "changed_since" for the
+        rows changed since loaded_at (minus DELTA_OVERLAP), replaces them by id
+        and drops those that came back with deleted_at. If the total does not
+        match "count" (e.g. a hard delete), everything is loaded again.
+        Returns (rows, new watermark, full_reload).
+        """
+        with self.db.transaction() as cur:
+            cur.execute("SELECT LOCALTIMESTAMP AS now")
+            now = cur.fetchone()["now"]
+
+            if loaded_at is not None:
+                self._run(cur, "changed_since", {"since": loaded_at - DELTA_OVERLAP})
+                changed = {row["id"]: row for row in cur.fetchall()}
+                merged = [changed.pop(row["id"], row) for row in rows]
+                merged.extend(changed.values())
+                merged = [row for row in merged if not row.get("deleted_at")]
+                if self._run(cur, "count").fetchone()["total"] == len(merged):
+                    merged.sort(key=sort_key, reverse=reverse)
+                    return merged, now, False
+
+            return self._run(cur, "list").fetchall(), now, True
+
+
+class AccountRepository(Repository):
+    """Entities that own an app_user login (citizens, vehicles and sensors)."""
+
+    ACCOUNT_STATEMENTS = {
+        "username_in_use": """
+            SELECT id FROM app_user_active WHERE username = %s
+        """,
+        "insert_app_user": """
+            INSERT INTO app_user (username, password_hash)
+            VALUES (%s, %s) RETURNING id
+        """,
+    }
+
+    def username_available(self, username):
+        return self._one("username_in_use", (username,)) is None
+
+    def _insert_app_user(self, cur, username, password_hash):
+        return self._run(cur, "insert_app_user", (username, password_hash)).fetchone()["id"]
@@ -0,0 +1,90 @@
+from psycopg.rows import tuple_row
+
+from smartcity.data.repository import AccountRepository
+
+
+class SensorRepo(AccountRepository):
+    """
+    Sensors page, sensor registration and the reading chart.
+
+    metrics() and series() use smartcity/sensor_series.py.
+    """
+
+    STATEMENTS = {
+        **AccountRepository.ACCOUNT_STATEMENTS,
+        "list": """
+            SELECT s.id, s.type, s.location, s.active,
+                   COALESCE(st.reading_count, 0) as reading_count,
+                   st.last_reading_at as last_reading
+            FROM sensor_active s
+            LEFT JOIN sensor_reading_stats st ON st.sensor_id = s.id
+            ORDER BY s.type, s.location
+        """,
+        "changed_since": """
+            WITH changed AS (
+                SELECT id FROM sensor WHERE updated_at > %(since)s
+                UNION
+                SELECT sensor_id FROM sensor_reading_stats WHERE updated_at > %(since)s
+            )
+            SELECT s.id, s.type, s.location, s.active,
+                   COALESCE(st.reading_count, 0) as reading_count,
+                   st.last_reading_at as last_reading,
+                   s.deleted_at
+            FROM sensor s
+            LEFT JOIN sensor_reading_stats st ON st.sensor_id = s.id
+            WHERE s.id IN (SELECT id FROM changed)
+        """,
+        "count": """
+            SELECT COUNT(*) AS total
+            FROM sensor_active
+        """,
+        "by_ids": """
+            SELECT s.id, s.type, s.location, s.active,
+                   COALESCE(st.reading_count, 0) as reading_count,
+                   st.last_reading_at as last_reading
+            FROM sensor_active s
+            LEFT JOIN sensor_reading_stats st ON st.sensor_id = s.id
+            WHERE s.id = ANY(%s)
+        """,
+        "insert": """
+            INSERT INTO sensor (
+                app_user_id, model, type, location
+            ) VALUES (%s, %s, %s, %s) RETURNING id
+        """,
+        "delete": """
+            DELETE FROM sensor WHERE id = %s
+        """,
+    }
+
+    def load(self, rows, loaded_at):
+        return self._load_delta(
+            rows, loaded_at, sort_key=lambda s: (s["type"] or "", s["location"] or "")
+        )
+
+    def by_ids(self, sensor_ids):
+        """Active sensors among sensor_ids, with their reading counters."""
+        return self._all("by_ids", (list(sensor_ids),))
+
+    def create(self, username, password_hash, model, sensor_type, location):
+        with self.db.transaction() as cur:
+            app_user_id = self._insert_app_user(cur, username, password_hash)
+            return self._run(cur, "insert", (
+                app_user_id, model, sensor_type, location,
+            )).fetchone()["id"]
+
+    def delete(self, sensor_id):
+        """Soft delete (trigger soft_delete_sensor_with_user)."""
+        with self.db.transaction() as cur:
+            self._run(cur, "delete", (sensor_id,))
+
+    def metrics(self, sensor_id):
+        from smartcity.sensor_series import sensor_metrics
+
+        with self.db.transaction(row_factory=tuple_row) as cur:
+            return sensor_metrics(cur, sensor_id)
+
+    def series(self, sensor_id, start, end, metric, points):
+        from smartcity.sensor_series import sensor_series
+
+        with self.db.transaction(row_factory=tuple_row) as cur:
+            return sensor_series(cur, sensor_id, start, end, metric=metric, points=points)
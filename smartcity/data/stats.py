@@ -0,0 +1,239 @@
+from datetime import datetime, timedelta
+
+from smartcity.data.repository import Repository
+
+
+class StatsRepo(Repository):
+    """
+    Aggregates of the Statistics page and the Dashboard cards.
+
+    Each section of statistics() runs in its own savepoint and falls back to
+    zeros when it fails, so one broken query does not abort the others.
+    """
+
+    STATEMENTS = {
+        "users": """
+            SELECT COUNT(*) as total,
+                   COUNT(CASE WHEN created_at >= CURRENT_DATE - INTERVAL '30 days' THEN 1 END) as this_month,
+                   COUNT(CASE WHEN created_at >= CURRENT_DATE - INTERVAL '7 days' THEN 1 END) as this_week
+            FROM app_user_active
+        """,
+        "citizens": """
+            SELECT COUNT(*) as total,
+                   COUNT(CASE WHEN debt > 0 THEN 1 END) as with_debt,
+                   COUNT(CASE WHEN allowed = TRUE THEN 1 END) as with_access,
+                   COALESCE(SUM(debt), 0) as total_debt,
+                   COALESCE(AVG(debt), 0) as avg_debt
+            FROM citizen_active
+        """,
+        "vehicles": """
+            SELECT COUNT(*) as total,
+                   COUNT(CASE WHEN allowed = TRUE THEN 1 END) as active,
+                   COUNT(CASE WHEN allowed = FALSE THEN 1 END) as blocked,
+                   COUNT(DISTINCT citizen_id) as unique_owners
+            FROM vehicle_active
+        """,
+        "sensors_by_type": """
+            SELECT type, COUNT(*) as count,
+                   COUNT(CASE WHEN active = TRUE THEN 1 END) as active
+            FROM sensor_active
+            GROUP BY type
+            ORDER BY count DESC
+        """,
+        "sensors": """
+            SELECT COUNT(*) as total_sensors,
+                   COUNT(CASE WHEN active = TRUE THEN 1 END) as active_sensors,
+                   COUNT(DISTINCT type) as sensor_types
+            FROM sensor_active
+        """,
+        "incident_summary": """
+            SELECT COUNT(*) as count,
+                   COUNT(CASE WHEN ti.occurred_at >= CURRENT_DATE - INTERVAL '30 days' THEN 1 END) as last_30_days,
+                   COUNT(CASE WHEN ti.occurred_at >= CURRENT_DATE - INTERVAL '7 days' THEN 1 END) as last_7_days,
+                   COALESCE(SUM(f.amount), 0) as total_fines
+            FROM traffic_incident ti
+            LEFT JOIN fine f ON ti.id = f.traffic_incident_id
+        """,
+        "incidents_by_location": """
+            SELECT ti.location, COUNT(*) as count,
+                   COUNT(f.id) as fine_count,
+                   COALESCE(AVG(f.amount), 0) as avg_fine
+            FROM traffic_incident ti
+            LEFT JOIN fine f ON ti.id = f.traffic_incident_id
+            GROUP BY ti.location
+            ORDER BY count DESC
+        """,
+        "fines": """
+            SELECT COUNT(*) as total_fines,
+                   COUNT(CASE WHEN status = 'pending' THEN 1 END) as pending_fines,
+                   COUNT(CASE WHEN status = 'overdue' THEN 1 END) as overdue_fines,
+                   COUNT(CASE WHEN status = 'paid' THEN 1 END) as paid_fines,
+                   COUNT(CASE WHEN status = 'cancelled' THEN 1 END) as cancelled_fines,
+                   COALESCE(SUM(amount), 0) as total_amount,
+                   COALESCE(SUM(CASE WHEN status = 'pending' THEN amount END), 0) as pending_amount,
+                   COALESCE(SUM(CASE WHEN status = 'overdue' THEN amount END), 0) as overdue_amount,
+                   COALESCE(SUM(CASE WHEN status = 'paid' THEN amount END), 0) as paid_amount,
+                   COALESCE(AVG(amount), 0) as avg_amount
+            FROM fine_current
+        """,
+        "fines_by_status": """
+            SELECT status, COUNT(*) as count, COALESCE(SUM(amount), 0) as total_amount
+            FROM fine_current
+            GROUP BY status
+            ORDER BY count DESC
+        """,
+        "dashboard_users": """
+            SELECT COUNT(*) as total,
+                   COUNT(CASE WHEN created_at >= CURRENT_DATE - INTERVAL '30 days' THEN 1 END) as this_month
+            FROM app_user_active
+        """,
+        "dashboard_citizens": """
+            SELECT COUNT(*) as total,
+                   COUNT(CASE WHEN debt > 0 THEN 1 END) as with_debt,
+                   COALESCE(SUM(debt), 0) as total_debt
+            FROM citizen_active
+        """,
+        "dashboard_vehicles": """
+            SELECT COUNT(*) as total,
+                   COUNT(CASE WHEN allowed = TRUE THEN 1 END) as active
+            FROM vehicle_active
+        """,
+        "dashboard_incidents": """
+            SELECT COUNT(*) as total,
+                   COUNT(CASE WHEN occurred_at >= CURRENT_DATE - INTERVAL '7 days' THEN 1 END) as this_week
+            FROM traffic_incident
+        """,
+        "dashboard_fines": """
+            SELECT COUNT(*) as total,
+                   COUNT(CASE WHEN status = 'pending' THEN 1 END) as pending,
+                   COUNT(CASE WHEN status = 'overdue' THEN 1 END) as overdue,
+                   COALESCE(SUM(amount), 0) as total_amount
+            FROM fine_current
+        """,
+        "dashboard_sensors": """
+            SELECT COUNT(*) as total,
+                   COUNT(CASE WHEN active = TRUE THEN 1 END) as active
+            FROM sensor_active
+        """,
+    }
+
+    def dashboard(self):
+        """Counters of the Dashboard cards: users, citizens, vehicles, incidents, fines and sensors."""
+        with self.db.transaction() as cur:
+            return {
+                key: self._run(cur, f"dashboard_{key}").fetchone()
+                for key in ("users", "citizens", "vehicles", "incidents", "fines", "sensors")
+            }
+
+    def statistics(self):
+        """Every aggregate of the Statistics page (also used by its export)."""
+        stats = {}
+        with self.db.transaction() as cur:
+            def section(fallbacks, load):
+                try:
+                    with cur.connection.transaction():
+                        stats.update(load())
+                except Exception:
+                    stats.update(fallbacks)
+
+            section(
+                {"users": {"total": 0, "this_month": 0, "this_week": 0}},
+                lambda: {"users": self._run(cur, "users").fetchone()},
+            )
+            section(
+                {"citizens": {
+                    "total": 0,
+                    "with_debt": 0,
+                    "with_access": 0,
+                    "total_debt": 0,
+                    "avg_debt": 0,
+                }},
+                lambda: {"citizens": self._run(cur, "citizens").fetchone()},
+            )
+            section(
+                {"vehicles": {
+                    "total": 0,
+                    "active": 0,
+                    "blocked": 0,
+                    "unique_owners": 0,
+                }},
+                lambda: {"vehicles": self._run(cur, "vehicles").fetchone()},
+            )
+            section(
+                {
+                    "sensors_by_type": [],
+                    "sensors": {
+                        "total_sensors": 0,
+                        "active_sensors": 0,
+                        "sensor_types": 0,
+                    },
+                },
+                lambda: {
+                    "sensors_by_type": self._run(cur, "sensors_by_type").fetchall(),
+                    "sensors": self._run(cur, "sensors").fetchone(),
+                },
+            )
+            section(
+                {
+                    "incidents_by_location": [],
+                    "incidents": {
+                        "total_incidents": 0,
+                        "resolved": 0,
+                        "pending": 0,
+                        "last_30_days": 0,
+                        "last_7_days": 0,
+                        "total_fines": 0,
+                    },
+                },
+                lambda: self._incidents(cur),
+            )
+            section(
+                {
+                    "fines_by_status": [],
+                    "fines": {
+                        "total_fines": 0,
+                        "pending_fines": 0,
+                        "overdue_fines": 0,
+                        "paid_fines": 0,
+                        "cancelled_fines": 0,
+                        "total_amount": 0,
+                        "pending_amount": 0,
+                        "overdue_amount": 0,
+                        "paid_amount": 0,
+                        "avg_amount": 0,
+                    },
+                },
+                lambda: {
+                    "fines": self._run(cur, "fines").fetchone(),
+                    "fines_by_status": self._run(cur, "fines_by_status").fetchall(),
+                },
+            )
+            section({"readings_last_7_days": []}, lambda: self._readings(cur))
+        return stats
+
+    def _incidents(self, cur):
+        summary = self._run(cur, "incident_summary").fetchone()
+        return {
+            "incidents_by_location": self._run(cur, "incidents_by_location").fetchall(),
+            "incidents": {
+                "total_incidents": summary.get("count", 0) if summary else 0,
+                "resolved": 0,
+                "pending": summary.get("count", 0) if summary else 0,
+                "last_30_days": summary.get("last_30_days", 0) if summary else 0,
+                "last_7_days": summary.get("last_7_days", 0) if summary else 0,
+                "total_fines": summary.get("total_fines", 0) if summary else 0,
+            },
+        }
+
+    def _readings(self, cur):
+        # Rollups + cauda ainda não agregada
+        from smartcity.reading_rollups import query_series
+
+        today = datetime.combine(datetime.now().date(), datetime.min.time())
+        rows = query_series(cur, today - timedelta(days=7), today + timedelta(days=1), unit="day")
+        return {
+            "readings_last_7_days": [
+                {"date": row["bucket"].date(), "readings_count": row["sample_count"]}
+                for row in rows
+            ]
+        }
@@ -0,0 +1,73 @@
+from smartcity.data.repository import AccountRepository
+
+
+class VehicleRepo(AccountRepository):
+    """Vehicles page and vehicle registration."""
+
+    STATEMENTS = {
+        **AccountRepository.ACCOUNT_STATEMENTS,
+        "list": """
+            SELECT v.id, v.license_plate, v.model, v.year, v.allowed,
+                   u.username, c.first_name, c.last_name
+            FROM vehicle_active v
+            JOIN app_user u ON v.app_user_id = u.id
+            LEFT JOIN citizen_active c ON v.citizen_id = c.id
+            ORDER BY v.license_plate
+        """,
+        "changed_since": """
+            WITH changed AS (
+                SELECT id FROM vehicle WHERE updated_at > %(since)s
+                UNION
+                SELECT v.id
+                FROM vehicle v
+                JOIN app_user u ON v.app_user_id = u.id
+                WHERE u.updated_at > %(since)s
+                UNION
+                SELECT v.id
+                FROM vehicle v
+                JOIN citizen c ON v.citizen_id = c.id
+                WHERE c.updated_at > %(since)s
+            )
+            SELECT v.id, v.license_plate, v.model, v.year, v.allowed,
+                   u.username, c.first_name, c.last_name, v.deleted_at
+            FROM vehicle v
+            JOIN app_user u ON v.app_user_id = u.id
+            LEFT JOIN citizen_active c ON v.citizen_id = c.id
+            WHERE v.id IN (SELECT id FROM changed)
+        """,
+        "count": """
+            SELECT COUNT(*) AS total
+            FROM vehicle_active v
+            JOIN app_user u ON v.app_user_id = u.id
+        """,
+        "insert": """
+            INSERT INTO vehicle (
+                app_user_id, license_plate, model, year, citizen_id
+            ) VALUES (%s, %s, %s, %s, %s) RETURNING id
+        """,
+        "insert_owner": """
+            INSERT INTO vehicle_citizen (vehicle_id, citizen_id)
+            VALUES (%s, %s)
+        """,
+        "delete": """
+            DELETE FROM vehicle WHERE id = %s
+        """,
+    }
+
+    def load(self, rows, loaded_at):
+        return self._load_delta(rows, loaded_at, sort_key=lambda v: v["license_plate"] or "")
+
+    def create(self, username, password_hash, license_plate, model, year, citizen_id=None):
+        with self.db.transaction() as cur:
+            app_user_id = self._insert_app_user(cur, username, password_hash)
+            vehicle_id = self._run(cur, "insert", (
+                app_user_id, license_plate, model, year, citizen_id,
+            )).fetchone()["id"]
+            if citizen_id:
+                self._run(cur, "insert_owner", (vehicle_id, citizen_id))
+            return vehicle_id
+
+    def delete(self, vehicle_id):
+        """Soft delete (trigger soft_delete_vehicle_with_user)."""
+        with self.db.transaction() as cur:
+            self._run(cur, "delete", (vehicle_id,))
@@ -0,0 +1,319 @@
+import atexit
+import json
+import os
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from functools import lru_cache
+
+import psycopg as psy
+
+# Arquivo (.json ou .prom) gravado ao fim do processo quando definido
+METRICS_FILE_ENV = "SMARTCITY_QUERY_METRICS"
+# Bits de precisão por potência de 2 do histograma (32 sub-buckets: erro relativo <= 1/32)
+SUB_BUCKET_BITS = 5
+# Linhas usadas para estimar o tamanho do resultado (média por linha x total de linhas)
+BYTES_SAMPLE_ROWS = 100
+PERCENTILES = (0.5, 0.95, 0.99)
+
+_COMMENTS = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_STRINGS = re.compile(r"'(?:[^']|'')*'")
+_NUMBERS = re.compile(r"(?<![\w.$])-?\d+(?:\.\d+)?(?![\w.])")
+_PLACEHOLDERS = re.compile(r"%\((\w+)\)s|%s|\$\d+")
+_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_SPACES = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(query):
+    """
+    Normalized text of a query: comments removed, literals and placeholders
+    replaced by ?, IN lists collapsed to (...) and whitespace collapsed, so
+    every execution of the same statement lands in the same bucket.
+    """
+    text = _COMMENTS.sub(" ", query)
+    text = _STRINGS.sub("?", text)
+    text = _PLACEHOLDERS.sub("?", text)
+    text = _NUMBERS.sub("?", text)
+    text = _LISTS.sub("(...)", text)
+    return _SPACES.sub(" ", text).strip()
+
+
+class LatencyHistogram:
+    """
+    HDR-style histogram of durations in microseconds.
+
+    Values below 2^(SUB_BUCKET_BITS + 1) get exact buckets; above that each
+    power of two is split in 2^SUB_BUCKET_BITS buckets, so percentiles keep a
+    bounded relative error with a few hundred buckets for any range.
+    """
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    @staticmethod
+    def bucket_of(value):
+        shift = max(value.bit_length() - SUB_BUCKET_BITS - 1, 0)
+        return (value >> shift) << shift, 1 << shift
+
+    def record(self, value):
+        value = max(int(value), 0)
+        lower, _ = self.bucket_of(value)
+        self.buckets[lower] = self.buckets.get(lower, 0) + 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket holding the given fraction of the values (capped by max)."""
+        if not self.count:
+            return None
+        target = max(int(self.count * fraction + 0.5), 1)
+        seen = 0
+        for lower in sorted(self.buckets):
+            seen += self.buckets[lower]
+            if seen >= target:
+                _, width = self.bucket_of(lower)
+                return min(lower + width - 1, self.max)
+        return self.max
+
+    def cumulative(self):
+        """[(upper bound, values <= bound)] for every non-empty bucket, ascending."""
+        result = []
+        seen = 0
+        for lower in sorted(self.buckets):
+            seen += self.buckets[lower]
+            _, width = self.bucket_of(lower)
+            result.append((lower + width - 1, seen))
+        return result
+
+
+class QueryStats:
+    """Counters and latency histogram of one query fingerprint."""
+
+    def __init__(self, fingerprint):
+        self.fingerprint = fingerprint
+        self.calls = 0
+        self.errors = 0
+        self.rows = 0
+        self.bytes = 0
+        self.histogram = LatencyHistogram()
+        self.last_at = None
+
+    def as_dict(self):
+        histogram = self.histogram
+        data = {
+            "fingerprint": self.fingerprint,
+            "calls": self.calls,
+            "errors": self.errors,
+            "rows": self.rows,
+            "bytes": self.bytes,
+            "total_ms": histogram.total / 1000,
+            "mean_ms": histogram.total / histogram.count / 1000 if histogram.count else None,
+            "min_ms": histogram.min / 1000 if histogram.min is not None else None,
+            "max_ms": histogram.max / 1000 if histogram.max is not None else None,
+            "last_at": self.last_at.isoformat(timespec="seconds") if self.last_at else None,
+        }
+        for fraction in PERCENTILES:
+            value = histogram.percentile(fraction)
+            data[f"p{int(fraction * 100)}_ms"] = value / 1000 if value is not None else None
+        return data
+
+
+class QueryRecorder:
+    """
+    In-memory registry of QueryStats by fingerprint, shared by every
+    instrumented connection of the process (thread-safe).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+        self.started_at = datetime.now()
+
+    def record(self, query, seconds, rows=0, size=0, error=False):
+        with self._lock:
+            stats = self._stats.get(query)
+            if stats is None:
+                stats = self._stats[query] = QueryStats(query)
+            stats.calls += 1
+            stats.errors += int(error)
+            stats.rows += max(rows, 0)
+            stats.bytes += size
+            stats.histogram.record(seconds * 1000000)
+            stats.last_at = datetime.now()
+
+    def snapshot(self, order_by="total_ms"):
+        """List of QueryStats.as_dict(), slowest (by order_by) first."""
+        with self._lock:
+            rows = [stats.as_dict() for stats in self._stats.values()]
+        rows.sort(key=lambda row: row[order_by] or 0, reverse=True)
+        return rows
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self.started_at = datetime.now()
+
+    def to_json(self):
+        return json.dumps(
+            {
+                "started_at": self.started_at.isoformat(timespec="seconds"),
+                "created_at": datetime.now().isoformat(timespec="seconds"),
+                "queries": self.snapshot(),
+            },
+            indent=2,
+            ensure_ascii=False,
+        )
+
+    def to_prometheus(self):
+        """Prometheus text exposition: one histogram (seconds) plus row/byte/error counters per fingerprint."""
+        with self._lock:
+            items = [
+                (stats.fingerprint, stats.calls, stats.errors, stats.rows, stats.bytes,
+                 stats.histogram.total, stats.histogram.cumulative())
+                for stats in self._stats.values()
+            ]
+
+        lines = [
+            "# HELP smartcity_query_duration_seconds Query latency by fingerprint.",
+            "# TYPE smartcity_query_duration_seconds histogram",
+        ]
+        for query, calls, _, _, _, total, cumulative in items:
+            label = _prometheus_label(query)
+            for upper, seen in cumulative:
+                lines.append(
+                    f'smartcity_query_duration_seconds_bucket{{query="{label}",le="{upper / 1000000:.6f}"}} {seen}'
+                )
+            lines.append(f'smartcity_query_duration_seconds_bucket{{query="{label}",le="+Inf"}} {calls}')
+            lines.append(f'smartcity_query_duration_seconds_sum{{query="{label}"}} {total / 1000000:.6f}')
+            lines.append(f'smartcity_query_duration_seconds_count{{query="{label}"}} {calls}')
+
+        for metric, position, help_text in (
+            ("smartcity_query_rows_total", 3, "Rows returned or affected."),
+            ("smartcity_query_bytes_total", 4, "Estimated result size in bytes."),
+            ("smartcity_query_errors_total", 2, "Executions that raised an error."),
+        ):
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} counter")
+            for item in items:
+                lines.append(f'{metric}{{query="{_prometheus_label(item[0])}"}} {item[position]}')
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path):
+        """Write the metrics to path: Prometheus text for .prom/.txt, JSON otherwise."""
+        content = self.to_prometheus() if path.endswith((".prom", ".txt")) else self.to_json()
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        return path
+
+
+def _prometheus_label(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+
+RECORDER = QueryRecorder()
+
+
+def _query_text(query, conn):
+    if isinstance(query, str):
+        return query
+    if isinstance(query, bytes):
+        return query.decode("utf-8", "replace")
+    try:
+        return query.as_string(conn)
+    except Exception:
+        return str(query)
+
+
+def _result_size(cur):
+    """Estimated bytes of the current result: average of the first rows times the row count."""
+    result = cur.pgresult
+    if result is None or not result.ntuples or not result.nfields:
+        return 0
+    sample = min(result.ntuples, BYTES_SAMPLE_ROWS)
+    size = sum(
+        len(result.get_value(row, col) or b"")
+        for row in range(sample)
+        for col in range(result.nfields)
+    )
+    return size * result.ntuples // sample
+
+
+class InstrumentedCursor(psy.Cursor):
+    """
+    Cursor that records every execute/executemany/copy in a QueryRecorder
+    (fingerprint, duration, rows returned or affected, estimated bytes).
+    """
+
+    recorder = RECORDER
+
+    def _record(self, query, started, error):
+        # A falha da instrumentação nunca pode derrubar a consulta medida
+        try:
+            self.recorder.record(
+                fingerprint(_query_text(query, self.connection)),
+                time.perf_counter() - started,
+                rows=0 if error else self.rowcount,
+                size=0 if error else _result_size(self),
+                error=error,
+            )
+        except Exception as exc:
+            print(f"Query metrics error: {exc!r}", file=sys.stderr)
+
+    def execute(self, query, params=None, **kwargs):
+        started = time.perf_counter()
+        try:
+            super().execute(query, params, **kwargs)
+        except Exception:
+            self._record(query, started, True)
+            raise
+        self._record(query, started, False)
+        return self
+
+    def executemany(self, query, params_seq, **kwargs):
+        started = time.perf_counter()
+        try:
+            super().executemany(query, params_seq, **kwargs)
+        except Exception:
+            self._record(query, started, True)
+            raise
+        self._record(query, started, False)
+
+    @contextmanager
+    def copy(self, statement, params=None, **kwargs):
+        started = time.perf_counter()
+        try:
+            with super().copy(statement, params, **kwargs) as copy:
+                yield copy
+        except Exception:
+            self._record(statement, started, True)
+            raise
+        self._record(statement, started, False)
+
+
+_dump_registered = False
+
+
+def connect(conninfo, **kwargs):
+    """
+    psycopg.connect() with InstrumentedCursor as the cursor factory.
+
+    When the SMARTCITY_QUERY_METRICS environment variable names a file, the
+    metrics of the process are written there at exit (see QueryRecorder.dump).
+    """
+    global _dump_registered
+    path = os.getenv(METRICS_FILE_ENV)
+    if path and not _dump_registered:
+        atexit.register(RECORDER.dump, path)
+        _dump_registered = True
+    kwargs.setdefault("cursor_factory", InstrumentedCursor)
+    return psy.connect(conninfo, **kwargs)
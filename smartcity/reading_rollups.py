@@ -0,0 +1,277 @@
+ROLLUP_LEVELS = (
+    # (unit, table) from finest to coarsest
+    ("minute", "reading_1m"),
+    ("hour", "reading_1h"),
+    ("day", "reading_1d"),
+)
+UNIT_SECONDS = {"minute": 60, "hour": 3600, "day": 86400}
+# Reading tables aggregated into the rollups, each with its own watermark row
+ROLLUP_SOURCES = ("reading", "reading_compact")
+# Metric holding the number of readings (not a JSON field)
+READING_COUNT_METRIC = "*"
+
+
+def metric_rows_sql(source, prefix=""):
+    """
+    SELECT of (id, sensor_id, ts, created_at, metric, num) for one reading table:
+    one row per numeric field plus a READING_COUNT_METRIC row per reading.
+    """
+    count_row = f"SELECT '{READING_COUNT_METRIC}'::TEXT AS metric, NULL::DOUBLE PRECISION AS num"
+    if source == "reading_compact":
+        return f"""
+            SELECT rc.id, rc.sensor_id, rc.timestamp AS ts, rc.created_at, m.metric, m.num
+            FROM {prefix}reading_compact rc
+            JOIN {prefix}reading_schema rs ON rs.id = rc.schema_id
+            CROSS JOIN LATERAL (
+                {count_row}
+                UNION ALL
+                SELECT u.metric, u.num::DOUBLE PRECISION
+                FROM unnest(rs.metrics, rc.metrics) AS u(metric, num)
+                WHERE u.metric IS NOT NULL AND u.num IS NOT NULL
+            ) m
+        """
+    return f"""
+        SELECT r.id, r.sensor_id, COALESCE(r.timestamp, r.created_at) AS ts, r.created_at, m.metric, m.num
+        FROM {prefix}reading r
+        CROSS JOIN LATERAL (
+            {count_row}
+            UNION ALL
+            SELECT rm.metric, rm.num FROM {prefix}reading_metrics(r.value) rm
+        ) m
+    """
+
+
+def refresh_rollups(conn_info, schema, batch_size=100000, lag_seconds=60):
+    """
+    Aggregate readings past the watermarks into reading_1m, reading_1h and reading_1d.
+
+    Each batch is read once from its source table (by id, after that source's
+    watermark), grouped per minute and merged (count/sum/min/max) into the three
+    tables and the watermark in the same transaction, so a batch is never
+    counted twice. Readings younger than lag_seconds are left for the next run
+    to give in-flight transactions (with lower ids) time to commit.
+    Returns the number of readings rolled up, or None on error.
+    """
+    try:
+        from smartcity.query_metrics import connect
+        rolled = 0
+        with connect(conn_info) as conn:
+            with conn.cursor() as cur:
+                for source in ROLLUP_SOURCES:
+                    cur.execute(f"""
+                        INSERT INTO {schema}.reading_rollup_watermark (source, last_reading_id)
+                        VALUES (%s, 0)
+                        ON CONFLICT (source) DO NOTHING
+                    """, (source,))
+            conn.commit()
+
+            for source in ROLLUP_SOURCES:
+                while True:
+                    count = _refresh_batch(conn, schema, source, batch_size, lag_seconds)
+                    rolled += count
+                    if count < batch_size:
+                        break
+        return rolled
+    except Exception as e:
+        print(f"Error: {e}")
+        import traceback
+        traceback.print_exc()
+        return None
+
+
+def _refresh_batch(conn, schema, source, batch_size, lag_seconds):
+    with conn.cursor() as cur:
+        # Row lock: only one refresh per source runs at a time
+        cur.execute(f"""
+            SELECT last_reading_id
+            FROM {schema}.reading_rollup_watermark
+            WHERE source = %s
+            FOR UPDATE
+        """, (source,))
+        watermark = cur.fetchone()[0]
+
+        cur.execute(f"""
+            SELECT MAX(id), COUNT(*)
+            FROM (
+                SELECT id
+                FROM {schema}.{source}
+                WHERE id > %s
+                  AND created_at <= CURRENT_TIMESTAMP - make_interval(secs => %s)
+                ORDER BY id
+                LIMIT %s
+            ) b
+        """, (watermark, lag_seconds, batch_size))
+        upper, count = cur.fetchone()
+        if not upper:
+            conn.rollback()
+            return 0
+
+        cur.execute(f"""
+            CREATE TEMP TABLE rollup_batch ON COMMIT DROP AS
+            SELECT
+                mr.sensor_id,
+                date_trunc('minute', mr.ts) AS bucket,
+                mr.metric,
+                COUNT(*) AS sample_count,
+                SUM(mr.num) AS value_sum,
+                MIN(mr.num) AS value_min,
+                MAX(mr.num) AS value_max
+            FROM ({metric_rows_sql(source, f"{schema}.")}) mr
+            WHERE mr.id > %s AND mr.id <= %s
+            GROUP BY 1, 2, 3
+        """, (watermark, upper))
+
+        for unit, table in ROLLUP_LEVELS:
+            cur.execute(f"""
+                INSERT INTO {schema}.{table} AS t (
+                    sensor_id, bucket, metric, sample_count, value_sum, value_min, value_max
+                )
+                SELECT
+                    sensor_id, date_trunc('{unit}', bucket), metric,
+                    SUM(sample_count), SUM(value_sum), MIN(value_min), MAX(value_max)
+                FROM rollup_batch
+                GROUP BY 1, 2, 3
+                ORDER BY 1, 2, 3
+                ON CONFLICT (sensor_id, bucket, metric) DO UPDATE
+                SET sample_count = t.sample_count + EXCLUDED.sample_count,
+                    value_sum = t.value_sum + EXCLUDED.value_sum,
+                    value_min = LEAST(t.value_min, EXCLUDED.value_min),
+                    value_max = GREATEST(t.value_max, EXCLUDED.value_max)
+            """)
+
+        cur.execute(f"""
+            UPDATE {schema}.reading_rollup_watermark
+            SET last_reading_id = %s,
+                updated_at = CURRENT_TIMESTAMP
+            WHERE source = %s
+        """, (upper, source))
+    conn.commit()
+    return count
+
+
+def rebuild_rollups(conn_info, schema, batch_size=100000):
+    """
+    Clear the rollup tables and aggregate every reading again.
+    Needed after readings are updated or deleted, which the incremental refresh ignores.
+    """
+    try:
+        from smartcity.query_metrics import connect
+        with connect(conn_info) as conn:
+            with conn.cursor() as cur:
+                tables = ", ".join(f"{schema}.{table}" for _, table in ROLLUP_LEVELS)
+                cur.execute(f"TRUNCATE {tables}")
+                for source in ROLLUP_SOURCES:
+                    cur.execute(f"""
+                        INSERT INTO {schema}.reading_rollup_watermark (source, last_reading_id)
+                        VALUES (%s, 0)
+                        ON CONFLICT (source) DO UPDATE
+                        SET last_reading_id = 0,
+                            updated_at = CURRENT_TIMESTAMP
+                    """, (source,))
+            conn.commit()
+        return refresh_rollups(conn_info, schema, batch_size=batch_size, lag_seconds=0)
+    except Exception as e:
+        print(f"Error: {e}")
+        import traceback
+        traceback.print_exc()
+        return None
+
+
+def select_level(start, end, unit):
+    """
+    Coarsest rollup table that can answer buckets of `unit` between start and end:
+    its granularity must not exceed `unit` and both bounds must fall on its buckets.
+    """
+    step = UNIT_SECONDS[unit]
+    chosen = ROLLUP_LEVELS[0]
+    for level_unit, table in ROLLUP_LEVELS:
+        level_step = UNIT_SECONDS[level_unit]
+        if level_step > step:
+            break
+        if all(_is_aligned(bound, level_unit) for bound in (start, end)):
+            chosen = (level_unit, table)
+    return chosen
+
+
+def _is_aligned(value, unit):
+    if unit == "minute":
+        return value.second == 0 and value.microsecond == 0
+    if unit == "hour":
+        return value.minute == 0 and value.second == 0 and value.microsecond == 0
+    return value.hour == 0 and value.minute == 0 and value.second == 0 and value.microsecond == 0
+
+
+def query_series(cur, start, end, unit="day", metric=READING_COUNT_METRIC, sensor_id=None, schema=None):
+    """
+    Aggregated readings per `unit` bucket in [start, end).
+
+    Uses the coarsest rollup that fits the range and adds the raw readings past
+    each source's watermark (not rolled up yet), so results are always current.
+    Returns rows (bucket, sample_count, avg, min, max) ordered by bucket.
+    """
+    prefix = f"{schema}." if schema else ""
+    _, table = select_level(start, end, unit)
+    params = {
+        "unit": unit,
+        "start": start,
+        "end": end,
+        "metric": metric,
+        "sensor_id": sensor_id,
+    }
+    tails = []
+    for i, source in enumerate(ROLLUP_SOURCES):
+        params[f"source_{i}"] = source
+        tails.append(f"""
+            SELECT
+                date_trunc(%(unit)s, mr.ts) AS bucket,
+                COUNT(*) AS sample_count,
+                SUM(mr.num) AS value_sum,
+                MIN(mr.num) AS value_min,
+                MAX(mr.num) AS value_max
+            FROM ({metric_rows_sql(source, prefix)}) mr
+            WHERE mr.id > COALESCE(
+                    (SELECT last_reading_id
+                     FROM {prefix}reading_rollup_watermark
+                     WHERE source = %(source_{i})s),
+                    0
+                )
+              AND mr.metric = %(metric)s
+              AND mr.ts >= %(start)s
+              AND mr.ts < %(end)s
+              AND (%(sensor_id)s::INTEGER IS NULL OR mr.sensor_id = %(sensor_id)s::INTEGER)
+            GROUP BY 1
+        """)
+
+    cur.execute(f"""
+        WITH rolled AS (
+            SELECT
+                date_trunc(%(unit)s, bucket) AS bucket,
+                SUM(sample_count) AS sample_count,
+                SUM(value_sum) AS value_sum,
+                MIN(value_min) AS value_min,
+                MAX(value_max) AS value_max
+            FROM {prefix}{table}
+            WHERE metric = %(metric)s
+              AND bucket >= %(start)s
+              AND bucket < %(end)s
+              AND (%(sensor_id)s::INTEGER IS NULL OR sensor_id = %(sensor_id)s::INTEGER)
+            GROUP BY 1
+        ),
+        tail AS (
+            {" UNION ALL ".join(tails)}
+        )
+        SELECT
+            bucket,
+            SUM(sample_count) AS sample_count,
+            SUM(value_sum) / NULLIF(SUM(sample_count), 0) AS avg,
+            MIN(value_min) AS min,
+            MAX(value_max) AS max
+        FROM (
+            SELECT * FROM rolled
+            UNION ALL
+            SELECT * FROM tail
+        ) u
+        GROUP BY bucket
+        ORDER BY bucket
+    """, params)
+    return cur.fetchall()
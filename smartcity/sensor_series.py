@@ -0,0 +1,120 @@
+from smartcity.reading_rollups import READING_COUNT_METRIC, ROLLUP_LEVELS, ROLLUP_SOURCES, UNIT_SECONDS, metric_rows_sql
+
+
+def bucket_seconds(start, end, points):
+    """Bucket width (seconds) so that [start, end) yields at most `points` buckets."""
+    span = max((end - start).total_seconds(), 1)
+    return max(int(-(-span // max(points, 1))), 1)
+
+
+def select_source(width):
+    """Coarsest rollup table whose bucket fits in `width` seconds, or None for raw readings."""
+    chosen = None
+    for unit, table in ROLLUP_LEVELS:
+        if UNIT_SECONDS[unit] <= width:
+            chosen = table
+    return chosen
+
+
+def sensor_series(cur, sensor_id, start, end, metric=READING_COUNT_METRIC, points=2000, schema=None):
+    """
+    Readings of one sensor in [start, end), downsampled on the server to at most
+    `points` time buckets (date_bin averaging).
+
+    Wide ranges are answered from the coarsest rollup that fits the bucket
+    width, plus the raw readings past the rollup watermarks; short ranges are
+    bucketed straight from reading/reading_compact. For READING_COUNT_METRIC
+    only `count` is meaningful.
+    Returns a dict of NumPy arrays: t (datetime64[ms]), count, avg, min, max.
+    """
+    import numpy as np
+
+    prefix = f"{schema}." if schema else ""
+    width = bucket_seconds(start, end, points)
+    table = select_source(width)
+    params = {
+        "width": f"{width} seconds",
+        "start": start,
+        "end": end,
+        "metric": metric,
+        "sensor_id": sensor_id,
+    }
+
+    parts = []
+    if table:
+        parts.append(f"""
+            SELECT
+                date_bin(%(width)s::INTERVAL, bucket, %(start)s) AS bucket,
+                sample_count, value_sum, value_min, value_max
+            FROM {prefix}{table}
+            WHERE sensor_id = %(sensor_id)s
+              AND metric = %(metric)s
+              AND bucket >= %(start)s
+              AND bucket < %(end)s
+        """)
+
+    for i, source in enumerate(ROLLUP_SOURCES):
+        params[f"source_{i}"] = source
+        # Without a rollup every raw reading is used; otherwise only the not-yet-rolled tail
+        after = f"""COALESCE(
+                    (SELECT last_reading_id
+                     FROM {prefix}reading_rollup_watermark
+                     WHERE source = %(source_{i})s),
+                    0
+                )""" if table else "0"
+        parts.append(f"""
+            SELECT
+                date_bin(%(width)s::INTERVAL, mr.ts, %(start)s) AS bucket,
+                1 AS sample_count,
+                mr.num AS value_sum,
+                mr.num AS value_min,
+                mr.num AS value_max
+            FROM ({metric_rows_sql(source, prefix)}) mr
+            WHERE mr.sensor_id = %(sensor_id)s
+              AND mr.metric = %(metric)s
+              AND mr.ts >= %(start)s
+              AND mr.ts < %(end)s
+              AND mr.id > {after}
+        """)
+
+    cur.execute(f"""
+        SELECT
+            bucket,
+            SUM(sample_count) AS count,
+            SUM(value_sum) / NULLIF(SUM(sample_count), 0) AS avg,
+            MIN(value_min) AS min,
+            MAX(value_max) AS max
+        FROM ({" UNION ALL ".join(parts)}) u
+        GROUP BY bucket
+        ORDER BY bucket
+    """, params)
+    rows = cur.fetchall()
+
+    def column(index, dtype):
+        return np.array([np.nan if row[index] is None else row[index] for row in rows], dtype=dtype)
+
+    return {
+        "t": np.array([row[0] for row in rows], dtype="datetime64[ms]"),
+        "count": np.array([row[1] for row in rows], dtype=np.int64),
+        "avg": column(2, np.float64),
+        "min": column(3, np.float64),
+        "max": column(4, np.float64),
+    }
+
+
+def sensor_metrics(cur, sensor_id, schema=None):
+    """Metrics available to chart for a sensor: its typed schema plus the fields seen in the daily rollup."""
+    prefix = f"{schema}." if schema else ""
+    cur.execute(f"""
+        SELECT unnest(rs.metrics) AS metric
+        FROM {prefix}sensor s
+        JOIN {prefix}reading_schema rs ON rs.sensor_type = s.type
+        WHERE s.id = %(sensor_id)s
+        UNION
+        SELECT DISTINCT metric
+        FROM {prefix}reading_1d
+        WHERE sensor_id = %(sensor_id)s
+          AND metric <> %(count_metric)s
+        ORDER BY metric
+    """, {"sensor_id": sensor_id, "count_metric": READING_COUNT_METRIC})
+    return [row[0] for row in cur.fetchall()]
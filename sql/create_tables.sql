@@ -96,6 +96,104 @@ CREATE TABLE IF NOT EXISTS SCHEMA_NAME.reading (
       ON DELETE CASCADE
 );
 
+CREATE TABLE IF NOT EXISTS SCHEMA_NAME.reading_schema (
+    id SMALLINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+    sensor_type VARCHAR(100) NOT NULL UNIQUE,
+    metrics TEXT[] NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT chk_reading_schema_metrics CHECK (cardinality(metrics) > 0)
+);
+
+CREATE TABLE IF NOT EXISTS SCHEMA_NAME.reading_compact (
+    id BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+    sensor_id INTEGER NOT NULL,
+    schema_id SMALLINT NOT NULL,
+    timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    metrics REAL[] NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT fk_sensor
+      FOREIGN KEY (sensor_id)
+      REFERENCES SCHEMA_NAME.sensor(id)
+      ON DELETE CASCADE,
+    CONSTRAINT fk_reading_schema
+      FOREIGN KEY (schema_id)
+      REFERENCES SCHEMA_NAME.reading_schema(id)
+      ON DELETE RESTRICT
+);
+
+INSERT INTO SCHEMA_NAME.reading_schema (sensor_type, metrics)
+VALUES
+    ('Radar', ARRAY['speed']),
+    ('Sensor de Velocidade', ARRAY['speed']),
+    ('Sensor de Tráfego', ARRAY['vehicle_count', 'avg_speed', 'occupancy']),
+    ('Qualidade do Ar', ARRAY['aqi', 'pm25', 'pm10', 'co2']),
+    ('Ruído', ARRAY['noise_db'])
+ON CONFLICT (sensor_type) DO NOTHING;
+
+CREATE TABLE IF NOT EXISTS SCHEMA_NAME.sensor_reading_stats (
+    sensor_id INTEGER PRIMARY KEY,
+    reading_count BIGINT NOT NULL DEFAULT 0,
+    last_reading_at TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT chk_reading_count CHECK (reading_count >= 0),
+    CONSTRAINT fk_sensor
+      FOREIGN KEY (sensor_id)
+      REFERENCES SCHEMA_NAME.sensor(id)
+      ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS SCHEMA_NAME.reading_1m (
+    sensor_id INTEGER NOT NULL,
+    bucket TIMESTAMP NOT NULL,
+    metric VARCHAR(100) NOT NULL,
+    sample_count BIGINT NOT NULL DEFAULT 0,
+    value_sum DOUBLE PRECISION,
+    value_min DOUBLE PRECISION,
+    value_max DOUBLE PRECISION,
+    PRIMARY KEY (sensor_id, bucket, metric),
+    CONSTRAINT fk_sensor
+      FOREIGN KEY (sensor_id)
+      REFERENCES SCHEMA_NAME.sensor(id)
+      ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS SCHEMA_NAME.reading_1h (
+    sensor_id INTEGER NOT NULL,
+    bucket TIMESTAMP NOT NULL,
+    metric VARCHAR(100) NOT NULL,
+    sample_count BIGINT NOT NULL DEFAULT 0,
+    value_sum DOUBLE PRECISION,
+    value_min DOUBLE PRECISION,
+    value_max DOUBLE PRECISION,
+    PRIMARY KEY (sensor_id, bucket, metric),
+    CONSTRAINT fk_sensor
+      FOREIGN KEY (sensor_id)
+      REFERENCES SCHEMA_NAME.sensor(id)
+      ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS SCHEMA_NAME.reading_1d (
+    sensor_id INTEGER NOT NULL,
+    bucket TIMESTAMP NOT NULL,
+    metric VARCHAR(100) NOT NULL,
+    sample_count BIGINT NOT NULL DEFAULT 0,
+    value_sum DOUBLE PRECISION,
+    value_min DOUBLE PRECISION,
+    value_max DOUBLE PRECISION,
+    PRIMARY KEY (sensor_id, bucket, metric),
+    CONSTRAINT fk_sensor
+      FOREIGN KEY (sensor_id)
+      REFERENCES SCHEMA_NAME.sensor(id)
+      ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS SCHEMA_NAME.reading_rollup_watermark (
+    source VARCHAR(50) PRIMARY KEY,
+    last_reading_id BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
 CREATE TABLE IF NOT EXISTS SCHEMA_NAME.vehicle_citizen (
     id INTEGER GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
     vehicle_id INTEGER NOT NULL,
@@ -137,11 +235,13 @@ CREATE TABLE IF NOT EXISTS SCHEMA_NAME.fine (
     amount NUMERIC(10,2) NOT NULL,
     status VARCHAR(20) DEFAULT 'pending',
     due_date DATE,
+    amount_paid_total NUMERIC(10,2) NOT NULL DEFAULT 0.00,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     CONSTRAINT chk_fine_amount CHECK (amount >= 0),
+    CONSTRAINT chk_fine_amount_paid_total CHECK (amount_paid_total >= 0),
     CONSTRAINT chk_fine_status CHECK (
-        status IN ('pending', 'paid', 'cancelled')
+        status IN ('pending', 'overdue', 'paid', 'cancelled')
     ),
     CONSTRAINT fk_traffic_incident
       FOREIGN KEY (traffic_incident_id)
@@ -210,3 +310,22 @@ CREATE TABLE IF NOT EXISTS SCHEMA_NAME.audit_log (
       ON DELETE SET NULL
 );
 
+
+-- Modelo de leitura das multas: uma linha por (incidente, multa), sem joins nas telas
+CREATE TABLE IF NOT EXISTS SCHEMA_NAME.fine_read_model (
+    incident_id INTEGER NOT NULL,
+    fine_id INTEGER,
+    vehicle_id INTEGER,
+    citizen_id INTEGER,
+    amount NUMERIC(10,2),
+    status VARCHAR(20),
+    due_date DATE,
+    fine_created_at TIMESTAMP,
+    incident_location TEXT,
+    incident_description TEXT,
+    occurred_at TIMESTAMP,
+    license_plate VARCHAR(12),
+    first_name VARCHAR(100),
+    last_name VARCHAR(150),
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
@@ -1,3 +1,6 @@
+-- Busca aproximada (ILIKE/similarity) em nomes, placas e locais
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
 CREATE INDEX IF NOT EXISTS idx_traffic_incident_vehicle
 ON SCHEMA_NAME.traffic_incident(vehicle_id);
 
@@ -17,6 +20,10 @@ WHERE status = 'pending';
 CREATE INDEX IF NOT EXISTS idx_fine_due_date
 ON SCHEMA_NAME.fine(due_date);
 
+CREATE INDEX IF NOT EXISTS idx_fine_pending_due_date
+ON SCHEMA_NAME.fine(due_date)
+WHERE status = 'pending';
+
 CREATE INDEX IF NOT EXISTS idx_fine_payment_fine
 ON SCHEMA_NAME.fine_payment(fine_id);
 
@@ -73,4 +80,96 @@ WHERE deleted_at IS NULL;
 
 CREATE UNIQUE INDEX ux_vehicle_license_plate_active
 ON SCHEMA_NAME.vehicle (license_plate)
-WHERE deleted_at IS NULL;
\ No newline at end of file
+WHERE deleted_at IS NULL;
+
+-- Placa normalizada (import_vehicles.plate_sql): placas antigas podem estar gravadas com separadores
+CREATE INDEX IF NOT EXISTS idx_vehicle_license_plate_normalized
+ON SCHEMA_NAME.vehicle ((regexp_replace(upper(COALESCE(license_plate, '')), '[^A-Z0-9]', '', 'g')))
+WHERE deleted_at IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_reading_sensor_timestamp
+ON SCHEMA_NAME.reading(sensor_id, timestamp DESC);
+
+CREATE INDEX IF NOT EXISTS idx_reading_1m_metric_bucket
+ON SCHEMA_NAME.reading_1m(metric, bucket);
+
+CREATE INDEX IF NOT EXISTS idx_reading_1h_metric_bucket
+ON SCHEMA_NAME.reading_1h(metric, bucket);
+
+CREATE INDEX IF NOT EXISTS idx_reading_1d_metric_bucket
+ON SCHEMA_NAME.reading_1d(metric, bucket);
+
+CREATE INDEX IF NOT EXISTS idx_reading_compact_sensor_timestamp
+ON SCHEMA_NAME.reading_compact(sensor_id, timestamp DESC);
+
+CREATE INDEX IF NOT EXISTS idx_app_user_updated_at
+ON SCHEMA_NAME.app_user(updated_at);
+
+CREATE INDEX IF NOT EXISTS idx_citizen_updated_at
+ON SCHEMA_NAME.citizen(updated_at);
+
+CREATE INDEX IF NOT EXISTS idx_vehicle_updated_at
+ON SCHEMA_NAME.vehicle(updated_at);
+
+CREATE INDEX IF NOT EXISTS idx_sensor_updated_at
+ON SCHEMA_NAME.sensor(updated_at);
+
+CREATE INDEX IF NOT EXISTS idx_traffic_incident_updated_at
+ON SCHEMA_NAME.traffic_incident(updated_at);
+
+CREATE INDEX IF NOT EXISTS idx_fine_updated_at
+ON SCHEMA_NAME.fine(updated_at);
+
+CREATE INDEX IF NOT EXISTS idx_sensor_reading_stats_updated_at
+ON SCHEMA_NAME.sensor_reading_stats(updated_at);
+
+CREATE INDEX IF NOT EXISTS idx_citizen_name_trgm
+ON SCHEMA_NAME.citizen USING GIN ((first_name || ' ' || last_name) gin_trgm_ops)
+WHERE deleted_at IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_vehicle_license_plate_trgm
+ON SCHEMA_NAME.vehicle USING GIN (license_plate gin_trgm_ops)
+WHERE deleted_at IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_traffic_incident_location_trgm
+ON SCHEMA_NAME.traffic_incident USING GIN (location gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_sensor_location_trgm
+ON SCHEMA_NAME.sensor USING GIN (location gin_trgm_ops)
+WHERE deleted_at IS NULL;
+
+CREATE UNIQUE INDEX IF NOT EXISTS ux_fine_read_model_fine
+ON SCHEMA_NAME.fine_read_model(fine_id);
+
+CREATE INDEX IF NOT EXISTS idx_fine_read_model_incident
+ON SCHEMA_NAME.fine_read_model(incident_id);
+
+CREATE INDEX IF NOT EXISTS idx_fine_read_model_citizen
+ON SCHEMA_NAME.fine_read_model(citizen_id);
+
+CREATE INDEX IF NOT EXISTS idx_fine_read_model_created_at
+ON SCHEMA_NAME.fine_read_model(fine_created_at DESC)
+WHERE fine_id IS NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_fine_read_model_open_due_date
+ON SCHEMA_NAME.fine_read_model(due_date)
+WHERE status IN ('pending', 'overdue');
+
+CREATE INDEX IF NOT EXISTS idx_fine_read_model_unfined
+ON SCHEMA_NAME.fine_read_model(occurred_at DESC)
+WHERE fine_id IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_fine_read_model_updated_at
+ON SCHEMA_NAME.fine_read_model(updated_at);
+
+CREATE INDEX IF NOT EXISTS idx_fine_read_model_open_trgm
+ON SCHEMA_NAME.fine_read_model USING GIN (
+    (COALESCE(license_plate, '') || ' ' || COALESCE(first_name, '') || ' ' || COALESCE(last_name, '')) gin_trgm_ops
+)
+WHERE status IN ('pending', 'overdue');
+
+CREATE INDEX IF NOT EXISTS idx_fine_read_model_unfined_trgm
+ON SCHEMA_NAME.fine_read_model USING GIN (
+    (COALESCE(license_plate, '') || ' ' || COALESCE(incident_location, '')) gin_trgm_ops
+)
+WHERE fine_id IS NULL;
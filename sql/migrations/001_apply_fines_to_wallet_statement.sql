@@ -0,0 +1,43 @@
+-- Aplica multas à carteira uma vez por cidadão por statement (trigger FOR EACH STATEMENT)
+CREATE OR REPLACE FUNCTION SCHEMA_NAME.apply_fines_to_wallet()
+RETURNS TRIGGER AS $$
+BEGIN
+    -- Soma as multas novas por cidadão e aplica carteira/dívida uma única vez
+    WITH new_amounts AS (
+        SELECT citizen_id, SUM(amount) AS total
+        FROM new_fines
+        WHERE status IS DISTINCT FROM 'cancelled'
+          AND amount > 0
+        GROUP BY citizen_id
+    ),
+    locked AS (
+        SELECT c.id, COALESCE(c.wallet_balance, 0) AS balance, n.total
+        FROM citizen c
+        JOIN new_amounts n ON n.citizen_id = c.id
+        ORDER BY c.id
+        FOR UPDATE OF c
+    )
+    UPDATE citizen c
+    SET wallet_balance = GREATEST(l.balance - l.total, 0),
+        debt = c.debt + GREATEST(l.total - l.balance, 0),
+        allowed = CASE
+            WHEN l.total > l.balance THEN FALSE
+            ELSE c.allowed
+        END,
+        updated_at = CURRENT_TIMESTAMP
+    FROM locked l
+    WHERE c.id = l.id;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_apply_fine ON SCHEMA_NAME.fine;
+
+CREATE TRIGGER trg_apply_fine
+AFTER INSERT ON SCHEMA_NAME.fine
+REFERENCING NEW TABLE AS new_fines
+FOR EACH STATEMENT
+EXECUTE FUNCTION SCHEMA_NAME.apply_fines_to_wallet();
+
+DROP FUNCTION IF EXISTS SCHEMA_NAME.apply_fine_to_wallet();
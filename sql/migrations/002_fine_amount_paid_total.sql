@@ -0,0 +1,55 @@
+-- Mantém fine.amount_paid_total e remove o SUM(amount_paid) do trigger de pagamento
+ALTER TABLE SCHEMA_NAME.fine
+    ADD COLUMN IF NOT EXISTS amount_paid_total NUMERIC(10,2) NOT NULL DEFAULT 0.00;
+
+ALTER TABLE SCHEMA_NAME.fine
+    DROP CONSTRAINT IF EXISTS chk_fine_amount_paid_total;
+
+ALTER TABLE SCHEMA_NAME.fine
+    ADD CONSTRAINT chk_fine_amount_paid_total CHECK (amount_paid_total >= 0);
+
+-- Backfill a partir dos pagamentos já registrados
+UPDATE SCHEMA_NAME.fine f
+SET amount_paid_total = p.total
+FROM (
+    SELECT fine_id, SUM(amount_paid) AS total
+    FROM SCHEMA_NAME.fine_payment
+    GROUP BY fine_id
+) p
+WHERE f.id = p.fine_id
+  AND f.amount_paid_total IS DISTINCT FROM p.total;
+
+CREATE OR REPLACE FUNCTION SCHEMA_NAME.apply_fine_payment()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_citizen_id INTEGER;
+BEGIN
+    -- Acumula o total pago e marca como paga no mesmo UPDATE
+    UPDATE fine
+    SET amount_paid_total = amount_paid_total + NEW.amount_paid,
+        status = CASE
+            WHEN amount <= amount_paid_total + NEW.amount_paid THEN 'paid'
+            ELSE status
+        END,
+        updated_at = CURRENT_TIMESTAMP
+    WHERE id = NEW.fine_id
+    RETURNING citizen_id INTO v_citizen_id;
+
+    UPDATE citizen
+    SET debt = GREATEST(debt - NEW.amount_paid, 0),
+        allowed = CASE
+            WHEN debt - NEW.amount_paid <= 0 THEN TRUE
+            ELSE allowed
+        END,
+        wallet_balance = CASE
+            WHEN NEW.payment_method = 'Carteira Digital'
+                THEN GREATEST(wallet_balance - NEW.amount_paid, 0)
+            ELSE wallet_balance
+        END,
+        updated_at = CURRENT_TIMESTAMP
+    WHERE id = v_citizen_id;
+
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
@@ -0,0 +1,137 @@
+-- Contadores por sensor mantidos por trigger (sem varrer reading na página de sensores)
+CREATE TABLE IF NOT EXISTS SCHEMA_NAME.sensor_reading_stats (
+    sensor_id INTEGER PRIMARY KEY,
+    reading_count BIGINT NOT NULL DEFAULT 0,
+    last_reading_at TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT chk_reading_count CHECK (reading_count >= 0),
+    CONSTRAINT fk_sensor
+      FOREIGN KEY (sensor_id)
+      REFERENCES SCHEMA_NAME.sensor(id)
+      ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_reading_sensor_timestamp
+ON SCHEMA_NAME.reading(sensor_id, timestamp DESC);
+
+CREATE OR REPLACE FUNCTION SCHEMA_NAME.sync_sensor_reading_stats()
+RETURNS TRIGGER AS $$
+BEGIN
+    -- Cada tabela de transição só existe para o seu evento, por isso um ramo por TG_OP
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO sensor_reading_stats (sensor_id, reading_count, last_reading_at)
+        SELECT sensor_id, COUNT(*), MAX(timestamp)
+        FROM new_readings
+        GROUP BY sensor_id
+        ORDER BY sensor_id
+        ON CONFLICT (sensor_id) DO UPDATE
+        SET reading_count = sensor_reading_stats.reading_count + EXCLUDED.reading_count,
+            last_reading_at = GREATEST(sensor_reading_stats.last_reading_at, EXCLUDED.last_reading_at),
+            updated_at = CURRENT_TIMESTAMP;
+
+    ELSIF TG_OP = 'DELETE' THEN
+        -- A última leitura é relida via idx_reading_sensor_timestamp
+        UPDATE sensor_reading_stats st
+        SET reading_count = GREATEST(st.reading_count - o.removed, 0),
+            last_reading_at = (
+                SELECT r.timestamp
+                FROM reading r
+                WHERE r.sensor_id = st.sensor_id
+                ORDER BY r.timestamp DESC NULLS LAST
+                LIMIT 1
+            ),
+            updated_at = CURRENT_TIMESTAMP
+        FROM (
+            SELECT sensor_id, COUNT(*) AS removed
+            FROM old_readings
+            GROUP BY sensor_id
+        ) o
+        WHERE st.sensor_id = o.sensor_id;
+
+    ELSIF TG_OP = 'UPDATE' THEN
+        -- Só interessam leituras que mudaram de sensor ou de timestamp
+        UPDATE sensor_reading_stats st
+        SET reading_count = GREATEST(st.reading_count - o.removed, 0),
+            updated_at = CURRENT_TIMESTAMP
+        FROM (
+            SELECT o.sensor_id, COUNT(*) AS removed
+            FROM old_readings o
+            JOIN new_readings n ON n.id = o.id
+            WHERE o.sensor_id <> n.sensor_id
+               OR o.timestamp IS DISTINCT FROM n.timestamp
+            GROUP BY o.sensor_id
+        ) o
+        WHERE st.sensor_id = o.sensor_id;
+
+        INSERT INTO sensor_reading_stats (sensor_id, reading_count, last_reading_at)
+        SELECT n.sensor_id, COUNT(*), MAX(n.timestamp)
+        FROM new_readings n
+        JOIN old_readings o ON o.id = n.id
+        WHERE o.sensor_id <> n.sensor_id
+           OR o.timestamp IS DISTINCT FROM n.timestamp
+        GROUP BY n.sensor_id
+        ORDER BY n.sensor_id
+        ON CONFLICT (sensor_id) DO UPDATE
+        SET reading_count = sensor_reading_stats.reading_count + EXCLUDED.reading_count,
+            updated_at = CURRENT_TIMESTAMP;
+
+        UPDATE sensor_reading_stats st
+        SET last_reading_at = (
+                SELECT r.timestamp
+                FROM reading r
+                WHERE r.sensor_id = st.sensor_id
+                ORDER BY r.timestamp DESC NULLS LAST
+                LIMIT 1
+            )
+        WHERE st.sensor_id IN (
+            SELECT o.sensor_id
+            FROM old_readings o
+            JOIN new_readings n ON n.id = o.id
+            WHERE o.sensor_id <> n.sensor_id
+               OR o.timestamp IS DISTINCT FROM n.timestamp
+            UNION
+            SELECT n.sensor_id
+            FROM old_readings o
+            JOIN new_readings n ON n.id = o.id
+            WHERE o.sensor_id <> n.sensor_id
+               OR o.timestamp IS DISTINCT FROM n.timestamp
+        );
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Bloqueia escrita em reading enquanto o backfill e os triggers são criados
+LOCK TABLE SCHEMA_NAME.reading IN SHARE ROW EXCLUSIVE MODE;
+
+INSERT INTO SCHEMA_NAME.sensor_reading_stats (sensor_id, reading_count, last_reading_at)
+SELECT sensor_id, COUNT(*), MAX(timestamp)
+FROM SCHEMA_NAME.reading
+GROUP BY sensor_id
+ON CONFLICT (sensor_id) DO UPDATE
+SET reading_count = EXCLUDED.reading_count,
+    last_reading_at = EXCLUDED.last_reading_at,
+    updated_at = CURRENT_TIMESTAMP;
+
+DROP TRIGGER IF EXISTS trg_sensor_reading_stats_insert ON SCHEMA_NAME.reading;
+DROP TRIGGER IF EXISTS trg_sensor_reading_stats_update ON SCHEMA_NAME.reading;
+DROP TRIGGER IF EXISTS trg_sensor_reading_stats_delete ON SCHEMA_NAME.reading;
+
+CREATE TRIGGER trg_sensor_reading_stats_insert
+AFTER INSERT ON SCHEMA_NAME.reading
+REFERENCING NEW TABLE AS new_readings
+FOR EACH STATEMENT
+EXECUTE FUNCTION SCHEMA_NAME.sync_sensor_reading_stats();
+
+CREATE TRIGGER trg_sensor_reading_stats_update
+AFTER UPDATE ON SCHEMA_NAME.reading
+REFERENCING OLD TABLE AS old_readings NEW TABLE AS new_readings
+FOR EACH STATEMENT
+EXECUTE FUNCTION SCHEMA_NAME.sync_sensor_reading_stats();
+
+CREATE TRIGGER trg_sensor_reading_stats_delete
+AFTER DELETE ON SCHEMA_NAME.reading
+REFERENCING OLD TABLE AS old_readings
+FOR EACH STATEMENT
+EXECUTE FUNCTION SCHEMA_NAME.sync_sensor_reading_stats();
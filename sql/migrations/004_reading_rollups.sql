@@ -0,0 +1,71 @@
+-- Rollups de leituras por minuto/hora/dia (preenchidos por functions/reading_rollups.py)
+CREATE TABLE IF NOT EXISTS SCHEMA_NAME.reading_1m (
+    sensor_id INTEGER NOT NULL,
+    bucket TIMESTAMP NOT NULL,
+    metric VARCHAR(100) NOT NULL,
+    sample_count BIGINT NOT NULL DEFAULT 0,
+    value_sum DOUBLE PRECISION,
+    value_min DOUBLE PRECISION,
+    value_max DOUBLE PRECISION,
+    PRIMARY KEY (sensor_id, bucket, metric),
+    CONSTRAINT fk_sensor
+      FOREIGN KEY (sensor_id)
+      REFERENCES SCHEMA_NAME.sensor(id)
+      ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS SCHEMA_NAME.reading_1h (
+    sensor_id INTEGER NOT NULL,
+    bucket TIMESTAMP NOT NULL,
+    metric VARCHAR(100) NOT NULL,
+    sample_count BIGINT NOT NULL DEFAULT 0,
+    value_sum DOUBLE PRECISION,
+    value_min DOUBLE PRECISION,
+    value_max DOUBLE PRECISION,
+    PRIMARY KEY (sensor_id, bucket, metric),
+    CONSTRAINT fk_sensor
+      FOREIGN KEY (sensor_id)
+      REFERENCES SCHEMA_NAME.sensor(id)
+      ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS SCHEMA_NAME.reading_1d (
+    sensor_id INTEGER NOT NULL,
+    bucket TIMESTAMP NOT NULL,
+    metric VARCHAR(100) NOT NULL,
+    sample_count BIGINT NOT NULL DEFAULT 0,
+    value_sum DOUBLE PRECISION,
+    value_min DOUBLE PRECISION,
+    value_max DOUBLE PRECISION,
+    PRIMARY KEY (sensor_id, bucket, metric),
+    CONSTRAINT fk_sensor
+      FOREIGN KEY (sensor_id)
+      REFERENCES SCHEMA_NAME.sensor(id)
+      ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS SCHEMA_NAME.reading_rollup_watermark (
+    source VARCHAR(50) PRIMARY KEY,
+    last_reading_id BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE OR REPLACE FUNCTION SCHEMA_NAME.reading_metrics(p_value JSONB)
+RETURNS TABLE (metric TEXT, num DOUBLE PRECISION) AS $$
+    -- Campos numéricos de primeiro nível do JSON; um número solto vira a métrica 'value'
+    SELECT e.key, (e.value #>> '{}')::DOUBLE PRECISION
+    FROM jsonb_each(CASE WHEN jsonb_typeof(p_value) = 'object' THEN p_value ELSE '{}'::JSONB END) e
+    WHERE jsonb_typeof(e.value) = 'number'
+    UNION ALL
+    SELECT 'value', (p_value #>> '{}')::DOUBLE PRECISION
+    WHERE jsonb_typeof(p_value) = 'number';
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE INDEX IF NOT EXISTS idx_reading_1m_metric_bucket
+ON SCHEMA_NAME.reading_1m(metric, bucket);
+
+CREATE INDEX IF NOT EXISTS idx_reading_1h_metric_bucket
+ON SCHEMA_NAME.reading_1h(metric, bucket);
+
+CREATE INDEX IF NOT EXISTS idx_reading_1d_metric_bucket
+ON SCHEMA_NAME.reading_1d(metric, bucket);
@@ -0,0 +1,278 @@
+-- Armazenamento tipado (REAL[]) para leituras de sensores numéricos
+CREATE TABLE IF NOT EXISTS SCHEMA_NAME.reading_schema (
+    id SMALLINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+    sensor_type VARCHAR(100) NOT NULL UNIQUE,
+    metrics TEXT[] NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT chk_reading_schema_metrics CHECK (cardinality(metrics) > 0)
+);
+
+CREATE TABLE IF NOT EXISTS SCHEMA_NAME.reading_compact (
+    id BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+    sensor_id INTEGER NOT NULL,
+    schema_id SMALLINT NOT NULL,
+    timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    metrics REAL[] NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT fk_sensor
+      FOREIGN KEY (sensor_id)
+      REFERENCES SCHEMA_NAME.sensor(id)
+      ON DELETE CASCADE,
+    CONSTRAINT fk_reading_schema
+      FOREIGN KEY (schema_id)
+      REFERENCES SCHEMA_NAME.reading_schema(id)
+      ON DELETE RESTRICT
+);
+
+INSERT INTO SCHEMA_NAME.reading_schema (sensor_type, metrics)
+VALUES
+    ('Radar', ARRAY['speed']),
+    ('Sensor de Velocidade', ARRAY['speed']),
+    ('Sensor de Tráfego', ARRAY['vehicle_count', 'avg_speed', 'occupancy']),
+    ('Qualidade do Ar', ARRAY['aqi', 'pm25', 'pm10', 'co2']),
+    ('Ruído', ARRAY['noise_db'])
+ON CONFLICT (sensor_type) DO NOTHING;
+
+CREATE INDEX IF NOT EXISTS idx_reading_compact_sensor_timestamp
+ON SCHEMA_NAME.reading_compact(sensor_id, timestamp DESC);
+
+CREATE OR REPLACE FUNCTION SCHEMA_NAME.latest_reading_at(p_sensor_id INTEGER)
+RETURNS TIMESTAMP AS $$
+    -- Leitura mais recente entre reading e reading_compact (um index scan em cada)
+    SELECT GREATEST(
+        (SELECT r.timestamp
+         FROM reading r
+         WHERE r.sensor_id = p_sensor_id AND r.timestamp IS NOT NULL
+         ORDER BY r.timestamp DESC
+         LIMIT 1),
+        (SELECT rc.timestamp
+         FROM reading_compact rc
+         WHERE rc.sensor_id = p_sensor_id
+         ORDER BY rc.timestamp DESC
+         LIMIT 1)
+    );
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION SCHEMA_NAME.reading_compact_values(p_value JSONB, p_metrics TEXT[])
+RETURNS REAL[] AS $$
+    -- Payload JSON -> REAL[] na ordem de p_metrics; NULL quando o payload não cabe no esquema
+    SELECT CASE
+        WHEN jsonb_typeof(p_value) IS DISTINCT FROM 'object' THEN NULL
+        WHEN EXISTS (
+            SELECT 1
+            FROM jsonb_each(p_value) e
+            WHERE NOT (e.key = ANY (p_metrics))
+               OR jsonb_typeof(e.value) NOT IN ('number', 'null')
+        ) THEN NULL
+        ELSE ARRAY(
+            SELECT (p_value ->> u.metric)::REAL
+            FROM unnest(p_metrics) WITH ORDINALITY AS u(metric, ord)
+            ORDER BY u.ord
+        )
+    END;
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION SCHEMA_NAME.block_reading_schema_reorder()
+RETURNS TRIGGER AS $$
+BEGIN
+    -- Linhas de reading_compact guardam posições: métricas só podem ser acrescentadas ao final
+    IF NEW.metrics[1:cardinality(OLD.metrics)] IS DISTINCT FROM OLD.metrics THEN
+        RAISE EXCEPTION 'Métricas de reading_schema só podem ser acrescentadas ao final (%)', OLD.sensor_type;
+    END IF;
+
+    NEW.updated_at = CURRENT_TIMESTAMP;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION SCHEMA_NAME.sync_sensor_reading_stats()
+RETURNS TRIGGER AS $$
+BEGIN
+    -- Cada tabela de transição só existe para o seu evento, por isso um ramo por TG_OP
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO sensor_reading_stats (sensor_id, reading_count, last_reading_at)
+        SELECT sensor_id, COUNT(*), MAX(timestamp)
+        FROM new_readings
+        GROUP BY sensor_id
+        ORDER BY sensor_id
+        ON CONFLICT (sensor_id) DO UPDATE
+        SET reading_count = sensor_reading_stats.reading_count + EXCLUDED.reading_count,
+            last_reading_at = GREATEST(sensor_reading_stats.last_reading_at, EXCLUDED.last_reading_at),
+            updated_at = CURRENT_TIMESTAMP;
+
+    ELSIF TG_OP = 'DELETE' THEN
+        -- A última leitura é relida pelos índices (sensor_id, timestamp DESC)
+        UPDATE sensor_reading_stats st
+        SET reading_count = GREATEST(st.reading_count - o.removed, 0),
+            last_reading_at = latest_reading_at(st.sensor_id),
+            updated_at = CURRENT_TIMESTAMP
+        FROM (
+            SELECT sensor_id, COUNT(*) AS removed
+            FROM old_readings
+            GROUP BY sensor_id
+        ) o
+        WHERE st.sensor_id = o.sensor_id;
+
+    ELSIF TG_OP = 'UPDATE' THEN
+        -- Só interessam leituras que mudaram de sensor ou de timestamp
+        UPDATE sensor_reading_stats st
+        SET reading_count = GREATEST(st.reading_count - o.removed, 0),
+            updated_at = CURRENT_TIMESTAMP
+        FROM (
+            SELECT o.sensor_id, COUNT(*) AS removed
+            FROM old_readings o
+            JOIN new_readings n ON n.id = o.id
+            WHERE o.sensor_id <> n.sensor_id
+               OR o.timestamp IS DISTINCT FROM n.timestamp
+            GROUP BY o.sensor_id
+        ) o
+        WHERE st.sensor_id = o.sensor_id;
+
+        INSERT INTO sensor_reading_stats (sensor_id, reading_count, last_reading_at)
+        SELECT n.sensor_id, COUNT(*), MAX(n.timestamp)
+        FROM new_readings n
+        JOIN old_readings o ON o.id = n.id
+        WHERE o.sensor_id <> n.sensor_id
+           OR o.timestamp IS DISTINCT FROM n.timestamp
+        GROUP BY n.sensor_id
+        ORDER BY n.sensor_id
+        ON CONFLICT (sensor_id) DO UPDATE
+        SET reading_count = sensor_reading_stats.reading_count + EXCLUDED.reading_count,
+            updated_at = CURRENT_TIMESTAMP;
+
+        UPDATE sensor_reading_stats st
+        SET last_reading_at = latest_reading_at(st.sensor_id)
+        WHERE st.sensor_id IN (
+            SELECT o.sensor_id
+            FROM old_readings o
+            JOIN new_readings n ON n.id = o.id
+            WHERE o.sensor_id <> n.sensor_id
+               OR o.timestamp IS DISTINCT FROM n.timestamp
+            UNION
+            SELECT n.sensor_id
+            FROM old_readings o
+            JOIN new_readings n ON n.id = o.id
+            WHERE o.sensor_id <> n.sensor_id
+               OR o.timestamp IS DISTINCT FROM n.timestamp
+        );
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_sensor_reading_stats_compact_insert ON SCHEMA_NAME.reading_compact;
+DROP TRIGGER IF EXISTS trg_sensor_reading_stats_compact_update ON SCHEMA_NAME.reading_compact;
+DROP TRIGGER IF EXISTS trg_sensor_reading_stats_compact_delete ON SCHEMA_NAME.reading_compact;
+DROP TRIGGER IF EXISTS trg_block_reading_schema_reorder ON SCHEMA_NAME.reading_schema;
+
+CREATE TRIGGER trg_sensor_reading_stats_compact_insert
+AFTER INSERT ON SCHEMA_NAME.reading_compact
+REFERENCING NEW TABLE AS new_readings
+FOR EACH STATEMENT
+EXECUTE FUNCTION SCHEMA_NAME.sync_sensor_reading_stats();
+
+CREATE TRIGGER trg_sensor_reading_stats_compact_update
+AFTER UPDATE ON SCHEMA_NAME.reading_compact
+REFERENCING OLD TABLE AS old_readings NEW TABLE AS new_readings
+FOR EACH STATEMENT
+EXECUTE FUNCTION SCHEMA_NAME.sync_sensor_reading_stats();
+
+CREATE TRIGGER trg_sensor_reading_stats_compact_delete
+AFTER DELETE ON SCHEMA_NAME.reading_compact
+REFERENCING OLD TABLE AS old_readings
+FOR EACH STATEMENT
+EXECUTE FUNCTION SCHEMA_NAME.sync_sensor_reading_stats();
+
+CREATE TRIGGER trg_block_reading_schema_reorder
+BEFORE UPDATE ON SCHEMA_NAME.reading_schema
+FOR EACH ROW
+EXECUTE FUNCTION SCHEMA_NAME.block_reading_schema_reorder();
+
+CREATE OR REPLACE VIEW SCHEMA_NAME.reading_all AS
+SELECT 'reading' AS source, r.id::BIGINT AS id, r.sensor_id, r.timestamp, r.value
+FROM SCHEMA_NAME.reading r
+UNION ALL
+SELECT
+    'reading_compact' AS source,
+    rc.id,
+    rc.sensor_id,
+    rc.timestamp,
+    COALESCE(
+        (SELECT jsonb_object_agg(u.metric, u.num)
+         FROM unnest(rs.metrics, rc.metrics) AS u(metric, num)
+         WHERE u.metric IS NOT NULL AND u.num IS NOT NULL),
+        '{}'::JSONB
+    ) AS value
+FROM SCHEMA_NAME.reading_compact rc
+JOIN SCHEMA_NAME.reading_schema rs ON rs.id = rc.schema_id;
+
+-- Move as leituras JSONB que cabem no esquema do tipo do sensor para reading_compact.
+-- Linhas já agregadas nos rollups entram primeiro e o watermark de reading_compact
+-- é posicionado logo após elas, para que nenhuma leitura seja contada duas vezes.
+DO $$
+DECLARE
+    v_reading_wm BIGINT;
+    v_compact_wm BIGINT;
+    v_rolled_max BIGINT;
+BEGIN
+    LOCK TABLE SCHEMA_NAME.reading IN SHARE ROW EXCLUSIVE MODE;
+    LOCK TABLE SCHEMA_NAME.reading_compact IN SHARE ROW EXCLUSIVE MODE;
+
+    INSERT INTO SCHEMA_NAME.reading_rollup_watermark (source, last_reading_id)
+    VALUES ('reading', 0), ('reading_compact', 0)
+    ON CONFLICT (source) DO NOTHING;
+
+    SELECT last_reading_id INTO v_reading_wm
+    FROM SCHEMA_NAME.reading_rollup_watermark
+    WHERE source = 'reading'
+    FOR UPDATE;
+
+    SELECT last_reading_id INTO v_compact_wm
+    FROM SCHEMA_NAME.reading_rollup_watermark
+    WHERE source = 'reading_compact'
+    FOR UPDATE;
+
+    IF EXISTS (SELECT 1 FROM SCHEMA_NAME.reading_compact WHERE id > v_compact_wm) THEN
+        RAISE EXCEPTION 'reading_compact possui leituras não agregadas: execute functions/reading_rollups.py antes da migração';
+    END IF;
+
+    CREATE TEMP TABLE reading_move ON COMMIT DROP AS
+    SELECT
+        r.id,
+        r.sensor_id,
+        rs.id AS schema_id,
+        COALESCE(r.timestamp, r.created_at, CURRENT_TIMESTAMP) AS timestamp,
+        r.created_at,
+        SCHEMA_NAME.reading_compact_values(r.value, rs.metrics) AS metrics,
+        r.id <= v_reading_wm AS rolled_up
+    FROM SCHEMA_NAME.reading r
+    JOIN SCHEMA_NAME.sensor s ON s.id = r.sensor_id
+    JOIN SCHEMA_NAME.reading_schema rs ON rs.sensor_type = s.type
+    WHERE SCHEMA_NAME.reading_compact_values(r.value, rs.metrics) IS NOT NULL;
+
+    INSERT INTO SCHEMA_NAME.reading_compact (sensor_id, schema_id, timestamp, metrics, created_at)
+    SELECT sensor_id, schema_id, timestamp, metrics, created_at
+    FROM reading_move
+    WHERE rolled_up
+    ORDER BY id;
+
+    SELECT MAX(id) INTO v_rolled_max FROM SCHEMA_NAME.reading_compact;
+
+    UPDATE SCHEMA_NAME.reading_rollup_watermark
+    SET last_reading_id = GREATEST(COALESCE(v_rolled_max, 0), v_compact_wm),
+        updated_at = CURRENT_TIMESTAMP
+    WHERE source = 'reading_compact';
+
+    INSERT INTO SCHEMA_NAME.reading_compact (sensor_id, schema_id, timestamp, metrics, created_at)
+    SELECT sensor_id, schema_id, timestamp, metrics, created_at
+    FROM reading_move
+    WHERE NOT rolled_up
+    ORDER BY id;
+
+    DELETE FROM SCHEMA_NAME.reading r
+    USING reading_move m
+    WHERE r.id = m.id;
+END;
+$$;
@@ -0,0 +1,54 @@
+-- Feed em tempo real para a GUI: NOTIFY em reading/reading_compact e traffic_incident
+CREATE OR REPLACE FUNCTION SCHEMA_NAME.notify_reading_feed()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_payload TEXT;
+BEGIN
+    -- Um NOTIFY por lote de até 500 sensores: "id,id,..." (limite de 8000 bytes do payload)
+    FOR v_payload IN
+        SELECT string_agg(sensor_id::TEXT, ',')
+        FROM (
+            SELECT sensor_id, (ROW_NUMBER() OVER (ORDER BY sensor_id) - 1) / 500 AS chunk
+            FROM (SELECT DISTINCT sensor_id FROM new_readings) s
+        ) c
+        GROUP BY chunk
+    LOOP
+        PERFORM pg_notify('reading_feed', v_payload);
+    END LOOP;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION SCHEMA_NAME.notify_incident_feed()
+RETURNS TRIGGER AS $$
+BEGIN
+    -- Payload "<operação>:<id>" (I/U/D); NOTIFYs iguais na mesma transação são agrupados
+    PERFORM pg_notify(
+        'incident_feed',
+        left(TG_OP, 1) || ':' || CASE WHEN TG_OP = 'DELETE' THEN OLD.id ELSE NEW.id END
+    );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_notify_reading_feed ON SCHEMA_NAME.reading;
+DROP TRIGGER IF EXISTS trg_notify_reading_compact_feed ON SCHEMA_NAME.reading_compact;
+DROP TRIGGER IF EXISTS trg_notify_incident_feed ON SCHEMA_NAME.traffic_incident;
+
+CREATE TRIGGER trg_notify_reading_feed
+AFTER INSERT ON SCHEMA_NAME.reading
+REFERENCING NEW TABLE AS new_readings
+FOR EACH STATEMENT
+EXECUTE FUNCTION SCHEMA_NAME.notify_reading_feed();
+
+CREATE TRIGGER trg_notify_reading_compact_feed
+AFTER INSERT ON SCHEMA_NAME.reading_compact
+REFERENCING NEW TABLE AS new_readings
+FOR EACH STATEMENT
+EXECUTE FUNCTION SCHEMA_NAME.notify_reading_feed();
+
+CREATE TRIGGER trg_notify_incident_feed
+AFTER INSERT OR UPDATE OR DELETE ON SCHEMA_NAME.traffic_incident
+FOR EACH ROW
+EXECUTE FUNCTION SCHEMA_NAME.notify_incident_feed();
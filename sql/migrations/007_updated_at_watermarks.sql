@@ -0,0 +1,67 @@
+-- Carga incremental da GUI: updated_at mantido por trigger e indexado em cada tabela
+CREATE OR REPLACE FUNCTION SCHEMA_NAME.touch_updated_at()
+RETURNS TRIGGER AS $$
+BEGIN
+    -- updated_at é o watermark da carga incremental da GUI: todo UPDATE precisa avançá-lo
+    NEW.updated_at = CURRENT_TIMESTAMP;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_touch_updated_at_app_user ON SCHEMA_NAME.app_user;
+DROP TRIGGER IF EXISTS trg_touch_updated_at_citizen ON SCHEMA_NAME.citizen;
+DROP TRIGGER IF EXISTS trg_touch_updated_at_vehicle ON SCHEMA_NAME.vehicle;
+DROP TRIGGER IF EXISTS trg_touch_updated_at_sensor ON SCHEMA_NAME.sensor;
+DROP TRIGGER IF EXISTS trg_touch_updated_at_traffic_incident ON SCHEMA_NAME.traffic_incident;
+DROP TRIGGER IF EXISTS trg_touch_updated_at_fine ON SCHEMA_NAME.fine;
+
+CREATE TRIGGER trg_touch_updated_at_app_user
+BEFORE UPDATE ON SCHEMA_NAME.app_user
+FOR EACH ROW
+EXECUTE FUNCTION SCHEMA_NAME.touch_updated_at();
+
+CREATE TRIGGER trg_touch_updated_at_citizen
+BEFORE UPDATE ON SCHEMA_NAME.citizen
+FOR EACH ROW
+EXECUTE FUNCTION SCHEMA_NAME.touch_updated_at();
+
+CREATE TRIGGER trg_touch_updated_at_vehicle
+BEFORE UPDATE ON SCHEMA_NAME.vehicle
+FOR EACH ROW
+EXECUTE FUNCTION SCHEMA_NAME.touch_updated_at();
+
+CREATE TRIGGER trg_touch_updated_at_sensor
+BEFORE UPDATE ON SCHEMA_NAME.sensor
+FOR EACH ROW
+EXECUTE FUNCTION SCHEMA_NAME.touch_updated_at();
+
+CREATE TRIGGER trg_touch_updated_at_traffic_incident
+BEFORE UPDATE ON SCHEMA_NAME.traffic_incident
+FOR EACH ROW
+EXECUTE FUNCTION SCHEMA_NAME.touch_updated_at();
+
+CREATE TRIGGER trg_touch_updated_at_fine
+BEFORE UPDATE ON SCHEMA_NAME.fine
+FOR EACH ROW
+EXECUTE FUNCTION SCHEMA_NAME.touch_updated_at();
+
+CREATE INDEX IF NOT EXISTS idx_app_user_updated_at
+ON SCHEMA_NAME.app_user(updated_at);
+
+CREATE INDEX IF NOT EXISTS idx_citizen_updated_at
+ON SCHEMA_NAME.citizen(updated_at);
+
+CREATE INDEX IF NOT EXISTS idx_vehicle_updated_at
+ON SCHEMA_NAME.vehicle(updated_at);
+
+CREATE INDEX IF NOT EXISTS idx_sensor_updated_at
+ON SCHEMA_NAME.sensor(updated_at);
+
+CREATE INDEX IF NOT EXISTS idx_traffic_incident_updated_at
+ON SCHEMA_NAME.traffic_incident(updated_at);
+
+CREATE INDEX IF NOT EXISTS idx_fine_updated_at
+ON SCHEMA_NAME.fine(updated_at);
+
+CREATE INDEX IF NOT EXISTS idx_sensor_reading_stats_updated_at
+ON SCHEMA_NAME.sensor_reading_stats(updated_at);
@@ -0,0 +1,17 @@
+-- Busca aproximada (ILIKE/similarity) em nomes, placas e locais
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS idx_citizen_name_trgm
+ON SCHEMA_NAME.citizen USING GIN ((first_name || ' ' || last_name) gin_trgm_ops)
+WHERE deleted_at IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_vehicle_license_plate_trgm
+ON SCHEMA_NAME.vehicle USING GIN (license_plate gin_trgm_ops)
+WHERE deleted_at IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_traffic_incident_location_trgm
+ON SCHEMA_NAME.traffic_incident USING GIN (location gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_sensor_location_trgm
+ON SCHEMA_NAME.sensor USING GIN (location gin_trgm_ops)
+WHERE deleted_at IS NULL;
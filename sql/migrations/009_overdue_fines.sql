@@ -0,0 +1,79 @@
+-- Multas vencidas: status 'overdue', índice parcial, marcação em lote e view com o status corrente
+ALTER TABLE SCHEMA_NAME.fine DROP CONSTRAINT IF EXISTS chk_fine_status;
+ALTER TABLE SCHEMA_NAME.fine ADD CONSTRAINT chk_fine_status CHECK (
+    status IN ('pending', 'overdue', 'paid', 'cancelled')
+);
+
+CREATE INDEX IF NOT EXISTS idx_fine_pending_due_date
+ON SCHEMA_NAME.fine(due_date)
+WHERE status = 'pending';
+
+CREATE OR REPLACE FUNCTION SCHEMA_NAME.flag_overdue_fines()
+RETURNS INTEGER AS $$
+DECLARE
+    v_count INTEGER;
+BEGIN
+    -- Lê só o índice parcial idx_fine_pending_due_date
+    UPDATE fine
+    SET status = 'overdue',
+        updated_at = CURRENT_TIMESTAMP
+    WHERE status = 'pending'
+      AND due_date < CURRENT_DATE;
+
+    GET DIAGNOSTICS v_count = ROW_COUNT;
+    RETURN v_count;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION SCHEMA_NAME.prevent_delete_citizen_with_pending_fines()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_pending_count INTEGER;
+BEGIN
+    SELECT COUNT(*)
+    INTO v_pending_count
+    FROM fine
+    WHERE citizen_id = OLD.id
+      AND status IN ('pending', 'overdue');
+
+    IF v_pending_count > 0 THEN
+        RAISE EXCEPTION
+            'Não é possível excluir o cidadão %. Existem multas pendentes.',
+            OLD.id;
+    END IF;
+
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION SCHEMA_NAME.cancel_fines_when_citizen_deleted()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE fine
+    SET status = 'cancelled',
+        updated_at = CURRENT_TIMESTAMP
+    WHERE citizen_id = OLD.id
+      AND status IN ('pending', 'overdue');
+
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE VIEW SCHEMA_NAME.fine_current AS
+SELECT
+    f.id,
+    f.traffic_incident_id,
+    f.citizen_id,
+    f.amount,
+    -- Vencida mesmo antes da próxima execução de flag_overdue_fines()
+    CASE
+        WHEN f.status = 'pending' AND f.due_date < CURRENT_DATE THEN 'overdue'
+        ELSE f.status
+    END::VARCHAR(20) AS status,
+    f.due_date,
+    f.amount_paid_total,
+    f.created_at,
+    f.updated_at
+FROM SCHEMA_NAME.fine f;
+
+SELECT SCHEMA_NAME.flag_overdue_fines();
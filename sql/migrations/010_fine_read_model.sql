@@ -0,0 +1,216 @@
+-- Modelo de leitura desnormalizado das multas (multa, incidente, placa, cidadão), mantido por triggers
+CREATE TABLE IF NOT EXISTS SCHEMA_NAME.fine_read_model (
+    incident_id INTEGER NOT NULL,
+    fine_id INTEGER,
+    vehicle_id INTEGER,
+    citizen_id INTEGER,
+    amount NUMERIC(10,2),
+    status VARCHAR(20),
+    due_date DATE,
+    fine_created_at TIMESTAMP,
+    incident_location TEXT,
+    incident_description TEXT,
+    occurred_at TIMESTAMP,
+    license_plate VARCHAR(12),
+    first_name VARCHAR(100),
+    last_name VARCHAR(150),
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS ux_fine_read_model_fine
+ON SCHEMA_NAME.fine_read_model(fine_id);
+
+CREATE INDEX IF NOT EXISTS idx_fine_read_model_incident
+ON SCHEMA_NAME.fine_read_model(incident_id);
+
+CREATE INDEX IF NOT EXISTS idx_fine_read_model_citizen
+ON SCHEMA_NAME.fine_read_model(citizen_id);
+
+CREATE INDEX IF NOT EXISTS idx_fine_read_model_created_at
+ON SCHEMA_NAME.fine_read_model(fine_created_at DESC)
+WHERE fine_id IS NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_fine_read_model_open_due_date
+ON SCHEMA_NAME.fine_read_model(due_date)
+WHERE status IN ('pending', 'overdue');
+
+CREATE INDEX IF NOT EXISTS idx_fine_read_model_unfined
+ON SCHEMA_NAME.fine_read_model(occurred_at DESC)
+WHERE fine_id IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_fine_read_model_updated_at
+ON SCHEMA_NAME.fine_read_model(updated_at);
+
+CREATE OR REPLACE FUNCTION SCHEMA_NAME.refresh_fine_read_model(p_incident_ids INTEGER[])
+RETURNS VOID AS $$
+BEGIN
+    IF cardinality(p_incident_ids) = 0 THEN
+        RETURN;
+    END IF;
+
+    -- Recalcula a fatia inteira de cada incidente: cobre multas novas, removidas e incidentes sem multa
+    DELETE FROM fine_read_model
+    WHERE incident_id = ANY(p_incident_ids);
+
+    INSERT INTO fine_read_model (
+        incident_id, fine_id, vehicle_id, citizen_id, amount, status, due_date,
+        fine_created_at, incident_location, incident_description, occurred_at,
+        license_plate, first_name, last_name
+    )
+    SELECT
+        ti.id,
+        f.id,
+        ti.vehicle_id,
+        -- Com multa, o cidadão multado; sem multa, o dono do veículo (quem seria multado)
+        COALESCE(f.citizen_id, v.citizen_id),
+        f.amount,
+        f.status,
+        f.due_date,
+        f.created_at,
+        ti.location,
+        ti.description,
+        ti.occurred_at,
+        v.license_plate,
+        c.first_name,
+        c.last_name
+    FROM traffic_incident ti
+    LEFT JOIN fine f ON f.traffic_incident_id = ti.id
+    LEFT JOIN vehicle v ON v.id = ti.vehicle_id
+    LEFT JOIN citizen c ON c.id = COALESCE(f.citizen_id, v.citizen_id)
+    WHERE ti.id = ANY(p_incident_ids);
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION SCHEMA_NAME.sync_fine_read_model_fine()
+RETURNS TRIGGER AS $$
+BEGIN
+    -- Cada tabela de transição só existe no seu evento, por isso um ramo por TG_OP
+    IF TG_OP = 'INSERT' THEN
+        PERFORM refresh_fine_read_model(ARRAY(
+            SELECT DISTINCT traffic_incident_id FROM new_fines
+        ));
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM refresh_fine_read_model(ARRAY(
+            SELECT DISTINCT traffic_incident_id FROM old_fines
+        ));
+    ELSE
+        PERFORM refresh_fine_read_model(ARRAY(
+            SELECT traffic_incident_id FROM old_fines
+            UNION
+            SELECT traffic_incident_id FROM new_fines
+        ));
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION SCHEMA_NAME.sync_fine_read_model_incident()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM refresh_fine_read_model(ARRAY(SELECT id FROM new_incidents));
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM refresh_fine_read_model(ARRAY(SELECT id FROM old_incidents));
+    ELSE
+        PERFORM refresh_fine_read_model(ARRAY(SELECT id FROM new_incidents));
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION SCHEMA_NAME.sync_fine_read_model_vehicle()
+RETURNS TRIGGER AS $$
+BEGIN
+    -- Só placa e dono aparecem no modelo; demais updates (soft delete, modelo, ano) não custam nada
+    PERFORM refresh_fine_read_model(ARRAY(
+        SELECT ti.id
+        FROM new_vehicles n
+        JOIN old_vehicles o ON o.id = n.id
+        JOIN traffic_incident ti ON ti.vehicle_id = n.id
+        WHERE n.license_plate IS DISTINCT FROM o.license_plate
+           OR n.citizen_id IS DISTINCT FROM o.citizen_id
+    ));
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION SCHEMA_NAME.sync_fine_read_model_citizen()
+RETURNS TRIGGER AS $$
+BEGIN
+    -- Carteira e dívida mudam a cada multa/pagamento: só troca de nome refaz o modelo
+    PERFORM refresh_fine_read_model(ARRAY(
+        SELECT DISTINCT m.incident_id
+        FROM new_citizens n
+        JOIN old_citizens o ON o.id = n.id
+        JOIN fine_read_model m ON m.citizen_id = n.id
+        WHERE n.first_name IS DISTINCT FROM o.first_name
+           OR n.last_name IS DISTINCT FROM o.last_name
+    ));
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Carga inicial: todos os incidentes, com e sem multa
+TRUNCATE SCHEMA_NAME.fine_read_model;
+SELECT SCHEMA_NAME.refresh_fine_read_model(ARRAY(SELECT id FROM SCHEMA_NAME.traffic_incident));
+
+DROP TRIGGER IF EXISTS trg_fine_read_model_fine_insert ON SCHEMA_NAME.fine;
+DROP TRIGGER IF EXISTS trg_fine_read_model_fine_update ON SCHEMA_NAME.fine;
+DROP TRIGGER IF EXISTS trg_fine_read_model_fine_delete ON SCHEMA_NAME.fine;
+DROP TRIGGER IF EXISTS trg_fine_read_model_incident_insert ON SCHEMA_NAME.traffic_incident;
+DROP TRIGGER IF EXISTS trg_fine_read_model_incident_update ON SCHEMA_NAME.traffic_incident;
+DROP TRIGGER IF EXISTS trg_fine_read_model_incident_delete ON SCHEMA_NAME.traffic_incident;
+DROP TRIGGER IF EXISTS trg_fine_read_model_vehicle_update ON SCHEMA_NAME.vehicle;
+DROP TRIGGER IF EXISTS trg_fine_read_model_citizen_update ON SCHEMA_NAME.citizen;
+
+CREATE TRIGGER trg_fine_read_model_fine_insert
+AFTER INSERT ON SCHEMA_NAME.fine
+REFERENCING NEW TABLE AS new_fines
+FOR EACH STATEMENT
+EXECUTE FUNCTION SCHEMA_NAME.sync_fine_read_model_fine();
+
+CREATE TRIGGER trg_fine_read_model_fine_update
+AFTER UPDATE ON SCHEMA_NAME.fine
+REFERENCING OLD TABLE AS old_fines NEW TABLE AS new_fines
+FOR EACH STATEMENT
+EXECUTE FUNCTION SCHEMA_NAME.sync_fine_read_model_fine();
+
+CREATE TRIGGER trg_fine_read_model_fine_delete
+AFTER DELETE ON SCHEMA_NAME.fine
+REFERENCING OLD TABLE AS old_fines
+FOR EACH STATEMENT
+EXECUTE FUNCTION SCHEMA_NAME.sync_fine_read_model_fine();
+
+CREATE TRIGGER trg_fine_read_model_incident_insert
+AFTER INSERT ON SCHEMA_NAME.traffic_incident
+REFERENCING NEW TABLE AS new_incidents
+FOR EACH STATEMENT
+EXECUTE FUNCTION SCHEMA_NAME.sync_fine_read_model_incident();
+
+CREATE TRIGGER trg_fine_read_model_incident_update
+AFTER UPDATE ON SCHEMA_NAME.traffic_incident
+REFERENCING OLD TABLE AS old_incidents NEW TABLE AS new_incidents
+FOR EACH STATEMENT
+EXECUTE FUNCTION SCHEMA_NAME.sync_fine_read_model_incident();
+
+CREATE TRIGGER trg_fine_read_model_incident_delete
+AFTER DELETE ON SCHEMA_NAME.traffic_incident
+REFERENCING OLD TABLE AS old_incidents
+FOR EACH STATEMENT
+EXECUTE FUNCTION SCHEMA_NAME.sync_fine_read_model_incident();
+
+CREATE TRIGGER trg_fine_read_model_vehicle_update
+AFTER UPDATE ON SCHEMA_NAME.vehicle
+REFERENCING OLD TABLE AS old_vehicles NEW TABLE AS new_vehicles
+FOR EACH STATEMENT
+EXECUTE FUNCTION SCHEMA_NAME.sync_fine_read_model_vehicle();
+
+CREATE TRIGGER trg_fine_read_model_citizen_update
+AFTER UPDATE ON SCHEMA_NAME.citizen
+REFERENCING OLD TABLE AS old_citizens NEW TABLE AS new_citizens
+FOR EACH STATEMENT
+EXECUTE FUNCTION SCHEMA_NAME.sync_fine_read_model_citizen();
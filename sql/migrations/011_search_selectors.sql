@@ -0,0 +1,14 @@
+-- Busca dos seletores da GUI (multas em aberto e incidentes sem multa) no modelo de leitura
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS idx_fine_read_model_open_trgm
+ON SCHEMA_NAME.fine_read_model USING GIN (
+    (COALESCE(license_plate, '') || ' ' || COALESCE(first_name, '') || ' ' || COALESCE(last_name, '')) gin_trgm_ops
+)
+WHERE status IN ('pending', 'overdue');
+
+CREATE INDEX IF NOT EXISTS idx_fine_read_model_unfined_trgm
+ON SCHEMA_NAME.fine_read_model USING GIN (
+    (COALESCE(license_plate, '') || ' ' || COALESCE(incident_location, '')) gin_trgm_ops
+)
+WHERE fine_id IS NULL;
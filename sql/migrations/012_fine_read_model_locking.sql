@@ -0,0 +1,50 @@
+-- Serializa a atualização de fine_read_model por incidente (DELETE + INSERT concorrentes duplicavam linhas)
+CREATE OR REPLACE FUNCTION SCHEMA_NAME.refresh_fine_read_model(p_incident_ids INTEGER[])
+RETURNS VOID AS $$
+DECLARE
+    v_incident_id INTEGER;
+BEGIN
+    IF cardinality(p_incident_ids) = 0 THEN
+        RETURN;
+    END IF;
+
+    -- Uma atualização por incidente de cada vez, em ordem de id (sem deadlock): sem isso, uma transação
+    -- que esperou pelo DELETE de outra não enxerga as linhas que ela inseriu e duplica a fatia
+    FOR v_incident_id IN
+        SELECT DISTINCT u.id FROM unnest(p_incident_ids) AS u(id) ORDER BY u.id
+    LOOP
+        PERFORM pg_advisory_xact_lock(hashtext('fine_read_model'), v_incident_id);
+    END LOOP;
+
+    -- Recalcula a fatia inteira de cada incidente: cobre multas novas, removidas e incidentes sem multa
+    DELETE FROM fine_read_model
+    WHERE incident_id = ANY(p_incident_ids);
+
+    INSERT INTO fine_read_model (
+        incident_id, fine_id, vehicle_id, citizen_id, amount, status, due_date,
+        fine_created_at, incident_location, incident_description, occurred_at,
+        license_plate, first_name, last_name
+    )
+    SELECT
+        ti.id,
+        f.id,
+        ti.vehicle_id,
+        -- Com multa, o cidadão multado; sem multa, o dono do veículo (quem seria multado)
+        COALESCE(f.citizen_id, v.citizen_id),
+        f.amount,
+        f.status,
+        f.due_date,
+        f.created_at,
+        ti.location,
+        ti.description,
+        ti.occurred_at,
+        v.license_plate,
+        c.first_name,
+        c.last_name
+    FROM traffic_incident ti
+    LEFT JOIN fine f ON f.traffic_incident_id = ti.id
+    LEFT JOIN vehicle v ON v.id = ti.vehicle_id
+    LEFT JOIN citizen c ON c.id = COALESCE(f.citizen_id, v.citizen_id)
+    WHERE ti.id = ANY(p_incident_ids);
+END;
+$$ LANGUAGE plpgsql;
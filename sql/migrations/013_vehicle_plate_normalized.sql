@@ -0,0 +1,5 @@
+-- Placa normalizada indexada: a checagem de placas da importação de frotas não varre mais vehicle
+-- migrate:no-transaction
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_vehicle_license_plate_normalized
+ON SCHEMA_NAME.vehicle ((regexp_replace(upper(COALESCE(license_plate, '')), '[^A-Z0-9]', '', 'g')))
+WHERE deleted_at IS NULL;
@@ -0,0 +1,87 @@
+-- Mantém fine.amount_paid_total também em UPDATE e DELETE de fine_payment (antes só o INSERT o atualizava)
+CREATE OR REPLACE FUNCTION SCHEMA_NAME.revise_fine_payments()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_fine_ids INTEGER[];
+    v_deltas NUMERIC[];
+BEGIN
+    -- Diferença por multa entre as tabelas de transição (um UPDATE pode trocar o fine_id do pagamento)
+    IF TG_OP = 'UPDATE' THEN
+        SELECT array_agg(fine_id ORDER BY fine_id), array_agg(delta ORDER BY fine_id)
+        INTO v_fine_ids, v_deltas
+        FROM (
+            SELECT fine_id, SUM(amount_paid) AS delta
+            FROM (
+                SELECT fine_id, amount_paid FROM new_payments
+                UNION ALL
+                SELECT fine_id, -amount_paid FROM old_payments
+            ) p
+            GROUP BY fine_id
+            HAVING SUM(amount_paid) <> 0
+        ) d;
+    ELSE
+        SELECT array_agg(fine_id ORDER BY fine_id), array_agg(delta ORDER BY fine_id)
+        INTO v_fine_ids, v_deltas
+        FROM (
+            SELECT fine_id, -SUM(amount_paid) AS delta
+            FROM old_payments
+            GROUP BY fine_id
+        ) d;
+    END IF;
+
+    IF v_fine_ids IS NULL THEN
+        RETURN NULL;
+    END IF;
+
+    -- Ajusta o total pago; uma multa paga que volta a ter saldo reabre como pendente ou vencida
+    UPDATE fine f
+    SET amount_paid_total = f.amount_paid_total + d.delta,
+        status = CASE
+            WHEN f.status = 'cancelled' THEN f.status
+            WHEN f.amount <= f.amount_paid_total + d.delta THEN 'paid'
+            WHEN f.status = 'paid' AND f.due_date < CURRENT_DATE THEN 'overdue'
+            WHEN f.status = 'paid' THEN 'pending'
+            ELSE f.status
+        END,
+        updated_at = CURRENT_TIMESTAMP
+    FROM unnest(v_fine_ids, v_deltas) AS d(fine_id, delta)
+    WHERE f.id = d.fine_id;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_revise_fine_payment_update ON SCHEMA_NAME.fine_payment;
+DROP TRIGGER IF EXISTS trg_revise_fine_payment_delete ON SCHEMA_NAME.fine_payment;
+
+CREATE TRIGGER trg_revise_fine_payment_update
+AFTER UPDATE ON SCHEMA_NAME.fine_payment
+REFERENCING OLD TABLE AS old_payments NEW TABLE AS new_payments
+FOR EACH STATEMENT
+EXECUTE FUNCTION SCHEMA_NAME.revise_fine_payments();
+
+CREATE TRIGGER trg_revise_fine_payment_delete
+AFTER DELETE ON SCHEMA_NAME.fine_payment
+REFERENCING OLD TABLE AS old_payments
+FOR EACH STATEMENT
+EXECUTE FUNCTION SCHEMA_NAME.revise_fine_payments();
+
+-- Corrige os totais (e o status) deixados errados por alterações anteriores em fine_payment
+UPDATE SCHEMA_NAME.fine f
+SET amount_paid_total = p.total,
+    status = CASE
+        WHEN f.status = 'cancelled' THEN f.status
+        WHEN f.amount <= p.total THEN 'paid'
+        WHEN f.status = 'paid' AND f.due_date < CURRENT_DATE THEN 'overdue'
+        WHEN f.status = 'paid' THEN 'pending'
+        ELSE f.status
+    END,
+    updated_at = CURRENT_TIMESTAMP
+FROM (
+    SELECT f2.id, COALESCE(SUM(fp.amount_paid), 0) AS total
+    FROM SCHEMA_NAME.fine f2
+    LEFT JOIN SCHEMA_NAME.fine_payment fp ON fp.fine_id = f2.id
+    GROUP BY f2.id
+) p
+WHERE f.id = p.id
+  AND f.amount_paid_total IS DISTINCT FROM p.total;
@@ -1,33 +1,33 @@
-CREATE OR REPLACE FUNCTION SCHEMA_NAME.apply_fine_to_wallet()
+CREATE OR REPLACE FUNCTION SCHEMA_NAME.apply_fines_to_wallet()
 RETURNS TRIGGER AS $$
-DECLARE
-    v_balance NUMERIC(10,2);
 BEGIN
-    IF NEW.status = 'cancelled' OR NEW.amount IS NULL OR NEW.amount = 0 THEN
-        RETURN NEW;
-    END IF;
-
-    SELECT wallet_balance
-    INTO v_balance
-    FROM citizen
-    WHERE id = NEW.citizen_id
-    FOR UPDATE;
-
-    IF v_balance >= NEW.amount THEN
-        UPDATE citizen
-        SET wallet_balance = wallet_balance - NEW.amount,
-            updated_at = CURRENT_TIMESTAMP
-        WHERE id = NEW.citizen_id;
-    ELSE
-        UPDATE citizen
-        SET wallet_balance = 0,
-            debt = debt + (NEW.amount - v_balance),
-            allowed = FALSE,
-            updated_at = CURRENT_TIMESTAMP
-        WHERE id = NEW.citizen_id;
-    END IF;
+    -- Soma as multas novas por cidadão e aplica carteira/dívida uma única vez
+    WITH new_amounts AS (
+        SELECT citizen_id, SUM(amount) AS total
+        FROM new_fines
+        WHERE status IS DISTINCT FROM 'cancelled'
+          AND amount > 0
+        GROUP BY citizen_id
+    ),
+    locked AS (
+        SELECT c.id, COALESCE(c.wallet_balance, 0) AS balance, n.total
+        FROM citizen c
+        JOIN new_amounts n ON n.citizen_id = c.id
+        ORDER BY c.id
+        FOR UPDATE OF c
+    )
+    UPDATE citizen c
+    SET wallet_balance = GREATEST(l.balance - l.total, 0),
+        debt = c.debt + GREATEST(l.total - l.balance, 0),
+        allowed = CASE
+            WHEN l.total > l.balance THEN FALSE
+            ELSE c.allowed
+        END,
+        updated_at = CURRENT_TIMESTAMP
+    FROM locked l
+    WHERE c.id = l.id;
 
-    RETURN NEW;
+    RETURN NULL;
 END;
 $$ LANGUAGE plpgsql;
 
@@ -36,10 +36,16 @@ RETURNS TRIGGER AS $$
 DECLARE
     v_citizen_id INTEGER;
 BEGIN
-    SELECT citizen_id
-    INTO v_citizen_id
-    FROM fine
-    WHERE id = NEW.fine_id;
+    -- Acumula o total pago e marca como paga no mesmo UPDATE
+    UPDATE fine
+    SET amount_paid_total = amount_paid_total + NEW.amount_paid,
+        status = CASE
+            WHEN amount <= amount_paid_total + NEW.amount_paid THEN 'paid'
+            ELSE status
+        END,
+        updated_at = CURRENT_TIMESTAMP
+    WHERE id = NEW.fine_id
+    RETURNING citizen_id INTO v_citizen_id;
 
     UPDATE citizen
     SET debt = GREATEST(debt - NEW.amount_paid, 0),
@@ -47,26 +53,384 @@ BEGIN
             WHEN debt - NEW.amount_paid <= 0 THEN TRUE
             ELSE allowed
         END,
+        wallet_balance = CASE
+            WHEN NEW.payment_method = 'Carteira Digital'
+                THEN GREATEST(wallet_balance - NEW.amount_paid, 0)
+            ELSE wallet_balance
+        END,
         updated_at = CURRENT_TIMESTAMP
     WHERE id = v_citizen_id;
 
-    IF NEW.payment_method = 'Carteira Digital' THEN
-        UPDATE citizen
-        SET wallet_balance = GREATEST(wallet_balance - NEW.amount_paid, 0),
-            updated_at = CURRENT_TIMESTAMP
-        WHERE id = v_citizen_id;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION SCHEMA_NAME.revise_fine_payments()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_fine_ids INTEGER[];
+    v_deltas NUMERIC[];
+BEGIN
+    -- Diferença por multa entre as tabelas de transição (um UPDATE pode trocar o fine_id do pagamento)
+    IF TG_OP = 'UPDATE' THEN
+        SELECT array_agg(fine_id ORDER BY fine_id), array_agg(delta ORDER BY fine_id)
+        INTO v_fine_ids, v_deltas
+        FROM (
+            SELECT fine_id, SUM(amount_paid) AS delta
+            FROM (
+                SELECT fine_id, amount_paid FROM new_payments
+                UNION ALL
+                SELECT fine_id, -amount_paid FROM old_payments
+            ) p
+            GROUP BY fine_id
+            HAVING SUM(amount_paid) <> 0
+        ) d;
+    ELSE
+        SELECT array_agg(fine_id ORDER BY fine_id), array_agg(delta ORDER BY fine_id)
+        INTO v_fine_ids, v_deltas
+        FROM (
+            SELECT fine_id, -SUM(amount_paid) AS delta
+            FROM old_payments
+            GROUP BY fine_id
+        ) d;
     END IF;
 
+    IF v_fine_ids IS NULL THEN
+        RETURN NULL;
+    END IF;
+
+    -- Ajusta o total pago; uma multa paga que volta a ter saldo reabre como pendente ou vencida
+    UPDATE fine f
+    SET amount_paid_total = f.amount_paid_total + d.delta,
+        status = CASE
+            WHEN f.status = 'cancelled' THEN f.status
+            WHEN f.amount <= f.amount_paid_total + d.delta THEN 'paid'
+            WHEN f.status = 'paid' AND f.due_date < CURRENT_DATE THEN 'overdue'
+            WHEN f.status = 'paid' THEN 'pending'
+            ELSE f.status
+        END,
+        updated_at = CURRENT_TIMESTAMP
+    FROM unnest(v_fine_ids, v_deltas) AS d(fine_id, delta)
+    WHERE f.id = d.fine_id;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION SCHEMA_NAME.flag_overdue_fines()
+RETURNS INTEGER AS $$
+DECLARE
+    v_count INTEGER;
+BEGIN
+    -- Lê só o índice parcial idx_fine_pending_due_date
     UPDATE fine
-    SET status = 'paid',
+    SET status = 'overdue',
         updated_at = CURRENT_TIMESTAMP
-    WHERE id = NEW.fine_id
-      AND amount <= (
-          SELECT COALESCE(SUM(amount_paid), 0)
-          FROM fine_payment
-          WHERE fine_id = NEW.fine_id
-      );
+    WHERE status = 'pending'
+      AND due_date < CURRENT_DATE;
+
+    GET DIAGNOSTICS v_count = ROW_COUNT;
+    RETURN v_count;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION SCHEMA_NAME.latest_reading_at(p_sensor_id INTEGER)
+RETURNS TIMESTAMP AS $$
+    -- Leitura mais recente entre reading e reading_compact (um index scan em cada)
+    SELECT GREATEST(
+        (SELECT r.timestamp
+         FROM reading r
+         WHERE r.sensor_id = p_sensor_id AND r.timestamp IS NOT NULL
+         ORDER BY r.timestamp DESC
+         LIMIT 1),
+        (SELECT rc.timestamp
+         FROM reading_compact rc
+         WHERE rc.sensor_id = p_sensor_id
+         ORDER BY rc.timestamp DESC
+         LIMIT 1)
+    );
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION SCHEMA_NAME.reading_compact_values(p_value JSONB, p_metrics TEXT[])
+RETURNS REAL[] AS $$
+    -- Payload JSON -> REAL[] na ordem de p_metrics; NULL quando o payload não cabe no esquema
+    SELECT CASE
+        WHEN jsonb_typeof(p_value) IS DISTINCT FROM 'object' THEN NULL
+        WHEN EXISTS (
+            SELECT 1
+            FROM jsonb_each(p_value) e
+            WHERE NOT (e.key = ANY (p_metrics))
+               OR jsonb_typeof(e.value) NOT IN ('number', 'null')
+        ) THEN NULL
+        ELSE ARRAY(
+            SELECT (p_value ->> u.metric)::REAL
+            FROM unnest(p_metrics) WITH ORDINALITY AS u(metric, ord)
+            ORDER BY u.ord
+        )
+    END;
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION SCHEMA_NAME.block_reading_schema_reorder()
+RETURNS TRIGGER AS $$
+BEGIN
+    -- Linhas de reading_compact guardam posições: métricas só podem ser acrescentadas ao final
+    IF NEW.metrics[1:cardinality(OLD.metrics)] IS DISTINCT FROM OLD.metrics THEN
+        RAISE EXCEPTION 'Métricas de reading_schema só podem ser acrescentadas ao final (%)', OLD.sensor_type;
+    END IF;
+
+    NEW.updated_at = CURRENT_TIMESTAMP;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
 
+CREATE OR REPLACE FUNCTION SCHEMA_NAME.sync_sensor_reading_stats()
+RETURNS TRIGGER AS $$
+BEGIN
+    -- Cada tabela de transição só existe para o seu evento, por isso um ramo por TG_OP
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO sensor_reading_stats (sensor_id, reading_count, last_reading_at)
+        SELECT sensor_id, COUNT(*), MAX(timestamp)
+        FROM new_readings
+        GROUP BY sensor_id
+        ORDER BY sensor_id
+        ON CONFLICT (sensor_id) DO UPDATE
+        SET reading_count = sensor_reading_stats.reading_count + EXCLUDED.reading_count,
+            last_reading_at = GREATEST(sensor_reading_stats.last_reading_at, EXCLUDED.last_reading_at),
+            updated_at = CURRENT_TIMESTAMP;
+
+    ELSIF TG_OP = 'DELETE' THEN
+        -- A última leitura é relida pelos índices (sensor_id, timestamp DESC)
+        UPDATE sensor_reading_stats st
+        SET reading_count = GREATEST(st.reading_count - o.removed, 0),
+            last_reading_at = latest_reading_at(st.sensor_id),
+            updated_at = CURRENT_TIMESTAMP
+        FROM (
+            SELECT sensor_id, COUNT(*) AS removed
+            FROM old_readings
+            GROUP BY sensor_id
+        ) o
+        WHERE st.sensor_id = o.sensor_id;
+
+    ELSIF TG_OP = 'UPDATE' THEN
+        -- Só interessam leituras que mudaram de sensor ou de timestamp
+        UPDATE sensor_reading_stats st
+        SET reading_count = GREATEST(st.reading_count - o.removed, 0),
+            updated_at = CURRENT_TIMESTAMP
+        FROM (
+            SELECT o.sensor_id, COUNT(*) AS removed
+            FROM old_readings o
+            JOIN new_readings n ON n.id = o.id
+            WHERE o.sensor_id <> n.sensor_id
+               OR o.timestamp IS DISTINCT FROM n.timestamp
+            GROUP BY o.sensor_id
+        ) o
+        WHERE st.sensor_id = o.sensor_id;
+
+        INSERT INTO sensor_reading_stats (sensor_id, reading_count, last_reading_at)
+        SELECT n.sensor_id, COUNT(*), MAX(n.timestamp)
+        FROM new_readings n
+        JOIN old_readings o ON o.id = n.id
+        WHERE o.sensor_id <> n.sensor_id
+           OR o.timestamp IS DISTINCT FROM n.timestamp
+        GROUP BY n.sensor_id
+        ORDER BY n.sensor_id
+        ON CONFLICT (sensor_id) DO UPDATE
+        SET reading_count = sensor_reading_stats.reading_count + EXCLUDED.reading_count,
+            updated_at = CURRENT_TIMESTAMP;
+
+        UPDATE sensor_reading_stats st
+        SET last_reading_at = latest_reading_at(st.sensor_id)
+        WHERE st.sensor_id IN (
+            SELECT o.sensor_id
+            FROM old_readings o
+            JOIN new_readings n ON n.id = o.id
+            WHERE o.sensor_id <> n.sensor_id
+               OR o.timestamp IS DISTINCT FROM n.timestamp
+            UNION
+            SELECT n.sensor_id
+            FROM old_readings o
+            JOIN new_readings n ON n.id = o.id
+            WHERE o.sensor_id <> n.sensor_id
+               OR o.timestamp IS DISTINCT FROM n.timestamp
+        );
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION SCHEMA_NAME.reading_metrics(p_value JSONB)
+RETURNS TABLE (metric TEXT, num DOUBLE PRECISION) AS $$
+    -- Campos numéricos de primeiro nível do JSON; um número solto vira a métrica 'value'
+    SELECT e.key, (e.value #>> '{}')::DOUBLE PRECISION
+    FROM jsonb_each(CASE WHEN jsonb_typeof(p_value) = 'object' THEN p_value ELSE '{}'::JSONB END) e
+    WHERE jsonb_typeof(e.value) = 'number'
+    UNION ALL
+    SELECT 'value', (p_value #>> '{}')::DOUBLE PRECISION
+    WHERE jsonb_typeof(p_value) = 'number';
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION SCHEMA_NAME.notify_reading_feed()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_payload TEXT;
+BEGIN
+    -- Um NOTIFY por lote de até 500 sensores: "id,id,..." (limite de 8000 bytes do payload)
+    FOR v_payload IN
+        SELECT string_agg(sensor_id::TEXT, ',')
+        FROM (
+            SELECT sensor_id, (ROW_NUMBER() OVER (ORDER BY sensor_id) - 1) / 500 AS chunk
+            FROM (SELECT DISTINCT sensor_id FROM new_readings) s
+        ) c
+        GROUP BY chunk
+    LOOP
+        PERFORM pg_notify('reading_feed', v_payload);
+    END LOOP;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION SCHEMA_NAME.notify_incident_feed()
+RETURNS TRIGGER AS $$
+BEGIN
+    -- Payload "<operação>:<id>" (I/U/D); NOTIFYs iguais na mesma transação são agrupados
+    PERFORM pg_notify(
+        'incident_feed',
+        left(TG_OP, 1) || ':' || CASE WHEN TG_OP = 'DELETE' THEN OLD.id ELSE NEW.id END
+    );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION SCHEMA_NAME.refresh_fine_read_model(p_incident_ids INTEGER[])
+RETURNS VOID AS $$
+DECLARE
+    v_incident_id INTEGER;
+BEGIN
+    IF cardinality(p_incident_ids) = 0 THEN
+        RETURN;
+    END IF;
+
+    -- Uma atualização por incidente de cada vez, em ordem de id (sem deadlock): sem isso, uma transação
+    -- que esperou pelo DELETE de outra não enxerga as linhas que ela inseriu e duplica a fatia
+    FOR v_incident_id IN
+        SELECT DISTINCT u.id FROM unnest(p_incident_ids) AS u(id) ORDER BY u.id
+    LOOP
+        PERFORM pg_advisory_xact_lock(hashtext('fine_read_model'), v_incident_id);
+    END LOOP;
+
+    -- Recalcula a fatia inteira de cada incidente: cobre multas novas, removidas e incidentes sem multa
+    DELETE FROM fine_read_model
+    WHERE incident_id = ANY(p_incident_ids);
+
+    INSERT INTO fine_read_model (
+        incident_id, fine_id, vehicle_id, citizen_id, amount, status, due_date,
+        fine_created_at, incident_location, incident_description, occurred_at,
+        license_plate, first_name, last_name
+    )
+    SELECT
+        ti.id,
+        f.id,
+        ti.vehicle_id,
+        -- Com multa, o cidadão multado; sem multa, o dono do veículo (quem seria multado)
+        COALESCE(f.citizen_id, v.citizen_id),
+        f.amount,
+        f.status,
+        f.due_date,
+        f.created_at,
+        ti.location,
+        ti.description,
+        ti.occurred_at,
+        v.license_plate,
+        c.first_name,
+        c.last_name
+    FROM traffic_incident ti
+    LEFT JOIN fine f ON f.traffic_incident_id = ti.id
+    LEFT JOIN vehicle v ON v.id = ti.vehicle_id
+    LEFT JOIN citizen c ON c.id = COALESCE(f.citizen_id, v.citizen_id)
+    WHERE ti.id = ANY(p_incident_ids);
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION SCHEMA_NAME.sync_fine_read_model_fine()
+RETURNS TRIGGER AS $$
+BEGIN
+    -- Cada tabela de transição só existe no seu evento, por isso um ramo por TG_OP
+    IF TG_OP = 'INSERT' THEN
+        PERFORM refresh_fine_read_model(ARRAY(
+            SELECT DISTINCT traffic_incident_id FROM new_fines
+        ));
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM refresh_fine_read_model(ARRAY(
+            SELECT DISTINCT traffic_incident_id FROM old_fines
+        ));
+    ELSE
+        PERFORM refresh_fine_read_model(ARRAY(
+            SELECT traffic_incident_id FROM old_fines
+            UNION
+            SELECT traffic_incident_id FROM new_fines
+        ));
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION SCHEMA_NAME.sync_fine_read_model_incident()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM refresh_fine_read_model(ARRAY(SELECT id FROM new_incidents));
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM refresh_fine_read_model(ARRAY(SELECT id FROM old_incidents));
+    ELSE
+        PERFORM refresh_fine_read_model(ARRAY(SELECT id FROM new_incidents));
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION SCHEMA_NAME.sync_fine_read_model_vehicle()
+RETURNS TRIGGER AS $$
+BEGIN
+    -- Só placa e dono aparecem no modelo; demais updates (soft delete, modelo, ano) não custam nada
+    PERFORM refresh_fine_read_model(ARRAY(
+        SELECT ti.id
+        FROM new_vehicles n
+        JOIN old_vehicles o ON o.id = n.id
+        JOIN traffic_incident ti ON ti.vehicle_id = n.id
+        WHERE n.license_plate IS DISTINCT FROM o.license_plate
+           OR n.citizen_id IS DISTINCT FROM o.citizen_id
+    ));
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION SCHEMA_NAME.sync_fine_read_model_citizen()
+RETURNS TRIGGER AS $$
+BEGIN
+    -- Carteira e dívida mudam a cada multa/pagamento: só troca de nome refaz o modelo
+    PERFORM refresh_fine_read_model(ARRAY(
+        SELECT DISTINCT m.incident_id
+        FROM new_citizens n
+        JOIN old_citizens o ON o.id = n.id
+        JOIN fine_read_model m ON m.citizen_id = n.id
+        WHERE n.first_name IS DISTINCT FROM o.first_name
+           OR n.last_name IS DISTINCT FROM o.last_name
+    ));
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION SCHEMA_NAME.touch_updated_at()
+RETURNS TRIGGER AS $$
+BEGIN
+    -- updated_at é o watermark da carga incremental da GUI: todo UPDATE precisa avançá-lo
+    NEW.updated_at = CURRENT_TIMESTAMP;
     RETURN NEW;
 END;
 $$ LANGUAGE plpgsql;
@@ -226,7 +590,7 @@ BEGIN
     INTO v_pending_count
     FROM fine
     WHERE citizen_id = OLD.id
-      AND status = 'pending';
+      AND status IN ('pending', 'overdue');
 
     IF v_pending_count > 0 THEN
         RAISE EXCEPTION
@@ -245,7 +609,7 @@ BEGIN
     SET status = 'cancelled',
         updated_at = CURRENT_TIMESTAMP
     WHERE citizen_id = OLD.id
-      AND status = 'pending';
+      AND status IN ('pending', 'overdue');
 
     RETURN OLD;
 END;
@@ -1,14 +1,136 @@
 -- Multas
 CREATE TRIGGER trg_apply_fine
 AFTER INSERT ON SCHEMA_NAME.fine
+REFERENCING NEW TABLE AS new_fines
+FOR EACH STATEMENT
+EXECUTE FUNCTION SCHEMA_NAME.apply_fines_to_wallet();
+
+-- Leituras
+CREATE TRIGGER trg_sensor_reading_stats_insert
+AFTER INSERT ON SCHEMA_NAME.reading
+REFERENCING NEW TABLE AS new_readings
+FOR EACH STATEMENT
+EXECUTE FUNCTION SCHEMA_NAME.sync_sensor_reading_stats();
+
+CREATE TRIGGER trg_sensor_reading_stats_update
+AFTER UPDATE ON SCHEMA_NAME.reading
+REFERENCING OLD TABLE AS old_readings NEW TABLE AS new_readings
+FOR EACH STATEMENT
+EXECUTE FUNCTION SCHEMA_NAME.sync_sensor_reading_stats();
+
+CREATE TRIGGER trg_sensor_reading_stats_delete
+AFTER DELETE ON SCHEMA_NAME.reading
+REFERENCING OLD TABLE AS old_readings
+FOR EACH STATEMENT
+EXECUTE FUNCTION SCHEMA_NAME.sync_sensor_reading_stats();
+
+CREATE TRIGGER trg_sensor_reading_stats_compact_insert
+AFTER INSERT ON SCHEMA_NAME.reading_compact
+REFERENCING NEW TABLE AS new_readings
+FOR EACH STATEMENT
+EXECUTE FUNCTION SCHEMA_NAME.sync_sensor_reading_stats();
+
+CREATE TRIGGER trg_sensor_reading_stats_compact_update
+AFTER UPDATE ON SCHEMA_NAME.reading_compact
+REFERENCING OLD TABLE AS old_readings NEW TABLE AS new_readings
+FOR EACH STATEMENT
+EXECUTE FUNCTION SCHEMA_NAME.sync_sensor_reading_stats();
+
+CREATE TRIGGER trg_sensor_reading_stats_compact_delete
+AFTER DELETE ON SCHEMA_NAME.reading_compact
+REFERENCING OLD TABLE AS old_readings
+FOR EACH STATEMENT
+EXECUTE FUNCTION SCHEMA_NAME.sync_sensor_reading_stats();
+
+CREATE TRIGGER trg_block_reading_schema_reorder
+BEFORE UPDATE ON SCHEMA_NAME.reading_schema
 FOR EACH ROW
-EXECUTE FUNCTION SCHEMA_NAME.apply_fine_to_wallet();
+EXECUTE FUNCTION SCHEMA_NAME.block_reading_schema_reorder();
+
+-- Feed em tempo real (LISTEN/NOTIFY)
+CREATE TRIGGER trg_notify_reading_feed
+AFTER INSERT ON SCHEMA_NAME.reading
+REFERENCING NEW TABLE AS new_readings
+FOR EACH STATEMENT
+EXECUTE FUNCTION SCHEMA_NAME.notify_reading_feed();
+
+CREATE TRIGGER trg_notify_reading_compact_feed
+AFTER INSERT ON SCHEMA_NAME.reading_compact
+REFERENCING NEW TABLE AS new_readings
+FOR EACH STATEMENT
+EXECUTE FUNCTION SCHEMA_NAME.notify_reading_feed();
+
+CREATE TRIGGER trg_notify_incident_feed
+AFTER INSERT OR UPDATE OR DELETE ON SCHEMA_NAME.traffic_incident
+FOR EACH ROW
+EXECUTE FUNCTION SCHEMA_NAME.notify_incident_feed();
+
+-- Modelo de leitura das multas
+CREATE TRIGGER trg_fine_read_model_fine_insert
+AFTER INSERT ON SCHEMA_NAME.fine
+REFERENCING NEW TABLE AS new_fines
+FOR EACH STATEMENT
+EXECUTE FUNCTION SCHEMA_NAME.sync_fine_read_model_fine();
+
+CREATE TRIGGER trg_fine_read_model_fine_update
+AFTER UPDATE ON SCHEMA_NAME.fine
+REFERENCING OLD TABLE AS old_fines NEW TABLE AS new_fines
+FOR EACH STATEMENT
+EXECUTE FUNCTION SCHEMA_NAME.sync_fine_read_model_fine();
+
+CREATE TRIGGER trg_fine_read_model_fine_delete
+AFTER DELETE ON SCHEMA_NAME.fine
+REFERENCING OLD TABLE AS old_fines
+FOR EACH STATEMENT
+EXECUTE FUNCTION SCHEMA_NAME.sync_fine_read_model_fine();
+
+CREATE TRIGGER trg_fine_read_model_incident_insert
+AFTER INSERT ON SCHEMA_NAME.traffic_incident
+REFERENCING NEW TABLE AS new_incidents
+FOR EACH STATEMENT
+EXECUTE FUNCTION SCHEMA_NAME.sync_fine_read_model_incident();
+
+CREATE TRIGGER trg_fine_read_model_incident_update
+AFTER UPDATE ON SCHEMA_NAME.traffic_incident
+REFERENCING OLD TABLE AS old_incidents NEW TABLE AS new_incidents
+FOR EACH STATEMENT
+EXECUTE FUNCTION SCHEMA_NAME.sync_fine_read_model_incident();
+
+CREATE TRIGGER trg_fine_read_model_incident_delete
+AFTER DELETE ON SCHEMA_NAME.traffic_incident
+REFERENCING OLD TABLE AS old_incidents
+FOR EACH STATEMENT
+EXECUTE FUNCTION SCHEMA_NAME.sync_fine_read_model_incident();
+
+CREATE TRIGGER trg_fine_read_model_vehicle_update
+AFTER UPDATE ON SCHEMA_NAME.vehicle
+REFERENCING OLD TABLE AS old_vehicles NEW TABLE AS new_vehicles
+FOR EACH STATEMENT
+EXECUTE FUNCTION SCHEMA_NAME.sync_fine_read_model_vehicle();
+
+CREATE TRIGGER trg_fine_read_model_citizen_update
+AFTER UPDATE ON SCHEMA_NAME.citizen
+REFERENCING OLD TABLE AS old_citizens NEW TABLE AS new_citizens
+FOR EACH STATEMENT
+EXECUTE FUNCTION SCHEMA_NAME.sync_fine_read_model_citizen();
 
 CREATE TRIGGER trg_apply_fine_payment
 AFTER INSERT ON SCHEMA_NAME.fine_payment
 FOR EACH ROW
 EXECUTE FUNCTION SCHEMA_NAME.apply_fine_payment();
 
+CREATE TRIGGER trg_revise_fine_payment_update
+AFTER UPDATE ON SCHEMA_NAME.fine_payment
+REFERENCING OLD TABLE AS old_payments NEW TABLE AS new_payments
+FOR EACH STATEMENT
+EXECUTE FUNCTION SCHEMA_NAME.revise_fine_payments();
+
+CREATE TRIGGER trg_revise_fine_payment_delete
+AFTER DELETE ON SCHEMA_NAME.fine_payment
+REFERENCING OLD TABLE AS old_payments
+FOR EACH STATEMENT
+EXECUTE FUNCTION SCHEMA_NAME.revise_fine_payments();
+
 -- Auditoria
 CREATE TRIGGER audit_app_user
 AFTER INSERT OR UPDATE OR DELETE ON SCHEMA_NAME.app_user
@@ -77,3 +199,34 @@ CREATE TRIGGER trg_block_update_deleted_sensor
 BEFORE UPDATE ON SCHEMA_NAME.sensor
 FOR EACH ROW
 EXECUTE FUNCTION SCHEMA_NAME.block_update_deleted_generic();
+
+-- Watermark de atualização incremental (updated_at)
+CREATE TRIGGER trg_touch_updated_at_app_user
+BEFORE UPDATE ON SCHEMA_NAME.app_user
+FOR EACH ROW
+EXECUTE FUNCTION SCHEMA_NAME.touch_updated_at();
+
+CREATE TRIGGER trg_touch_updated_at_citizen
+BEFORE UPDATE ON SCHEMA_NAME.citizen
+FOR EACH ROW
+EXECUTE FUNCTION SCHEMA_NAME.touch_updated_at();
+
+CREATE TRIGGER trg_touch_updated_at_vehicle
+BEFORE UPDATE ON SCHEMA_NAME.vehicle
+FOR EACH ROW
+EXECUTE FUNCTION SCHEMA_NAME.touch_updated_at();
+
+CREATE TRIGGER trg_touch_updated_at_sensor
+BEFORE UPDATE ON SCHEMA_NAME.sensor
+FOR EACH ROW
+EXECUTE FUNCTION SCHEMA_NAME.touch_updated_at();
+
+CREATE TRIGGER trg_touch_updated_at_traffic_incident
+BEFORE UPDATE ON SCHEMA_NAME.traffic_incident
+FOR EACH ROW
+EXECUTE FUNCTION SCHEMA_NAME.touch_updated_at();
+
+CREATE TRIGGER trg_touch_updated_at_fine
+BEFORE UPDATE ON SCHEMA_NAME.fine
+FOR EACH ROW
+EXECUTE FUNCTION SCHEMA_NAME.touch_updated_at();
@@ -16,4 +16,39 @@ WHERE deleted_at IS NULL;
 CREATE OR REPLACE VIEW SCHEMA_NAME.app_user_active AS
 SELECT *
 FROM SCHEMA_NAME.app_user
-WHERE deleted_at IS NULL;
\ No newline at end of file
+WHERE deleted_at IS NULL;
+
+CREATE OR REPLACE VIEW SCHEMA_NAME.fine_current AS
+SELECT
+    f.id,
+    f.traffic_incident_id,
+    f.citizen_id,
+    f.amount,
+    -- Vencida mesmo antes da próxima execução de flag_overdue_fines()
+    CASE
+        WHEN f.status = 'pending' AND f.due_date < CURRENT_DATE THEN 'overdue'
+        ELSE f.status
+    END::VARCHAR(20) AS status,
+    f.due_date,
+    f.amount_paid_total,
+    f.created_at,
+    f.updated_at
+FROM SCHEMA_NAME.fine f;
+
+CREATE OR REPLACE VIEW SCHEMA_NAME.reading_all AS
+SELECT 'reading' AS source, r.id::BIGINT AS id, r.sensor_id, r.timestamp, r.value
+FROM SCHEMA_NAME.reading r
+UNION ALL
+SELECT
+    'reading_compact' AS source,
+    rc.id,
+    rc.sensor_id,
+    rc.timestamp,
+    COALESCE(
+        (SELECT jsonb_object_agg(u.metric, u.num)
+         FROM unnest(rs.metrics, rc.metrics) AS u(metric, num)
+         WHERE u.metric IS NOT NULL AND u.num IS NOT NULL),
+        '{}'::JSONB
+    ) AS value
+FROM SCHEMA_NAME.reading_compact rc
+JOIN SCHEMA_NAME.reading_schema rs ON rs.id = rc.schema_id;